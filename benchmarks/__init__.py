@@ -0,0 +1,4 @@
+"""Offline benchmarks that run Barry's commands against a simulated Discord guild.
+
+See ``python -m benchmarks.run --help``.
+"""
@@ -0,0 +1,254 @@
+"""Generate labelled Avrae-style messages for parser benchmarks.
+
+Each :class:`CorpusMessage` carries the answers a correct parser should give: the
+contribution points in it, the level-ups it announces and the auto-responder rules it
+should trigger. Messages come in the variants the Avrae guide warns about (markdown
+around numbers, zero-width characters, curly apostrophes, thousands separators, odd
+casing) plus near misses that should not match anything, so a parser change shows up
+as a change in precision and recall as well as speed.
+
+The shapes follow docs/avrae_message_guide.md and the default rules in
+``Listeners.DEFAULT_AUTORESPONDERS``; the text itself is synthetic.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+VARIANTS = ("plain", "markdown", "zero_width", "curly", "commas", "case")
+
+NAMES = (
+    "Aria", "Brom", "Cerys", "Dain", "Elowen", "Fabian", "Galen", "Hesper", "Ilyra", "Jorin",
+    "Kestrel", "Lyra", "Mimi", "Nox", "Osovar", "Paige", "Quill", "Rook", "Sarran", "Thessaly",
+)
+SPELLS = ("Fire Bolt", "Light", "Shield", "Magic Missile", "Misty Step", "Counterspell", "Fireball", "Revivify")
+
+
+@dataclass
+class CorpusFooter:
+    text: str
+
+
+@dataclass
+class CorpusField:
+    name: str
+    value: str
+
+
+@dataclass
+class CorpusEmbed:
+    title: Optional[str] = None
+    description: Optional[str] = None
+    fields: List[CorpusField] = field(default_factory=list)
+    footer: Optional[CorpusFooter] = None
+
+
+@dataclass
+class CorpusAuthor:
+    id: int
+    name: str
+    bot: bool
+
+
+AVRAE = CorpusAuthor(261302296103747584, "Avrae", True)
+PLAYER = CorpusAuthor(100000000000000001, "player", False)
+
+
+@dataclass
+class CorpusMessage:
+    """A message shaped like ``discord.Message`` plus the expected parser results."""
+
+    id: int
+    kind: str
+    variant: str
+    author: CorpusAuthor
+    content: str = ""
+    embeds: List[CorpusEmbed] = field(default_factory=list)
+    points: Optional[int] = None
+    level_ups: Tuple[Tuple[str, int], ...] = ()
+    triggers: FrozenSet[str] = frozenset()
+    guild: None = None
+    channel: None = None
+
+
+def _ordinal(level: int) -> str:
+    return f"{level}{({1: 'st', 2: 'nd', 3: 'rd'}.get(level if level % 100 not in (11, 12, 13) else 0, 'th'))}"
+
+
+def _inject_zero_width(text: str, rng: random.Random) -> str:
+    """Put a zero-width space after a random space, as Avrae and copy-pasted text sometimes do."""
+
+    spaces = [index for index, char in enumerate(text) if char == " "]
+    if not spaces:
+        return text + "\u200b"
+    index = rng.choice(spaces)
+    return text[: index + 1] + "\u200b" + text[index + 1 :]
+
+
+def _downtime(rng: random.Random, variant: str) -> dict:
+    name = rng.choice(NAMES)
+    points = rng.randint(1000, 250000) if variant == "commas" else rng.randint(1, 60)
+    number = f"{points:,}"
+    if variant == "markdown":
+        number = rng.choice(("**{}**", "*{}*", "_{}_", "***{}***")).format(number)
+    apostrophe = "’" if variant == "curly" else "'"
+    only = "only " if rng.random() < 0.2 else ""
+    line = f"That{apostrophe}s {only}{number} contribution points towards the Mythal."
+    if variant == "case":
+        line = line.upper()
+    if variant == "zero_width":
+        line = _inject_zero_width(line, rng)
+    roll = f"**Arcana**: 1d20 ({rng.randint(1, 20)}) + 7 = `{rng.randint(8, 27)}`"
+    return {
+        "embeds": [CorpusEmbed(title=f"{name} has begun adding their energy to the Mythal!", description=f"{roll}\n{line}")],
+        "points": points,
+    }
+
+
+def _downtime_near_miss(rng: random.Random, variant: str) -> dict:
+    name = rng.choice(NAMES)
+    line = rng.choice(
+        (
+            f"That's {rng.randint(1, 60)} experience points.",
+            f"Contribution points so far: {rng.randint(1, 999)}",
+            f"{name} needs {rng.randint(1, 60)} more contribution points.",
+        )
+    )
+    return {"embeds": [CorpusEmbed(title=f"{name} rests for the day.", description=line)]}
+
+
+def _level_up(rng: random.Random, variant: str) -> dict:
+    name = rng.choice(NAMES)
+    level = rng.randint(2, 20)
+    ordinal = _ordinal(level)
+    if variant == "markdown":
+        ordinal = f"**{ordinal}**"
+    template = rng.choice(
+        (
+            "{name} levels up to {ordinal} level!",
+            "{name} gains {xp} Experience and levels up to {ordinal} level!",
+            "{name} leveled up to {ordinal} level",
+            "{name} reaches level {level}",
+        )
+    )
+    text = template.format(name=name, ordinal=ordinal, level=level, xp=f"{rng.randint(300, 355000):,}")
+    if variant == "case":
+        text = text.upper()
+        name = name.upper()
+    if variant == "zero_width":
+        text = _inject_zero_width(text, rng)
+    return {"embeds": [CorpusEmbed(title=text, description="Hit points increased.")], "level_ups": ((name, level),)}
+
+
+def _level_up_near_miss(rng: random.Random, variant: str) -> dict:
+    name = rng.choice(NAMES)
+    text = rng.choice(
+        (
+            f"{name} casts {rng.choice(SPELLS)} at {_ordinal(rng.randint(2, 9))} level!",
+            f"{name} has {rng.randint(1, 4)} {_ordinal(rng.randint(1, 9))} level spell slots remaining",
+            f"{name} reaches level {rng.randint(2, 9)} of the Undermountain",
+        )
+    )
+    return {"embeds": [CorpusEmbed(title=text, description="1d20 (11) + 3 = `14`")]}
+
+
+def _spellbook(rng: random.Random, variant: str) -> dict:
+    name = rng.choice(NAMES)
+    spells = rng.sample(SPELLS, rng.randint(2, len(SPELLS)))
+    footer = "An italicized spell indicates that the spell is homebrew."
+    if variant == "zero_width":
+        footer = _inject_zero_width(footer, rng)
+    if variant == "case":
+        footer = footer.upper()
+    apostrophe = "’" if variant == "curly" else "'"
+    cantrip = f"*{spells[0]}*" if variant == "markdown" else spells[0]
+    embed = CorpusEmbed(
+        title=f"{name}{apostrophe}s Spellbook",
+        description=f"{name} knows {len(spells)} spells.",
+        fields=[CorpusField("Cantrips", cantrip), CorpusField("1st Level", ", ".join(spells[1:]))],
+        footer=CorpusFooter(footer),
+    )
+    return {"embeds": [embed], "triggers": frozenset({"spellbook_tip"})}
+
+
+def _marketplace(rng: random.Random, variant: str) -> dict:
+    thing = rng.choice(SPELLS + ("Owlbear", "Mind Flayer", "Bag of Holding"))
+    link = "**Go to Marketplace**" if variant == "markdown" else "go to Marketplace"
+    if variant == "zero_width":
+        link = _inject_zero_width(link, rng)
+    if rng.random() < 0.2:
+        # Monster stat blocks include the phrase but link to full details, which suppresses the reply
+        description = f"Unlock {thing} on D&D Beyond to view this monster's full details. {link} to unlock."
+        return {"embeds": [CorpusEmbed(title=thing, description=description)]}
+    description = f"You do not have access to {thing}. {link} to unlock it."
+    return {"embeds": [CorpusEmbed(title="Error", description=description)], "triggers": frozenset({"avrae_marketplace"})}
+
+
+def _ddb_not_connected(rng: random.Random, variant: str) -> dict:
+    apostrophe = "’" if variant == "curly" else "'"
+    text = (
+        f"It looks like you don{apostrophe}t have your Discord account connected to your D&D Beyond account. "
+        "Link your account to use SRD content."
+    )
+    if variant == "zero_width":
+        text = _inject_zero_width(text, rng)
+    return {"embeds": [CorpusEmbed(title="Error", description=text)], "triggers": frozenset({"avrae_ddb_not_connected"})}
+
+
+def _player_chatter(rng: random.Random, variant: str) -> dict:
+    # Humans quoting Avrae should not trigger the Avrae-only responders
+    return {
+        "author": PLAYER,
+        "content": rng.choice(
+            (
+                "it told me to go to marketplace, what do I do?",
+                f"{rng.choice(NAMES)} reaches level {rng.randint(2, 20)} next session!",
+                "That's 20 contribution points? nice",
+                "anyone know a good spell for this?",
+            )
+        ),
+    }
+
+
+def _check(rng: random.Random, variant: str) -> dict:
+    name = rng.choice(NAMES)
+    skill = rng.choice(("Perception", "Stealth", "Arcana", "Insight", "Athletics"))
+    return {"embeds": [CorpusEmbed(title=f"{name} makes a {skill} check!", description=f"1d20 ({rng.randint(1, 20)}) + 4 = `{rng.randint(5, 24)}`")]}
+
+
+Builder = Callable[[random.Random, str], dict]
+
+# kind -> (builder, relative frequency, variants it comes in)
+KINDS: Dict[str, Tuple[Builder, float, Sequence[str]]] = {
+    "downtime": (_downtime, 0.25, VARIANTS),
+    "downtime_near_miss": (_downtime_near_miss, 0.05, ("plain",)),
+    "level_up": (_level_up, 0.15, ("plain", "markdown", "zero_width", "case")),
+    "level_up_near_miss": (_level_up_near_miss, 0.05, ("plain",)),
+    "spellbook": (_spellbook, 0.1, ("plain", "markdown", "zero_width", "curly", "case")),
+    "marketplace": (_marketplace, 0.05, ("plain", "markdown", "zero_width")),
+    "ddb_not_connected": (_ddb_not_connected, 0.05, ("plain", "curly", "zero_width")),
+    "player_chatter": (_player_chatter, 0.1, ("plain",)),
+    "check": (_check, 0.2, ("plain",)),
+}
+
+
+def generate_corpus(count: int, seed: int = 1, kinds: Optional[Sequence[str]] = None) -> List[CorpusMessage]:
+    """Return ``count`` labelled messages; the same seed always gives the same corpus.
+
+    Within each kind, half the messages are ``plain`` and the rest are spread evenly
+    over that kind's other variants.
+    """
+
+    rng = random.Random(seed)
+    names = list(kinds or KINDS)
+    weights = [KINDS[name][1] for name in names]
+    messages = []
+    for index in range(count):
+        kind = rng.choices(names, weights)[0]
+        builder, _, variants = KINDS[kind]
+        variant = "plain" if len(variants) == 1 or rng.random() < 0.5 else rng.choice(variants[1:])
+        values = builder(rng, variant)
+        messages.append(CorpusMessage(id=index + 1, kind=kind, variant=variant, author=values.pop("author", AVRAE), **values))
+    return messages
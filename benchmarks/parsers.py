@@ -0,0 +1,262 @@
+"""Throughput and accuracy of the Avrae parsers against a generated corpus.
+
+Usage::
+
+    python -m benchmarks.parsers                         # 20,000 messages, every parser
+    python -m benchmarks.parsers points --count 100000
+    python -m benchmarks.parsers --output before.json
+    python -m benchmarks.parsers --baseline before.json
+    python -m benchmarks.parsers --scaling 10,100,1000
+
+Each parser runs over the whole corpus ``--repeat`` times and the fastest pass is
+reported as messages per second. Its answers are scored against the corpus labels:
+precision is the share of reported items that were right, recall the share of
+expected items that were found, and misses are broken down by message kind and variant.
+
+``--scaling`` instead times the auto-responder literal scan with the default rules
+padded out to each given number of literals, to check that the per-message cost
+does not grow with the size of the rule set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import random
+import string
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from benchmarks.avrae_corpus import CorpusMessage, generate_corpus
+from bot.extensions._helpers.autoresponders import AutoResponderEngine, AutoResponderRule
+from bot.extensions._helpers.avrae import parse_contribution_points, parse_level_ups
+from bot.extensions._helpers.dispatch import MessageContext, message_text_parts
+from bot.extensions.listeners import Listeners
+
+
+def _text_blob(message: CorpusMessage) -> str:
+    return "\n".join(part for part in message_text_parts(message) if part)
+
+
+def _points(message: CorpusMessage) -> Set[Any]:
+    # Same order as /contributions: each embed description, then the whole message
+    for embed in message.embeds:
+        points = parse_contribution_points(embed.description or "")
+        if points is not None:
+            return {points}
+    points = parse_contribution_points(_text_blob(message))
+    return set() if points is None else {points}
+
+
+def _level_ups(message: CorpusMessage) -> Set[Any]:
+    return set(parse_level_ups(_text_blob(message)))
+
+
+_ENGINE = AutoResponderEngine([AutoResponderRule.from_dict(rule) for rule in Listeners.DEFAULT_AUTORESPONDERS])
+
+
+def _triggers(message: CorpusMessage) -> Set[Any]:
+    # A fresh context per message, as on_message builds one, so lowering the text is part of the cost
+    return {rule.name for rule, _ in _ENGINE.match(MessageContext(message))}
+
+
+@dataclass(frozen=True)
+class Parser:
+    parse: Callable[[CorpusMessage], Set[Any]]
+    expected: Callable[[CorpusMessage], Set[Any]]
+
+
+PARSERS: Dict[str, Parser] = {
+    "points": Parser(_points, lambda m: set() if m.points is None else {m.points}),
+    "level_ups": Parser(_level_ups, lambda m: set(m.level_ups)),
+    "triggers": Parser(_triggers, lambda m: set(m.triggers)),
+}
+
+
+@dataclass
+class ParserResult:
+    parser: str
+    messages: int
+    seconds: float
+    messages_per_second: float
+    precision: float
+    recall: float
+    true_positives: int
+    false_positives: int
+    false_negatives: int
+    misses: Dict[str, int] = field(default_factory=dict)
+    false_alarms: Dict[str, int] = field(default_factory=dict)
+
+    def row(self) -> str:
+        return (
+            f"{self.parser:<10} {self.messages_per_second:>12,.0f} {self.precision:>9.1%} {self.recall:>7.1%} "
+            f"{self.false_positives:>6} {self.false_negatives:>6}"
+        )
+
+
+HEADER = f"{'parser':<10} {'msgs/sec':>12} {'precision':>9} {'recall':>7} {'FP':>6} {'FN':>6}"
+
+
+def benchmark_parser(name: str, corpus: List[CorpusMessage], repeat: int = 5) -> ParserResult:
+    """Time ``name`` over ``corpus`` and score its answers against the labels."""
+
+    parser = PARSERS[name]
+    best = float("inf")
+    answers: List[Set[Any]] = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        answers = [parser.parse(message) for message in corpus]
+        best = min(best, time.perf_counter() - started)
+
+    tp = fp = fn = 0
+    misses: Counter = Counter()
+    false_alarms: Counter = Counter()
+    for message, found in zip(corpus, answers):
+        expected = parser.expected(message)
+        label = f"{message.kind}/{message.variant}"
+        tp += len(found & expected)
+        if found - expected:
+            fp += len(found - expected)
+            false_alarms[label] += 1
+        if expected - found:
+            fn += len(expected - found)
+            misses[label] += 1
+    return ParserResult(
+        parser=name,
+        messages=len(corpus),
+        seconds=best,
+        messages_per_second=len(corpus) / best if best else float("inf"),
+        precision=tp / (tp + fp) if tp + fp else 1.0,
+        recall=tp / (tp + fn) if tp + fn else 1.0,
+        true_positives=tp,
+        false_positives=fp,
+        false_negatives=fn,
+        misses=dict(misses.most_common()),
+        false_alarms=dict(false_alarms.most_common()),
+    )
+
+
+def compare(results: List[ParserResult], baseline: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Lines showing the change in speed (relative) and accuracy (points) against a baseline."""
+
+    lines = []
+    for result in results:
+        before = baseline.get(result.parser)
+        if not before:
+            continue
+        speed = (result.messages_per_second - before["messages_per_second"]) / before["messages_per_second"]
+        lines.append(
+            f"{result.parser:<10} speed {speed:+.1%}, precision {(result.precision - before['precision']) * 100:+.1f}pt, "
+            f"recall {(result.recall - before['recall']) * 100:+.1f}pt"
+        )
+    return lines
+
+
+@dataclass
+class ScalingResult:
+    literals: int
+    microseconds_per_message: float
+
+    def row(self) -> str:
+        return f"{self.literals:>8} {self.microseconds_per_message:>12.2f}"
+
+
+SCALING_HEADER = f"{'literals':>8} {'us/message':>12}"
+
+
+def _filler_rules(count: int, seed: int) -> List[AutoResponderRule]:
+    """``count`` single-trigger rules whose two-word phrases do not occur in the corpus."""
+
+    rng = random.Random(seed)
+    rules = []
+    for index in range(count):
+        words = ("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(2))
+        rules.append(AutoResponderRule.from_dict({"name": f"filler_{index}", "triggers": [" ".join(words)], "response": "x"}))
+    return rules
+
+
+def benchmark_literal_scaling(
+    corpus: List[CorpusMessage], counts: Sequence[int], repeat: int = 5, seed: int = 1
+) -> List[ScalingResult]:
+    """Time the shared literal scan over ``corpus`` with each number of literals in ``counts``."""
+
+    defaults = [AutoResponderRule.from_dict(rule) for rule in Listeners.DEFAULT_AUTORESPONDERS]
+    base = len(AutoResponderEngine(defaults).matcher.literals)
+    texts = [_text_blob(message).lower() for message in corpus]
+    results = []
+    for count in counts:
+        matcher = AutoResponderEngine(defaults + _filler_rules(max(0, count - base), seed)).matcher
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            for text in texts:
+                matcher.find(text)
+            best = min(best, time.perf_counter() - started)
+        results.append(ScalingResult(literals=len(matcher.literals), microseconds_per_message=best / len(texts) * 1e6))
+    return results
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("parsers", nargs="*", help=f"Parsers to run: {', '.join(PARSERS)} (default: all)")
+    parser.add_argument("--count", type=int, default=20000, help="Messages in the corpus (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus random seed (default %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per parser; the fastest is kept (default %(default)s)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+    parser.add_argument(
+        "--scaling", help="Time the auto-responder scan at these comma-separated literal counts instead, e.g. 10,100,1000"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.parsers) - set(PARSERS))
+    if unknown:
+        parser.error(f"unknown parser(s): {', '.join(unknown)}")
+    corpus = generate_corpus(args.count, seed=args.seed)
+    kinds = Counter(message.kind for message in corpus)
+    print(f"Corpus: {len(corpus)} messages, seed {args.seed} ({', '.join(f'{k} {n}' for k, n in sorted(kinds.items()))})")
+    if args.scaling:
+        counts = [int(count) for count in args.scaling.split(",") if count.strip()]
+        print(SCALING_HEADER)
+        for scaling in benchmark_literal_scaling(corpus, counts, repeat=args.repeat, seed=args.seed):
+            print(scaling.row())
+        return 0
+    print(HEADER)
+    results = []
+    for name in args.parsers or list(PARSERS):
+        result = benchmark_parser(name, corpus, repeat=args.repeat)
+        results.append(result)
+        print(result.row())
+    for result in results:
+        for title, counts in (("misses", result.misses), ("false positives", result.false_alarms)):
+            if counts:
+                print(f"\n{result.parser} {title} by kind/variant:")
+                for label, count in counts.items():
+                    print(f"    {count:>6} {label}")
+
+    corpus_spec = {"count": args.count, "seed": args.seed}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            payload = {"corpus": corpus_spec, "results": {r.parser: dataclasses.asdict(r) for r in results}}
+            json.dump(payload, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline.get("corpus") != corpus_spec:
+            print("Warning: baseline was recorded with a different corpus.", file=sys.stderr)
+        print("\nAgainst baseline:")
+        for line in compare(results, baseline.get("results", {})):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Replay a captured event log into the Listeners cog against simulated Discord.
+
+Usage::
+
+    python -m benchmarks.replay /data/events.jsonl               # original speed
+    python -m benchmarks.replay events.jsonl --speed 100         # 100x real traffic
+    python -m benchmarks.replay events.jsonl --speed 0 --responses
+
+Capture a log with ``BARRY_CAPTURE_EVENTS`` (see bot/services/event_capture.py).
+Every event is handed to ``Listeners.on_message`` or ``on_raw_reaction_add`` in its
+own task at its recorded offset divided by ``--speed``, as the gateway would. Sends,
+replies, DMs and reactions go to the simulated guild's fakes, so each REST call is
+counted and delayed (``--latency``, ``--global-rate``) without touching Discord.
+Replies still pass through the real outbound scheduler and its rate limits.
+
+The report shows per-event latency percentiles, the dispatcher's per-handler
+latencies, the responses that would have been sent and the REST calls made.
+Digests that are still open when the log ends are flushed, and their posts are
+counted as responses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import discord
+
+from benchmarks.simulated_guild import GuildSpec, SimulatedWorld
+from bot.extensions.listeners import Listeners
+from bot.services.cooldowns import CooldownStore
+from bot.services.event_capture import read_events
+from bot.services.opt_outs import OptOutRegistry
+from bot.services.sent_messages import SentMessageRegistry
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 when empty)."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+@dataclass
+class ReplayReport:
+    events: Dict[str, int]
+    capture_seconds: float
+    wall_seconds: float
+    speed: float
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    max_lag_seconds: float = 0.0
+    errors: int = 0
+    handlers: List[str] = field(default_factory=list)
+    responses: List[Dict[str, Any]] = field(default_factory=list)
+    rest_calls: int = 0
+    routes: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly report with percentiles instead of raw latencies."""
+
+        data = dataclasses.asdict(self)
+        data["latencies"] = {
+            event: {
+                **{f"p{round(q * 100)}_ms": percentile(values, q) * 1000 for q in PERCENTILES},
+                "max_ms": max(values, default=0.0) * 1000,
+            }
+            for event, values in self.latencies.items()
+        }
+        return data
+
+    def lines(self, show_responses: bool = False) -> List[str]:
+        total = sum(self.events.values())
+        achieved = self.capture_seconds / self.wall_seconds if self.wall_seconds else 0.0
+        out = [
+            f"Replayed {total} events ({', '.join(f'{n} {t}' for t, n in sorted(self.events.items()))}) "
+            f"covering {self.capture_seconds:.1f}s of capture in {self.wall_seconds:.1f}s ({achieved:.1f}x)",
+            "",
+            f"{'event':<22} {'n':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}",
+        ]
+        for event, values in sorted(self.latencies.items()):
+            cells = [percentile(values, q) for q in PERCENTILES] + [max(values, default=0.0)]
+            out.append(f"{event:<22} {len(values):>7} " + " ".join(f"{value * 1000:>7.1f}ms" for value in cells))
+        out.append(f"Max dispatch lag {self.max_lag_seconds * 1000:.1f}ms; {self.errors} listener error(s)")
+        if self.handlers:
+            out += ["", "Handlers:"] + [f"    {line}" for line in self.handlers]
+
+        kinds = Counter(_response_kind(response) for response in self.responses)
+        out += ["", f"Responses: {len(self.responses)} ({', '.join(f'{n} {k}' for k, n in sorted(kinds.items())) or 'none'})"]
+        if show_responses:
+            for response in self.responses:
+                text = response.get("content") or response.get("reaction") or ""
+                out.append(f"    #{response['channel']}: {text[:100]!r}")
+        out.append(f"REST calls: {self.rest_calls}")
+        out += [f"    {count:>6} x {route}" for route, count in sorted(self.routes.items(), key=lambda item: -item[1])]
+        return out
+
+
+def _response_kind(response: Dict[str, Any]) -> str:
+    if "reaction" in response:
+        return "reactions"
+    if response["channel"].startswith("dm-"):
+        return "DMs"
+    return "replies" if response.get("reply") else "channel messages"
+
+
+class Replayer:
+    """Rebuilds captured payloads as fake discord objects and feeds them to a fresh Listeners cog."""
+
+    def __init__(self, header: Dict[str, Any], spec: GuildSpec, data_dir: str) -> None:
+        self.world = SimulatedWorld(spec)
+        bot_user_id = header.get("bot_user_id")
+        if bot_user_id is not None:
+            self.world.bot_user = self.world.user(int(bot_user_id), "barry", bot=True)
+            self.world.bot.user = self.world.bot_user
+        services = self.world.bot.services
+        services.sent_messages = SentMessageRegistry(os.path.join(data_dir, "sent_messages.json"))
+        services.cooldowns = CooldownStore(os.path.join(data_dir, "cooldowns.json"))
+        services.opt_outs = OptOutRegistry(":memory:")
+        self.cog = Listeners(self.world.bot)
+
+    def message(self, data: Dict[str, Any]) -> Any:
+        guild_id = int(data["guild_id"]) if data.get("guild_id") else None
+        channel = self.world.channel(int(data["channel_id"]), guild_id)
+        author_data = data.get("author") or {}
+        author = self.world.user(int(author_data.get("id", 0)), author_data.get("username"), bool(author_data.get("bot")))
+        message = channel.get_partial_message(int(data["id"]))
+        message.author = author
+        message.content = data.get("content") or ""
+        message.embeds = [discord.Embed.from_dict(embed) for embed in data.get("embeds") or []]
+        reference = data.get("message_reference")
+        if reference and reference.get("message_id"):
+            message.reference = SimpleNamespace(message_id=int(reference["message_id"]), resolved=None)
+        metadata = data.get("interaction_metadata")
+        if metadata and metadata.get("user"):
+            user = metadata["user"]
+            message.interaction_metadata = SimpleNamespace(user=self.world.user(int(user["id"]), user.get("username")))
+        return message
+
+    def reaction(self, data: Dict[str, Any]) -> Any:
+        member = (data.get("member") or {}).get("user")
+        emoji = data.get("emoji") or {}
+        return SimpleNamespace(
+            guild_id=int(data["guild_id"]) if data.get("guild_id") else None,
+            channel_id=int(data["channel_id"]),
+            message_id=int(data["message_id"]),
+            user_id=int(data["user_id"]),
+            emoji=discord.PartialEmoji(name=emoji.get("name"), id=int(emoji["id"]) if emoji.get("id") else None),
+            member=self.world.user(int(member["id"]), member.get("username"), bool(member.get("bot"))) if member else None,
+        )
+
+    async def _dispatch(self, event: Dict[str, Any], report: ReplayReport) -> None:
+        kind = event["t"]
+        if kind == "MESSAGE_CREATE":
+            listener, argument = self.cog.on_message, self.message(event["d"])
+        else:
+            listener, argument = self.cog.on_raw_reaction_add, self.reaction(event["d"])
+        started = time.perf_counter()
+        try:
+            await listener(argument)
+        except Exception:
+            report.errors += 1
+        report.latencies.setdefault(kind, []).append(time.perf_counter() - started)
+
+    async def run(self, events: List[Dict[str, Any]], speed: float = 1.0) -> ReplayReport:
+        """Dispatch ``events`` at ``speed`` times their recorded pace (0 means as fast as possible)."""
+
+        report = ReplayReport(
+            events=dict(Counter(event["t"] for event in events)),
+            capture_seconds=events[-1]["at"] if events else 0.0,
+            wall_seconds=0.0,
+            speed=speed,
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = []
+        for event in events:
+            if speed > 0:
+                delay = started + event["at"] / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    report.max_lag_seconds = max(report.max_lag_seconds, -delay)
+            else:
+                await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(self._dispatch(event, report)))
+        await asyncio.gather(*tasks)
+        report.wall_seconds = loop.time() - started
+
+        # Flush open digests so their posts count as responses
+        await self.cog.cog_unload()
+        report.handlers = self.cog.dispatcher.latency_report()
+        report.responses = list(self.world.outbox)
+        report.rest_calls = self.world.rest.calls
+        report.routes = dict(self.world.rest.routes)
+        return report
+
+
+async def replay(path: str, speed: float = 1.0, spec: Optional[GuildSpec] = None) -> ReplayReport:
+    """Replay the capture at ``path`` into a fresh Listeners cog and return the report."""
+
+    header, events = read_events(path)
+    spec = spec or GuildSpec(channels=0, members=0, downtime_messages=0, level_up_messages=0)
+    with tempfile.TemporaryDirectory() as data_dir:
+        return await Replayer(header, spec, data_dir).run(events, speed)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Capture file written with BARRY_CAPTURE_EVENTS")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier; 0 = no delays (default %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated REST round trip in seconds (default %(default)s)")
+    parser.add_argument("--global-rate", type=int, default=50, help="Simulated global REST limit per second (default %(default)s)")
+    parser.add_argument("--responses", action="store_true", help="Print every response that would have been sent")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    return parser
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    spec = GuildSpec(
+        channels=0, members=0, downtime_messages=0, level_up_messages=0, latency=args.latency, global_rate=args.global_rate
+    )
+    report = await replay(args.path, args.speed, spec)
+    for line in report.lines(show_responses=args.responses):
+        print(line)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report.summary(), handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
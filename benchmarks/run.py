@@ -0,0 +1,262 @@
+"""Run slash commands against a simulated guild and report time, REST calls and memory.
+
+Usage::
+
+    python -m benchmarks.run                       # every command, default guild
+    python -m benchmarks.run useractivity log --channels 20 --latency 0.05
+    python -m benchmarks.run --output after.json --baseline before.json
+    python -m benchmarks.run contributions useractivity --workers 2
+
+Wall time is the median of ``--repeat`` runs. Peak memory comes from one extra run
+under ``tracemalloc`` (which slows execution, so it is kept out of the timings) and
+counts only allocations made by the command. The simulated history is built
+beforehand, but each history page hands out fresh message copies, as discord.py
+builds new objects from every page, so messages a command keeps are counted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.simulated_guild import GuildSpec, SimulatedWorld
+from bot.core.tracing import Trace
+from bot.extensions import summaries
+from bot.extensions.activity import Activity
+from bot.extensions.contributions import Contributions
+from bot.services.channel_reports import ChannelReportCache
+from bot.services.workers import ParseWorkerPool
+
+Scenario = Callable[[SimulatedWorld], Awaitable[Any]]
+# /tldr summarises this many of the most recent messages in the busiest channel
+TLDR_SCENE_LENGTH = 200
+
+
+async def _useractivity(world: SimulatedWorld) -> None:
+    cog = Activity(world.bot)
+    await cog.useractivity.callback(cog, world.interaction())
+
+
+async def _channelactivity(world: SimulatedWorld) -> None:
+    # Times the live scan rather than a report precomputed by the weekly job
+    with tempfile.TemporaryDirectory() as data_dir:
+        world.bot.services.channel_reports = ChannelReportCache(os.path.join(data_dir, "channel_reports.json"))
+        cog = Activity(world.bot)
+        await cog.channelactivity.callback(cog, world.interaction(), refresh=True)
+
+
+async def _log(world: SimulatedWorld) -> None:
+    cog = Activity(world.bot)
+    busiest = max(world.rp_channels, key=lambda channel: len(channel.messages))
+    await cog.log.callback(cog, world.interaction(busiest))
+
+
+async def _contributions(world: SimulatedWorld) -> None:
+    cog = Contributions(world.bot)
+    await cog.contributions.callback(cog, world.interaction(world.downtimes), message_limit=len(world.downtimes.messages))
+
+
+async def _tldr(world: SimulatedWorld) -> None:
+    cog = summaries.Summaries(world.bot)
+    channel = max(world.rp_channels, key=lambda channel: len(channel.messages))
+    scene = channel.messages[-TLDR_SCENE_LENGTH:]
+    with _simulated_llm(world.spec.llm_latency):
+        await cog.tldr.callback(cog, world.interaction(channel), str(scene[0].id), str(scene[-1].id))
+
+
+async def _export(world: SimulatedWorld) -> None:
+    cog = summaries.Summaries(world.bot)
+    channel = max(world.rp_channels, key=lambda channel: len(channel.messages))
+    await cog.export.callback(cog, world.interaction(channel), str(channel.messages[0].id), str(channel.messages[-1].id))
+
+
+@contextmanager
+def _simulated_llm(latency: float) -> Iterator[None]:
+    """Replace the Claude call with a canned summary that blocks for ``latency`` like the real client."""
+
+    def claude_call(prompt: str, max_tokens: int = 200, temperature: float = 0.8) -> str:
+        time.sleep(latency)
+        return "- A simulated summary of the scene."
+
+    original = summaries.claude_call
+    summaries.claude_call = claude_call
+    try:
+        yield
+    finally:
+        summaries.claude_call = original
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "useractivity": _useractivity,
+    "channelactivity": _channelactivity,
+    "contributions": _contributions,
+    "log": _log,
+    "tldr": _tldr,
+    "export": _export,
+}
+
+
+@dataclass
+class BenchmarkResult:
+    command: str
+    wall_seconds: float
+    wall_runs: List[float]
+    rest_calls: int
+    ratelimit_wait_seconds: float
+    peak_memory_bytes: int
+    responses: int
+    routes: List[Dict[str, Any]] = field(default_factory=list)
+
+    def row(self) -> str:
+        return (
+            f"{self.command:<16} {self.wall_seconds:>8.3f}s {self.rest_calls:>6} "
+            f"{self.ratelimit_wait_seconds:>8.3f}s {self.peak_memory_bytes / 1e6:>8.2f}MB {self.responses:>5}"
+        )
+
+
+HEADER = f"{'command':<16} {'wall':>9} {'calls':>6} {'rl wait':>9} {'peak mem':>10} {'sent':>5}"
+
+
+async def _run_once(name: str, spec: GuildSpec, measure_memory: bool, workers: Optional[ParseWorkerPool] = None) -> tuple:
+    world = SimulatedWorld(spec)
+    if workers is not None:
+        world.bot.services.workers = workers
+    gc.collect()
+    if measure_memory:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    with world.tracer.trace("command", name) as trace:
+        await SCENARIOS[name](world)
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+    return elapsed, trace, world.responses, peak
+
+
+async def run_benchmark(
+    name: str,
+    spec: GuildSpec,
+    repeat: int = 3,
+    measure_memory: bool = True,
+    workers: Optional[ParseWorkerPool] = None,
+) -> BenchmarkResult:
+    """Time ``name`` over ``repeat`` fresh worlds, then measure its peak memory once.
+
+    ``workers`` is shared by every run, so a pool started by an earlier run stays warm
+    as it would in the bot. Without it, parsing runs inline.
+    """
+
+    runs: List[float] = []
+    trace: Optional[Trace] = None
+    responses = 0
+    for _ in range(max(1, repeat)):
+        elapsed, trace, responses, _ = await _run_once(name, spec, measure_memory=False, workers=workers)
+        runs.append(elapsed)
+    peak = (await _run_once(name, spec, measure_memory=True, workers=workers))[3] if measure_memory else 0
+    assert trace is not None
+    summary = trace.summary()["rest"]
+    return BenchmarkResult(
+        command=name,
+        wall_seconds=statistics.median(runs),
+        wall_runs=runs,
+        rest_calls=summary["calls"],
+        ratelimit_wait_seconds=summary["ratelimit_wait_ms"] / 1000,
+        peak_memory_bytes=peak,
+        responses=responses,
+        routes=summary["routes"],
+    )
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Lines showing the relative change against a previous ``--output`` file."""
+
+    lines = []
+    for result in results:
+        before = baseline.get(result.command)
+        if not before:
+            continue
+        changes = []
+        for key, label in (("wall_seconds", "wall"), ("rest_calls", "calls"), ("peak_memory_bytes", "mem")):
+            old, new = before.get(key), getattr(result, key)
+            if old:
+                changes.append(f"{label} {(new - old) / old:+.1%}")
+        lines.append(f"{result.command:<16} " + ", ".join(changes))
+    return lines
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("commands", nargs="*", help=f"Commands to run: {', '.join(sorted(SCENARIOS))} (default: all)")
+    defaults = GuildSpec()
+    for spec_field in dataclasses.fields(GuildSpec):
+        parser.add_argument(
+            f"--{spec_field.name.replace('_', '-')}",
+            type=type(getattr(defaults, spec_field.name)),
+            default=getattr(defaults, spec_field.name),
+            help=f"Simulated guild {spec_field.name.replace('_', ' ')} (default %(default)s)",
+        )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per command (default %(default)s)")
+    parser.add_argument("--workers", type=int, default=0, help="Parse worker processes; 0 parses inline (default %(default)s)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--routes", action="store_true", help="Print REST calls per route for each command")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+    return parser
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.commands) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+    spec = GuildSpec(**{f.name: getattr(args, f.name) for f in dataclasses.fields(GuildSpec)})
+    names = args.commands or sorted(SCENARIOS)
+
+    print(f"Simulated guild: {json.dumps(dataclasses.asdict(spec))}")
+    print(HEADER)
+    results = []
+    workers = ParseWorkerPool(max_workers=args.workers)
+    try:
+        for name in names:
+            result = await run_benchmark(name, spec, repeat=args.repeat, measure_memory=not args.no_memory, workers=workers)
+            results.append(result)
+            print(result.row())
+            if args.routes:
+                for route in result.routes:
+                    print(f"    {route['calls']:>6} x {route['route']} ({route['time_ms']:.0f}ms, {route['wait_ms']:.0f}ms waiting)")
+    finally:
+        workers.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            payload = {"spec": dataclasses.asdict(spec), "results": {r.command: dataclasses.asdict(r) for r in results}}
+            json.dump(payload, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline.get("spec") != dataclasses.asdict(spec):
+            print("Warning: baseline was recorded with a different simulated guild.", file=sys.stderr)
+        print("\nAgainst baseline:")
+        for line in compare(results, baseline.get("results", {})):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,488 @@
+"""A synthetic Discord guild that Barry's cogs can run against without a gateway.
+
+The fakes implement only what the commands touch: channel ``history`` paging (100
+messages per simulated REST call, with discord.py's ordering rules), member lists
+and roles, DMs and channel sends. Every simulated request goes through
+:class:`SimulatedRest`, which adds latency, enforces token-bucket rate limits and
+records the call on the active :mod:`bot.core.tracing` trace exactly as the real HTTP
+hooks do, so benchmark reports and production traces read the same.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+import discord
+
+import config
+from bot.core.config_store import BotConfig
+from bot.core.metrics import MetricsRegistry
+from bot.core.tracing import Tracer, record_attempt_end, record_attempt_start
+from bot.extensions.contributions import Contributions
+from bot.services.outbound import OutboundScheduler, TokenBucket
+from bot.services.resolver import DiscordResolver
+from bot.services.workers import ParseWorkerPool
+
+SILVERYMOON_GUILD_ID = 866376531995918346
+# Channels ``/useractivity`` scans for level-ups in Silverymoon
+LEVEL_UP_CHANNEL_IDS = (866544281408897024, 866544082331369472)
+DOWNTIMES_CHANNEL_ID = Contributions.DOWNTIMES_CHANNEL_ID
+BOT_USER_ID = 1
+AVRAE_USER_ID = 261302296103747584
+HISTORY_PAGE_SIZE = 100
+
+CHARACTER_NAMES = (
+    "Ansa", "Bryn", "Caelum", "Dagny", "Elowen", "Fenwick", "Galen", "Hollis", "Isolde", "Jorah",
+    "Kestrel", "Lyra", "Maelis", "Nyx", "Orrin", "Perrin", "Quill", "Rowan", "Sable", "Tamsin",
+)
+SCENE_LINES = (
+    "*leans against the bar, watching the door.*",
+    "\"You're late,\" she says, not looking up from the map.",
+    "He sets the lantern down and kneels by the broken cart.",
+    "*the rain eases as the bells of the Moonbridge ring out*",
+    "\"We go at dawn. Bring rope, and keep your voice down.\"",
+    "She traces the rune with one finger, frowning. \"This isn't elven.\"",
+)
+
+
+@dataclass
+class GuildSpec:
+    """Shape of the simulated guild and its REST behaviour."""
+
+    channels: int = 67
+    messages_per_channel: int = 300
+    members: int = 300
+    # Share of RP-channel messages that are Avrae embeds (scene breaks, rolls)
+    avrae_ratio: float = 0.15
+    downtime_messages: int = 2000
+    # Share of downtime-channel Avrae embeds that award contribution points
+    contribution_ratio: float = 0.6
+    level_up_messages: int = 200
+    history_days: int = 60
+    # Simulated REST round trip in seconds
+    latency: float = 0.02
+    # Requests per second across all routes (Discord's global limit is 50)
+    global_rate: int = 50
+    # Requests per 5 seconds per route and channel; 0 disables the per-route limit
+    route_rate: int = 0
+    llm_latency: float = 0.0
+    seed: int = 1
+
+
+class SimulatedRest:
+    """Latency, rate limits and call accounting for simulated REST requests."""
+
+    def __init__(self, spec: GuildSpec, tracer: Tracer) -> None:
+        self.spec = spec
+        self.tracer = tracer
+        self.calls = 0
+        self.routes: Counter = Counter()
+        self._global = TokenBucket(spec.global_rate, 1.0) if spec.global_rate else None
+        self._routes: Dict[Hashable, TokenBucket] = {}
+
+    async def request(self, method: str, path: str, major: Any = None) -> None:
+        self.calls += 1
+        self.routes[f"{method} {path}"] += 1
+        with self.tracer.rest_span(method, path) as span:
+            if self._global is not None:
+                await self._global.acquire()
+            if self.spec.route_rate:
+                bucket = self._routes.setdefault((method, path, major), TokenBucket(self.spec.route_rate, 5.0))
+                await bucket.acquire()
+            record_attempt_start(time.perf_counter())
+            if self.spec.latency:
+                await asyncio.sleep(self.spec.latency)
+            record_attempt_end(time.perf_counter(), 200, f"{method} {path}")
+
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str) -> None:
+        self.id = role_id
+        self.name = name
+
+
+class FakeUser:
+    """A guild member (or the bot itself); ``send`` opens a DM like discord.py does."""
+
+    def __init__(self, world: "SimulatedWorld", user_id: int, name: str, roles: Iterable[FakeRole] = (), bot: bool = False):
+        self._world = world
+        self.id = user_id
+        self.name = name
+        self.display_name = name.title()
+        self.global_name = self.display_name
+        self.bot = bot
+        self.roles = list(roles)
+        self.mention = f"<@{user_id}>"
+        self.dm_channel: Optional[FakeTextChannel] = None
+
+    def __str__(self) -> str:
+        return self.name
+
+    async def send(self, content: Optional[str] = None, **kwargs: Any) -> "FakeMessage":
+        if self.dm_channel is None:
+            await self._world.rest.request("POST", "/users/@me/channels")
+            self.dm_channel = FakeTextChannel(self._world, next(self._world.ids), f"dm-{self.name}", None)
+        return await self.dm_channel.send(content, **kwargs)
+
+
+class FakeMessage:
+    def __init__(
+        self,
+        message_id: int,
+        channel: "FakeTextChannel",
+        author: FakeUser,
+        content: str,
+        created_at: datetime.datetime,
+        embeds: Optional[List[discord.Embed]] = None,
+    ) -> None:
+        self.id = message_id
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.created_at = created_at
+        self.embeds = embeds or []
+        self.reference = None
+        self.interaction_metadata = None
+
+    def fetched(self) -> "FakeMessage":
+        """A fresh copy, as discord.py builds new objects from every history page it fetches."""
+
+        copy = FakeMessage(self.id, self.channel, self.author, self.content, self.created_at, [e.copy() for e in self.embeds])
+        copy.reference = self.reference
+        return copy
+
+    @property
+    def jump_url(self) -> str:
+        guild_id = self.guild.id if self.guild else "@me"
+        return f"https://discord.com/channels/{guild_id}/{self.channel.id}/{self.id}"
+
+    async def reply(self, content: Optional[str] = None, **kwargs: Any) -> "FakeMessage":
+        return await self.channel.send(content, reference=self, **kwargs)
+
+    async def add_reaction(self, emoji: Any) -> None:
+        await self.channel._world.rest.request(
+            "PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self.channel.id
+        )
+        self.channel._world.outbox.append({"channel": self.channel.name, "reaction": str(emoji)})
+
+
+class FakeTextChannel:
+    def __init__(self, world: "SimulatedWorld", channel_id: int, name: str, guild: Optional["FakeGuild"]) -> None:
+        self._world = world
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.category_id = None
+        self.mention = f"<#{channel_id}>"
+        # Oldest first, like the channel itself
+        self.messages: List[FakeMessage] = []
+        self.sent: List[Dict[str, Any]] = []
+
+    async def history(
+        self,
+        *,
+        limit: Optional[int] = 100,
+        before: Optional[datetime.datetime] = None,
+        after: Optional[datetime.datetime] = None,
+        oldest_first: Optional[bool] = None,
+    ):
+        """Yield messages page by page with discord.py's defaults (newest first unless ``after`` is set)."""
+
+        if oldest_first is None:
+            oldest_first = after is not None
+        messages = [
+            message
+            for message in self.messages
+            if (before is None or message.created_at < before) and (after is None or message.created_at > after)
+        ]
+        if not oldest_first:
+            messages.reverse()
+        remaining = float("inf") if limit is None else limit
+        position = 0
+        while remaining > 0:
+            page_size = int(min(HISTORY_PAGE_SIZE, remaining))
+            await self._world.rest.request("GET", "/channels/{channel_id}/messages", self.id)
+            page = messages[position : position + page_size]
+            for message in page:
+                yield message.fetched()
+            if len(page) < page_size:
+                return
+            position += page_size
+            remaining -= page_size
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return FakeMessage(message_id, self, self._world.bot_user, "", datetime.datetime.now(datetime.timezone.utc))
+
+    async def send(self, content: Optional[str] = None, **kwargs: Any) -> FakeMessage:
+        await self._world.rest.request("POST", "/channels/{channel_id}/messages", self.id)
+        self.sent.append({"content": content, **kwargs})
+        self._world.outbox.append({"channel": self.name, "content": content, "reply": "reference" in kwargs})
+        message = FakeMessage(
+            next(self._world.ids), self, self._world.bot_user, content or "", datetime.datetime.now(datetime.timezone.utc)
+        )
+        self._world.responses += 1
+        return message
+
+
+class FakeGuild:
+    def __init__(self, world: "SimulatedWorld", guild_id: int, name: str) -> None:
+        self._world = world
+        self.id = guild_id
+        self.name = name
+        self.channels: Dict[int, FakeTextChannel] = {}
+        self._members: List[FakeUser] = []
+        self.chunked = False
+
+    @property
+    def members(self) -> List[FakeUser]:
+        return self._members
+
+    @property
+    def text_channels(self) -> List[FakeTextChannel]:
+        return list(self.channels.values())
+
+    def get_channel(self, channel_id: int) -> Optional[FakeTextChannel]:
+        return self.channels.get(channel_id)
+
+    async def chunk(self, cache: bool = True) -> List[FakeUser]:
+        # Member chunks arrive over the gateway, 1000 per chunk
+        for _ in range(0, max(1, len(self._members)), 1000):
+            if self._world.spec.latency:
+                await asyncio.sleep(self._world.spec.latency)
+        self.chunked = True
+        return self._members
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs: Any) -> None:
+        await self._interaction.world.rest.request("POST", "/webhooks/{webhook_id}/{webhook_token}")
+        self._interaction.sent.append({"content": content, **kwargs})
+        self._interaction.world.responses += 1
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, **kwargs: Any) -> None:
+        await self._interaction.world.rest.request("POST", "/interactions/{interaction_id}/{interaction_token}/callback")
+        self._done = True
+
+    async def send_message(self, content: Optional[str] = None, **kwargs: Any) -> None:
+        await self._interaction.world.rest.request("POST", "/interactions/{interaction_id}/{interaction_token}/callback")
+        self._done = True
+        self._interaction.sent.append({"content": content, **kwargs})
+        self._interaction.world.responses += 1
+
+
+class FakeInteraction:
+    def __init__(self, world: "SimulatedWorld", channel: FakeTextChannel, user: FakeUser) -> None:
+        self.world = world
+        self.id = next(world.ids)
+        self.guild = channel.guild
+        self.guild_id = channel.guild.id if channel.guild else None
+        self.channel = channel
+        self.channel_id = channel.id
+        self.user = user
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.sent: List[Dict[str, Any]] = []
+
+
+class FakeBot:
+    """The slice of ``commands.Bot`` the cogs use, backed by a :class:`SimulatedWorld`."""
+
+    def __init__(self, world: "SimulatedWorld") -> None:
+        self._world = world
+        self.user = world.bot_user
+        self.services = SimpleNamespace(
+            config=SimpleNamespace(current=world.config),
+            resolver=None,
+            outbound=OutboundScheduler(),
+            metrics=MetricsRegistry(),
+            tracer=world.tracer,
+            # Parsing runs inline unless a benchmark attaches a real pool
+            workers=ParseWorkerPool(max_workers=0),
+        )
+        self.services.resolver = DiscordResolver(self)
+
+    def get_channel(self, channel_id: int) -> Optional[FakeTextChannel]:
+        return self._world.channels.get(channel_id)
+
+    def get_guild(self, guild_id: int) -> Optional[FakeGuild]:
+        return self._world.guild if self._world.guild.id == guild_id else None
+
+    def get_user(self, user_id: int) -> Optional[FakeUser]:
+        return self._world.users.get(user_id)
+
+    def get_partial_messageable(self, channel_id: int, guild_id: Optional[int] = None) -> FakeTextChannel:
+        return self._world.channel(channel_id, guild_id)
+
+    async def fetch_user(self, user_id: int) -> FakeUser:
+        await self._world.rest.request("GET", "/users/{user_id}")
+        return self._world.user(user_id)
+
+    async def fetch_channel(self, channel_id: int) -> FakeTextChannel:
+        await self._world.rest.request("GET", "/channels/{channel_id}", channel_id)
+        return self._world.channel(channel_id)
+
+
+class SimulatedWorld:
+    """One simulated guild, its members and message history, built from a :class:`GuildSpec`."""
+
+    def __init__(self, spec: GuildSpec, tracer: Optional[Tracer] = None) -> None:
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.tracer = tracer or Tracer(slow_threshold=float("inf"))
+        self.rest = SimulatedRest(spec, self.tracer)
+        self.ids = itertools.count(10**17)
+        self.now = datetime.datetime.now(datetime.timezone.utc)
+        self.responses = 0
+        # Everything the bot sent or reacted with, in order
+        self.outbox: List[Dict[str, Any]] = []
+        self.users: Dict[int, FakeUser] = {}
+        self.channels: Dict[int, FakeTextChannel] = {}
+
+        self.guild = FakeGuild(self, SILVERYMOON_GUILD_ID, "Silverymoon (simulated)")
+        self.other_guilds: Dict[int, FakeGuild] = {}
+        base_config = BotConfig.from_module(config)
+        self.bot_user = self._add_user(BOT_USER_ID, "barry", [], bot=True)
+        self.avrae = self._add_user(AVRAE_USER_ID, "Avrae", [FakeRole(next(self.ids), "Bots")], bot=True)
+        self.roles = self._build_roles(base_config)
+        self.players = [self._add_player(index) for index in range(spec.members)]
+        self.staff = self._add_user(
+            next(self.ids), "staffer", [self.roles["Staff"], self.roles["Player"], self.roles["opt_in"]]
+        )
+
+        self.rp_channels = [self._add_channel(f"rp-{index}") for index in range(spec.channels)]
+        self.output_channel = self._add_channel("scene-summaries")
+        self.downtimes = self._add_channel("downtimes", DOWNTIMES_CHANNEL_ID)
+        self.level_up_channels = [self._add_channel(f"level-ups-{index}", cid) for index, cid in enumerate(LEVEL_UP_CHANNEL_IDS)]
+
+        for channel in self.rp_channels:
+            self._fill_rp_channel(channel)
+        self._fill_downtimes()
+        for channel in self.level_up_channels:
+            self._fill_level_ups(channel)
+
+        settings = base_config.to_mapping()
+        settings["monitored_channels"] = {**settings["monitored_channels"], self.guild.id: [c.id for c in self.rp_channels]}
+        settings["tldr_additional_channels"] = {**settings["tldr_additional_channels"], self.guild.id: []}
+        settings["tldr_excluded_channels"] = {**settings["tldr_excluded_channels"], self.guild.id: []}
+        settings["tldr_output_channels"] = {**settings["tldr_output_channels"], self.guild.id: self.output_channel.id}
+        self.config = BotConfig.from_mapping(settings)
+        self.bot = FakeBot(self)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    def _build_roles(self, cfg: BotConfig) -> Dict[str, FakeRole]:
+        names = set(cfg.include_role) | set(cfg.exclude_role) | set(cfg.authorised_roles)
+        roles = {name: FakeRole(next(self.ids), name) for name in sorted(names)}
+        roles["opt_in"] = FakeRole(next(self.ids), cfg.opt_in_roles[SILVERYMOON_GUILD_ID])
+        return roles
+
+    def _add_user(self, user_id: int, name: str, roles: List[FakeRole], bot: bool = False) -> FakeUser:
+        user = FakeUser(self, user_id, name, roles, bot=bot)
+        self.users[user_id] = user
+        self.guild._members.append(user)
+        return user
+
+    def _add_player(self, index: int) -> FakeUser:
+        roles = [self.roles["Player"], self.roles["opt_in"]]
+        if self.rng.random() < 0.1:
+            roles.append(self.roles["Inactive"])
+        return self._add_user(next(self.ids), f"player{index}", roles)
+
+    def _add_channel(self, name: str, channel_id: Optional[int] = None) -> FakeTextChannel:
+        channel = FakeTextChannel(self, channel_id or next(self.ids), name, self.guild)
+        self.channels[channel.id] = channel
+        self.guild.channels[channel.id] = channel
+        return channel
+
+    def _timestamps(self, count: int) -> List[datetime.datetime]:
+        span = self.spec.history_days * 86400
+        offsets = sorted((self.rng.random() * span for _ in range(count)), reverse=True)
+        return [self.now - datetime.timedelta(seconds=offset) for offset in offsets]
+
+    def _character(self) -> str:
+        return self.rng.choice(CHARACTER_NAMES)
+
+    def _append(self, channel: FakeTextChannel, author: FakeUser, created_at, content="", embeds=None) -> None:
+        channel.messages.append(FakeMessage(next(self.ids), channel, author, content, created_at, embeds))
+
+    def _fill_rp_channel(self, channel: FakeTextChannel) -> None:
+        # A handful of regulars per channel, like real scenes
+        cast = self.rng.sample(self.players, min(len(self.players), self.rng.randint(2, 5)))
+        for created_at in self._timestamps(self.spec.messages_per_channel):
+            if self.rng.random() < self.spec.avrae_ratio:
+                embed = discord.Embed(title=f"{self._character()} makes a Perception check!", description="1d20 (14) + 5 = `19`")
+                self._append(channel, self.avrae, created_at, embeds=[embed])
+            else:
+                self._append(channel, self.rng.choice(cast), created_at, content=self.rng.choice(SCENE_LINES))
+
+    def _fill_downtimes(self) -> None:
+        for created_at in self._timestamps(self.spec.downtime_messages):
+            if self.rng.random() < self.spec.contribution_ratio:
+                points = self.rng.randint(1, 40)
+                embed = discord.Embed(
+                    title=f"{self._character()} has begun adding their energy to the Mythal!",
+                    description=f"They roll 1d20 (12) + 4 = `16`.\nThat's **{points}** contribution points",
+                )
+                embed.set_footer(text="!downtime mythal")
+                self._append(self.downtimes, self.avrae, created_at, embeds=[embed])
+            else:
+                self._append(self.downtimes, self.rng.choice(self.players), created_at, content="!downtime mythal")
+
+    def _fill_level_ups(self, channel: FakeTextChannel) -> None:
+        for created_at in self._timestamps(self.spec.level_up_messages):
+            level = self.rng.randint(2, 20)
+            suffix = {1: "st", 2: "nd", 3: "rd"}.get(level if level < 4 else 0, "th")
+            embed = discord.Embed(
+                title=f"{self._character()} levels up to {level}{suffix} level!", description="Hit points increased."
+            )
+            self._append(channel, self.avrae, created_at, embeds=[embed])
+
+    # ------------------------------------------------------------------
+    # Helpers for runners
+    # ------------------------------------------------------------------
+    def user(self, user_id: int, name: Optional[str] = None, bot: bool = False) -> FakeUser:
+        """Return the user with ``user_id``, creating them (outside the member list) if unseen."""
+
+        if user_id not in self.users:
+            self.users[user_id] = FakeUser(self, user_id, name or f"user{user_id}", bot=bot)
+        return self.users[user_id]
+
+    def channel(self, channel_id: int, guild_id: Optional[int] = None) -> FakeTextChannel:
+        """Return the channel with ``channel_id``, creating it in ``guild_id`` (or Silverymoon) if unseen."""
+
+        if channel_id not in self.channels:
+            if guild_id is None or guild_id == self.guild.id:
+                return self._add_channel(f"channel-{channel_id}", channel_id)
+            guild = self.other_guilds.setdefault(guild_id, FakeGuild(self, guild_id, f"guild-{guild_id}"))
+            channel = FakeTextChannel(self, channel_id, f"channel-{channel_id}", guild)
+            guild.channels[channel_id] = channel
+            self.channels[channel_id] = channel
+        return self.channels[channel_id]
+
+    def interaction(self, channel: Optional[FakeTextChannel] = None, user: Optional[FakeUser] = None) -> FakeInteraction:
+        return FakeInteraction(self, channel or self.rp_channels[0], user or self.staff)
+
+    def message_count(self) -> int:
+        return sum(len(channel.messages) for channel in self.channels.values())
@@ -0,0 +1,389 @@
+"""File-backed, hot-reloadable bot configuration.
+
+``config.py`` provides the defaults. ``/data/settings.json`` (a JSON object using the
+same keys, lower-cased) overrides any of them and is watched for changes, so channel
+lists, roles, thresholds and the ignore list can be edited without a redeploy.
+Extensions read the current :class:`BotConfig` snapshot via :func:`config_for`; a
+reload swaps the whole snapshot at once, so a command never sees half an update.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import dataclasses
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from bot.core.storage import data_path, read_json
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigError(ValueError):
+    """Raised when a settings file does not match the expected shape."""
+
+
+def _int_keyed(value: Any, name: str, item: Callable[[Any], Any]) -> Dict[int, Any]:
+    if not isinstance(value, dict):
+        raise ConfigError(f"{name} must be an object keyed by guild ID")
+    try:
+        return {int(key): item(entry) for key, entry in value.items()}
+    except (TypeError, ValueError) as exc:
+        raise ConfigError(f"{name} has an invalid entry: {exc}") from exc
+
+
+def _str_keyed(value: Any, name: str) -> Dict[str, str]:
+    if not isinstance(value, dict):
+        raise ConfigError(f"{name} must be an object keyed by guild ID")
+    return {str(key): str(entry) for key, entry in value.items()}
+
+
+def _ids(value: Any) -> List[int]:
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"expected a list of IDs, got {type(value).__name__}")
+    return [int(entry) for entry in value]
+
+
+def _strings(value: Any, name: str) -> List[str]:
+    if not isinstance(value, (list, tuple)):
+        raise ConfigError(f"{name} must be a list")
+    return [str(entry) for entry in value]
+
+
+def _thresholds(value: Any) -> Dict[str, int]:
+    if not isinstance(value, dict) or not {"yellow", "red"} <= set(value):
+        raise ValueError("channeltimes entries need 'yellow' and 'red'")
+    return {str(key): int(entry) for key, entry in value.items()}
+
+
+def _dedupe(ids: List[int]) -> Tuple[int, ...]:
+    return tuple(dict.fromkeys(ids))
+
+
+@dataclass(frozen=True)
+class GuildConfig:
+    """Everything configured for one guild, precomputed for O(1) membership checks.
+
+    The ``*_order`` tuples keep config order (without duplicates) for reports that
+    list channels; the frozensets are for membership tests.
+    """
+
+    guild_id: int
+    description: Optional[str]
+    ai_description: Optional[str]
+    ai_enabled: bool
+    opt_in_role: Optional[str]
+    monitored_order: Tuple[int, ...]
+    monitored: FrozenSet[int]
+    tldr_additional: FrozenSet[int]
+    tldr_excluded: FrozenSet[int]
+    # Channels /tldr accepts before exclusions: monitored plus the TL;DR extras
+    tldr_sources: FrozenSet[int]
+    # Channels /tldr actually summarises
+    tldr_eligible: FrozenSet[int]
+    tldr_output_channel: Optional[int]
+    ping_report_channel: Optional[int]
+    # Monitored channels first, then TL;DR extras
+    archive_order: Tuple[int, ...]
+    channel_times: Optional[Dict[str, int]]
+
+    @property
+    def is_known(self) -> bool:
+        """Whether the guild is on the authorised ``guilds`` list."""
+
+        return self.description is not None
+
+    @property
+    def is_monitored(self) -> bool:
+        return bool(self.monitored_order)
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    """Typed snapshot of every setting previously read straight from ``config.py``."""
+
+    guilds: Dict[str, str]
+    ai_guilds: Dict[str, str]
+    include_role: List[str]
+    exclude_role: List[str]
+    inactivity_threshold: int
+    warning_threshold: int
+    authorised_roles: List[str]
+    opt_in_roles: Dict[int, str]
+    monitored_channels: Dict[int, List[int]]
+    tldr_excluded_channels: Dict[int, List[int]]
+    tldr_additional_channels: Dict[int, List[int]]
+    tldr_output_channels: Dict[int, int]
+    channeltimes: Dict[int, Dict[str, int]]
+    ping_report_channels: Dict[int, int]
+    nyoom_immunity: List[int]
+    nyoom_user_immunity: List[str]
+    guild_ids: List[int]
+    ignore_list: List[Union[int, str]]
+    ai_enabled_servers: List[str]
+    egg_categories: List[str]
+    posts_file: str
+    github_issue_repo: str
+
+    # Derived views, built once per snapshot in ``__post_init__``
+    guild_index: Dict[int, GuildConfig] = field(init=False, repr=False, compare=False)
+    authorised_role_names: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    include_role_names: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    exclude_role_names: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    nyoom_channel_ids: FrozenSet[int] = field(init=False, repr=False, compare=False)
+    nyoom_user_names: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    ai_enabled_guild_ids: FrozenSet[int] = field(init=False, repr=False, compare=False)
+    egg_category_ids: FrozenSet[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        derived = {
+            "authorised_role_names": frozenset(self.authorised_roles),
+            "include_role_names": frozenset(self.include_role),
+            "exclude_role_names": frozenset(self.exclude_role),
+            "nyoom_channel_ids": frozenset(self.nyoom_immunity),
+            "nyoom_user_names": frozenset(self.nyoom_user_immunity),
+            "ai_enabled_guild_ids": frozenset(int(guild_id) for guild_id in self.ai_enabled_servers),
+            "egg_category_ids": frozenset(int(category_id) for category_id in self.egg_categories),
+            "guild_index": self._build_guild_index(),
+        }
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+    def _build_guild_index(self) -> Dict[int, GuildConfig]:
+        guilds = {int(guild_id): description for guild_id, description in self.guilds.items()}
+        ai_guilds = {int(guild_id): description for guild_id, description in self.ai_guilds.items()}
+        ai_enabled = {int(guild_id) for guild_id in self.ai_enabled_servers}
+        guild_ids = (
+            set(guilds)
+            | set(ai_guilds)
+            | set(self.monitored_channels)
+            | set(self.tldr_additional_channels)
+            | set(self.tldr_excluded_channels)
+            | set(self.tldr_output_channels)
+            | set(self.channeltimes)
+            | set(self.ping_report_channels)
+            | set(self.opt_in_roles)
+        )
+        index = {}
+        for guild_id in guild_ids:
+            monitored_order = _dedupe(self.monitored_channels.get(guild_id, []))
+            additional = frozenset(self.tldr_additional_channels.get(guild_id, []))
+            excluded = frozenset(self.tldr_excluded_channels.get(guild_id, []))
+            sources = frozenset(monitored_order) | additional
+            output_channel = self.tldr_output_channels.get(guild_id) or None
+            index[guild_id] = GuildConfig(
+                guild_id=guild_id,
+                description=guilds.get(guild_id),
+                ai_description=ai_guilds.get(guild_id),
+                ai_enabled=guild_id in ai_enabled,
+                opt_in_role=self.opt_in_roles.get(guild_id),
+                monitored_order=monitored_order,
+                monitored=frozenset(monitored_order),
+                tldr_additional=additional,
+                tldr_excluded=excluded,
+                tldr_sources=sources,
+                tldr_eligible=sources - excluded,
+                tldr_output_channel=output_channel,
+                ping_report_channel=self.ping_report_channels.get(guild_id) or None,
+                archive_order=_dedupe(list(monitored_order) + list(self.tldr_additional_channels.get(guild_id, []))),
+                channel_times=self.channeltimes.get(guild_id),
+            )
+        return index
+
+    def guild(self, guild_id: Optional[int]) -> Optional[GuildConfig]:
+        """Config for ``guild_id`` (int or str), or ``None`` if the guild is not configured at all."""
+
+        if guild_id is None:
+            return None
+        return self.guild_index.get(int(guild_id))
+
+    @classmethod
+    def setting_names(cls) -> List[str]:
+        return [item.name for item in dataclasses.fields(cls) if item.init]
+
+    @classmethod
+    def from_mapping(cls, data: Dict[str, Any]) -> "BotConfig":
+        """Validate and coerce a mapping of settings, raising :class:`ConfigError`."""
+
+        names = cls.setting_names()
+        missing = [name for name in names if name not in data]
+        if missing:
+            raise ConfigError(f"Missing settings: {', '.join(missing)}")
+        unknown = sorted(set(data) - set(names))
+        if unknown:
+            raise ConfigError(f"Unknown settings: {', '.join(unknown)}")
+        try:
+            inactivity = int(data["inactivity_threshold"])
+            warning = int(data["warning_threshold"])
+        except (TypeError, ValueError) as exc:
+            raise ConfigError(f"Thresholds must be whole numbers of days: {exc}") from exc
+        if not 0 < warning <= inactivity:
+            raise ConfigError("warning_threshold must be positive and no larger than inactivity_threshold")
+        try:
+            nyoom_immunity = _ids(data["nyoom_immunity"])
+            guild_ids = _ids(data["guild_ids"])
+        except (TypeError, ValueError) as exc:
+            raise ConfigError(f"Invalid channel or guild ID list: {exc}") from exc
+
+        if not isinstance(data["ignore_list"], (list, tuple)):
+            raise ConfigError("ignore_list must be a list of user IDs or usernames")
+        # User IDs stay integers; usernames are matched lower-case
+        ignore_list: List[Union[int, str]] = [
+            entry if isinstance(entry, int) else str(entry).lower() for entry in data["ignore_list"]
+        ]
+
+        return cls(
+            guilds=_str_keyed(data["guilds"], "guilds"),
+            ai_guilds=_str_keyed(data["ai_guilds"], "ai_guilds"),
+            include_role=_strings(data["include_role"], "include_role"),
+            exclude_role=_strings(data["exclude_role"], "exclude_role"),
+            inactivity_threshold=inactivity,
+            warning_threshold=warning,
+            authorised_roles=_strings(data["authorised_roles"], "authorised_roles"),
+            opt_in_roles=_int_keyed(data["opt_in_roles"], "opt_in_roles", str),
+            monitored_channels=_int_keyed(data["monitored_channels"], "monitored_channels", _ids),
+            tldr_excluded_channels=_int_keyed(data["tldr_excluded_channels"], "tldr_excluded_channels", _ids),
+            tldr_additional_channels=_int_keyed(data["tldr_additional_channels"], "tldr_additional_channels", _ids),
+            tldr_output_channels=_int_keyed(data["tldr_output_channels"], "tldr_output_channels", int),
+            channeltimes=_int_keyed(data["channeltimes"], "channeltimes", _thresholds),
+            ping_report_channels=_int_keyed(data["ping_report_channels"], "ping_report_channels", int),
+            nyoom_immunity=nyoom_immunity,
+            nyoom_user_immunity=_strings(data["nyoom_user_immunity"], "nyoom_user_immunity"),
+            guild_ids=guild_ids,
+            ignore_list=ignore_list,
+            ai_enabled_servers=_strings(data["ai_enabled_servers"], "ai_enabled_servers"),
+            egg_categories=_strings(data["egg_categories"], "egg_categories"),
+            posts_file=str(data["posts_file"]),
+            github_issue_repo=str(data["github_issue_repo"]),
+        )
+
+    @classmethod
+    def from_module(cls, module: ModuleType) -> "BotConfig":
+        """Read the defaults from a ``config.py``-style module (upper-case names are lowered)."""
+
+        names = set(cls.setting_names())
+        data = {key.lower(): value for key, value in vars(module).items() if key.lower() in names}
+        return cls.from_mapping(data)
+
+    def to_mapping(self) -> Dict[str, Any]:
+        return {name: copy.deepcopy(getattr(self, name)) for name in self.setting_names()}
+
+    def apply_to_module(self, module: ModuleType) -> None:
+        """Mirror this snapshot onto the legacy ``config`` module for code that still reads it."""
+
+        for key, value in self.to_mapping().items():
+            attribute = key.upper() if hasattr(module, key.upper()) and not hasattr(module, key) else key
+            setattr(module, attribute, value)
+
+
+class ConfigStore:
+    """Holds the current :class:`BotConfig` and reloads it when the settings file changes."""
+
+    def __init__(self, defaults: ModuleType, path: Optional[str] = None, poll_interval: float = 10.0) -> None:
+        self.defaults = defaults
+        self.path = path or data_path("settings.json")
+        self.poll_interval = poll_interval
+        self._default_mapping = BotConfig.from_module(defaults).to_mapping()
+        self._current = BotConfig.from_mapping(self._default_mapping)
+        self._mtime: Optional[float] = None
+        self._listeners: List[Callable[[BotConfig], None]] = []
+        self._watch_task: Optional["asyncio.Task[None]"] = None
+        self.last_error: Optional[str] = None
+        self.reload()
+
+    @property
+    def current(self) -> BotConfig:
+        return self._current
+
+    def subscribe(self, callback: Callable[[BotConfig], None]) -> None:
+        """Call ``callback(config)`` after every successful reload."""
+
+        self._listeners.append(callback)
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """Re-read the settings file. On error the previous snapshot stays in effect."""
+
+        self._mtime = self._file_mtime()
+        overrides = read_json(self.path, default=None) if self._mtime is not None else {}
+        try:
+            if not isinstance(overrides, dict):
+                raise ConfigError(f"{self.path} must contain a JSON object")
+            updated = BotConfig.from_mapping({**self._default_mapping, **overrides})
+        except ConfigError as exc:
+            self.last_error = str(exc)
+            logger.error("Ignoring invalid settings in %s: %s", self.path, exc)
+            return False
+
+        self.last_error = None
+        self._current = updated
+        updated.apply_to_module(self.defaults)
+        for callback in list(self._listeners):
+            try:
+                callback(updated)
+            except Exception:
+                logger.exception("Config reload listener %r failed", callback)
+        if overrides:
+            logger.info("Loaded %d setting override(s) from %s", len(overrides), self.path)
+        return True
+
+    def check_for_changes(self) -> bool:
+        """Reload if the settings file was created, edited or removed. Returns ``True`` if reloaded."""
+
+        if self._file_mtime() == self._mtime:
+            return False
+        return self.reload()
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                self.check_for_changes()
+            except Exception:
+                logger.exception("Failed while checking %s for changes", self.path)
+
+    def start_watching(self) -> None:
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch())
+
+    def stop_watching(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+
+def config_store_for(client: Any) -> ConfigStore:
+    """Return the store attached to ``client.services``, creating one from ``config.py`` if needed."""
+
+    services = getattr(client, "services", None)
+    store = getattr(services, "config", None)
+    if store is None:
+        import config as defaults
+
+        store = ConfigStore(defaults)
+        if services is not None:
+            services.config = store
+    return store
+
+
+def config_for(client: Any) -> BotConfig:
+    """The current configuration snapshot for ``client``."""
+
+    return config_store_for(client).current
+
+
+if __name__ == "__main__":
+    # ``python -m bot.core.config_store > /data/settings.json`` seeds the file from config.py
+    import config as _defaults
+
+    print(json.dumps(BotConfig.from_module(_defaults).to_mapping(), indent=2, ensure_ascii=False))
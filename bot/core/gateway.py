@@ -0,0 +1,114 @@
+"""Gateway intent and cache profile derived from what the loaded extensions need.
+
+Each extension module declares ``REQUIRED_INTENTS``, a tuple of ``discord.Intents``
+flag names. The ``lean`` profile (default) requests only the union of those, caches
+members only once a guild is chunked on demand (see :func:`ensure_chunked`) and keeps
+a small message cache. ``BARRY_GATEWAY_PROFILE=full`` restores ``Intents.all()`` with
+members chunked at startup.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, FrozenSet, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_INTENTS: FrozenSet[str] = frozenset({"guilds"})
+PROFILES = ("lean", "full")
+DEFAULT_MESSAGE_CACHE = 200
+
+
+def required_intent_names(modules: Iterable[ModuleType]) -> FrozenSet[str]:
+    """Union of ``REQUIRED_INTENTS`` declared by ``modules`` plus :data:`BASE_INTENTS`."""
+
+    names = set(BASE_INTENTS)
+    for module in modules:
+        names.update(getattr(module, "REQUIRED_INTENTS", ()))
+    return frozenset(names)
+
+
+@dataclass(frozen=True)
+class GatewayProfile:
+    """Keyword arguments for ``commands.Bot`` that control intents and caching."""
+
+    name: str
+    intents: Any
+    member_cache_flags: Any
+    max_messages: Optional[int]
+    chunk_guilds_at_startup: bool
+
+    def bot_kwargs(self) -> dict:
+        return {
+            "intents": self.intents,
+            "member_cache_flags": self.member_cache_flags,
+            "max_messages": self.max_messages,
+            "chunk_guilds_at_startup": self.chunk_guilds_at_startup,
+        }
+
+
+def build_gateway_profile(extensions: Iterable[str], profile: Optional[str] = None) -> GatewayProfile:
+    """Build the profile for ``extensions`` (``BARRY_GATEWAY_PROFILE`` if ``profile`` is omitted)."""
+
+    import discord
+
+    name = (profile or os.getenv("BARRY_GATEWAY_PROFILE", "lean")).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown gateway profile {name!r}; expected one of {PROFILES}")
+    max_messages = int(os.getenv("BARRY_MESSAGE_CACHE", DEFAULT_MESSAGE_CACHE)) or None
+
+    if name == "full":
+        intents = discord.Intents.all()
+        return GatewayProfile(name, intents, discord.MemberCacheFlags.from_intents(intents), max_messages, True)
+
+    names = required_intent_names(importlib.import_module(extension) for extension in extensions)
+    intents = discord.Intents.none()
+    for flag in sorted(names):
+        setattr(intents, flag, True)
+    # Only keep members that were chunked or joined; never cache by voice state
+    member_cache_flags = discord.MemberCacheFlags.none()
+    if intents.members:
+        member_cache_flags.joined = True
+    logger.info("Gateway profile %s requests intents: %s", name, ", ".join(sorted(names)))
+    return GatewayProfile(name, intents, member_cache_flags, max_messages, False)
+
+
+async def ensure_chunked(guild: Any) -> None:
+    """Load the member list of ``guild`` the first time a command needs it."""
+
+    if guild is not None and not getattr(guild, "chunked", True):
+        await guild.chunk(cache=True)
+
+
+def _approx_bytes(objects: List[Any], sample: int = 100) -> int:
+    """Estimate memory for ``objects`` from the shallow size of a sample and their slots."""
+
+    if not objects:
+        return 0
+    picked = objects[:sample]
+    total = 0
+    for obj in picked:
+        total += sys.getsizeof(obj)
+        for slot in getattr(type(obj), "__slots__", ()):
+            total += sys.getsizeof(getattr(obj, slot, None))
+    return int(total / len(picked) * len(objects))
+
+
+def cache_report(client: Any) -> List[str]:
+    """One line per gateway cache: entry count and approximate memory."""
+
+    guilds = list(getattr(client, "guilds", []))
+    caches = {
+        "guilds": guilds,
+        "users": list(getattr(client, "users", [])),
+        "members": [member for guild in guilds for member in getattr(guild, "members", [])],
+        "channels": [channel for guild in guilds for channel in getattr(guild, "channels", [])],
+        "roles": [role for guild in guilds for role in getattr(guild, "roles", [])],
+        "messages": list(getattr(client, "cached_messages", [])),
+    }
+    return [f"{name}: {len(entries)} entries, ~{_approx_bytes(entries) / 1024:.0f} KiB" for name, entries in caches.items()]
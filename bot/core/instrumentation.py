@@ -0,0 +1,104 @@
+"""discord.py hooks that feed :mod:`bot.core.metrics` and :mod:`bot.core.tracing`.
+
+``InstrumentedCommandTree`` times and traces every slash command without touching the
+command callbacks, and :func:`instrument_http` counts REST calls per route template (for
+example ``GET /channels/{channel_id}/messages``) so history paging shows up directly,
+attributing each call to the command or event being traced.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from typing import Any, Optional
+
+import discord
+from discord import app_commands
+
+from bot.core.cache import TTLCache
+from bot.core.metrics import MetricsRegistry, metrics_for
+from bot.core.tracing import Tracer, tracer_for
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """Command tree recording ``barry_command_seconds`` and a REST trace per slash command."""
+
+    def __init__(self, client: Any, **kwargs: Any) -> None:
+        super().__init__(client, **kwargs)
+        # interaction id -> (trace, context token); entries for abandoned interactions expire
+        self._traces: TTLCache = TTLCache(maxsize=4096, ttl=900.0)
+        client.add_listener(self._on_command_completion, "on_app_command_completion")
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is discord.InteractionType.application_command:
+            # Runs in the invocation's own task, so the trace covers every request the command makes
+            command = interaction.command
+            self._traces.set(
+                interaction.id,
+                tracer_for(self.client).start(
+                    "command",
+                    getattr(command, "qualified_name", None) or "unknown",
+                    interaction_id=interaction.id,
+                    guild_id=interaction.guild_id,
+                    channel_id=interaction.channel_id,
+                    user_id=interaction.user.id,
+                ),
+            )
+        return True
+
+    def _record(self, interaction: discord.Interaction, command: Any, outcome: str) -> None:
+        entry = self._traces.pop(interaction.id)
+        if entry is None:
+            return
+        trace, token = entry
+        name = getattr(command, "qualified_name", None) or trace.name
+        metrics_for(self.client).observe(
+            "barry_command_seconds", time.perf_counter() - trace.started, command=name, outcome=outcome
+        )
+        tracer_for(self.client).finish(trace, token, outcome)
+
+    async def _on_command_completion(self, interaction: discord.Interaction, command: Any) -> None:
+        self._record(interaction, command, "ok")
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError, /) -> None:
+        self._record(interaction, interaction.command, "error")
+        await super().on_error(interaction, error)
+
+
+def instrument_http(client: Any, registry: Optional[MetricsRegistry] = None, tracer: Optional[Tracer] = None) -> None:
+    """Wrap ``client.http.request`` to record request counts and latency per route template.
+
+    Rate-limit waits are only measured when the client was built with
+    ``http_trace=build_http_trace_config()``; without it they count as request time.
+    """
+
+    http = client.http
+    if getattr(http, "_barry_instrumented", False):
+        return
+    original = http.request
+
+    @functools.wraps(original)
+    async def request(route: Any, **kwargs: Any) -> Any:
+        metrics = registry or metrics_for(client)
+        status = "error"
+        with (tracer or tracer_for(client)).rest_span(route.method, route.path) as span:
+            try:
+                response = await original(route, **kwargs)
+                status = "ok"
+                return response
+            except discord.HTTPException as exc:
+                status = str(exc.status)
+                raise
+            finally:
+                span.duration = time.perf_counter() - span.started
+                labels = {"method": route.method, "route": route.path}
+                metrics.inc("barry_discord_requests_total", status=status, **labels)
+                metrics.observe("barry_discord_request_seconds", span.duration, **labels)
+                if span.ratelimit_wait:
+                    metrics.inc("barry_discord_ratelimit_wait_seconds_total", span.ratelimit_wait, **labels)
+
+    http.request = request
+    http._barry_instrumented = True
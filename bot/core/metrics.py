@@ -0,0 +1,364 @@
+"""Lightweight in-process metrics primitives and a Prometheus-style registry.
+
+Everything records into :data:`REGISTRY` by default. :class:`MetricsServer` exposes it
+as ``/metrics`` in the Prometheus text format, and ``/stats`` renders
+:func:`stats_report` in Discord.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from bot.core.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+LabelKey = Tuple[Tuple[str, str], ...]
+# A collector returns ``(name, labels, value)`` gauge samples computed at scrape time
+Collector = Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9108
+
+# Latency buckets in seconds, Prometheus-style upper bounds.
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; memory stays constant regardless of observation count."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        self.counts: List[int] = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing quantile ``q`` (the observed max for the last bucket)."""
+
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> Dict[float, int]:
+        """Cumulative counts per upper bound, as exposed by Prometheus."""
+
+        out: Dict[float, int] = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            out[bound] = running
+        return out
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Named counters and histograms keyed by label sets, plus scrape-time gauges."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Collector] = []
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1.0, /, **labels: Any) -> None:
+        series = self._counters.setdefault(name, {})
+        key = _label_key(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def counter(self, name: str, /, **labels: Any) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def counters(self, name: str) -> Dict[LabelKey, float]:
+        return dict(self._counters.get(name, {}))
+
+    def histogram(self, name: str, /, **labels: Any) -> Histogram:
+        """The histogram for ``name`` and ``labels``, created on first use."""
+
+        series = self._histograms.setdefault(name, {})
+        key = _label_key(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(self.buckets)
+        return histogram
+
+    def histograms(self, name: str) -> Dict[LabelKey, Histogram]:
+        return dict(self._histograms.get(name, {}))
+
+    def observe(self, name: str, value: float, /, **labels: Any) -> None:
+        self.histogram(name, **labels).observe(value)
+
+    @contextmanager
+    def time(self, name: str, /, **labels: Any) -> Iterator[None]:
+        """Observe the block's duration under ``name``, labelled ``outcome="ok"|"error"``."""
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.observe(name, time.perf_counter() - started, outcome=outcome, **labels)
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> Dict[str, Dict[LabelKey, float]]:
+        gauges: Dict[str, Dict[LabelKey, float]] = {}
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                logger.exception("Metrics collector %r failed", collector)
+                continue
+            for name, labels, value in samples:
+                gauges.setdefault(name, {})[_label_key(labels)] = float(value)
+        return gauges
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format (version 0.0.4)."""
+
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in sorted(self._counters.items()):
+            header(name, "counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, series in sorted(self.collect().items()):
+            header(name, "gauge")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, series in sorted(self._histograms.items()):
+            header(name, "histogram")
+            for labels, histogram in sorted(series.items()):
+                for bound, count in histogram.cumulative().items():
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe("barry_command_seconds", "Slash command latency by command and outcome.")
+REGISTRY.describe("barry_handler_seconds", "Listener and on_message handler latency by handler and outcome.")
+REGISTRY.describe("barry_discord_requests_total", "Discord REST requests by method, route and status.")
+REGISTRY.describe("barry_discord_request_seconds", "Discord REST request latency by method and route.")
+REGISTRY.describe("barry_discord_ratelimit_wait_seconds_total", "Time Discord REST requests spent waiting on rate limits.")
+REGISTRY.describe("barry_llm_seconds", "LLM call latency by model and outcome.")
+REGISTRY.describe("barry_llm_tokens_total", "LLM tokens by model and direction.")
+REGISTRY.describe("barry_cache_hit_ratio", "Hit ratio of in-memory caches since startup.")
+REGISTRY.describe("barry_cache_entries", "Current number of entries in in-memory caches.")
+
+
+def default_registry() -> MetricsRegistry:
+    return REGISTRY
+
+
+def metrics_for(client: Any) -> MetricsRegistry:
+    """The registry attached to ``client.services``, or the process-wide default."""
+
+    services = getattr(client, "services", None)
+    registry = getattr(services, "metrics", None)
+    return registry if registry is not None else REGISTRY
+
+
+def instrumented(name: str, metric: str = "barry_handler_seconds", registry: Optional[MetricsRegistry] = None):
+    """Decorator recording an async callable's latency under ``metric`` labelled ``handler=name``.
+
+    The call is also traced as an ``event`` (see :mod:`bot.core.tracing`), so REST
+    requests it makes are attributed to it.
+
+    Apply it beneath ``@commands.Cog.listener()`` or ``@tasks.loop``. Slash commands are
+    timed centrally by ``InstrumentedCommandTree`` instead, because discord.py resolves
+    command annotations from the callback's own module.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with (registry or REGISTRY).time(metric, handler=name), TRACER.trace("event", name):
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def cache_collector(caches: Dict[str, Any]) -> Collector:
+    """Collector reporting ``hit_rate`` for each named cache (anything with ``hits``/``misses``)."""
+
+    def collect() -> Iterable[Tuple[str, Dict[str, Any], float]]:
+        for cache_name, cache in caches.items():
+            yield "barry_cache_hit_ratio", {"cache": cache_name}, cache.hit_rate
+            yield "barry_cache_entries", {"cache": cache_name}, len(cache)
+
+    return collect
+
+
+def _label(labels: LabelKey, key: str) -> str:
+    return dict(labels).get(key, "?")
+
+
+def stats_report(registry: MetricsRegistry, limit: int = 10, skip_handlers: Iterable[str] = ()) -> List[str]:
+    """Short plain-text summary of the busiest series, for the ``/stats`` command.
+
+    ``skip_handlers`` leaves out handler series reported elsewhere, such as the
+    auto-responders ``/handlerstats`` already breaks down.
+    """
+
+    lines: List[str] = []
+    skipped = frozenset(skip_handlers)
+
+    def latency_section(title: str, metric: str, label: str) -> None:
+        merged: Dict[str, Histogram] = {}
+        errors: Dict[str, int] = {}
+        for labels, histogram in registry.histograms(metric).items():
+            key = _label(labels, label)
+            if key in skipped:
+                continue
+            target = merged.setdefault(key, Histogram(registry.buckets))
+            target.counts = [a + b for a, b in zip(target.counts, histogram.counts)]
+            target.count += histogram.count
+            target.sum += histogram.sum
+            target.max = max(target.max, histogram.max)
+            if _label(labels, "outcome") == "error":
+                errors[key] = errors.get(key, 0) + histogram.count
+        if not merged:
+            return
+        lines.append(f"{title}:")
+        ranked = sorted(merged.items(), key=lambda item: item[1].quantile(0.95), reverse=True)[:limit]
+        for key, histogram in ranked:
+            lines.append(
+                f"  {key}: n={histogram.count} err={errors.get(key, 0)} mean={histogram.mean * 1000:.0f}ms "
+                f"p95<={histogram.quantile(0.95) * 1000:.0f}ms max={histogram.max * 1000:.0f}ms"
+            )
+
+    latency_section("Commands", "barry_command_seconds", "command")
+    latency_section("Events", "barry_handler_seconds", "handler")
+
+    requests: Dict[str, float] = {}
+    for labels, value in registry.counters("barry_discord_requests_total").items():
+        key = f"{_label(labels, 'method')} {_label(labels, 'route')}"
+        requests[key] = requests.get(key, 0.0) + value
+    if requests:
+        lines.append(f"Discord REST ({int(sum(requests.values()))} requests):")
+        for key, value in sorted(requests.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            lines.append(f"  {key}: {int(value)}")
+
+    tokens = registry.counters("barry_llm_tokens_total")
+    if tokens:
+        lines.append("LLM tokens:")
+        for labels, value in sorted(tokens.items()):
+            lines.append(f"  {_label(labels, 'model')} {_label(labels, 'direction')}: {int(value)}")
+
+    gauges = registry.collect().get("barry_cache_hit_ratio", {})
+    if gauges:
+        lines.append("Cache hit rates:")
+        for labels, value in sorted(gauges.items()):
+            lines.append(f"  {_label(labels, 'cache')}: {value:.0%}")
+    return lines
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` for ``registry`` on a local aiohttp server.
+
+    Controlled by ``BARRY_METRICS_HOST`` (default ``127.0.0.1``) and ``BARRY_METRICS_PORT``
+    (default 9108; ``0`` disables the endpoint).
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: Optional[str] = None, port: Optional[int] = None) -> None:
+        self.registry = registry
+        self.host = host or os.getenv("BARRY_METRICS_HOST", DEFAULT_METRICS_HOST)
+        self.port = int(os.getenv("BARRY_METRICS_PORT", DEFAULT_METRICS_PORT)) if port is None else port
+        self._runner: Any = None
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def _handle_metrics(self, request: Any) -> Any:
+        from aiohttp import web
+
+        return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self) -> bool:
+        """Start listening. Returns ``False`` when disabled or the port cannot be bound."""
+
+        if self.running or not self.port:
+            return self.running
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as exc:
+            logger.warning("Metrics endpoint disabled; could not bind %s:%s (%s)", self.host, self.port, exc)
+            await runner.cleanup()
+            return False
+        self._runner = runner
+        logger.info("Serving metrics on http://%s:%s/metrics", self.host, self.port)
+        return True
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,287 @@
+"""Cron-scheduled background jobs with their schedules persisted on the data volume.
+
+Extensions register jobs with a default five-field cron spec (``minute hour day
+month weekday``, in UTC) via :meth:`JobScheduler.add`. Last-run times are kept in
+``/data/schedule.json``; adding an ``override`` spec to a job's entry there and
+restarting reschedules it without a deploy. Code defaults are never written to the
+file, so a release that changes a default takes effect unless an override is set.
+A job whose run was missed while the bot was down runs once as soon as the
+scheduler starts.
+
+Fields accept ``*``, numbers, ``a-b`` ranges, ``*/n`` or ``a-b/n`` steps and
+comma-separated lists. Weekdays run from 0 (Sunday) to 6, with 7 also meaning
+Sunday. As in cron, when both day and weekday are restricted either may match.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from bot.core.storage import WriteBehindJsonStore, data_path
+
+logger = logging.getLogger(__name__)
+
+_FIELDS: Tuple[Tuple[str, int, int], ...] = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# Give up looking for a matching minute after this long (e.g. "0 0 31 2 *")
+_SEARCH_LIMIT = timedelta(days=5 * 366)
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(","):
+        body, _, step_text = part.partition("/")
+        try:
+            step = int(step_text) if step_text else 1
+            if body == "*":
+                start, end = low, high
+            elif "-" in body:
+                start, end = (int(bound) for bound in body.split("-", 1))
+            else:
+                start = end = int(body)
+        except ValueError as exc:
+            raise ValueError(f"Invalid {name} field {text!r}") from exc
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid {name} field {text!r}: values must be within {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSpec:
+    """A parsed five-field cron expression."""
+
+    expression: str
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    day_restricted: bool
+    weekday_restricted: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSpec":
+        text = _ALIASES.get(expression.strip().lower(), expression.strip())
+        parts = text.split()
+        if len(parts) != len(_FIELDS):
+            raise ValueError(f"Cron spec {expression!r} needs {len(_FIELDS)} fields: minute hour day month weekday")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(part, name, low, high) for part, (name, low, high) in zip(parts, _FIELDS)
+        )
+        return cls(
+            expression=expression.strip(),
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            # Sunday is both 0 and 7
+            weekdays=frozenset(day % 7 for day in weekdays),
+            day_restricted=parts[2] != "*",
+            weekday_restricted=parts[4] != "*",
+        )
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def matches(self, moment: datetime) -> bool:
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.month in self.months
+            and self._day_matches(moment)
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """The first matching minute strictly after ``moment``."""
+
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + _SEARCH_LIMIT
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron spec {self.expression!r} never matches")
+
+
+class ScheduleStore(WriteBehindJsonStore):
+    """``{job name: {"last_run": epoch seconds or None, "override": optional spec}}`` on the data volume.
+
+    Processes running different shards register different jobs, so each flush keeps
+    the other processes' entries.
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 5.0) -> None:
+        super().__init__(path or data_path("schedule.json"), flush_interval=flush_interval)
+        self.entries: Dict[str, Dict[str, Any]] = dict(self.load() or {})
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self.entries)
+
+    def merge(self, on_disk: Any, snapshot: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        return {**(on_disk or {}), **snapshot}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Job:
+    name: str
+    spec: CronSpec
+    callback: Callable[[], Awaitable[Any]]
+    next_run: datetime
+    last_run: Optional[datetime] = None
+    running: bool = field(default=False, compare=False)
+
+
+class JobScheduler:
+    """Runs registered jobs at the times their cron specs name.
+
+    The loop started by :meth:`start` wakes at the earliest next run, or at least
+    every ``poll_interval`` seconds. Each job runs in its own task, and a job still
+    running from its previous slot is skipped rather than started twice.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        clock: Callable[[], datetime] = _utcnow,
+        poll_interval: float = 60.0,
+    ) -> None:
+        self.store = ScheduleStore(path)
+        self.jobs: Dict[str, Job] = {}
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._running: Dict[str, "asyncio.Task[None]"] = {}
+
+    def _save(self, name: str, last_run: Optional[float]) -> None:
+        entry: Dict[str, Any] = {"last_run": last_run}
+        override = (self.store.entries.get(name) or {}).get("override")
+        if override:
+            entry["override"] = override
+        self.store.entries[name] = entry
+        self.store.mark_dirty()
+
+    def add(self, name: str, default_spec: str, callback: Callable[[], Awaitable[Any]]) -> Job:
+        """Register ``callback`` under ``name``; an ``override`` saved for ``name`` replaces ``default_spec``."""
+
+        entry = dict(self.store.entries.get(name) or {})
+        spec = CronSpec.parse(default_spec)
+        if entry.get("override"):
+            try:
+                spec = CronSpec.parse(entry["override"])
+            except ValueError:
+                logger.exception("Ignoring invalid schedule override for job %s", name)
+        now = self._clock()
+        last_run = datetime.fromtimestamp(entry["last_run"], timezone.utc) if entry.get("last_run") else None
+        # A slot missed while the bot was down runs straight away; a new job waits for its first slot
+        next_run = spec.next_after(last_run or now)
+        job = Job(name=name, spec=spec, callback=callback, next_run=next_run, last_run=last_run)
+        self.jobs[name] = job
+        # Rewrite the entry without the spec so later releases can change the default
+        self._save(name, entry.get("last_run"))
+        logger.info("Scheduled job %s (%s); next run %s", name, spec.expression, next_run.isoformat())
+        return job
+
+    def remove(self, name: str) -> None:
+        self.jobs.pop(name, None)
+
+    def due(self, now: Optional[datetime] = None) -> List[Job]:
+        now = now or self._clock()
+        return [job for job in self.jobs.values() if job.next_run <= now and not job.running]
+
+    async def _run(self, job: Job) -> None:
+        started = time.perf_counter()
+        try:
+            await job.callback()
+            logger.info("Job %s finished in %.1fs", job.name, time.perf_counter() - started)
+        except Exception:
+            logger.exception("Job %s failed", job.name)
+        finally:
+            job.running = False
+
+    def run_due(self, now: Optional[datetime] = None) -> List["asyncio.Task[None]"]:
+        """Start every due job and schedule its next run; returns the started tasks."""
+
+        now = now or self._clock()
+        tasks = []
+        for job in self.due(now):
+            job.running = True
+            job.last_run = now
+            job.next_run = job.spec.next_after(now)
+            self._save(job.name, now.timestamp())
+            task = asyncio.get_running_loop().create_task(self._run(job), name=f"job:{job.name}")
+            self._running[job.name] = task
+            task.add_done_callback(lambda _, name=job.name: self._running.pop(name, None))
+            tasks.append(task)
+        return tasks
+
+    async def _loop(self) -> None:
+        while True:
+            self.run_due()
+            now = self._clock()
+            upcoming = [job.next_run for job in self.jobs.values()]
+            delay = self.poll_interval
+            if upcoming:
+                delay = min(delay, max(0.0, (min(upcoming) - now).total_seconds()))
+            await asyncio.sleep(max(delay, 1.0))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop(), name="job-scheduler")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._running.values()):
+            task.cancel()
+        self.store.flush()
+
+    def describe(self) -> List[str]:
+        return [
+            f"{job.name}: {job.spec.expression}, next run {job.next_run:%Y-%m-%d %H:%M} UTC"
+            for job in sorted(self.jobs.values(), key=lambda job: job.next_run)
+        ]
+
+
+def jobs_for(client: Any) -> JobScheduler:
+    """Return the job scheduler attached to ``client.services``, creating one if needed."""
+
+    services = getattr(client, "services", None)
+    jobs = getattr(services, "jobs", None)
+    if jobs is None:
+        jobs = JobScheduler()
+        if services is not None:
+            services.jobs = jobs
+    return jobs
@@ -2,9 +2,22 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
+from bot.core.config_store import ConfigStore
+from bot.core.metrics import MetricsRegistry, MetricsServer, default_registry
+from bot.core.scheduler import JobScheduler
+from bot.core.tracing import Tracer, default_tracer
+from bot.services.archive import ChannelArchiver
+from bot.services.channel_reports import ChannelReportCache
+from bot.services.cooldowns import CooldownStore
 from bot.services.github_app import GitHubAppClient
+from bot.services.opt_outs import OptOutRegistry
+from bot.services.outbound import OutboundScheduler
+from bot.services.resolver import DiscordResolver
+from bot.services.sent_messages import SentMessageRegistry
+from bot.services.workers import ParseWorkerPool
 
 
 @dataclass
@@ -12,3 +25,22 @@ class ServiceContainer:
     """Holds long-lived service instances injected into extensions."""
 
     github: GitHubAppClient
+    archiver: ChannelArchiver = field(default_factory=ChannelArchiver)
+    sent_messages: SentMessageRegistry = field(default_factory=SentMessageRegistry)
+    cooldowns: CooldownStore = field(default_factory=CooldownStore)
+    outbound: OutboundScheduler = field(default_factory=OutboundScheduler)
+    # Worker processes start on the first parsing job.
+    workers: ParseWorkerPool = field(default_factory=ParseWorkerPool)
+    # Extensions register jobs on load; the loop starts on the first ready event.
+    jobs: JobScheduler = field(default_factory=JobScheduler)
+    channel_reports: ChannelReportCache = field(default_factory=ChannelReportCache)
+    metrics: MetricsRegistry = field(default_factory=default_registry)
+    tracer: Tracer = field(default_factory=default_tracer)
+    # Binds a local port, so it is only started on the first ready event.
+    metrics_server: Optional[MetricsServer] = None
+    # Built from config.py plus /data/settings.json by ``build_service_container``.
+    config: Optional[ConfigStore] = None
+    # Opens SQLite on the data volume, so it is only built by ``build_service_container``.
+    opt_outs: Optional[OptOutRegistry] = None
+    # Needs the running client, so it is attached in ``create_bot``.
+    resolver: Optional[DiscordResolver] = None
@@ -5,8 +5,15 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 
+import config
+from bot.core.config_store import ConfigStore
 from bot.core.services import ServiceContainer
+from bot.core.storage import data_path
+from bot.services.archive import ChannelArchiver
+from bot.services.cooldowns import CooldownStore
 from bot.services.github_app import build_github_app_client_from_env
+from bot.services.opt_outs import OptOutRegistry
+from bot.services.sent_messages import SentMessageRegistry
 
 
 class SettingsError(RuntimeError):
@@ -32,4 +39,17 @@ def build_service_container() -> ServiceContainer:
     """Bootstrap all long-lived services using environment variables."""
 
     github_client = build_github_app_client_from_env()
-    return ServiceContainer(github=github_client)
+    archiver = ChannelArchiver(root=data_path("archive"))
+    sent_messages = SentMessageRegistry(data_path("sent_messages.json"))
+    cooldowns = CooldownStore(data_path("cooldowns.json"))
+    config_store = ConfigStore(config, data_path("settings.json"))
+    opt_outs = OptOutRegistry(data_path("opt_outs.sqlite3"), static_entries=config_store.current.ignore_list)
+    config_store.subscribe(lambda updated: opt_outs.set_static_entries(updated.ignore_list))
+    return ServiceContainer(
+        github=github_client,
+        archiver=archiver,
+        sent_messages=sent_messages,
+        cooldowns=cooldowns,
+        config=config_store,
+        opt_outs=opt_outs,
+    )
@@ -0,0 +1,104 @@
+"""Shard layout for running Barry as one or several ``AutoShardedBot`` processes.
+
+``BARRY_SHARD_COUNT`` fixes the total number of shards (Discord's recommendation is
+used when unset) and ``BARRY_SHARD_IDS`` picks the shards this process connects,
+e.g. ``0-3`` or ``0,2``. Without ``BARRY_SHARD_IDS`` one process runs every shard.
+Several processes can share a data volume; each should be given its own
+``BARRY_METRICS_PORT``.
+
+Discord routes a guild to shard ``(guild_id >> 22) % shard_count``, so background
+jobs use :func:`owns_guild` to work only on guilds whose events reach this process,
+and process-wide one-off work (command sync, the startup DM) runs only on the
+process holding shard 0 (:func:`is_primary`).
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+def parse_shard_ids(spec: str) -> Tuple[int, ...]:
+    """Parse ``"0-3"``, ``"0,2,5"`` or a mix of both into sorted shard IDs."""
+
+    ids = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, end = (int(bound) for bound in part.split("-", 1))
+                if end < start:
+                    raise ValueError
+                ids.update(range(start, end + 1))
+            else:
+                ids.add(int(part))
+        except ValueError as exc:
+            raise ValueError(f"Invalid shard ID range {part!r} in {spec!r}") from exc
+    if not ids:
+        raise ValueError(f"No shard IDs in {spec!r}")
+    return tuple(sorted(ids))
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    """Which shards this process runs; ``None`` values are left to discord.py."""
+
+    shard_count: Optional[int] = None
+    shard_ids: Optional[Tuple[int, ...]] = None
+
+    def __post_init__(self) -> None:
+        if self.shard_count is not None and self.shard_count < 1:
+            raise ValueError("BARRY_SHARD_COUNT must be at least 1")
+        if self.shard_ids is not None:
+            if self.shard_count is None:
+                raise ValueError("BARRY_SHARD_IDS needs BARRY_SHARD_COUNT")
+            out_of_range = [shard for shard in self.shard_ids if shard >= self.shard_count]
+            if out_of_range:
+                raise ValueError(f"Shard IDs {out_of_range} are outside BARRY_SHARD_COUNT={self.shard_count}")
+
+    @classmethod
+    def from_env(cls) -> "ShardPlan":
+        count = os.getenv("BARRY_SHARD_COUNT", "").strip()
+        ids = os.getenv("BARRY_SHARD_IDS", "").strip()
+        return cls(shard_count=int(count) if count else None, shard_ids=parse_shard_ids(ids) if ids else None)
+
+    def bot_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {}
+        if self.shard_count is not None:
+            kwargs["shard_count"] = self.shard_count
+        if self.shard_ids is not None:
+            kwargs["shard_ids"] = list(self.shard_ids)
+        return kwargs
+
+    def describe(self) -> str:
+        if self.shard_count is None:
+            return "all shards (count chosen by Discord)"
+        if self.shard_ids is None:
+            return f"all {self.shard_count} shard(s)"
+        return f"shard(s) {', '.join(map(str, self.shard_ids))} of {self.shard_count}"
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    return (int(guild_id) >> 22) % max(1, shard_count)
+
+
+def owns_guild(client: Any, guild_id: int) -> bool:
+    """Whether ``guild_id`` is served by one of the shards this process connects."""
+
+    shard_count = getattr(client, "shard_count", None)
+    if not shard_count or shard_count <= 1:
+        return True
+    shard_ids = getattr(client, "shard_ids", None)
+    if shard_ids is None:
+        return True
+    return shard_for_guild(guild_id, shard_count) in shard_ids
+
+
+def is_primary(client: Any) -> bool:
+    """Whether this process runs shard 0 and so should do once-per-deployment work."""
+
+    shard_ids = getattr(client, "shard_ids", None)
+    return shard_ids is None or 0 in shard_ids
@@ -0,0 +1,96 @@
+"""Startup phase timing and change-gated application command sync."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bot.core.storage import data_path
+
+logger = logging.getLogger(__name__)
+
+
+class StartupPhases:
+    """Records how long each named startup phase took, relative to process start."""
+
+    def __init__(self, clock=time.perf_counter) -> None:
+        self._clock = clock
+        self.started_at = clock()
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_after: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - started
+            self.phases.append((name, elapsed))
+            logger.info("Startup phase %s took %.2fs", name, elapsed)
+
+    def mark_ready(self) -> float:
+        """Record time to first ready; later calls (gateway reconnects) keep the first value."""
+
+        if self.ready_after is None:
+            self.ready_after = self._clock() - self.started_at
+        return self.ready_after
+
+    def report(self) -> str:
+        parts = ", ".join(f"{name}={elapsed:.2f}s" for name, elapsed in self.phases)
+        ready = f"{self.ready_after:.2f}s" if self.ready_after is not None else "not yet"
+        return f"Time to first ready: {ready} ({parts})"
+
+
+def command_tree_hash(payloads: Iterable[Dict[str, Any]], application_id: Optional[int] = None) -> str:
+    """Stable hash of the serialised command tree (order-independent)."""
+
+    canonical = sorted(json.dumps(payload, sort_keys=True, default=str) for payload in payloads)
+    digest = hashlib.sha256()
+    digest.update(str(application_id).encode())
+    for item in canonical:
+        digest.update(b"\0")
+        digest.update(item.encode())
+    return digest.hexdigest()
+
+
+def _read_stored_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return handle.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_stored_hash(path: str, value: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(value)
+    os.replace(tmp_path, path)
+
+
+async def sync_commands_if_changed(bot: Any, path: Optional[str] = None, force: bool = False) -> Optional[int]:
+    """Sync the global command tree only when it differs from the last synced one.
+
+    Returns the number of synced commands, or ``None`` when the sync was skipped.
+    """
+
+    path = path or data_path("command_tree.sha256")
+    tree = bot.tree
+    current = command_tree_hash((command.to_dict(tree) for command in tree.get_commands()), bot.application_id)
+    if not force and _read_stored_hash(path) == current:
+        logger.info("Command tree unchanged since last sync; skipping sync")
+        return None
+
+    synced = await tree.sync()
+    try:
+        _write_stored_hash(path, current)
+    except OSError:
+        logger.exception("Failed to store command tree hash at %s", path)
+    return len(synced)
@@ -0,0 +1,173 @@
+"""Helpers for reading and writing persistent bot state under the data volume."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR_DEFAULT = "/data"
+
+
+def data_path(*parts: str) -> str:
+    """Return a path inside the data volume (``BARRY_DATA_DIR``, default ``/data``)."""
+
+    return os.path.join(os.getenv("BARRY_DATA_DIR", _DATA_DIR_DEFAULT), *parts)
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Load JSON from ``path``, returning ``default`` if it is missing or unreadable."""
+
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError):
+        return default
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write ``data`` as JSON via a temporary file so readers never see a partial file."""
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``path + ".lock"`` across processes sharing the volume."""
+
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class WriteBehindJsonStore:
+    """Base class for in-memory state that is persisted to a JSON file in the background.
+
+    Subclasses call :meth:`mark_dirty` after mutating their state; the state returned by
+    :meth:`snapshot` is then written at most once every ``flush_interval`` seconds.
+
+    Several bot processes (one per shard range) may share the file. Each flush takes a
+    file lock and hands the current file contents to :meth:`merge`, so subclasses can
+    combine their changes with entries written by other processes. Background flushes
+    wait for the lock, read, merge and write in a worker thread so a contended lock
+    never stalls the event loop; :meth:`flush` does the same synchronously for shutdown.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 30.0) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self._dirty = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+
+    def load(self) -> Any:
+        return read_json(self.path, default=None)
+
+    def snapshot(self) -> Any:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def merge(self, on_disk: Any, snapshot: Any) -> Any:
+        """State to write given the file's current contents; the default overwrites them.
+
+        Runs in a worker thread during background flushes, so it should combine
+        ``on_disk`` with ``snapshot`` (taken on the event loop) rather than live state.
+        """
+
+        return snapshot
+
+    def flushed(self, snapshot: Any) -> None:
+        """Called after ``snapshot`` was written, e.g. to forget changes that are now persisted."""
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(self.flush_interval, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        if self._flush_task is not None and not self._flush_task.done():
+            # The running flush will reschedule itself if there are changes left
+            return
+        self._flush_task = asyncio.get_running_loop().create_task(self.flush_async())
+
+    def _write(self, snapshot: Any) -> None:
+        with file_lock(self.path):
+            on_disk = read_json(self.path, default=None)
+            write_json_atomic(self.path, snapshot if on_disk is None else self.merge(on_disk, snapshot))
+
+    def _take_snapshot(self) -> Any:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._dirty = False
+        return self.snapshot()
+
+    def flush(self) -> None:
+        """Write pending changes now, blocking until the file lock is free."""
+
+        writing = self._flush_task is not None and not self._flush_task.done()
+        # A background write may still be in flight at shutdown; write again so nothing depends on it
+        if not self._dirty and not writing:
+            return
+        snapshot = self._take_snapshot()
+        try:
+            self._write(snapshot)
+        except OSError:
+            self._dirty = True
+            logger.exception("Failed to persist %s", self.path)
+            return
+        self.flushed(snapshot)
+
+    async def flush_async(self) -> None:
+        """Write pending changes from a worker thread."""
+
+        if not self._dirty:
+            return
+        snapshot = self._take_snapshot()
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except OSError:
+            logger.exception("Failed to persist %s", self.path)
+            self.mark_dirty()
+            return
+        self.flushed(snapshot)
+        if self._dirty:
+            # Changes made while writing wait for the next interval
+            self.mark_dirty()
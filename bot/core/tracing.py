@@ -0,0 +1,289 @@
+"""Per-invocation tracing of Discord REST calls.
+
+A :class:`Trace` is opened for each slash command (by ``InstrumentedCommandTree``) or
+instrumented event, and kept in a context variable so every REST request made while
+handling it, including from tasks it spawns, is attributed to it as a :class:`RestSpan`.
+When the trace finishes, the tracer logs a JSON summary on the ``barry.trace`` logger.
+Traces slower than the threshold also log a collapsed-stack breakdown
+(``frame;frame value`` lines), which flamegraph.pl or speedscope can render.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("barry.trace")
+
+DEFAULT_SLOW_THRESHOLD = 3.0
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("barry_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["RestSpan"]] = contextvars.ContextVar("barry_rest_span", default=None)
+_trace_ids = itertools.count(1)
+
+
+@dataclass
+class RestSpan:
+    """One Discord REST request, including any time spent waiting on rate limits."""
+
+    method: str
+    route: str
+    started: float
+    duration: float = 0.0
+    # Time before each HTTP attempt started: bucket/global lock acquisition and 429 back-off sleeps
+    ratelimit_wait: float = 0.0
+    attempts: int = 0
+    bucket: Optional[str] = None
+    status: Optional[int] = None
+    rate_limited: int = 0
+    _mark: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.route}"
+
+    @property
+    def network(self) -> float:
+        return max(0.0, self.duration - self.ratelimit_wait)
+
+
+@dataclass
+class Trace:
+    """A command or event invocation and the REST spans it caused."""
+
+    kind: str
+    name: str
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    trace_id: int = field(default_factory=lambda: next(_trace_ids))
+    duration: Optional[float] = None
+    outcome: str = "ok"
+    spans: List[RestSpan] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return self.duration if self.duration is not None else time.perf_counter() - self.started
+
+    def rest_busy_time(self) -> float:
+        """Wall time during which at least one REST request was in flight."""
+
+        intervals = sorted((span.started, span.started + span.duration) for span in self.spans)
+        busy = 0.0
+        current_start: Optional[float] = None
+        current_end = 0.0
+        for start, end in intervals:
+            if current_start is None or start > current_end:
+                if current_start is not None:
+                    busy += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_start is not None:
+            busy += current_end - current_start
+        return busy
+
+    def routes(self) -> List[Dict[str, Any]]:
+        """Spans aggregated per route, slowest total first."""
+
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans:
+            entry = grouped.setdefault(
+                span.label, {"route": span.label, "bucket": span.bucket, "calls": 0, "time_ms": 0.0, "wait_ms": 0.0}
+            )
+            entry["calls"] += 1
+            entry["time_ms"] += span.duration * 1000
+            entry["wait_ms"] += span.ratelimit_wait * 1000
+            entry["bucket"] = entry["bucket"] or span.bucket
+        ordered = sorted(grouped.values(), key=lambda entry: entry["time_ms"], reverse=True)
+        for entry in ordered:
+            entry["time_ms"] = round(entry["time_ms"], 1)
+            entry["wait_ms"] = round(entry["wait_ms"], 1)
+        return ordered
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace": self.kind,
+            "name": self.name,
+            "id": self.trace_id,
+            **self.attrs,
+            "outcome": self.outcome,
+            "duration_ms": round(self.elapsed * 1000, 1),
+            "rest": {
+                "calls": len(self.spans),
+                "busy_ms": round(self.rest_busy_time() * 1000, 1),
+                "ratelimit_wait_ms": round(sum(span.ratelimit_wait for span in self.spans) * 1000, 1),
+                "rate_limited": sum(span.rate_limited for span in self.spans),
+                "routes": self.routes(),
+            },
+        }
+
+    def collapsed_stacks(self) -> List[str]:
+        """Flamegraph input: one ``frame;frame milliseconds`` line per leaf.
+
+        Concurrent requests overlap, so their frames can add up to more than the
+        trace's wall time; ``(self)`` is the time with no request in flight.
+        """
+
+        root = f"{self.kind}:{self.name}"
+        totals: Dict[Tuple[str, str], float] = {}
+        for span in self.spans:
+            for leaf, value in (("network", span.network), ("ratelimit_wait", span.ratelimit_wait)):
+                if value > 0:
+                    totals[(span.label, leaf)] = totals.get((span.label, leaf), 0.0) + value
+        lines = [f"{root};(self) {round(max(0.0, self.elapsed - self.rest_busy_time()) * 1000)}"]
+        for (label, leaf), value in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"{root};{label};{leaf} {round(value * 1000)}")
+        return lines
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class Tracer:
+    """Opens traces and logs their summaries when they finish.
+
+    ``slow_threshold`` defaults to ``BARRY_TRACE_SLOW_SECONDS`` (3 seconds). Event traces
+    that made no REST calls and were not slow are dropped silently, so quiet
+    ``on_message`` runs do not flood the log.
+    """
+
+    def __init__(self, slow_threshold: Optional[float] = None, keep: int = 20) -> None:
+        if slow_threshold is None:
+            slow_threshold = float(os.getenv("BARRY_TRACE_SLOW_SECONDS", DEFAULT_SLOW_THRESHOLD))
+        self.slow_threshold = slow_threshold
+        self.recent_slow: Deque[Trace] = deque(maxlen=keep)
+        self._listeners: List[Callable[[Trace], None]] = []
+
+    def subscribe(self, listener: Callable[[Trace], None]) -> None:
+        self._listeners.append(listener)
+
+    def start(self, kind: str, name: str, **attrs: Any) -> Tuple[Trace, contextvars.Token]:
+        trace = Trace(kind=kind, name=name, attrs=attrs)
+        return trace, _current_trace.set(trace)
+
+    def finish(self, trace: Trace, token: Optional[contextvars.Token] = None, outcome: str = "ok") -> None:
+        if trace.duration is not None:
+            return
+        trace.duration = time.perf_counter() - trace.started
+        trace.outcome = outcome
+        if token is not None:
+            try:
+                _current_trace.reset(token)
+            except ValueError:
+                # Finished from a different context (e.g. a completion event); the owning task ends anyway
+                pass
+        slow = trace.duration >= self.slow_threshold
+        if trace.kind == "command" or trace.spans or slow:
+            logger.info(json.dumps(trace.summary(), default=str))
+        if slow:
+            self.recent_slow.append(trace)
+            logger.warning(
+                "Slow %s %s took %.2fs; collapsed stacks (ms):\n%s",
+                trace.kind,
+                trace.name,
+                trace.duration,
+                "\n".join(trace.collapsed_stacks()),
+            )
+        for listener in self._listeners:
+            listener(trace)
+
+    @contextmanager
+    def trace(self, kind: str, name: str, **attrs: Any) -> Iterator[Trace]:
+        """Trace the block; nested blocks join the enclosing trace instead of starting a new one."""
+
+        parent = _current_trace.get()
+        if parent is not None:
+            yield parent
+            return
+        trace, token = self.start(kind, name, **attrs)
+        outcome = "error"
+        try:
+            yield trace
+            outcome = "ok"
+        finally:
+            self.finish(trace, token, outcome)
+
+    @contextmanager
+    def rest_span(self, method: str, route: str) -> Iterator[RestSpan]:
+        """Attribute one REST request to the current trace (if any)."""
+
+        span = RestSpan(method=method, route=route, started=time.perf_counter())
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.started
+            _current_span.reset(token)
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.spans.append(span)
+
+
+TRACER = Tracer()
+
+
+def default_tracer() -> Tracer:
+    return TRACER
+
+
+def tracer_for(client: Any) -> Tracer:
+    """The tracer attached to ``client.services``, or the process-wide default."""
+
+    services = getattr(client, "services", None)
+    tracer = getattr(services, "tracer", None)
+    return tracer if tracer is not None else TRACER
+
+
+def record_attempt_start(now: float) -> None:
+    """Charge the gap since the request (or its previous attempt) began to rate-limit waiting."""
+
+    span = _current_span.get()
+    if span is None:
+        return
+    span.attempts += 1
+    span.ratelimit_wait += max(0.0, now - (span._mark if span._mark is not None else span.started))
+
+
+def record_attempt_end(now: float, status: Optional[int], bucket: Optional[str]) -> None:
+    """Fold one HTTP attempt (there may be several per request on 429s) into the current span."""
+
+    span = _current_span.get()
+    if span is None:
+        return
+    span._mark = now
+    span.status = status
+    if bucket:
+        span.bucket = bucket
+    if status == 429:
+        span.rate_limited += 1
+
+
+def build_http_trace_config() -> Any:
+    """``aiohttp.TraceConfig`` marking each HTTP attempt, for ``Client(http_trace=...)``."""
+
+    import aiohttp
+
+    async def on_request_start(session: Any, context: Any, params: Any) -> None:
+        record_attempt_start(time.perf_counter())
+
+    async def on_request_end(session: Any, context: Any, params: Any) -> None:
+        response = params.response
+        record_attempt_end(time.perf_counter(), response.status, response.headers.get("X-RateLimit-Bucket"))
+
+    async def on_request_exception(session: Any, context: Any, params: Any) -> None:
+        record_attempt_end(time.perf_counter(), None, None)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_request_end.append(on_request_end)
+    config.on_request_exception.append(on_request_exception)
+    return config
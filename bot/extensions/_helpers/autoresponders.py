@@ -0,0 +1,315 @@
+"""Data-driven trigger/response rules for the automated responders.
+
+Rules are plain dictionaries (loaded from ``/data/autoresponders.json`` when present)
+so staff can add responders without a deploy. Every trigger and exclusion literal of
+every rule is compiled into a single Aho-Corasick automaton, so each message is
+scanned once no matter how many rules exist.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Pattern, Sequence, Set, Tuple, Union
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - falls back to the pure-Python automaton
+    ahocorasick = None  # type: ignore[assignment]
+
+from bot.core.storage import read_json
+from bot.extensions._helpers.dispatch import AUTHOR_AVRAE, AUTHOR_BOT, AUTHOR_HUMAN, MessageContext
+
+logger = logging.getLogger(__name__)
+
+COOLDOWN_SCOPES = ("global", "channel", "user", "key")
+_AUTHOR_KINDS = {"human": AUTHOR_HUMAN, "avrae": AUTHOR_AVRAE, "bot": AUTHOR_BOT}
+
+
+class _TrieAutomaton:
+    """Pure-Python Aho-Corasick automaton, used when ``pyahocorasick`` is not installed.
+
+    Each state's output holds every literal ending there, including those reached
+    through its failure link, so nested and overlapping literals are all reported.
+    """
+
+    def __init__(self, literals: Sequence[str]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[str, ...]] = [()]
+        for literal in literals:
+            state = 0
+            for char in literal:
+                following = goto[state].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto[state][char] = following
+                    goto.append({})
+                    outputs.append(())
+                state = following
+            outputs[state] = (literal,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[following] = goto[fallback].get(char, 0)
+                outputs[following] += outputs[fail[following]]
+                queue.append(following)
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs: Dict[int, FrozenSet[str]] = {
+            state: frozenset(found) for state, found in enumerate(outputs) if found
+        }
+
+    def find(self, text: str) -> Set[str]:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: Set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if state in outputs:
+                found |= outputs[state]
+        return found
+
+
+class _CAutomaton:
+    """``pyahocorasick`` automaton; the scan runs in C."""
+
+    def __init__(self, literals: Sequence[str]) -> None:
+        self._automaton = ahocorasick.Automaton()
+        for literal in literals:
+            self._automaton.add_word(literal, literal)
+        self._automaton.make_automaton()
+
+    def find(self, text: str) -> Set[str]:
+        return {literal for _, literal in self._automaton.iter(text)}
+
+
+class LiteralMatcher:
+    """Find which of many literals occur in a text with one Aho-Corasick pass.
+
+    The automaton is built once per rule set, so scanning a message costs time in
+    proportion to its length and the matches found, not to the number of literals.
+    """
+
+    def __init__(self, literals: Iterable[str]) -> None:
+        self.literals: Tuple[str, ...] = tuple(sorted({lit.lower() for lit in literals if lit}))
+        self._automaton: Optional[Union[_CAutomaton, _TrieAutomaton]] = None
+        if self.literals:
+            self._automaton = (_CAutomaton if ahocorasick is not None else _TrieAutomaton)(self.literals)
+
+    def find(self, text_lower: str) -> Set[str]:
+        if self._automaton is None:
+            return set()
+        return self._automaton.find(text_lower)
+
+
+def _list(value: Any, name: str, field_name: str) -> List[Any]:
+    # A bare string would otherwise be iterated into one-character entries
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Auto-responder rule {name!r} field {field_name!r} must be a list")
+    return list(value)
+
+
+@dataclass(frozen=True)
+class AutoResponderRule:
+    """A trigger/response pair and the conditions that scope it."""
+
+    name: str
+    triggers: Tuple[str, ...]
+    response: str
+    unless: Tuple[str, ...] = ()
+    authors: FrozenSet[str] = frozenset({AUTHOR_HUMAN})
+    channel_ids: Optional[FrozenSet[int]] = None
+    exclude_channel_ids: FrozenSet[int] = frozenset()
+    cooldown: float = 0.0
+    cooldown_scope: str = "channel"
+    key_pattern: Optional[Pattern[str]] = None
+    respect_opt_outs: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AutoResponderRule":
+        """Build a rule from its JSON form, raising ``ValueError`` if it is malformed."""
+
+        try:
+            name = str(data["name"])
+            raw_triggers = data["triggers"]
+            response = str(data["response"])
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f"Auto-responder rule is missing name, triggers or response: {data!r}") from exc
+        triggers = tuple(str(trigger).lower() for trigger in _list(raw_triggers, name, "triggers"))
+        if not triggers or not response:
+            raise ValueError(f"Auto-responder rule {name!r} needs at least one trigger and a response")
+
+        authors = _list(data.get("authors", ["human"]), name, "authors")
+        unknown = [author for author in authors if author not in _AUTHOR_KINDS]
+        if unknown:
+            raise ValueError(f"Auto-responder rule {name!r} has unknown authors {unknown}")
+
+        scope = data.get("cooldown_scope", "channel")
+        if scope not in COOLDOWN_SCOPES:
+            raise ValueError(f"Auto-responder rule {name!r} has unknown cooldown_scope {scope!r}")
+        key_pattern = data.get("key_pattern")
+        if scope == "key" and not key_pattern:
+            raise ValueError(f"Auto-responder rule {name!r} uses cooldown_scope 'key' without a key_pattern")
+
+        channel_ids = data.get("channel_ids")
+        try:
+            compiled_key = re.compile(key_pattern, re.MULTILINE) if key_pattern else None
+        except re.error as exc:
+            raise ValueError(f"Auto-responder rule {name!r} has an invalid key_pattern: {exc}") from exc
+
+        return cls(
+            name=name,
+            triggers=triggers,
+            response=response,
+            unless=tuple(str(literal).lower() for literal in _list(data.get("unless", ()), name, "unless")),
+            authors=frozenset(_AUTHOR_KINDS[author] for author in authors),
+            channel_ids=frozenset(int(cid) for cid in _list(channel_ids, name, "channel_ids")) if channel_ids is not None else None,
+            exclude_channel_ids=frozenset(
+                int(cid) for cid in _list(data.get("exclude_channel_ids", ()), name, "exclude_channel_ids")
+            ),
+            cooldown=float(data.get("cooldown", 0.0)),
+            cooldown_scope=scope,
+            key_pattern=compiled_key,
+            respect_opt_outs=bool(data.get("respect_opt_outs", True)),
+        )
+
+    def cooldown_key(self, ctx: MessageContext) -> Optional[str]:
+        """Return the cooldown key for ``ctx``; ``None`` means the rule does not apply."""
+
+        if self.key_pattern is not None:
+            match = self.key_pattern.search(ctx.text)
+            if match is None:
+                return None
+            scope_key = (match.group(1) if match.groups() else match.group(0)).strip()
+        elif self.cooldown_scope == "user":
+            user = ctx.triggering_user
+            scope_key = str(user.get("user_id")) if user else "unknown"
+        elif self.cooldown_scope == "channel":
+            scope_key = str(ctx.channel_id)
+        else:
+            scope_key = "*"
+        return f"autoresponder:{self.name}:{scope_key}"
+
+
+class AutoResponderEngine:
+    """Evaluates a set of rules against a message using one shared literal matcher."""
+
+    def __init__(self, rules: Sequence[AutoResponderRule]) -> None:
+        self.rules: Tuple[AutoResponderRule, ...] = tuple(rules)
+        self.authors: FrozenSet[str] = frozenset().union(*(rule.authors for rule in self.rules))
+        self.matcher = LiteralMatcher(
+            literal for rule in self.rules for literal in rule.triggers + rule.unless
+        )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, ctx: MessageContext) -> List[Tuple[AutoResponderRule, str]]:
+        """Return ``(rule, cooldown_key)`` for every rule that applies to ``ctx``.
+
+        The result is memoised on ``ctx`` so a dispatcher predicate and its handler
+        share one scan.
+        """
+
+        return ctx.memo(("autoresponders", id(self)), lambda: self._match(ctx))
+
+    def _match(self, ctx: MessageContext) -> List[Tuple[AutoResponderRule, str]]:
+        if ctx.author_kind not in self.authors:
+            return []
+        found = self.matcher.find(ctx.text_lower)
+        if not found:
+            return []
+        matches = []
+        for rule in self.rules:
+            if ctx.author_kind not in rule.authors:
+                continue
+            if not found.intersection(rule.triggers) or found.intersection(rule.unless):
+                continue
+            if rule.channel_ids is not None and ctx.channel_id not in rule.channel_ids:
+                continue
+            if ctx.channel_id in rule.exclude_channel_ids:
+                continue
+            key = rule.cooldown_key(ctx)
+            if key is not None:
+                matches.append((rule, key))
+        return matches
+
+
+def load_rules(path: str, defaults: Sequence[Dict[str, Any]] = ()) -> List[AutoResponderRule]:
+    """Load rules from ``path`` (a JSON list), falling back to ``defaults`` if it is absent."""
+
+    data = read_json(path, default=None)
+    if data is None:
+        data = list(defaults)
+    if isinstance(data, dict):
+        data = data.get("rules", [])
+    if not isinstance(data, list):
+        raise ValueError(f"{path} must contain a list of auto-responder rules")
+    return [AutoResponderRule.from_dict(entry) for entry in data]
+
+
+class AutoResponderRuleSet:
+    """Keeps an :class:`AutoResponderEngine` in sync with its rules file.
+
+    The file's modification time is checked at most every ``check_interval`` seconds;
+    a malformed file is logged and the previous rules stay in effect.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        defaults: Sequence[Dict[str, Any]] = (),
+        check_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = path
+        self.defaults = list(defaults)
+        self.check_interval = check_interval
+        self._clock = clock
+        self._mtime: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._engine = AutoResponderEngine(())
+        self.reload()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """Re-read the rules file now. Returns ``False`` if it could not be parsed."""
+
+        self._checked_at = self._clock()
+        mtime = self._current_mtime()
+        try:
+            rules = load_rules(self.path, self.defaults)
+        except ValueError:
+            logger.exception("Ignoring invalid auto-responder rules in %s", self.path)
+            self._mtime = mtime
+            return False
+        self._engine = AutoResponderEngine(rules)
+        self._mtime = mtime
+        logger.info("Loaded %d auto-responder rules from %s", len(rules), self.path if mtime else "defaults")
+        return True
+
+    @property
+    def engine(self) -> AutoResponderEngine:
+        if self._clock() - self._checked_at >= self.check_interval:
+            self._checked_at = self._clock()
+            if self._current_mtime() != self._mtime:
+                self.reload()
+        return self._engine
@@ -0,0 +1,180 @@
+"""Parsers for the Avrae embeds Barry reads (see docs/avrae_message_guide.md).
+
+Kept free of discord imports so the corpus benchmark in ``benchmarks/parsers.py``
+can measure exactly the code the commands run. The ``*_records`` functions take
+batches of transcript records (see ``transcripts.message_to_record``) or compact
+history records, so commands can run them in the parse worker pool
+(bot/services/workers.py).
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Matches: "That's 24 contribution points" or "That's only 24 contribution points" allowing optional markdown
+# around the number (e.g. **24**, *24*), and optional commas in numbers.
+# Accept both straight and curly apostrophes (’ or ').
+POINTS_REGEX = re.compile(
+    r"That[’']s\s+(?:only\s+)?\**\*?_?([0-9]{1,3}(?:,[0-9]{3})*)_?\*?\**\s+contribution\s+points",
+    re.IGNORECASE,
+)
+
+# "<name> levels up to 5th level", "<name> gains 6,500 Experience and levels up to **5th** level!",
+# "<name> leveled up to 5th level" and "<name> reaches level 5", one per line.
+LEVEL_UP_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    for pattern in (
+        r"^\s*([^\n]+?)\s+(?:gains\s+[\d,]+\s+Experience\s+and\s+)?levels?\s+up\s+to\s+\*{0,2}(\d{1,2})(?:st|nd|rd|th)\*{0,2}\s+level!?",
+        r"^\s*([^\n]+?)\s+level(?:ed|led)\s+up\s+to\s+\*{0,2}(\d{1,2})(?:st|nd|rd|th)\*{0,2}\s+level!?",
+        r"^\s*([^\n]+?)\s+reaches?\s+level\s+\*{0,2}(\d{1,2})\*{0,2}\b",
+    )
+)
+
+
+def parse_contribution_points(text: str) -> Optional[int]:
+    """Return the points in a "That's N contribution points" line, or ``None``."""
+
+    if not text:
+        return None
+    normalised = text.replace("\u200b", "").strip()
+    match = POINTS_REGEX.search(normalised) or POINTS_REGEX.search(normalised.lower())
+    if match is None:
+        return None
+    return int(match.group(1).replace(",", ""))
+
+
+def parse_level_ups(text: str) -> List[Tuple[str, int]]:
+    """Return ``(character name, level)`` for every level-up line in ``text``."""
+
+    return [
+        (name.strip(), int(level))
+        for pattern in LEVEL_UP_PATTERNS
+        for name, level in pattern.findall(text)
+    ]
+
+
+# ----------------------------------------------------------------------
+# Batch parsers over transcript records
+# ----------------------------------------------------------------------
+_KEY_PREFIX = "*-•–—> #"
+_KEY_STRIP = "`*_~.,:;!?—-()[]{}\u200b"
+
+
+def _first_word(text: str) -> Optional[str]:
+    """First word of the first non-empty line, without markdown bullets or punctuation."""
+
+    for line in text.splitlines():
+        stripped = line.strip().lstrip(_KEY_PREFIX)
+        if not stripped.split():
+            continue
+        return stripped.split()[0].strip(_KEY_STRIP) or None
+    return None
+
+
+def contribution_key(record: Dict[str, Any]) -> Optional[str]:
+    """The aggregation key for a record: the first word of the likeliest name-bearing text.
+
+    Tried in order: the first embed title (or embed author names before it), the
+    message content, then each embed's description, first field value and name,
+    and footer.
+    """
+
+    candidates: List[str] = []
+    embeds = record.get("embeds") or []
+    for embed in embeds:
+        if embed.get("title"):
+            candidates.append(embed["title"])
+            break
+        if embed.get("author"):
+            candidates.append(embed["author"])
+    if record.get("content"):
+        candidates.append(record["content"])
+    for embed in embeds:
+        if embed.get("description"):
+            candidates.append(embed["description"])
+        fields = embed.get("fields") or []
+        if fields:
+            if fields[0].get("value"):
+                candidates.append(fields[0]["value"])
+            if fields[0].get("name"):
+                candidates.append(fields[0]["name"])
+        if embed.get("footer"):
+            candidates.append(embed["footer"])
+    for candidate in candidates:
+        word = _first_word(candidate)
+        if word:
+            return word
+    return None
+
+
+def _record_text(record: Dict[str, Any], include_authors: bool = False) -> str:
+    parts = [record.get("content") or ""]
+    for embed in record.get("embeds") or []:
+        for key in ("title", "description", "footer"):
+            if embed.get(key):
+                parts.append(embed[key])
+        for field in embed.get("fields") or []:
+            parts.append(field.get("name") or "")
+            parts.append(field.get("value") or "")
+        if include_authors and embed.get("author"):
+            parts.append(embed["author"])
+    return "\n".join(parts)
+
+
+class ContributionScan(NamedTuple):
+    """What ``/contributions`` found in one record.
+
+    ``matches`` holds ``(key, points, source text)`` per match, with ``key`` ``None``
+    when no key could be extracted. ``missed`` is set when no embed yielded a keyed
+    match and the whole-message fallback found no points either.
+    """
+
+    text: str
+    matches: Tuple[Tuple[Optional[str], int, str], ...]
+    missed: bool
+
+
+def scan_contributions(record: Dict[str, Any]) -> ContributionScan:
+    """Find contribution points per embed description, falling back to the whole message."""
+
+    text = _record_text(record)
+    if not text:
+        return ContributionScan(text, (), False)
+    matches: List[Tuple[Optional[str], int, str]] = []
+    keyed = False
+    for embed in record.get("embeds") or []:
+        description = embed.get("description")
+        points = parse_contribution_points(description or "")
+        if points is None:
+            continue
+        title = (embed.get("title") or "").replace("\u200b", "").strip()
+        key = _first_word(title.splitlines()[0]) if title else None
+        key = key or contribution_key(record)
+        matches.append((key, points, description.replace("\u200b", "").strip()))
+        keyed = keyed or key is not None
+    if keyed:
+        return ContributionScan(text, tuple(matches), False)
+    points = parse_contribution_points(text)
+    if points is None:
+        return ContributionScan(text, tuple(matches), True)
+    matches.append((contribution_key(record), points, text))
+    return ContributionScan(text, tuple(matches), False)
+
+
+def _as_dict(record: Any) -> Dict[str, Any]:
+    return record.to_transcript() if hasattr(record, "to_transcript") else record
+
+
+def scan_contributions_records(records: Sequence[Any]) -> List[ContributionScan]:
+    return [scan_contributions(_as_dict(record)) for record in records]
+
+
+def level_ups_records(records: Sequence[Any]) -> List[Tuple[str, int]]:
+    """Every level-up in the records' content, embed text and embed authors."""
+
+    return [
+        level_up
+        for record in records
+        for level_up in parse_level_ups(_record_text(_as_dict(record), include_authors=True))
+    ]
@@ -0,0 +1,104 @@
+"""Buffering of low-urgency notifications into periodic digests."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, List, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Notification:
+    """One line item for a digest; ``group`` decides which digest it joins."""
+
+    title: str
+    body: str
+    group: Hashable = None
+    urgent: bool = False
+    created_at: float = field(default_factory=time.time)
+
+
+FlushCallback = Callable[[Hashable, List[Notification]], Awaitable[None]]
+
+
+class NotificationDigest:
+    """Collect notifications per group and hand them to ``flush`` in batches.
+
+    A group is flushed ``window`` seconds after its first buffered notification or as
+    soon as it holds ``max_items``, whichever comes first. Urgent notifications bypass
+    the buffer and are delivered on their own immediately.
+    """
+
+    def __init__(self, flush: FlushCallback, window: float = 300.0, max_items: int = 10) -> None:
+        self._flush = flush
+        self.window = window
+        self.max_items = max(1, max_items)
+        self._buffers: Dict[Hashable, List[Notification]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(items) for items in self._buffers.values())
+
+    async def add(self, notification: Notification) -> None:
+        if notification.urgent:
+            await self._deliver(notification.group, [notification])
+            return
+
+        group = notification.group
+        buffer = self._buffers.setdefault(group, [])
+        buffer.append(notification)
+        if len(buffer) >= self.max_items:
+            await self.flush(group)
+        elif group not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[group] = loop.call_later(self.window, self._flush_soon, group)
+
+    def _flush_soon(self, group: Hashable) -> None:
+        self._timers.pop(group, None)
+        task = asyncio.ensure_future(self.flush(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, group: Hashable) -> None:
+        """Deliver everything buffered for ``group`` now."""
+
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._buffers.pop(group, None)
+        if items:
+            await self._deliver(group, items)
+
+    async def flush_all(self) -> None:
+        for group in list(self._buffers):
+            await self.flush(group)
+
+    async def _deliver(self, group: Hashable, items: List[Notification]) -> None:
+        try:
+            await self._flush(group, items)
+        except Exception:
+            logger.exception("Failed to deliver digest of %d notification(s) for %s", len(items), group)
+
+
+def render_digest(items: List[Notification], limit: int = 2000) -> List[str]:
+    """Render ``items`` as bullet lines packed into messages of at most ``limit`` characters."""
+
+    messages: List[str] = []
+    current = ""
+    for item in items:
+        line = f"• **{item.title}** — {item.body}"
+        if len(line) > limit:
+            line = line[: limit - 3] + "..."
+        if current and len(current) + 1 + len(line) > limit:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
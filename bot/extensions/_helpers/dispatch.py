@@ -0,0 +1,269 @@
+"""Predicate-based dispatch of ``on_message`` events to auto-responder handlers.
+
+Each handler declares cheap predicates (author kind, guild, channel, embeds, literal
+substrings). The dispatcher builds a :class:`MessageContext` once per message so the
+text, lowered text and triggering-user resolution are shared by every handler, then
+runs the handlers whose predicates match concurrently, each with its own timeout and
+error isolation, recording per-handler latency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from bot.core.metrics import Histogram, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+AUTHOR_SELF = "self"
+AUTHOR_HUMAN = "human"
+AUTHOR_AVRAE = "avrae"
+AUTHOR_BOT = "bot"
+ANY_AUTHOR: FrozenSet[str] = frozenset({AUTHOR_HUMAN, AUTHOR_AVRAE, AUTHOR_BOT})
+
+HandlerCallback = Callable[[Any, "MessageContext"], Awaitable[Any]]
+
+
+def message_text_parts(message) -> List[str]:
+    """Return message content followed by every embed title/description/footer/field."""
+
+    parts = [message.content or ""]
+    for embed in getattr(message, "embeds", None) or []:
+        try:
+            if getattr(embed, "title", None):
+                parts.append(embed.title)
+            if getattr(embed, "description", None):
+                parts.append(embed.description)
+            if getattr(embed, "footer", None) and getattr(embed.footer, "text", None):
+                parts.append(embed.footer.text)
+            for field in getattr(embed, "fields", None) or []:
+                parts.append(field.name or "")
+                parts.append(field.value or "")
+        except Exception:
+            logger.exception("Failed to parse an embed while building message text")
+    return parts
+
+
+class MessageContext:
+    """Per-message values computed once and shared by every handler."""
+
+    def __init__(
+        self,
+        message,
+        bot_user_id: Optional[int] = None,
+        resolve_user: Optional[Callable[[Any], Optional[dict]]] = None,
+        is_ignored: Optional[Callable[..., bool]] = None,
+    ) -> None:
+        self.message = message
+        self._resolve_user = resolve_user
+        self._is_ignored = is_ignored
+
+        author = message.author
+        guild = getattr(message, "guild", None)
+        channel = getattr(message, "channel", None)
+        self.guild_id: Optional[int] = getattr(guild, "id", None)
+        self.channel_id: Optional[int] = getattr(channel, "id", None)
+        self.category_id: Optional[int] = getattr(channel, "category_id", None)
+
+        if bot_user_id is not None and getattr(author, "id", None) == bot_user_id:
+            self.author_kind = AUTHOR_SELF
+        elif not getattr(author, "bot", False):
+            self.author_kind = AUTHOR_HUMAN
+        elif (getattr(author, "name", None) or "").lower() == "avrae":
+            self.author_kind = AUTHOR_AVRAE
+        else:
+            self.author_kind = AUTHOR_BOT
+
+        self.content: str = message.content or ""
+        self.has_embeds = bool(getattr(message, "embeds", None))
+        self._memo: Dict[Any, Any] = {}
+
+    def memo(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return ``compute()``, cached under ``key`` for the life of this context.
+
+        Lets a handler's predicate and the handler itself share an expensive result.
+        """
+
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    @cached_property
+    def content_lower(self) -> str:
+        return self.content.lower()
+
+    @cached_property
+    def text(self) -> str:
+        """Content plus all embed text, newline separated."""
+
+        return "\n".join(message_text_parts(self.message)) if self.has_embeds else self.content
+
+    @cached_property
+    def text_lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def triggering_user(self) -> Optional[dict]:
+        if self._resolve_user is None:
+            return None
+        try:
+            return self._resolve_user(self.message)
+        except Exception:
+            logger.debug("Triggering user resolution raised for message %s", getattr(self.message, "id", None))
+            return None
+
+    @cached_property
+    def is_ignored(self) -> bool:
+        user = self.triggering_user
+        if not user or self._is_ignored is None:
+            return False
+        try:
+            return bool(self._is_ignored(user_id=user.get("user_id"), username=user.get("username")))
+        except Exception:
+            logger.exception("Error while checking ignore list for message %s", getattr(self.message, "id", None))
+            return False
+
+
+@dataclass(frozen=True)
+class MessageHandler:
+    """A registered handler and the cheap predicates that gate it."""
+
+    name: str
+    callback: HandlerCallback
+    authors: FrozenSet[str] = frozenset({AUTHOR_HUMAN})
+    guild_ids: Optional[FrozenSet[int]] = None
+    channel_ids: Optional[FrozenSet[int]] = None
+    exclude_channel_ids: FrozenSet[int] = frozenset()
+    exclude_category_ids: FrozenSet[int] = frozenset()
+    requires_embeds: bool = False
+    substrings: Tuple[str, ...] = ()
+    predicate: Optional[Callable[[MessageContext], bool]] = None
+    timeout: Optional[float] = None
+
+    def matches(self, ctx: MessageContext) -> bool:
+        if ctx.author_kind not in self.authors:
+            return False
+        if self.guild_ids is not None and ctx.guild_id not in self.guild_ids:
+            return False
+        if self.channel_ids is not None and ctx.channel_id not in self.channel_ids:
+            return False
+        if ctx.channel_id in self.exclude_channel_ids or ctx.category_id in self.exclude_category_ids:
+            return False
+        if self.requires_embeds and not ctx.has_embeds:
+            return False
+        if self.substrings:
+            text = ctx.text_lower
+            if not any(literal in text for literal in self.substrings):
+                return False
+        if self.predicate is not None and not self.predicate(ctx):
+            return False
+        return True
+
+
+class MessageDispatcher:
+    """Registry of message handlers, run concurrently once their predicates match."""
+
+    def __init__(
+        self, default_timeout: float = 15.0, slow_threshold: float = 2.0, metrics: Optional[MetricsRegistry] = None
+    ) -> None:
+        self._handlers: List[MessageHandler] = []
+        self.default_timeout = default_timeout
+        self.slow_threshold = slow_threshold
+        # Optional shared registry; handler latency is exported as ``barry_handler_seconds``
+        self.metrics = metrics
+        self.latency: Dict[str, Histogram] = {}
+        self.failures: Dict[str, int] = {}
+        self.timeouts: Dict[str, int] = {}
+
+    @property
+    def handlers(self) -> Tuple[MessageHandler, ...]:
+        return tuple(self._handlers)
+
+    def register(
+        self,
+        name: str,
+        callback: HandlerCallback,
+        *,
+        authors: Iterable[str] = (AUTHOR_HUMAN,),
+        guild_ids: Optional[Iterable[int]] = None,
+        channel_ids: Optional[Iterable[int]] = None,
+        exclude_channel_ids: Iterable[int] = (),
+        exclude_category_ids: Iterable[int] = (),
+        requires_embeds: bool = False,
+        substrings: Iterable[str] = (),
+        predicate: Optional[Callable[[MessageContext], bool]] = None,
+        timeout: Optional[float] = None,
+    ) -> MessageHandler:
+        """Register ``callback(message, ctx)``; ``substrings`` are matched case-insensitively."""
+
+        handler = MessageHandler(
+            name=name,
+            callback=callback,
+            authors=frozenset(authors),
+            guild_ids=frozenset(guild_ids) if guild_ids is not None else None,
+            channel_ids=frozenset(channel_ids) if channel_ids is not None else None,
+            exclude_channel_ids=frozenset(exclude_channel_ids),
+            exclude_category_ids=frozenset(exclude_category_ids),
+            requires_embeds=requires_embeds,
+            substrings=tuple(dict.fromkeys(literal.lower() for literal in substrings)),
+            predicate=predicate,
+            timeout=timeout,
+        )
+        self._handlers.append(handler)
+        self.latency.setdefault(name, Histogram())
+        self.failures.setdefault(name, 0)
+        self.timeouts.setdefault(name, 0)
+        return handler
+
+    def matching(self, ctx: MessageContext) -> List[MessageHandler]:
+        return [handler for handler in self._handlers if handler.matches(ctx)]
+
+    async def _run(self, handler: MessageHandler, ctx: MessageContext) -> None:
+        message_id = getattr(ctx.message, "id", None)
+        timeout = handler.timeout if handler.timeout is not None else self.default_timeout
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            await asyncio.wait_for(handler.callback(ctx.message, ctx), timeout=timeout)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            self.timeouts[handler.name] += 1
+            logger.warning("Handler %s timed out after %.1fs for message %s", handler.name, timeout, message_id)
+        except Exception:
+            self.failures[handler.name] += 1
+            logger.exception("Handler %s failed for message %s", handler.name, message_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.latency[handler.name].observe(elapsed)
+            if self.metrics is not None:
+                self.metrics.observe("barry_handler_seconds", elapsed, handler=handler.name, outcome=outcome)
+            if elapsed >= self.slow_threshold:
+                logger.warning("Handler %s took %.2fs for message %s", handler.name, elapsed, message_id)
+
+    async def dispatch(self, ctx: MessageContext) -> List[str]:
+        """Run every matching handler concurrently. Returns the names that ran."""
+
+        handlers = self.matching(ctx)
+        if len(handlers) == 1:
+            await self._run(handlers[0], ctx)
+        elif handlers:
+            await asyncio.gather(*(self._run(handler, ctx) for handler in handlers))
+        return [handler.name for handler in handlers]
+
+    def latency_report(self) -> List[str]:
+        """One summary line per handler, slowest p95 first."""
+
+        lines = []
+        for name, histogram in sorted(self.latency.items(), key=lambda item: item[1].quantile(0.95), reverse=True):
+            lines.append(
+                f"{name}: n={histogram.count} mean={histogram.mean * 1000:.1f}ms "
+                f"p50<={histogram.quantile(0.5) * 1000:.0f}ms p95<={histogram.quantile(0.95) * 1000:.0f}ms "
+                f"max={histogram.max * 1000:.0f}ms errors={self.failures[name]} timeouts={self.timeouts[name]}"
+            )
+        return lines
@@ -0,0 +1,169 @@
+"""Compact records for commands that hold channel history in memory.
+
+A ``discord.Message`` keeps its author or member, embeds, reactions, mentions and
+connection state alive. That is well over a kilobyte per message before its text,
+and ``/export`` holds up to 10,000 of them. Scanners convert each message into a
+:class:`CompactMessage` as it arrives and let the original go: IDs, an epoch
+timestamp, a flag word and the text. The author's name and display name are
+interned per scan, so repeated authors cost nothing. Embeds and attachments are
+kept, as transcript dictionaries, only on messages that have them.
+
+Records pickle cheaply, so they can be handed to the parse worker pool
+(bot/services/workers.py), and :meth:`CompactMessage.to_transcript` rebuilds the
+dictionary ``transcripts.message_to_record`` would have produced.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.extensions._helpers.transcripts import TranscriptRecord, _attachment_to_dict, _embed_to_dict, _isoformat
+
+FLAG_BOT = 1
+FLAG_EDITED = 2
+
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class CompactMessage:
+    """The parts of a message that history scans and transcripts use."""
+
+    __slots__ = (
+        "id",
+        "channel_id",
+        "guild_id",
+        "author_id",
+        "author",
+        "display_name",
+        "created_at",
+        "edited_at",
+        "flags",
+        "content",
+        "extras",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        channel_id: Optional[int],
+        guild_id: Optional[int],
+        author_id: Optional[int],
+        author: str,
+        display_name: str,
+        created_at: float,
+        edited_at: Optional[float] = None,
+        flags: int = 0,
+        content: str = "",
+        extras: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None,
+    ) -> None:
+        self.id = id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.author_id = author_id
+        self.author = author
+        self.display_name = display_name
+        self.created_at = created_at
+        self.edited_at = edited_at
+        self.flags = flags
+        self.content = content
+        # (embeds, attachments) as transcript dictionaries, or None when there are neither
+        self.extras = extras
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # Positional state pickles smaller than the default slot-name mapping
+        return (CompactMessage, tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self) -> str:
+        return f"<CompactMessage id={self.id} author={self.author!r}>"
+
+    @property
+    def bot(self) -> bool:
+        return bool(self.flags & FLAG_BOT)
+
+    @property
+    def edited(self) -> bool:
+        return bool(self.flags & FLAG_EDITED)
+
+    @property
+    def created(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at, timezone.utc)
+
+    @property
+    def jump_url(self) -> str:
+        return f"https://discord.com/channels/{self.guild_id or '@me'}/{self.channel_id}/{self.id}"
+
+    def to_transcript(self) -> TranscriptRecord:
+        """The transcript record ``message_to_record`` builds for the original message."""
+
+        embeds, attachments = self.extras or ([], [])
+        edited = datetime.fromtimestamp(self.edited_at, timezone.utc) if self.edited else None
+        return {
+            "id": self.id,
+            "channel_id": self.channel_id,
+            "author_id": self.author_id,
+            "author": self.author,
+            "display_name": self.display_name,
+            "bot": self.bot,
+            "created_at": _isoformat(self.created) if self.created_at else None,
+            "edited_at": _isoformat(edited),
+            "content": self.content,
+            "embeds": list(embeds),
+            "attachments": list(attachments),
+            "jump_url": self.jump_url,
+        }
+
+
+class Compactor:
+    """Converts messages into :class:`CompactMessage` records for one scan.
+
+    With ``keep_text=False`` content, embeds and attachments are dropped too, for
+    scans such as ``/log`` that only count who posted when.
+    """
+
+    def __init__(self, keep_text: bool = True) -> None:
+        self.keep_text = keep_text
+        self._authors: Dict[Any, Tuple[Optional[int], str, str]] = {}
+
+    def __call__(self, message: Any) -> CompactMessage:
+        author = message.author
+        author_id = getattr(author, "id", None)
+        key = author_id if author_id is not None else id(author)
+        interned = self._authors.get(key)
+        if interned is None:
+            name = getattr(author, "name", None) or "unknown"
+            interned = (author_id, name, getattr(author, "display_name", None) or name)
+            self._authors[key] = interned
+
+        edited_at = _epoch(getattr(message, "edited_at", None))
+        flags = (FLAG_BOT if getattr(author, "bot", False) else 0) | (FLAG_EDITED if edited_at is not None else 0)
+        content = ""
+        extras = None
+        if self.keep_text:
+            content = message.content or ""
+            embeds = [_embed_to_dict(embed) for embed in getattr(message, "embeds", None) or []]
+            attachments = [_attachment_to_dict(a) for a in getattr(message, "attachments", None) or []]
+            if embeds or attachments:
+                extras = (embeds, attachments)
+
+        channel = getattr(message, "channel", None)
+        guild = getattr(message, "guild", None)
+        return CompactMessage(
+            id=message.id,
+            channel_id=getattr(channel, "id", None),
+            guild_id=getattr(guild, "id", None),
+            author_id=interned[0],
+            author=interned[1],
+            display_name=interned[2],
+            created_at=_epoch(getattr(message, "created_at", None)) or 0.0,
+            edited_at=edited_at,
+            flags=flags,
+            content=content,
+            extras=extras,
+        )
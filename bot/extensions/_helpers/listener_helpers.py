@@ -6,16 +6,31 @@ import logging
 from functools import wraps
 from typing import Any, Awaitable, Callable, TypeVar, cast
 
+from bot.extensions._helpers.dispatch import MessageContext
+
 logger = logging.getLogger(__name__)
 
 TFunc = TypeVar("TFunc", bound=Callable[..., Awaitable[Any]])
 
 
 def requires_not_ignored(func: TFunc) -> TFunc:
-    """Skip a handler if the triggering user cannot be resolved or is ignored."""
+    """Skip a handler if the triggering user cannot be resolved or is ignored.
+
+    When the handler is called with a :class:`MessageContext`, the user resolution and
+    ignore check cached on the context are reused instead of being recomputed.
+    """
 
     @wraps(func)
     async def wrapper(self, message, *args, **kwargs):  # type: ignore[override]
+        ctx = next((arg for arg in args if isinstance(arg, MessageContext)), kwargs.get("ctx"))
+        if isinstance(ctx, MessageContext):
+            if not ctx.triggering_user:
+                logger.debug("Skipping %s because triggering user could not be resolved", func.__name__)
+                return None
+            if ctx.is_ignored:
+                return None
+            return await func(self, message, *args, **kwargs)
+
         try:
             triggering_user = self._resolve_triggering_user(message)  # type: ignore[attr-defined]
         except Exception:
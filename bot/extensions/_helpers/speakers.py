@@ -0,0 +1,128 @@
+"""Fixed-memory tracking of who spoke recently, for attributing bot replies to a user."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+# (message_id, user_id, username, timestamp)
+_Slot = Tuple[int, int, Optional[str], float]
+
+
+class _Ring:
+    """Preallocated ring buffer of the most recent speakers in one channel."""
+
+    __slots__ = ("slots", "head")
+
+    def __init__(self, size: int) -> None:
+        self.slots: List[Optional[_Slot]] = [None] * size
+        self.head = 0
+
+    def push(self, entry: _Slot) -> None:
+        self.slots[self.head] = entry
+        self.head = (self.head + 1) % len(self.slots)
+
+    def newest_first(self):
+        size = len(self.slots)
+        for offset in range(1, size + 1):
+            entry = self.slots[(self.head - offset) % size]
+            if entry is None:
+                return
+            yield entry
+
+
+def _user_record(user: Any) -> Optional[dict]:
+    if user is None or getattr(user, "id", None) is None:
+        return None
+    name = getattr(user, "name", None)
+    return {"user_id": user.id, "username": name.lower() if name else None}
+
+
+class RecentSpeakerTracker:
+    """LRU of channels, each holding a ring buffer of recent human messages.
+
+    Memory is bounded by ``max_channels * slots`` regardless of how many channels the
+    bot has seen. :meth:`attribute` works out which user a bot message (e.g. an Avrae
+    reply) was produced for, preferring exact links over "whoever spoke last".
+    """
+
+    def __init__(
+        self,
+        max_channels: int = 512,
+        slots: int = 10,
+        max_age: float = 10.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_channels = max(1, max_channels)
+        self.slots = max(1, slots)
+        self.max_age = max_age
+        self._clock = clock
+        self._channels: "OrderedDict[int, _Ring]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def record(self, channel_id: int, message_id: int, user_id: int, username: Optional[str]) -> None:
+        ring = self._channels.get(channel_id)
+        if ring is None:
+            ring = self._channels[channel_id] = _Ring(self.slots)
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel_id)
+        ring.push((message_id, user_id, username.lower() if username else None, self._clock()))
+
+    def latest(self, channel_id: int, max_age: Optional[float] = None) -> Optional[dict]:
+        """Return the most recent speaker in ``channel_id`` within ``max_age`` seconds."""
+
+        ring = self._channels.get(channel_id)
+        if ring is None:
+            return None
+        cutoff = self._clock() - (self.max_age if max_age is None else max_age)
+        for _, user_id, username, ts in ring.newest_first():
+            if ts < cutoff:
+                return None
+            return {"user_id": user_id, "username": username, "timestamp": ts}
+        return None
+
+    def by_message(self, channel_id: int, message_id: int) -> Optional[dict]:
+        """Return the author of a tracked message, if it is still in the buffer."""
+
+        ring = self._channels.get(channel_id)
+        if ring is None:
+            return None
+        for tracked_id, user_id, username, ts in ring.newest_first():
+            if tracked_id == message_id:
+                return {"user_id": user_id, "username": username, "timestamp": ts}
+        return None
+
+    def attribute(self, message: Any) -> Optional[dict]:
+        """Return the user a bot ``message`` was triggered by.
+
+        Slash-command responses carry ``interaction_metadata``; prefix-command replies
+        carry a ``reference`` to the invoking message. Only when neither exists does
+        this fall back to the latest speaker in the channel.
+        """
+
+        metadata = getattr(message, "interaction_metadata", None)
+        record = _user_record(getattr(metadata, "user", None))
+        if record:
+            return record
+
+        channel_id = getattr(getattr(message, "channel", None), "id", None)
+        reference = getattr(message, "reference", None)
+        if reference is not None:
+            author = getattr(getattr(reference, "resolved", None), "author", None)
+            record = None if getattr(author, "bot", False) else _user_record(author)
+            if record:
+                return record
+            referenced_id = getattr(reference, "message_id", None)
+            if referenced_id is not None and channel_id is not None:
+                record = self.by_message(channel_id, referenced_id)
+                if record:
+                    return record
+
+        if channel_id is None:
+            return None
+        return self.latest(channel_id)
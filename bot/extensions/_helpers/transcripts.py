@@ -0,0 +1,238 @@
+"""Helpers for turning scene messages into exportable transcripts.
+
+Messages are first flattened into plain dictionaries by :func:`message_to_record`
+so that the formatters below never touch the Discord API and the same records can
+be written to disk or processed offline.
+"""
+
+from __future__ import annotations
+
+import gzip
+import html
+import json
+from collections.abc import Sequence as SequenceABC
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+TranscriptRecord = Dict[str, Any]
+
+# Exports larger than this are gzip-compressed before upload.
+GZIP_THRESHOLD_BYTES = 1024 * 1024
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _embed_to_dict(embed) -> Dict[str, Any]:
+    footer = getattr(embed, "footer", None)
+    author = getattr(embed, "author", None)
+    return {
+        "title": getattr(embed, "title", None) or None,
+        "description": getattr(embed, "description", None) or None,
+        "fields": [
+            {"name": str(getattr(field, "name", "") or ""), "value": str(getattr(field, "value", "") or "")}
+            for field in getattr(embed, "fields", None) or []
+        ],
+        "footer": getattr(footer, "text", None) or None,
+        "author": getattr(author, "name", None) or None,
+    }
+
+
+def _attachment_to_dict(attachment) -> Dict[str, Any]:
+    return {
+        "filename": getattr(attachment, "filename", None),
+        "url": getattr(attachment, "url", None),
+        "size": getattr(attachment, "size", None),
+        "content_type": getattr(attachment, "content_type", None),
+    }
+
+
+def message_to_record(message) -> TranscriptRecord:
+    """Flatten a Discord message into a JSON-serialisable transcript record."""
+
+    author = message.author
+    name = getattr(author, "name", None) or "unknown"
+    return {
+        "id": message.id,
+        "channel_id": getattr(getattr(message, "channel", None), "id", None),
+        "author_id": getattr(author, "id", None),
+        "author": name,
+        "display_name": getattr(author, "display_name", None) or name,
+        "bot": bool(getattr(author, "bot", False)),
+        "created_at": _isoformat(getattr(message, "created_at", None)),
+        "edited_at": _isoformat(getattr(message, "edited_at", None)),
+        "content": message.content or "",
+        "embeds": [_embed_to_dict(embed) for embed in getattr(message, "embeds", None) or []],
+        "attachments": [_attachment_to_dict(a) for a in getattr(message, "attachments", None) or []],
+        "jump_url": getattr(message, "jump_url", None),
+    }
+
+
+def _timestamp_label(record: TranscriptRecord) -> str:
+    created = record.get("created_at")
+    if not created:
+        return ""
+    label = created.replace("T", " ")[:16]
+    if record.get("edited_at"):
+        label += " (edited)"
+    return label
+
+
+def _embed_lines(embed: Dict[str, Any]) -> List[str]:
+    lines = []
+    for key in ("author", "title", "description"):
+        if embed.get(key):
+            lines.append(str(embed[key]))
+    for field in embed.get("fields", []):
+        lines.append(f"{field['name']}: {field['value']}")
+    if embed.get("footer"):
+        lines.append(str(embed["footer"]))
+    return lines
+
+
+# ----------------------------------------------------------------------
+# Formatters
+# ----------------------------------------------------------------------
+def format_text(records: Sequence[TranscriptRecord], title: str) -> str:
+    """Plain text layout, matching the original ``/export`` output."""
+
+    out = []
+    for record in records:
+        out.append(f"{record['author']}\n-----\n {record['content']}\n")
+        for embed in record.get("embeds", []):
+            for line in _embed_lines(embed):
+                out.append(f" | {line}\n")
+        for attachment in record.get("attachments", []):
+            out.append(f" [attachment] {attachment.get('filename')}: {attachment.get('url')}\n")
+        out.append("===============\n")
+    return "".join(out)
+
+
+def format_markdown(records: Sequence[TranscriptRecord], title: str) -> str:
+    out = [f"# {title}\n\n"]
+    for record in records:
+        out.append(f"**{record['display_name']}** ({record['author']}) — {_timestamp_label(record)}\n\n")
+        if record["content"]:
+            out.append(f"{record['content']}\n\n")
+        for embed in record.get("embeds", []):
+            out.append("".join(f"> {line}\n" for text in _embed_lines(embed) for line in text.splitlines()))
+            out.append("\n")
+        for attachment in record.get("attachments", []):
+            out.append(f"- [{attachment.get('filename')}]({attachment.get('url')})\n")
+        out.append("\n---\n\n")
+    return "".join(out)
+
+
+def format_jsonl(records: Sequence[TranscriptRecord], title: str) -> str:
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+_HTML_STYLE = (
+    "body{font-family:sans-serif;max-width:50em;margin:2em auto;background:#313338;color:#dbdee1}"
+    ".msg{margin:0 0 1em;padding:.5em 1em;border-left:3px solid #5865f2}"
+    ".meta{font-size:.85em;color:#949ba4}.author{font-weight:bold;color:#f2f3f5}"
+    ".embed{margin:.5em 0;padding:.5em;background:#2b2d31;border-left:3px solid #949ba4;white-space:pre-wrap}"
+    ".content{white-space:pre-wrap}a{color:#00a8fc}"
+)
+
+
+def format_html(records: Sequence[TranscriptRecord], title: str) -> str:
+    """Self-contained HTML transcript (inline styles, no external assets)."""
+
+    esc = html.escape
+    out = [
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">",
+        f"<title>{esc(title)}</title><style>{_HTML_STYLE}</style></head><body>",
+        f"<h1>{esc(title)}</h1>",
+    ]
+    for record in records:
+        out.append(f"<div class=\"msg\" id=\"m{record['id']}\">")
+        out.append(
+            f"<div><span class=\"author\">{esc(record['display_name'])}</span> "
+            f"<span class=\"meta\">{esc(record['author'])} · {esc(_timestamp_label(record))}</span></div>"
+        )
+        if record["content"]:
+            out.append(f"<div class=\"content\">{esc(record['content'])}</div>")
+        for embed in record.get("embeds", []):
+            out.append(f"<div class=\"embed\">{esc(chr(10).join(_embed_lines(embed)))}</div>")
+        for attachment in record.get("attachments", []):
+            url = esc(attachment.get("url") or "", quote=True)
+            out.append(f"<div><a href=\"{url}\">{esc(attachment.get('filename') or 'attachment')}</a></div>")
+        out.append("</div>")
+    out.append("</body></html>\n")
+    return "\n".join(out)
+
+
+@dataclass(frozen=True)
+class TranscriptFormatter:
+    """A named export format."""
+
+    label: str
+    extension: str
+    render: Callable[[Sequence[TranscriptRecord], str], str]
+
+
+FORMATTERS: Dict[str, TranscriptFormatter] = {
+    "txt": TranscriptFormatter("Plain text", "txt", format_text),
+    "md": TranscriptFormatter("Markdown", "md", format_markdown),
+    "jsonl": TranscriptFormatter("JSON Lines", "jsonl", format_jsonl),
+    "html": TranscriptFormatter("HTML", "html", format_html),
+}
+
+
+def register_formatter(key: str, formatter: TranscriptFormatter) -> None:
+    """Make an additional export format available to ``/export``."""
+
+    FORMATTERS[key] = formatter
+
+
+class _ExpandedRecords(SequenceABC):
+    """Expands compact records one at a time as a formatter reads them, so a long
+    transcript never holds every record as a dictionary at once."""
+
+    def __init__(self, records: List[Any]) -> None:
+        self._records = records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return _ExpandedRecords(self._records[index])
+        record = self._records[index]
+        return record.to_transcript() if hasattr(record, "to_transcript") else record
+
+
+def render_transcript(
+    records: Iterable[TranscriptRecord],
+    fmt: Union[str, TranscriptFormatter],
+    basename: str,
+    title: Optional[str] = None,
+    gzip_threshold: int = GZIP_THRESHOLD_BYTES,
+) -> Tuple[str, bytes]:
+    """Render ``records`` in format ``fmt`` and return ``(filename, payload)``.
+
+    ``records`` may also be compact history records (``history.CompactMessage``),
+    which are expanded here so a worker process receives the smaller form.
+    ``fmt`` is a key of :data:`FORMATTERS` or a formatter itself; pass the formatter
+    when rendering in a worker process, which only knows the built-in keys.
+    Payloads above ``gzip_threshold`` bytes are gzip-compressed and the filename
+    gains a ``.gz`` suffix.
+    """
+
+    formatter = fmt if isinstance(fmt, TranscriptFormatter) else FORMATTERS.get(fmt)
+    if formatter is None:
+        raise ValueError(f"Unknown transcript format: {fmt}")
+
+    payload = formatter.render(_ExpandedRecords(list(records)), title or basename).encode("utf-8")
+    filename = f"{basename}.{formatter.extension}"
+    if len(payload) > gzip_threshold:
+        payload = gzip.compress(payload)
+        filename += ".gz"
+    return filename, payload
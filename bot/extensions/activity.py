@@ -1,48 +1,107 @@
 import datetime
+import functools
 import logging
-import re
 
 import discord
 from discord import Embed, app_commands
 from discord.ext import commands
 
-import config
-from utils import _authorised_user, _server_error, get_recent_messages_reversed
+from bot.core.config_store import config_for
+from bot.core.gateway import ensure_chunked
+from bot.core.metrics import instrumented
+from bot.core.scheduler import jobs_for
+from bot.core.sharding import owns_guild
+from bot.extensions._helpers.avrae import level_ups_records
+from bot.extensions._helpers.history import Compactor
+from bot.services.channel_reports import build_channel_report, channel_reports_for
+from bot.services.outbound import PRIORITY_LOW, scheduler_for
+from bot.services.workers import workers_for
+from utils import _authorised_user, _server_error
 
 logger = logging.getLogger(__name__)
 
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds", "guild_messages", "members", "message_content")
+
+# Monday 05:00 UTC, the quietest hour across the RP guilds; override per guild in /data/schedule.json
+WEEKLY_PINGS_SPEC = "0 5 * * 1"
+# /channelactivity serves the precomputed report until a week's run has been missed
+REPORT_MAX_AGE = datetime.timedelta(days=8)
+
 
 class Activity(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._job_names = []
+
+    async def cog_load(self) -> None:
+        jobs = jobs_for(self.bot)
+        for guild_id, gcfg in config_for(self.bot).guild_index.items():
+            # Each process reports on the guilds on its own shards
+            if gcfg.channel_times is None or not gcfg.is_monitored or not owns_guild(self.bot, guild_id):
+                continue
+            name = f"weekly_pings:{guild_id}"
+            jobs.add(name, WEEKLY_PINGS_SPEC, functools.partial(self.weekly_pings, guild_id))
+            self._job_names.append(name)
+
+    async def cog_unload(self) -> None:
+        jobs = jobs_for(self.bot)
+        for name in self._job_names:
+            jobs.remove(name)
+        self._job_names.clear()
+        channel_reports_for(self.bot).flush()
+
+    @instrumented("weekly_pings")
+    async def weekly_pings(self, guild_id: int) -> None:
+        """Precompute the guild's channel report and post the ping text to its staff channel."""
+
+        await self.bot.wait_until_ready()
+        gcfg = config_for(self.bot).guild(guild_id)
+        if gcfg is None or gcfg.channel_times is None or self.bot.get_guild(guild_id) is None:
+            return
+        report = await build_channel_report(self.bot, gcfg, datetime.datetime.now(datetime.timezone.utc))
+        channel_reports_for(self.bot).put(report)
+        logger.info("Precomputed channel report for guild %s: %d stale channel(s)", guild_id, len(report.stale))
+
+        if gcfg.ping_report_channel is None:
+            return
+        channel = self.bot.get_channel(gcfg.ping_report_channel)
+        if channel is None:
+            logger.warning("Ping report channel %s for guild %s not found", gcfg.ping_report_channel, guild_id)
+            return
+        embed = Embed(title="Ping Post", description=report.ping_description())
+        await scheduler_for(self.bot).send(channel, embed=embed, priority=PRIORITY_LOW)
 
     @app_commands.command(name="useractivity", description="See the RP activity of users.")
     async def useractivity(self, interaction: discord.Interaction):
+        cfg = config_for(self.bot)
         await interaction.response.defer()
-        if interaction.guild.id not in config.monitored_channels.keys():
+        gcfg = cfg.guild(interaction.guild.id)
+        if gcfg is None or not gcfg.is_monitored:
             embed = _server_error(interaction)
             await interaction.followup.send(embed=embed)
             return
 
-        authorised = any(role.name in config.authorised_roles for role in interaction.user.roles)
+        authorised = any(role.name in cfg.authorised_role_names for role in interaction.user.roles)
         if not authorised:
             embed = _authorised_user()
             await interaction.followup.send(embed=embed)
             return
 
+        await ensure_chunked(interaction.guild)
         active = [
             user.id
             for user in interaction.guild.members
-            if any(role.name in config.include_role for role in user.roles)
-            and not any(role.name in config.exclude_role for role in user.roles)
+            if any(role.name in cfg.include_role_names for role in user.roles)
+            and not any(role.name in cfg.exclude_role_names for role in user.roles)
         ]
 
-        one_month_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=config.inactivity_threshold)
-        fourteen_days_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=config.warning_threshold)
+        one_month_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=cfg.inactivity_threshold)
+        fourteen_days_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=cfg.warning_threshold)
 
         channel_histories_new = {}
         channel_histories_old = {}
-        for channel_id in config.monitored_channels[interaction.guild.id]:
+        for channel_id in gcfg.monitored_order:
             channel = self.bot.get_channel(int(channel_id))
             if not channel:
                 continue
@@ -73,7 +132,7 @@ class Activity(commands.Cog):
         inactive = {}
 
         if 0 in total_activity.values():
-            description = f":red_circle: No posts in the last {config.inactivity_threshold} days:\n"
+            description = f":red_circle: No posts in the last {cfg.inactivity_threshold} days:\n"
             for user, posts in total_activity.items():
                 if posts == 0:
                     description += f"<@{user}>: {total_activity[user]}\n"
@@ -81,20 +140,20 @@ class Activity(commands.Cog):
             description += "\n"
 
         if 0 in new_activity.values():
-            description += f":orange_circle: No posts in the last {config.warning_threshold} days:\n"
+            description += f":orange_circle: No posts in the last {cfg.warning_threshold} days:\n"
             for user, posts in new_activity.items():
                 if posts == 0 and total_activity[user] > 0:
                     description += f"<@{user}>: {new_activity[user]}\n"
             description += "\n"
 
         if any(post_count in total_activity.values() for post_count in (1, 2, 3)):
-            description += f":yellow_circle: 1-3 posts in the last {config.inactivity_threshold} days:\n"
+            description += f":yellow_circle: 1-3 posts in the last {cfg.inactivity_threshold} days:\n"
             for user, posts in total_activity.items():
                 if 1 <= posts <= 3:
                     description += f"<@{user}>: {total_activity[user]}\n"
             description += "\n"
 
-        description += f":green_circle: 4+ posts in the last {config.inactivity_threshold} days:\n"
+        description += f":green_circle: 4+ posts in the last {cfg.inactivity_threshold} days:\n"
         for user, posts in total_activity.items():
             if posts >= 4:
                 description += f"<@{user}>: {total_activity[user]}\n"
@@ -108,45 +167,17 @@ class Activity(commands.Cog):
             two_weeks_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=14)
 
             try:
-                level_ups = []
+                records = []
+                compact = Compactor()
                 for channel_id in level_up_channel_ids:
                     level_up_channel = self.bot.get_channel(channel_id)
                     if level_up_channel:
                         async for message in level_up_channel.history(limit=None):
                             if message.created_at < two_weeks_ago:
                                 break
-                            texts = []
-                            if message.content:
-                                texts.append(message.content)
-                            if message.embeds:
-                                for embed_obj in message.embeds:
-                                    if getattr(embed_obj, "title", None):
-                                        texts.append(embed_obj.title)
-                                    if getattr(embed_obj, "description", None):
-                                        texts.append(embed_obj.description)
-                                    for field in getattr(embed_obj, "fields", []):
-                                        if getattr(field, "name", None):
-                                            texts.append(str(field.name))
-                                        if getattr(field, "value", None):
-                                            texts.append(str(field.value))
-                                    if getattr(embed_obj, "footer", None) and getattr(embed_obj.footer, "text", None):
-                                        texts.append(embed_obj.footer.text)
-                                    if getattr(embed_obj, "author", None) and getattr(embed_obj.author, "name", None):
-                                        texts.append(embed_obj.author.name)
-
-                            text_blob = "\n".join(texts)
-
-                            patterns = [
-                                r"^\s*([^\n]+?)\s+(?:gains\s+[\d,]+\s+Experience\s+and\s+)?levels?\s+up\s+to\s+\*{0,2}(\d{1,2})(?:st|nd|rd|th)\*{0,2}\s+level!?",
-                                r"^\s*([^\n]+?)\s+level(?:ed|led)\s+up\s+to\s+\*{0,2}(\d{1,2})(?:st|nd|rd|th)\*{0,2}\s+level!?",
-                                r"^\s*([^\n]+?)\s+reaches?\s+level\s+\*{0,2}(\d{1,2})\*{0,2}\b",
-                            ]
-
-                            for pattern in patterns:
-                                for match in re.findall(pattern, text_blob, re.IGNORECASE | re.MULTILINE):
-                                    character_name = match[0].strip()
-                                    level = int(match[1])
-                                    level_ups.append((character_name, level))
+                            records.append(compact(message))
+
+                level_ups = await workers_for(self.bot).map_batches(level_ups_records, records)
 
                 if level_ups:
                     highest_levels = {}
@@ -168,7 +199,7 @@ class Activity(commands.Cog):
         description = ""
         six_months_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=180)
 
-        for channel_id in config.monitored_channels[interaction.guild.id]:
+        for channel_id in gcfg.monitored_order:
             channel = self.bot.get_channel(int(channel_id))
             if not channel:
                 continue
@@ -200,90 +231,54 @@ class Activity(commands.Cog):
             await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="channelactivity", description="Get the time of the last message in a channel.")
-    async def channelactivity(self, interaction: discord.Interaction):
+    @app_commands.describe(refresh="Read the channels now instead of using this week's precomputed report")
+    async def channelactivity(self, interaction: discord.Interaction, refresh: bool = False):
+        cfg = config_for(self.bot)
         await interaction.response.defer()
-        if interaction.guild.id not in config.monitored_channels.keys():
+        gcfg = cfg.guild(interaction.guild.id)
+        if gcfg is None or not gcfg.is_monitored:
             embed = _server_error(interaction)
             await interaction.followup.send(embed=embed)
             return
 
-        authorised = any(role.name in config.authorised_roles for role in interaction.user.roles)
+        authorised = any(role.name in cfg.authorised_role_names for role in interaction.user.roles)
         if not authorised:
             embed = _authorised_user()
             await interaction.followup.send(embed=embed)
             return
 
-        channel_list = config.monitored_channels[interaction.guild.id]
-        description = ""
-        active = []
-        inactive = []
-        stale = []
-
-        for channel_id in channel_list:
-            channel = self.bot.get_channel(int(channel_id))
-            messages = channel.history(limit=1)
-            try:
-                message = await messages.__anext__()
-            except StopAsyncIteration:
-                continue
-            message_time = message.created_at
-            time_elapsed = datetime.datetime.now(datetime.timezone.utc) - message_time
-            author = message.author
-            status = ":green_circle:"
-            if time_elapsed > datetime.timedelta(days=config.channeltimes[interaction.guild.id]["yellow"]):
-                status = ":yellow_circle:"
-            if time_elapsed > datetime.timedelta(days=config.channeltimes[interaction.guild.id]["red"]):
-                status = ":red_circle:"
-                if message.author.name != "Avrae":
-                    stale.append(channel_id)
-
-            time_elapsed_str = "Today" if time_elapsed.days == 0 else f"{time_elapsed.days} days ago"
-            desc_string = f"{status} <#{channel_id}>: {message_time.strftime('%d/%m/%Y')} ({time_elapsed_str})\n"
-
-            if author.name == "Avrae":
-                inactive.append(desc_string)
-            else:
-                active.append(desc_string)
-
-        if active:
-            description = "# Active channels:\n(Channels with an ongoing RP scene)\n\n" + "".join(active)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        reports = channel_reports_for(self.bot)
+        report = None if refresh else reports.get(gcfg.guild_id, max_age=REPORT_MAX_AGE, now=now)
+        precomputed = report is not None
+        if report is None:
+            report = await build_channel_report(self.bot, gcfg, now)
+            reports.put(report)
+
+        footer = None
+        if precomputed:
+            footer = f"Precomputed {report.generated.strftime('%d/%m/%Y %H:%M')} UTC; use refresh for a live check"
+
+        description = report.active_description()
+        if description is not None:
             embed = Embed(title="Last message", description=description)
+            if footer:
+                embed.set_footer(text=footer)
             await interaction.followup.send(embed=embed)
 
-        if stale:
-            ping_description = "Copy and paste the below for your weekly pinging needs\n\n"
-            ping_description += (
-                "```\n## Weekly pings!\nAs usual, this is a friendly check in on those scenes which seem to be slowing down."
-                " How's it going? How's life? Are you both communicating and happy with the pace of things?"
-                " Do you need any help or hand from anyone?\n"
-            )
-
-            for channel_id in stale:
-                users = []
-                channel = self.bot.get_channel(int(channel_id))
-                message_history = await get_recent_messages_reversed(channel)
-                for message in message_history:
-                    if message.author.name == "Avrae":
-                        break
-                    if message.author.id not in users:
-                        users.append(message.author.id)
-                users_mentions = ", ".join([f"<@{user}>" for user in users])
-                ping_description += f"<#{channel_id}>: ({users_mentions})\n"
-            ping_description += "```"
-            embed = Embed(title="Ping Post", description=ping_description)
-            await interaction.followup.send(embed=embed)
-        else:
-            embed = Embed(title="Ping Post", description="Good news! No stale channels were found. Everyone is playing nicely!")
-            await interaction.followup.send(embed=embed)
-
+        embed = Embed(title="Ping Post", description=report.ping_description())
+        if footer:
+            embed.set_footer(text=footer)
+        await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="log", description="Audit who's been posting since the last Avrae message in this channel.")
     async def log(self, interaction: discord.Interaction) -> None:
+        cfg = config_for(self.bot)
         await interaction.response.defer(ephemeral=True)
 
         DM_ROLE_ID = 881193159747600394
         authorised = any(
-            role.name in config.authorised_roles or role.id == DM_ROLE_ID
+            role.name in cfg.authorised_role_names or role.id == DM_ROLE_ID
             for role in interaction.user.roles
         )
         if not authorised:
@@ -301,11 +296,13 @@ class Activity(commands.Cog):
 
         raw_messages = []
         avrae_found = False
+        # Only authors and timestamps are needed, so the text is not kept
+        compact = Compactor(keep_text=False)
         async for message in channel.history(limit=500):
             if message.author.name == "Avrae":
                 avrae_found = True
                 break
-            raw_messages.append(message)
+            raw_messages.append(compact(message))
 
         if not raw_messages:
             note = "No messages found since the last Avrae post." if avrae_found else "No messages found in this channel."
@@ -318,10 +315,10 @@ class Activity(commands.Cog):
         # Collapse consecutive runs by the same author into a single turn
         turns = []  # (author_id, display_name, timestamp_of_most_recent_msg_in_run)
         for msg in raw_messages:
-            if turns and turns[-1][0] == msg.author.id:
-                turns[-1] = (turns[-1][0], turns[-1][1], msg.created_at)
+            if turns and turns[-1][0] == msg.author_id:
+                turns[-1] = (turns[-1][0], turns[-1][1], msg.created)
             else:
-                turns.append((msg.author.id, msg.author.display_name, msg.created_at))
+                turns.append((msg.author_id, msg.display_name, msg.created))
 
         # Aggregate per-user stats; iterate turns in order (oldest first)
         user_stats: dict[int, dict] = {}
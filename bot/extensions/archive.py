@@ -0,0 +1,156 @@
+"""Bulk archiving of monitored RP channels to the local data volume."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import List, Optional
+
+import discord
+from discord import Embed, app_commands
+from discord.ext import commands, tasks
+
+from bot.core.config_store import BotConfig, config_for
+from bot.core.metrics import instrumented
+from bot.core.sharding import owns_guild
+from bot.services.archive import ArchiveResult, ChannelArchiver
+from utils import _authorised_user, _server_error
+
+logger = logging.getLogger(__name__)
+
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds", "message_content")
+
+# Room left for the failure list in the results embed (descriptions cap at 4096 characters)
+FAILED_CHANNELS_LIMIT = 3500
+
+
+def archive_channel_ids(cfg: BotConfig, guild_id: int) -> List[int]:
+    """Monitored and TL;DR-additional channels for a guild, without duplicates."""
+
+    gcfg = cfg.guild(guild_id)
+    return list(gcfg.archive_order) if gcfg else []
+
+
+def failed_channels_text(failed: List[ArchiveResult], limit: int = FAILED_CHANNELS_LIMIT) -> str:
+    """One line per failed channel, cut to ``limit`` characters with a count of those left out."""
+
+    lines: List[str] = []
+    length = 0
+    for index, result in enumerate(failed):
+        line = f"<#{result.channel_id}>: {result.error}"
+        later = len(failed) - index - 1
+        # Keep room for the "…and N more" line whenever channels would follow this one
+        needed = len(line) + (len(f"\n…and {later} more") if later else 0)
+        if length + needed > limit:
+            lines.append(f"…and {later + 1} more")
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+class Archive(commands.Cog):
+    """Keeps a compressed, incremental JSONL archive of RP channel history."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        services = getattr(bot, "services", None)
+        if not services or not getattr(services, "archiver", None):
+            raise RuntimeError("Archive service not configured on bot instance")
+        self.archiver: ChannelArchiver = services.archiver
+        self._manual_run: Optional["asyncio.Task[None]"] = None
+
+    async def cog_load(self) -> None:
+        self.nightly_archive.start()
+
+    async def cog_unload(self) -> None:
+        self.nightly_archive.cancel()
+        if self._manual_run is not None:
+            self._manual_run.cancel()
+        self.archiver.cursors.flush()
+
+    async def _archive_guild(self, guild_id: int) -> List[ArchiveResult]:
+        channels = []
+        for channel_id in archive_channel_ids(config_for(self.bot), guild_id):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                logger.debug("Skipping archive of unknown channel %s", channel_id)
+                continue
+            channels.append(channel)
+        return await self.archiver.archive_channels(guild_id, channels)
+
+    @tasks.loop(hours=24)
+    @instrumented("nightly_archive")
+    async def nightly_archive(self) -> None:
+        cfg = config_for(self.bot)
+        for guild_id, gcfg in cfg.guild_index.items():
+            # Each process archives only the guilds on its own shards
+            if not gcfg.is_monitored or not owns_guild(self.bot, guild_id) or self.bot.get_guild(guild_id) is None:
+                continue
+            try:
+                await self._archive_guild(guild_id)
+            except Exception:
+                logger.exception("Nightly archive failed for guild %s", guild_id)
+
+    @nightly_archive.before_loop
+    async def _before_nightly_archive(self) -> None:
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="archive", description="Archive new messages from this server's RP channels.")
+    async def archive(self, interaction: discord.Interaction) -> None:
+        cfg = config_for(self.bot)
+        await interaction.response.defer(ephemeral=True)
+        gcfg = cfg.guild(interaction.guild.id)
+        if gcfg is None or not gcfg.is_monitored:
+            await interaction.followup.send(embed=_server_error(interaction), ephemeral=True)
+            return
+
+        authorised = any(role.name in cfg.authorised_role_names for role in interaction.user.roles)
+        if not authorised:
+            await interaction.followup.send(embed=_authorised_user(), ephemeral=True)
+            return
+
+        if self.archiver.running or (self._manual_run is not None and not self._manual_run.done()):
+            await interaction.followup.send(
+                embed=Embed(title="Archive", description="An archive run is already in progress. Try again shortly."),
+                ephemeral=True,
+            )
+            return
+
+        # A guild's first archive walks its whole history, which can outlast the interaction token
+        self._manual_run = asyncio.get_running_loop().create_task(
+            self._run_manual_archive(interaction.guild.id, interaction.user, interaction.channel),
+            name=f"archive:{interaction.guild.id}",
+        )
+        await interaction.followup.send(
+            embed=Embed(title="Archive", description="Archive started. I'll DM you the results when it finishes."),
+            ephemeral=True,
+        )
+
+    async def _run_manual_archive(self, guild_id: int, user: discord.abc.User, channel: discord.abc.Messageable) -> None:
+        try:
+            results = await self._archive_guild(guild_id)
+        except Exception:
+            logger.exception("Manual archive failed for guild %s", guild_id)
+            embed = Embed(title="Archive Failed", description="An error occurred while archiving this server's channels.")
+        else:
+            archived = sum(result.messages for result in results)
+            failed = [result for result in results if result.error]
+            description = f"Archived {archived} new message(s) from {len(results)} channel(s)."
+            if failed:
+                description += "\n\nFailed channels:\n" + failed_channels_text(failed)
+            embed = Embed(title="Archive", description=description)
+
+        try:
+            try:
+                await user.send(embed=embed)
+            except discord.Forbidden:
+                # Fall back to the invoking channel if DMs are disabled
+                await channel.send(content=user.mention, embed=embed)
+        except Exception:
+            logger.exception("Failed to report archive results to user %s", user.id)
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(Archive(bot))
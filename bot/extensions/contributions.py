@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import re
 from collections import defaultdict
 from typing import Dict
 
@@ -11,24 +11,26 @@ import discord
 from discord import Embed, app_commands
 from discord.ext import commands
 
-import config
+from bot.core.config_store import config_for
+from bot.extensions._helpers.avrae import POINTS_REGEX, scan_contributions_records
+from bot.extensions._helpers.history import Compactor
+from bot.services.outbound import PRIORITY_LOW, scheduler_for
+from bot.services.resolver import resolver_for
+from bot.services.workers import workers_for
 from utils import _authorised_user, _server_error
 
 logger = logging.getLogger(__name__)
 
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds", "message_content")
+
 
 class Contributions(commands.Cog):
     """Slash commands for contribution point summaries."""
 
     SILVERYMOON_GUILD_ID = 866376531995918346
     DOWNTIMES_CHANNEL_ID = 881218238170665043
-    # Matches: "That's 24 contribution points" or "That's only 24 contribution points" allowing optional markdown
-    # around the number (e.g. **24**, *24*), and optional commas in numbers.
-    # Accept both straight and curly apostrophes (’ or ').
-    POINTS_REGEX = re.compile(
-        r"That[’']s\s+(?:only\s+)?\**\*?_?([0-9]{1,3}(?:,[0-9]{3})*)_?\*?\**\s+contribution\s+points",
-        re.IGNORECASE,
-    )
+    POINTS_REGEX = POINTS_REGEX
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
@@ -45,10 +47,12 @@ class Contributions(commands.Cog):
         embed description, first field value/name, or footer text.
         Contribution phrase is searched across message content and embed fields.
         """
+        cfg = config_for(self.bot)
         await interaction.response.defer()
 
         # Server checks
-        if str(interaction.guild.id) not in config.guilds:
+        gcfg = cfg.guild(interaction.guild.id)
+        if gcfg is None or not gcfg.is_known:
             await interaction.followup.send(embed=_server_error(interaction))
             return
 
@@ -64,16 +68,14 @@ class Contributions(commands.Cog):
             return
 
         # Authorisation check (reuse existing pattern)
-        authorised = any(role.name in config.authorised_roles for role in interaction.user.roles)
+        authorised = any(role.name in cfg.authorised_role_names for role in interaction.user.roles)
         if not authorised:
             await interaction.followup.send(embed=_authorised_user())
             return
 
         # Fetch the target channel
         try:
-            channel = self.bot.get_channel(self.DOWNTIMES_CHANNEL_ID) or await self.bot.fetch_channel(
-                self.DOWNTIMES_CHANNEL_ID
-            )
+            channel = await resolver_for(self.bot).channel(self.DOWNTIMES_CHANNEL_ID)
         except Exception:
             logger.exception("Failed to fetch downtimes channel: %s", self.DOWNTIMES_CHANNEL_ID)
             await interaction.followup.send(
@@ -174,7 +176,6 @@ class Contributions(commands.Cog):
         # Aggregate totals
         per_key: Dict[str, int] = defaultdict(int)
         grand_total = 0
-        scanned = 0
         # diagnostics
         non_empty_blobs = 0
         regex_matched = 0
@@ -182,170 +183,19 @@ class Contributions(commands.Cog):
         sample_matched_no_key: list[str] = []
         sample_unmatched_blobs: list[str] = []
 
-        def _extract_first_word_key(msg: discord.Message) -> str | None:
-            """Return the first word key for aggregation.
-
-            Priority order:
-            1) First embed title's first word (common for Avrae outputs)
-            2) Message content first word
-            3) Embed description first word
-            4) First embed field value, then field name
-            5) Embed footer text first word
-            """
-            candidates: list[str] = []
-            # 1) Prefer embed title
-            for emb in getattr(msg, "embeds", []) or []:
-                if getattr(emb, "title", None):
-                    candidates.append(emb.title)
-                    break  # only need the first embed title
-                # Also consider author name if present (less common but may hold key)
-                if getattr(emb, "author", None) and getattr(emb.author, "name", None):
-                    candidates.append(emb.author.name)
-            # 2) Message content
-            if msg.content:
-                candidates.append(msg.content)
-            for emb in getattr(msg, "embeds", []) or []:
-                if getattr(emb, "description", None):
-                    candidates.append(emb.description)
-                # Prefer first field's value then name
-                fields = list(getattr(emb, "fields", []) or [])
-                if fields:
-                    first_field = fields[0]
-                    if getattr(first_field, "value", None):
-                        candidates.append(str(first_field.value))
-                    if getattr(first_field, "name", None):
-                        candidates.append(str(first_field.name))
-                if getattr(emb, "footer", None) and getattr(emb.footer, "text", None):
-                    candidates.append(emb.footer.text)
-
-            def _first_word(text: str) -> str | None:
-                # Use first non-empty line
-                for line in text.splitlines():
-                    stripped = line.strip()
-                    if not stripped:
-                        continue
-                    # Remove common markdown bullets/prefixes
-                    stripped = stripped.lstrip("*-•–—> #")
-                    # Split on whitespace
-                    tok = stripped.split()[0]
-                    # Strip punctuation/markdown wrappers
-                    tok = tok.strip("`*_~.,:;!?—-()[]{}\u200b")
-                    return tok or None
-                return None
-
-            for c in candidates:
-                w = _first_word(c)
-                if w:
-                    return w
-            return None
-
         try:
-            # Fetch the most recent messages (last N). oldest_first=False ensures we get newest -> oldest
-            async for message in channel.history(limit=message_limit, oldest_first=False):
-                # Skip messages sent by this bot only; we want to process Avrae and other bot outputs.
-                if getattr(self.bot, "user", None) and message.author.id == self.bot.user.id:
-                    continue
-                scanned += 1
-
-                # Build parts using the same approach as listeners._handle_avrae_triggers
-                parts = [message.content or ""]
-                if message.embeds:
-                    for embed in message.embeds:
-                        try:
-                            if getattr(embed, "title", None):
-                                parts.append(embed.title)
-                            if getattr(embed, "description", None):
-                                parts.append(embed.description)
-                            if getattr(embed, "footer", None) and getattr(embed.footer, "text", None):
-                                parts.append(embed.footer.text)
-                            if getattr(embed, "fields", None):
-                                for field in embed.fields:
-                                    parts.append(field.name or "")
-                                    parts.append(field.value or "")
-                        except Exception:
-                            logger.exception("Failed to parse an embed while checking contributions")
-
-                text_blob = "\n".join(parts)
-                if not text_blob:
-                    continue
-                non_empty_blobs += 1
-
-                # Prefer per-embed scanning: many Avrae outputs put the phrase in the embed description
-                matched_here = False
-                for emb in getattr(message, "embeds", []) or []:
-                    emb_desc = getattr(emb, "description", None)
-                    if not emb_desc:
-                        continue
-                    # normalize tiny invisible characters
-                    emb_desc_norm = emb_desc.replace("\u200b", "").strip()
-                    points_match = self.POINTS_REGEX.search(emb_desc_norm) or (getattr(self, "POINTS_REGEX_FALLBACK", None) and self.POINTS_REGEX_FALLBACK.search(emb_desc_norm))
-                    if not points_match:
-                        # lowercase fallback
-                        points_match = self.POINTS_REGEX.search(emb_desc_norm.lower()) or (getattr(self, "POINTS_REGEX_FALLBACK", None) and self.POINTS_REGEX_FALLBACK.search(emb_desc_norm.lower()))
-                    if not points_match:
-                        continue
-
-                    # got points in this embed description
-                    regex_matched += 1
-                    try:
-                        points = int(points_match.group(1).replace(",", ""))
-                    except Exception:
-                        continue
-
-                    # key comes from the first word of the embed title (preferred)
-                    emb_title = getattr(emb, "title", None) or ""
-                    # normalize title similarly
-                    emb_title_norm = emb_title.replace("\u200b", "").strip()
-                    first_word = None
-                    if emb_title_norm:
-                        # take first token and strip punctuation
-                        tok = emb_title_norm.splitlines()[0].strip()
-                        tok = tok.lstrip("*-•–—> #")
-                        tok = tok.split()[0] if tok.split() else ""
-                        first_word = tok.strip("`*_~.,:;!?—-()[]{}\u200b") or None
-
-                    if not first_word:
-                        # fallback to previous message-level heuristic
-                        first_word = _extract_first_word_key(message)
-
-                    if not first_word:
-                        matched_without_key += 1
-                        if len(sample_matched_no_key) < 5:
-                            sample_matched_no_key.append(emb_desc_norm[:300])
-                        # continue scanning other embeds in the message
-                        continue
-
-                    per_key[first_word] += points
-                    grand_total += points
-                    matched_here = True
-                    # continue scanning other embeds (do not break) to capture multiple contributions in one message
-
-                if not matched_here:
-                    # fallback: scan the assembled text blob (legacy behaviour)
-                    points_match = self.POINTS_REGEX.search(text_blob) or (getattr(self, "POINTS_REGEX_FALLBACK", None) and self.POINTS_REGEX_FALLBACK.search(text_blob))
-                    if not points_match:
-                        text_lower = text_blob.lower()
-                        points_match = self.POINTS_REGEX.search(text_lower) or (getattr(self, "POINTS_REGEX_FALLBACK", None) and self.POINTS_REGEX_FALLBACK.search(text_lower))
-                    if not points_match:
-                        if len(sample_unmatched_blobs) < 5:
-                            sample_unmatched_blobs.append(text_blob[:300])
-                        continue
-
-                    regex_matched += 1
-                    try:
-                        points = int(points_match.group(1).replace(",", ""))
-                    except Exception:
-                        continue
-
-                    first_word = _extract_first_word_key(message)
-                    if not first_word:
-                        matched_without_key += 1
-                        if len(sample_matched_no_key) < 5:
-                            sample_matched_no_key.append(text_blob[:300])
-                        continue
-
-                    per_key[first_word] += points
-                    grand_total += points
+            # Fetch the most recent messages (last N). oldest_first=False ensures we get newest -> oldest.
+            # Skip messages sent by this bot only; we want to process Avrae and other bot outputs.
+            own_id = getattr(getattr(self.bot, "user", None), "id", None)
+            compact = Compactor()
+            records = [
+                compact(message)
+                async for message in channel.history(limit=message_limit, oldest_first=False)
+                if own_id is None or message.author.id != own_id
+            ]
+            scanned = len(records)
+            # Regex scanning runs in worker processes while the event loop stays free
+            scans = await workers_for(self.bot).map_batches(scan_contributions_records, records)
         except Exception:
             logger.exception("Error while scanning channel history for contributions")
             await interaction.followup.send(
@@ -355,6 +205,24 @@ class Contributions(commands.Cog):
             )
             return
 
+        for scan in scans:
+            if not scan.text:
+                continue
+            non_empty_blobs += 1
+            # Many Avrae outputs put the phrase in the embed description; the helper scans
+            # each embed first and falls back to the whole message (see scan_contributions)
+            for key, points, source in scan.matches:
+                regex_matched += 1
+                if not key:
+                    matched_without_key += 1
+                    if len(sample_matched_no_key) < 5:
+                        sample_matched_no_key.append(source[:300])
+                    continue
+                per_key[key] += points
+                grand_total += points
+            if scan.missed and len(sample_unmatched_blobs) < 5:
+                sample_unmatched_blobs.append(scan.text[:300])
+
         if not per_key:
             # Provide diagnostic information to help debug why no keys were extracted
             diag = Embed(title="Contribution Points — diagnostics")
@@ -429,11 +297,15 @@ class Contributions(commands.Cog):
         embed = Embed(title=title, description=chunks[0])
         
         try:
-            # Send the results to the user's DMs
-            await interaction.user.send(embed=embed)
-            for idx in range(1, len(chunks)):
-                cont_embed = Embed(title=f"Contribution Points Summary (cont. {idx})", description=chunks[idx])
-                await interaction.user.send(embed=cont_embed)
+            # Send the results to the user's DMs, queued at low priority behind any alerts
+            outbound = scheduler_for(self.bot)
+            embeds = [embed] + [
+                Embed(title=f"Contribution Points Summary (cont. {idx})", description=chunks[idx])
+                for idx in range(1, len(chunks))
+            ]
+            await asyncio.gather(
+                *(outbound.send(interaction.user, embed=part, priority=PRIORITY_LOW) for part in embeds)
+            )
             
             await interaction.followup.send(
                 embed=Embed(title="Contribution Points", description="Summary sent to your DMs!"),
@@ -9,11 +9,14 @@ import discord
 from discord import Embed, app_commands
 from discord.ext import commands
 
-import config
+from bot.core.config_store import config_for
 from bot.services.github_app import GitHubAppClient, GitHubAppError
 
 logger = logging.getLogger(__name__)
 
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds",)
+
 
 class GitHubIssues(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
@@ -38,17 +41,16 @@ class GitHubIssues(commands.Cog):
         label: Optional[str] = None,
         assignees: Optional[str] = None,
     ) -> None:
-        allowed_servers = getattr(config, "ai_enabled_servers", [])
+        cfg = config_for(self.bot)
         guild = getattr(interaction, "guild", None)
-        guild_id = str(getattr(guild, "id", "")) if guild else None
-        if not guild_id or guild_id not in allowed_servers:
+        if guild is None or guild.id not in cfg.ai_enabled_guild_ids:
             await interaction.response.send_message(
                 embed=Embed(title="Unavailable", description="This command is not enabled in this server."),
                 ephemeral=True,
             )
             return
 
-        repo = getattr(config, "GITHUB_ISSUE_REPO", "")
+        repo = cfg.github_issue_repo
         if not repo:
             await interaction.response.send_message(
                 embed=Embed(title="Error", description="GitHub issue repository is not configured."),
@@ -214,7 +216,7 @@ class GitHubIssues(commands.Cog):
         interaction: discord.Interaction,
         current: str,
     ) -> List[app_commands.Choice[str]]:
-        repo = getattr(config, "GITHUB_ISSUE_REPO", "")
+        repo = config_for(self.bot).github_issue_repo
         if not repo:
             return []
 
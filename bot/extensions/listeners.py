@@ -4,29 +4,188 @@ from __future__ import annotations
 
 import logging
 import re
-import time
-from collections import deque
 
+from discord import app_commands
 from discord.ext import commands
 import discord
 
-import config
+from bot.core.cache import TTLCache
+from bot.core.config_store import config_for
+from bot.core.metrics import instrumented, metrics_for
+from bot.core.storage import data_path
+from bot.extensions._helpers.autoresponders import AutoResponderRuleSet
+from bot.extensions._helpers.digest import Notification, NotificationDigest, render_digest
+from bot.extensions._helpers.dispatch import (
+    ANY_AUTHOR,
+    AUTHOR_HUMAN,
+    MessageContext,
+    MessageDispatcher,
+)
 from bot.extensions._helpers.listener_helpers import requires_not_ignored
+from bot.extensions._helpers.speakers import RecentSpeakerTracker
+from bot.services.cooldowns import CooldownStore
+from bot.services.event_capture import Anonymiser, EventRecorder, capture_path
+from bot.services.opt_outs import OptOutRegistry
+from bot.services.outbound import PRIORITY_HIGH, route_for, scheduler_for
+from bot.services.resolver import resolver_for
+from bot.services.sent_messages import SentMessageRegistry
 
 logger = logging.getLogger(__name__)
 
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds", "guild_messages", "guild_reactions", "message_content")
+
 
 class Listeners(commands.Cog):
     SILVERYMOON_GUILD_ID = 866376531995918346
     DRAGONSPEAKER_ROLE_ID = 881993444380258377
     DRAGONSPEAKER_DEST_CHANNEL_ID = 1466414670972846284
+    MOD_CHAT_CATEGORY_ID = 866400862854184972
+    # Non-urgent Dragonspeaker notifications are batched per source into digest threads
+    DIGEST_WINDOW = 5 * 60
+    DIGEST_MAX_ITEMS = 10
+    DIGEST_THREAD_TTL = 6 * 60 * 60
+    URGENT_MARKERS = ("urgent", "emergency", "asap")
+    OPT_OUT_DIGEST_GROUP = "opt-outs"
     NYOOM_PATTERN = re.compile(r"ny+o{2,}m", re.IGNORECASE)
+    # Built-in auto-responders, used when /data/autoresponders.json does not exist.
+    # See README.md ("Auto-responder rules") for the file format.
+    DEFAULT_AUTORESPONDERS = (
+        {
+            "name": "spellbook_tip",
+            "triggers": ["An italicized spell indicates that the spell is homebrew."],
+            "authors": ["human", "avrae", "bot"],
+            "key_pattern": r"^(.+?) knows \d+ spells?",
+            "cooldown_scope": "key",
+            "cooldown": 24 * 60 * 60,
+            "response": (
+                "💡 **Tip:** You can use `!sbb` as a more reliable alias to see your spellbook!\n\n"
+                "It should be less confused by homebrew spells and Avrae's weird choices.\n\n"
+                "-# You will not receive this tip again for 24 hours. If you would rather opt out of automated tips, react to this message with :x: ."
+            ),
+        },
+        {
+            "name": "avrae_marketplace",
+            "triggers": ["go to marketplace"],
+            "unless": ["this monster's full details"],
+            "authors": ["avrae"],
+            "response": (
+                "It looks like you're trying to use content that D&D Beyond doesn't want you to have. "
+                "Please try using `!aa` instead of `!a`, and if stuck please ping a `@dragonspeaker` for assistance.\n\n"
+                "React with :x: to this message if you'd like to opt out of automated replies"
+            ),
+        },
+        {
+            "name": "avrae_ddb_not_connected",
+            "triggers": ["it looks like you don't have your discord account connected to your d&d beyond account"],
+            "unless": ["this monster's full details"],
+            "authors": ["avrae"],
+            "response": (
+                "It looks like you don't have access to SRD content. This is free content, you just need to connect your D&D Beyond account to your Discord account.\n\n"
+                "We go to some lengths to ensure the premium content is available, but for the free content we do ask that you meet us in the middle.\n"
+                "React with :x: to this message if you'd like to opt out of automated replies."
+            ),
+        },
+    )
+    # (recipient user ID, phrases that alert them when mentioned by anyone else, literals that suppress the alert)
+    NAME_ALERTS = (
+        (
+            661212031231459329,  # lxgrf
+            (
+                "Sarran",
+                "Fabian",
+                "Alex",
+                "Cerys",
+                "Afton",
+                "LX",
+                "Vyla",
+                "Zhvylathurgiesh-Moli",
+                "Cora",
+                "Lyra",
+                "Leif",
+                "Osovar",
+                "Barry",
+            ),
+            ('"Revivify (Sarran)": 1',),
+        ),
+        (702837629363683408, ("Mimi", "Elias", "Paige", "Meems", "Mims", "Neopets", "Eilas"), ()),  # aethelar
+    )
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.sbb_reminders: dict[str, float] = {}
-        self.sbb_reminder_cooldown = 24 * 60 * 60
-        self.recent_user_messages: dict[int, deque] = {}
+        self.resolver = resolver_for(bot)
+        self.outbound = scheduler_for(bot)
+        services = getattr(bot, "services", None)
+        self.sent_messages: SentMessageRegistry = getattr(services, "sent_messages", None) or SentMessageRegistry()
+        self.opt_outs: OptOutRegistry = getattr(services, "opt_outs", None) or OptOutRegistry(
+            ":memory:", static_entries=config_for(bot).ignore_list
+        )
+        self.cooldowns: CooldownStore = getattr(services, "cooldowns", None) or CooldownStore()
+        self.autoresponders = AutoResponderRuleSet(data_path("autoresponders.json"), self.DEFAULT_AUTORESPONDERS)
+        self.recent_speakers = RecentSpeakerTracker()
+        self.dragonspeaker_digest = NotificationDigest(
+            self._flush_dragonspeaker_digest, window=self.DIGEST_WINDOW, max_items=self.DIGEST_MAX_ITEMS
+        )
+        # Digest threads keep collecting follow-ups for a while before a fresh thread is started.
+        self._digest_threads = TTLCache(maxsize=64, ttl=self.DIGEST_THREAD_TTL)
+        self.dispatcher = self._build_dispatcher()
+        # Opened on the first gateway frame, once the bot's own user ID is known
+        self._capture_path = capture_path()
+        self.event_recorder: EventRecorder | None = None
+
+    def _build_dispatcher(self) -> MessageDispatcher:
+        """Register the automated responders and the cheap predicates that gate them."""
+
+        dispatcher = MessageDispatcher(metrics=metrics_for(self.bot))
+        silverymoon = (self.SILVERYMOON_GUILD_ID,)
+        dispatcher.register(
+            "autoresponders",
+            self._handle_autoresponders,
+            authors=ANY_AUTHOR,
+            guild_ids=silverymoon,
+            predicate=lambda ctx: bool(self.autoresponders.engine.match(ctx)),
+        )
+        dispatcher.register(
+            "nyoom",
+            self._handle_nyoom,
+            authors=(AUTHOR_HUMAN,),
+            guild_ids=silverymoon,
+            substrings=("oom",),
+            # Read at dispatch time so edits to the immunity list apply without a reload
+            predicate=lambda ctx: ctx.channel_id not in config_for(self.bot).nyoom_channel_ids,
+        )
+        dispatcher.register(
+            "forward_dragonspeaker",
+            self._handle_forward_dragonspeaker,
+            authors=(AUTHOR_HUMAN,),
+            guild_ids=silverymoon,
+            exclude_channel_ids=(self.DRAGONSPEAKER_DEST_CHANNEL_ID,),
+            substrings=(f"<@&{self.DRAGONSPEAKER_ROLE_ID}>",),
+        )
+        dispatcher.register(
+            "name_alert",
+            self._handle_name_alert,
+            authors=(AUTHOR_HUMAN,),
+            guild_ids=silverymoon,
+            exclude_category_ids=(self.MOD_CHAT_CATEGORY_ID,),
+            substrings=[phrase for _, phrases, _ in self.NAME_ALERTS for phrase in phrases],
+        )
+        return dispatcher
+
+    def capture_vocabulary(self) -> set[str]:
+        """Words that survive anonymisation in captured messages: everything the responders look for."""
+
+        literals = [literal for rule in self.autoresponders.engine.rules for literal in rule.triggers + rule.unless]
+        literals += [phrase for _, phrases, suppressors in self.NAME_ALERTS for phrase in phrases + suppressors]
+        literals += self.URGENT_MARKERS
+        return {word.lower() for literal in literals for word in re.findall(r"\w+", literal)}
+
+    async def cog_unload(self) -> None:
+        if self.event_recorder is not None:
+            self.event_recorder.close()
+        await self.dragonspeaker_digest.flush_all()
+        self.sent_messages.flush()
+        self.cooldowns.flush()
 
     # ------------------------------------------------------------------
     # Helper for posting to DragonSpeaker destination
@@ -35,6 +194,7 @@ class Listeners(commands.Cog):
         """
         Posts content to the DragonSpeaker destination channel.
         Handles checking if the channel is a ForumChannel or TextChannel.
+        Returns where follow-up messages should go (the new thread, or the channel itself).
         """
         if isinstance(channel, discord.ForumChannel):
             # Check for "Unassigned" and "Open" tags
@@ -47,10 +207,56 @@ class Listeners(commands.Cog):
             if open_tag:
                 applied_tags.append(open_tag)
 
-            await channel.create_thread(name=title, content=content, applied_tags=applied_tags)
+            created = await self.outbound.submit(
+                route_for(channel),
+                lambda: channel.create_thread(name=title, content=content, applied_tags=applied_tags),
+            )
+            return getattr(created, "thread", channel)
         else:
             # Fallback for TextChannel
-            await channel.send(content)
+            await self.outbound.send(channel, content)
+            return channel
+
+    def _digest_label(self, group) -> str:
+        if group == self.OPT_OUT_DIGEST_GROUP:
+            return group
+        # Mention digests are keyed by channel ID; the name is only for display
+        channel = self.bot.get_channel(group)
+        return f"#{getattr(channel, 'name', None) or group}"
+
+    async def _flush_dragonspeaker_digest(self, group, items: list[Notification]) -> None:
+        """Post buffered notifications, reusing the group's digest thread while it is fresh."""
+
+        dest_channel = await self.resolver.channel(self.DRAGONSPEAKER_DEST_CHANNEL_ID)
+        if len(items) == 1 and items[0].urgent:
+            await self._post_to_dragonspeaker_channel(dest_channel, items[0].body, title=items[0].title)
+            return
+
+        label = self._digest_label(group)
+        # Opt-out reports have always pinged the role; forwarded mentions never added a ping of their own
+        role_mention = f"<@&{self.DRAGONSPEAKER_ROLE_ID}> " if group == self.OPT_OUT_DIGEST_GROUP else ""
+        header = f"{role_mention}{len(items)} notification(s) from {label}:\n"
+        parts = render_digest(items, limit=2000 - len(header))
+        parts[0] = header + parts[0]
+
+        target = self._digest_threads.get(group)
+        if target is not None:
+            try:
+                for index, part in enumerate(parts):
+                    await self.outbound.send(target, part)
+                return
+            except (discord.NotFound, discord.Forbidden):
+                # Staff deleted, locked or archived the thread; start a fresh one with what is left
+                logger.info("Digest thread for %s is gone; starting a new one", label)
+                self._digest_threads.pop(group)
+                parts = parts[index:]
+                if index:
+                    parts[0] = header + parts[0]
+
+        target = await self._post_to_dragonspeaker_channel(dest_channel, parts[0], title=f"Dragonspeaker digest: {label}")
+        self._digest_threads.set(group, target)
+        for part in parts[1:]:
+            await self.outbound.send(target, part)
 
     # ------------------------------------------------------------------
     # Recent message tracking + ignore resolution helpers
@@ -59,35 +265,14 @@ class Listeners(commands.Cog):
         if message.author.bot:
             return
 
-        channel_id = message.channel.id
-        if channel_id not in self.recent_user_messages:
-            self.recent_user_messages[channel_id] = deque(maxlen=10)
-
-        self.recent_user_messages[channel_id].append(
-            {
-                "user_id": message.author.id,
-                "username": message.author.name.lower(),
-                "timestamp": time.time(),
-            }
-        )
-
-    def _get_recent_user_in_channel(self, channel_id, max_age_seconds: int = 10):
-        if channel_id not in self.recent_user_messages:
-            return None
-
-        current_time = time.time()
-        for msg_info in reversed(self.recent_user_messages[channel_id]):
-            if current_time - msg_info["timestamp"] <= max_age_seconds:
-                return msg_info
-
-        return None
+        self.recent_speakers.record(message.channel.id, message.id, message.author.id, message.author.name)
 
     def _resolve_triggering_user(self, message):
         if not getattr(message, "author", None):
             return None
 
         if getattr(message.author, "bot", False):
-            return self._get_recent_user_in_channel(getattr(message.channel, "id", None))
+            return self.recent_speakers.attribute(message)
 
         return {
             "user_id": message.author.id,
@@ -95,37 +280,22 @@ class Listeners(commands.Cog):
         }
 
     def _is_user_ignored(self, user_id=None, username=None) -> bool:
-        ignore_list = getattr(config, "IGNORE_LIST", None)
-        if not ignore_list:
-            return False
-
-        try:
-            if user_id is not None and user_id in ignore_list:
-                return True
-            if username is not None and username in ignore_list:
-                return True
-        except Exception:
-            logger.exception("Failed while checking IGNORE_LIST")
-
-        return False
+        return self.opt_outs.is_opted_out(user_id=user_id, username=username)
 
     # ------------------------------------------------------------------
     # Automated response handlers
     # ------------------------------------------------------------------
     @requires_not_ignored
-    async def _handle_nyoom(self, message):
-        if message.channel.id in config.nyoom_immunity:
-            return
-        if message.author.name in config.nyoom_user_immunity:
+    async def _handle_nyoom(self, message, ctx: MessageContext):
+        if message.author.name in config_for(self.bot).nyoom_user_names:
             return
 
-        content = message.content or ""
-        if self.NYOOM_PATTERN.search(content):
+        if self.NYOOM_PATTERN.search(ctx.content):
             await message.add_reaction("🏎️")
             await message.reply("## 🏎️ nyooooom 🏎️")
 
-    async def _handle_name_alert(self, message):
-        content_lower = (message.content or "").lower()
+    async def _handle_name_alert(self, message, ctx: MessageContext):
+        content_lower = ctx.content_lower
         author_id = getattr(message.author, "id", None)
 
         def _phrase_in_content(phrase: str) -> bool:
@@ -136,10 +306,6 @@ class Listeners(commands.Cog):
             pattern = rf"\b{re.escape(phrase.lower())}\b"
             return re.search(pattern, content_lower) is not None
 
-        # don't respond to messages in Mod Chat Category
-        if getattr(message.channel, "category_id", None) == 866400862854184972:
-            return
-
         # Helper to build a DM that stays under Discord's 2000-char limit
         def _build_alert_text(recipient_label: str = "You were mentioned in Silverymoon") -> str:
             prefix = (
@@ -166,223 +332,111 @@ class Listeners(commands.Cog):
 
             return f"{prefix}Message: {content_display}\nLink: {jump_url}"
 
-        # Alerts for lxgrf (661212031231459329): notify if anyone other than lxgrf mentions one of the phrases
-        if author_id != 661212031231459329:
-            for phrase in [
-                'Sarran',
-                'Fabian',
-                'Alex',
-                'Cerys',
-                'Afton',
-                'LX',
-                'Vyla',
-                'Zhvylathurgiesh-Moli',
-                'Cora',
-                'Lyra',
-                'Leif',
-                'Osovar',
-                'Barry',
-            ]:
-                if _phrase_in_content(phrase):
-                    if '"Revivify (Sarran)": 1' in message.content:
-                        continue
-                    try:
-                        target_user = await self.bot.fetch_user(661212031231459329)
-                        alert_text = _build_alert_text()
-                        await target_user.send(alert_text)
-                        logger.info(
-                            "Sent Silverymoon alert DM for phrase '%s' from user %s",
-                            phrase,
-                            message.author.name,
-                        )
-                    except Exception:
-                        logger.exception("Failed to send Silverymoon alert DM")
-                    break
-
-        # Alerts for aethelar (702837629363683408): notify if anyone other than aethelar mentions one of the phrases
-        if author_id != 702837629363683408:
-            for phrase in [
-                'Mimi',
-                'Elias',
-                'Paige',
-                'Meems',
-                'Mims',
-                'Neopets',
-                'Eilas',
-            ]:
-                # Use the same whole-word matcher to avoid substrings like 'mimir' or 'Mimsy'
+        # Notify each recipient if anyone other than themselves mentions one of their phrases
+        for recipient_id, phrases, suppressors in self.NAME_ALERTS:
+            if author_id == recipient_id:
+                continue
+            for phrase in phrases:
+                # Use the whole-word matcher to avoid substrings like 'mimir' or 'Mimsy'
                 if not _phrase_in_content(phrase):
                     continue
-
+                # A suppressing literal (e.g. a Sarran Revivify roll) skips this match, not the recipient
+                if any(literal in ctx.content for literal in suppressors):
+                    continue
                 try:
-                    target_user = await self.bot.fetch_user(702837629363683408)
+                    target_user = await self.resolver.user(recipient_id)
                     alert_text = _build_alert_text()
-                    await target_user.send(alert_text)
+                    # Alerts jump the queue; bursts of mentions to one recipient are merged into fewer DMs
+                    await self.outbound.send(target_user, alert_text, priority=PRIORITY_HIGH, coalesce=True)
                     logger.info(
-                        "Sent Silverymoon alert DM to aethelar for phrase '%s' from user %s",
+                        "Sent Silverymoon alert DM to %s for phrase '%s' from user %s",
+                        recipient_id,
                         phrase,
                         message.author.name,
                     )
                 except Exception:
-                    logger.exception("Failed to send Silverymoon alert DM to aethelar")
+                    logger.exception("Failed to send Silverymoon alert DM to %s", recipient_id)
                 break
 
-    @requires_not_ignored
-    async def _handle_avrae_triggers(self, message):
-        parts = [message.content or ""]
-        if message.embeds:
-            for embed in message.embeds:
-                try:
-                    if getattr(embed, "title", None):
-                        parts.append(embed.title)
-                    if getattr(embed, "description", None):
-                        parts.append(embed.description)
-                    if getattr(embed, "footer", None) and getattr(embed.footer, "text", None):
-                        parts.append(embed.footer.text)
-                    if getattr(embed, "fields", None):
-                        for field in embed.fields:
-                            parts.append(field.name or "")
-                            parts.append(field.value or "")
-                except Exception:
-                    logger.exception("Failed to parse an embed while checking Avrae triggers")
-
-        text_lower = "\n".join(parts).lower()
-        if "this monster's full details" in text_lower:
-            return
-
-        if "go to marketplace" in text_lower:
-            await message.reply(
-                "It looks like you're trying to use content that D&D Beyond doesn't want you to have. "
-                "Please try using `!aa` instead of `!a`, and if stuck please ping a `@dragonspeaker` for assistance.\n\n"
-                "React with :x: to this message if you'd like to opt out of automated replies"
-            )
-        if "it looks like you don't have your discord account connected to your d&d beyond account" in text_lower:
-            await message.reply(
-                "It looks like you don't have access to SRD content. This is free content, you just need to connect your D&D Beyond account to your Discord account.\n\n"
-                "We go to some lengths to ensure the premium content is available, but for the free content we do ask that you meet us in the middle.\n"
-                "React with :x: to this message if you'd like to opt out of automated replies."
-            )
-
-    async def _handle_forward_dragonspeaker(self, message):
-        if message.channel.id == self.DRAGONSPEAKER_DEST_CHANNEL_ID:
-            return
-
-        if not (
-            any(role.id == self.DRAGONSPEAKER_ROLE_ID for role in getattr(message, "role_mentions", []))
-            or f"<@&{self.DRAGONSPEAKER_ROLE_ID}>" in (message.content or "")
-        ):
-            return
-
-        if message.author.bot:
-            return
-
-        try:
-            dest_channel = self.bot.get_channel(self.DRAGONSPEAKER_DEST_CHANNEL_ID) or await self.bot.fetch_channel(
-                self.DRAGONSPEAKER_DEST_CHANNEL_ID
-            )
-        except Exception:
-            logger.exception("Failed to fetch Dragonspeaker destination channel")
-            return
+    async def _handle_autoresponders(self, message, ctx: MessageContext):
+        for rule, cooldown_key in self.autoresponders.engine.match(ctx):
+            if rule.respect_opt_outs and (not ctx.triggering_user or ctx.is_ignored):
+                continue
+            # Claim the cooldown before replying so concurrent messages don't both trigger a reply
+            if rule.cooldown and not self.cooldowns.acquire(cooldown_key, ttl=rule.cooldown):
+                continue
+            try:
+                await message.reply(rule.response)
+            except Exception:
+                if rule.cooldown:
+                    self.cooldowns.reset(cooldown_key)
+                raise
+            logger.info("Auto-responder %s replied to message %s", rule.name, message.id)
 
+    async def _handle_forward_dragonspeaker(self, message, ctx: MessageContext):
         jump_url = getattr(message, "jump_url", "") or ""
-        prefix = f"Forwarded Dragonspeaker mention from <@{message.author.id}> in <#{message.channel.id}>:\n"
-        max_total = 1800
+        channel_name = getattr(message.channel, "name", "unknown-channel")
+        urgent = any(marker in ctx.content_lower for marker in self.URGENT_MARKERS)
+        if urgent:
+            prefix = f"Forwarded Dragonspeaker mention from <@{message.author.id}> in <#{message.channel.id}>:\n"
+            max_total = 1800
+        else:
+            # Digest lines stay short; the jump link carries the full message
+            prefix = f"<@{message.author.id}>: "
+            max_total = 400
         reserved = len(prefix) + len("\nMessage: ") + len(jump_url) + 3
-        content = message.content or ""
+        content = ctx.content
         if len(content) + reserved > max_total:
             allowed = max_total - reserved
             content = content[:allowed] + "... (truncated)" if allowed > 0 else "(content omitted - too long)"
 
-        forward_text = f"{prefix}{content}\nMessage: {jump_url}"
-        forward_text = f"{prefix}{content}\nMessage: {jump_url}"
-        await self._post_to_dragonspeaker_channel(
-            dest_channel, 
-            forward_text, 
-            title=f"Mention by {message.author.name} in #{getattr(message.channel, 'name', 'unknown-channel')}"
-        )
-
-    @requires_not_ignored
-    async def _check_spellbook_reminder(self, message):
-        spellbook_pattern = r"An italicized spell indicates that the spell is homebrew."
-
-        footer_text = ""
-        if message.embeds:
-            for embed in message.embeds:
-                if getattr(embed, "footer", None) and getattr(embed.footer, "text", None):
-                    footer_text += embed.footer.text + " "
-
-        text_to_check = (message.content or "") + " " + footer_text
-        if not re.search(spellbook_pattern, text_to_check):
-            return
-
-        character_name = None
-        if message.embeds:
-            for embed in message.embeds:
-                if getattr(embed, "description", None):
-                    knows_match = re.search(r"^(.+?) knows \d+ spells?", embed.description)
-                    if knows_match:
-                        character_name = knows_match.group(1).strip()
-                        break
-
-        if not character_name:
-            return
-
-        current_time = time.time()
-        last_reminder = self.sbb_reminders.get(character_name)
-        if last_reminder and (current_time - last_reminder) < self.sbb_reminder_cooldown:
-            return
-
-        await message.reply(
-            "💡 **Tip:** You can use `!sbb` as a more reliable alias to see your spellbook!\n\n"
-            "It should be less confused by homebrew spells and Avrae's weird choices.\n\n"
-            "-# You will not receive this tip again for 24 hours. If you would rather opt out of automated tips, react to this message with :x: ."
+        await self.dragonspeaker_digest.add(
+            Notification(
+                title=f"Mention by {message.author.name} in #{channel_name}",
+                body=f"{prefix}{content}\nMessage: {jump_url}",
+                group=message.channel.id,
+                urgent=urgent,
+            )
         )
-        self.sbb_reminders[character_name] = current_time
-        logger.info("Reminded %s of !sbb", character_name)
 
     # ------------------------------------------------------------------
     # Event listeners
     # ------------------------------------------------------------------
     @commands.Cog.listener()
+    @instrumented("on_message")
     async def on_message(self, message) -> None:
-        if message.author == self.bot.user:
+        bot_user_id = getattr(self.bot.user, "id", None)
+        if getattr(message.author, "id", None) == bot_user_id:
+            # Gateway echo of our own sends: remember them so reactions can be prefiltered
+            self.sent_messages.add(message.id)
             return
 
-        if not message.guild or message.guild.id != self.SILVERYMOON_GUILD_ID:
+        ctx = MessageContext(
+            message,
+            bot_user_id=bot_user_id,
+            resolve_user=self._resolve_triggering_user,
+            is_ignored=self._is_user_ignored,
+        )
+        if ctx.guild_id != self.SILVERYMOON_GUILD_ID:
             return
 
-        if not message.author.bot:
+        if ctx.author_kind == AUTHOR_HUMAN:
             self._track_user_message(message)
 
-        await self._check_spellbook_reminder(message)
+        await self.dispatcher.dispatch(ctx)
 
-        if message.author.bot and message.author.name.lower() != "avrae":
+    @commands.Cog.listener()
+    async def on_socket_raw_receive(self, raw) -> None:
+        # Only dispatched when the bot was built with enable_debug_events (BARRY_CAPTURE_EVENTS)
+        if self._capture_path is None or self.bot.user is None:
             return
-
-        if not message.author.bot:
-            try:
-                await self._handle_nyoom(message)
-            except Exception:
-                logger.exception("Failed handling nyoom for message %s", getattr(message, "id", None))
-
-        if message.author.bot and message.author.name.lower() == "avrae":
-            try:
-                await self._handle_avrae_triggers(message)
-            except Exception:
-                logger.exception("Failed to process Avrae-specific replies")
-
-        try:
-            await self._handle_forward_dragonspeaker(message)
-        except Exception:
-            logger.exception("Error checking for Dragonspeaker mentions in on_message")
-            
-        if not message.author.bot:
-            try:
-                await self._handle_name_alert(message)
-            except Exception:
-                logger.exception("Error handling Silverymoon name alert in on_message")
+        if self.event_recorder is None:
+            anonymiser = Anonymiser(keep_words=self.capture_vocabulary(), keep_patterns=(self.NYOOM_PATTERN,))
+            self.event_recorder = EventRecorder(self._capture_path, anonymiser, bot_user_id=self.bot.user.id)
+        self.event_recorder.feed(raw)
 
     @commands.Cog.listener()
+    @instrumented("on_raw_reaction_add")
     async def on_raw_reaction_add(self, payload) -> None:
         try:
             if payload.guild_id != self.SILVERYMOON_GUILD_ID:
@@ -395,65 +449,86 @@ class Listeners(commands.Cog):
             if emoji_name not in ("❌", "✖", "x", "X"):
                 return
 
-            try:
-                channel = await self.bot.fetch_channel(payload.channel_id)
-                message = await channel.fetch_message(payload.message_id)
-            except Exception:
-                logger.exception("Failed to fetch channel or message for reaction payload")
-                return
-
-            if message.author.id != self.bot.user.id:
+            # Only reactions on messages we sent matter; everything else is dropped without an API call
+            if payload.message_id not in self.sent_messages:
                 return
 
             try:
-                dest_channel = self.bot.get_channel(self.DRAGONSPEAKER_DEST_CHANNEL_ID) or await self.bot.fetch_channel(
-                    self.DRAGONSPEAKER_DEST_CHANNEL_ID
-                )
+                channel = self.resolver.messageable(payload.channel_id, guild_id=payload.guild_id)
+                message = channel.get_partial_message(payload.message_id)
             except Exception:
-                logger.exception("Failed to get Dragonspeaker destination channel")
+                logger.exception("Failed to resolve channel or message for reaction payload")
                 return
 
             author_mention = f"<@{payload.user_id}>"
             origin_channel_mention = f"<#{payload.channel_id}>"
             msg_link = getattr(message, "jump_url", None) or ""
 
-            role_mention = f"<@&{self.DRAGONSPEAKER_ROLE_ID}>"
-
             try:
                 reactor_username = None
                 try:
-                    reactor_user = await self.bot.fetch_user(payload.user_id)
+                    # Guild reaction events carry the member, so no fetch is needed in the common case
+                    reactor_user = payload.member or await self.resolver.user(payload.user_id)
                     reactor_username = reactor_user.name.lower() if reactor_user else None
                 except Exception:
                     reactor_username = None
 
-                reactor_ignored = self._is_user_ignored(
-                    user_id=payload.user_id,
-                    username=reactor_username,
+                newly_opted_out = self.opt_outs.add(
+                    payload.user_id,
+                    reactor_username,
+                    source=f"reaction:{payload.channel_id}/{payload.message_id}",
                 )
+            except Exception:
+                logger.exception("Failed to record opt-out for user %s", payload.user_id)
+                return
 
-                if not reactor_ignored and message.channel and getattr(message.channel, "guild", None):
-                    await message.reply(
-                        f"Thank you {author_mention} — your request has been noted, and the Dragonspeakers will apply it shortly."
-                    )
+            if not newly_opted_out:
+                return
+
+            try:
+                await message.reply(
+                    f"Thank you {author_mention} — you've been opted out of automated replies. "
+                    "Use `/optin` if you'd like them back."
+                )
             except Exception:
                 logger.exception("Failed to send acknowledgement reply to the reacted message")
 
-            notify_text = (
-                f"{role_mention} ❌ Reaction by {author_mention} on my message in {origin_channel_mention}.\n"
-                f"Message: {msg_link}"
-            )
-
-            title = f"Reaction by {reactor_username or 'Unknown'} in #{getattr(message.channel, 'name', 'unknown-channel')}"
-            await self._post_to_dragonspeaker_channel(
-                dest_channel, 
-                notify_text, 
-                title=title
+            # Opt-outs need no action, so they only ever go into the digest
+            await self.dragonspeaker_digest.add(
+                Notification(
+                    title=f"❌ Opt-out by {reactor_username or 'Unknown'}",
+                    body=f"{author_mention} reacted on my message in {origin_channel_mention}: {msg_link}",
+                    group=self.OPT_OUT_DIGEST_GROUP,
+                )
             )
 
         except Exception:
             logger.exception("Unexpected error in on_raw_reaction_add listener")
 
 
+    # ------------------------------------------------------------------
+    # Self-service opt-out commands
+    # ------------------------------------------------------------------
+    @app_commands.command(name="optout", description="Stop receiving Barry's automated replies and tips.")
+    async def optout(self, interaction: discord.Interaction) -> None:
+        added = self.opt_outs.add(interaction.user.id, interaction.user.name, source="command")
+        message = (
+            "You've been opted out of automated replies."
+            if added
+            else "You're already opted out of automated replies."
+        )
+        await interaction.response.send_message(message, ephemeral=True)
+
+    @app_commands.command(name="optin", description="Receive Barry's automated replies and tips again.")
+    async def optin(self, interaction: discord.Interaction) -> None:
+        if self.opt_outs.is_static(user_id=interaction.user.id, username=interaction.user.name):
+            message = "Your opt-out is managed by the Dragonspeakers; please ask them to remove it."
+        elif self.opt_outs.remove(interaction.user.id):
+            message = "You'll receive automated replies again."
+        else:
+            message = "You weren't opted out of automated replies."
+        await interaction.response.send_message(message, ephemeral=True)
+
+
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(Listeners(bot))
@@ -6,8 +6,12 @@ import discord
 from discord import Embed, app_commands
 from discord.ext import commands
 
-import config
-from utils import _ai_enabled_server, _server_error, claude_call
+from bot.core.config_store import config_for
+from utils import _server_error, claude_call
+
+
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds",)
 
 
 class Prompts(commands.Cog):
@@ -27,13 +31,15 @@ class Prompts(commands.Cog):
         second_character: str,
         request: str = "",
     ) -> None:
+        cfg = config_for(self.bot)
         await interaction.response.defer()
         description = ""
-        if str(interaction.guild.id) not in config.guilds:
+        gcfg = cfg.guild(interaction.guild.id)
+        if gcfg is None or not gcfg.is_known:
             embed = _server_error(interaction)
             await interaction.followup.send(embed=embed)
             return
-        if not _ai_enabled_server(interaction.guild.id):
+        if not gcfg.ai_enabled:
             embed = Embed(
                 title="AI Not Enabled",
                 description=(
@@ -52,7 +58,7 @@ class Prompts(commands.Cog):
             )
 
         title = "Here is your scene prompt!"
-        city = config.guilds[str(interaction.guild.id)]
+        city = gcfg.description
         description += f"**First character**: `{first_character}`\n**Second character**: `{second_character}`"
         prompt = (
             "You are a D&D Dungeonmaster. Give a concise bullet-point summary of an idea for a low-stakes encounter, "
@@ -81,13 +87,15 @@ class Prompts(commands.Cog):
         request="Any specific requests for the scene prompt.",
     )
     async def solo(self, interaction: discord.Interaction, character: str, request: str = "") -> None:
+        cfg = config_for(self.bot)
         await interaction.response.defer()
         description = ""
-        if str(interaction.guild.id) not in config.guilds:
+        gcfg = cfg.guild(interaction.guild.id)
+        if gcfg is None or not gcfg.is_known:
             embed = _server_error(interaction)
             await interaction.followup.send(embed=embed)
             return
-        if not _ai_enabled_server(interaction.guild.id):
+        if not gcfg.ai_enabled:
             embed = Embed(
                 title="AI Not Enabled",
                 description=(
@@ -105,7 +113,7 @@ class Prompts(commands.Cog):
             )
 
         title = "Here is your solo scene prompt!"
-        city = config.guilds[str(interaction.guild.id)]
+        city = gcfg.description
         description += f"**Character**: `{character}`"
         prompt = (
             "Give a short, concise, bullet-point summary of an idea for an emotive and interesting character development "
@@ -149,7 +157,7 @@ class Prompts(commands.Cog):
             f"`Guild ID: {interaction.guild.id}`"
         )
 
-        if _ai_enabled_server(interaction.guild.id):
+        if interaction.guild.id in config_for(self.bot).ai_enabled_guild_ids:
             description += "\n\n✅ **AI Capabilities: Enabled**"
         else:
             description += "\n\n❌ **AI Capabilities: Disabled** - Contact an administrator to enable AI features."
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import io
 import logging
 from typing import Optional
 
@@ -9,11 +10,19 @@ import discord
 from discord import Embed, File, app_commands
 from discord.ext import commands
 
-import config
+from bot.core.config_store import config_for
+from bot.core.gateway import ensure_chunked
+from bot.extensions._helpers.history import Compactor
+from bot.extensions._helpers.transcripts import FORMATTERS, render_transcript
+from bot.services.resolver import resolver_for
+from bot.services.workers import workers_for
 from utils import _server_error, claude_call
 
 logger = logging.getLogger(__name__)
 
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds", "members", "message_content")
+
 
 class Summaries(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
@@ -35,17 +44,15 @@ class Summaries(commands.Cog):
         endmessageid: str,
     scenetitle: Optional[str] = None,
     ) -> None:
+        cfg = config_for(self.bot)
         await interaction.response.defer(ephemeral=True)
 
-        if str(interaction.guild.id) not in config.guilds:
+        gcfg = cfg.guild(interaction.guild.id)
+        if gcfg is None or not gcfg.is_known:
             await interaction.followup.send(embed=_server_error(interaction), ephemeral=True)
             return
 
-        monitored = config.monitored_channels[interaction.guild.id]
-        additional = config.tldr_additional_channels[interaction.guild.id]
-        excluded = config.tldr_excluded_channels[interaction.guild.id]
-
-        if interaction.channel.id not in monitored and interaction.channel.id not in additional:
+        if interaction.channel.id not in gcfg.tldr_sources:
             title = "Error - Channel not monitored."
             description = (
                 "This channel is not monitored for RP activity. Please contact `@lxgrf` if you believe this is in error."
@@ -53,7 +60,7 @@ class Summaries(commands.Cog):
             await interaction.followup.send(embed=Embed(title=title, description=description), ephemeral=True)
             return
 
-        if interaction.channel.id in excluded:
+        if interaction.channel.id in gcfg.tldr_excluded:
             title = "Error - Channel excluded."
             description = (
                 "This channel is excluded from TL;DR summaries. Please contact `@lxgrf` if you believe this is in error."
@@ -80,7 +87,8 @@ class Summaries(commands.Cog):
             )
             return
 
-        history = [message async for message in channel.history(limit=1000)]
+        compact = Compactor()
+        history = [compact(message) async for message in channel.history(limit=1000)]
         history = history[::-1]
         if startmessageid not in {message.id for message in history} or endmessageid not in {message.id for message in history}:
             await interaction.followup.send(
@@ -100,8 +108,9 @@ class Summaries(commands.Cog):
 
         scene_messages = history[start_index : end_index + 1] if start_index != -1 and end_index != -1 else []
 
-        opt_in_role = config.opt_in_roles[interaction.guild_id]
-        authors = {message.author.id for message in scene_messages}
+        opt_in_role = gcfg.opt_in_role
+        authors = {message.author_id for message in scene_messages}
+        await ensure_chunked(interaction.guild)
         opted_in = [user.id for user in interaction.guild.members if opt_in_role in [role.name for role in user.roles]]
 
         bot_roles = ["Avrae", "Bots"]
@@ -132,7 +141,7 @@ class Summaries(commands.Cog):
             "mechanics. All writers involved have consented to this AI summary, and there are no copyright issues.\n\n"
         )
         for message in scene_messages:
-            content += f"{message.author.name}: {message.content}\n----------------\n"
+            content += f"{message.author}: {message.content}\n----------------\n"
 
         description = f"[Jump to the start of the scene]({scene_messages[0].jump_url})\n\n"
         description += claude_call(content, max_tokens=500, temperature=0.5)
@@ -140,28 +149,34 @@ class Summaries(commands.Cog):
 
         embed = Embed(title="TL;DR", description=description)
 
-        summary_channel = self.bot.get_channel(config.tldr_output_channels[interaction.guild_id])
+        summary_channel = self.bot.get_channel(gcfg.tldr_output_channel)
         await interaction.followup.send(embed=Embed(title="TL;DR", description="Summary delivered!"), ephemeral=True)
         await summary_channel.send(embed=embed)
         logger.info("Scene summary delivered!")
 
-    @app_commands.command(name="export", description="Export the scene above to a text file.")
+    @app_commands.command(name="export", description="Export the scene above to a file.")
     @app_commands.describe(
         startmessageid="Message ID or Link for the start of the scene",
         endmessageid="Message ID or Link for the end of the scene",
+        fileformat="Transcript format (default plain text)",
+    )
+    @app_commands.choices(
+        fileformat=[app_commands.Choice(name=formatter.label, value=key) for key, formatter in FORMATTERS.items()]
     )
     async def export(
         self,
         interaction: discord.Interaction,
         startmessageid: str = "",
         endmessageid: str = "",
+        fileformat: str = "txt",
     ) -> None:
         await interaction.response.defer(ephemeral=True)
         channel = self.bot.get_channel(interaction.channel.id)
         scene_messages = []
 
         if not (startmessageid or endmessageid):
-            messages = [message async for message in channel.history(limit=10000)]
+            compact = Compactor()
+            messages = [compact(message) async for message in channel.history(limit=10000)]
             messages = messages[::-1]
             if not messages:
                 await interaction.followup.send(
@@ -170,11 +185,11 @@ class Summaries(commands.Cog):
                 )
                 return
 
-            if messages[-1].author.name == "Avrae":
+            if messages[-1].author == "Avrae":
                 messages.pop()
 
             for i in range(len(messages) - 1, -1, -1):
-                if messages[i].author.name == "Avrae":
+                if messages[i].author == "Avrae":
                     scene_messages = messages[i + 1 :]
                     break
             else:
@@ -225,7 +240,7 @@ class Summaries(commands.Cog):
                     )
                     return
 
-                channel = await self.bot.fetch_channel(channel_id)
+                channel = await resolver_for(self.bot).channel(channel_id)
             except (discord.NotFound, discord.Forbidden):
                 await interaction.followup.send(
                     embed=Embed(title="Export", description="Could not fetch the specified channel."),
@@ -239,7 +254,8 @@ class Summaries(commands.Cog):
                 )
                 return
 
-            messages = [message async for message in channel.history(limit=10000)]
+            compact = Compactor()
+            messages = [compact(message) async for message in channel.history(limit=10000)]
             messages = messages[::-1]
 
             start_index = next((i for i, message in enumerate(messages) if message.id == start_message_id), -1)
@@ -254,13 +270,18 @@ class Summaries(commands.Cog):
 
             scene_messages = messages[start_index : end_index + 1]
 
-        filename = f"{interaction.channel.name}_scene.txt"
-        with open(filename, "w") as handle:
-            for message in scene_messages:
-                handle.write(f"{message.author.name}\n-----\n {message.content}\n===============\n")
+        # Formatting and gzip of a 10k-message scene run in a worker process
+        filename, payload = await workers_for(self.bot).run(
+            render_transcript,
+            scene_messages,
+            FORMATTERS.get(fileformat, FORMATTERS["txt"]),
+            f"{interaction.channel.name}_scene",
+            f"#{interaction.channel.name}",
+            size=len(scene_messages),
+        )
 
         try:
-            await interaction.user.send(file=File(filename))
+            await interaction.user.send(file=File(io.BytesIO(payload), filename=filename))
             await interaction.followup.send(
                 embed=Embed(title="Export", description="Scene exported and sent to your DMs!"),
                 ephemeral=True,
@@ -269,7 +290,7 @@ class Summaries(commands.Cog):
             # Fall back to sending in channel if DMs are disabled
             await interaction.followup.send(
                 content="Could not DM you the export (check your privacy settings). Sending here instead:",
-                file=File(filename),
+                file=File(io.BytesIO(payload), filename=filename),
                 ephemeral=True,
             )
         except Exception:
@@ -1,6 +1,7 @@
 """Utility command(s) restricted to lxgrf for server introspection."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Sequence
 
@@ -8,8 +9,16 @@ import discord
 from discord import app_commands, Embed
 from discord.ext import commands
 
+from bot.core.config_store import config_store_for
+from bot.core.metrics import metrics_for, stats_report
+from bot.services.outbound import PRIORITY_LOW, scheduler_for
+from bot.services.resolver import resolver_for
+
 logger = logging.getLogger(__name__)
 
+# Gateway intents this extension needs; see bot/core/gateway.py
+REQUIRED_INTENTS = ("guilds",)
+
 LXGRF_USER_ID = 661212031231459329
 
 class Utility(commands.Cog):
@@ -71,20 +80,24 @@ class Utility(commands.Cog):
             chunks.append(as_block("\n".join(current_lines)))
 
         try:
-            target_user = await self.bot.fetch_user(LXGRF_USER_ID)
+            target_user = await resolver_for(self.bot).user(LXGRF_USER_ID)
         except Exception:
             logger.exception("Failed to fetch lxgrf user for utility DM")
             await interaction.followup.send(embed=Embed(title="Error", description="Could not fetch user."))
             return
 
+        # Send each chunk as its own code block message; no headers to keep content clean.
+        # Queued at low priority so the report never holds up alerts.
+        outbound = scheduler_for(self.bot)
+        results = await asyncio.gather(
+            *(outbound.send(target_user, chunk, priority=PRIORITY_LOW) for chunk in chunks), return_exceptions=True
+        )
         sent = 0
-        for idx, chunk in enumerate(chunks):
-            try:
-                # Send each chunk as its own code block message; no headers to keep content clean.
-                await target_user.send(chunk)
+        for idx, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.error("Failed sending utility DM part %s", idx + 1, exc_info=result)
+            else:
                 sent += 1
-            except Exception:
-                logger.exception("Failed sending utility DM part %s", idx + 1)
 
         await interaction.followup.send(
             embed=Embed(
@@ -93,6 +106,90 @@ class Utility(commands.Cog):
             ephemeral=True,
         )
 
+    @app_commands.command(name="handlerstats", description="Show auto-responder latency per handler (lxgrf only).")
+    async def handlerstats(self, interaction: discord.Interaction) -> None:
+        """Report per-handler latency histograms from the Listeners dispatcher."""
+        if interaction.user.id != LXGRF_USER_ID:
+            await interaction.response.send_message(
+                embed=Embed(title="Not Authorised", description="This command is restricted."), ephemeral=True
+            )
+            return
+
+        listeners = self.bot.get_cog("Listeners")
+        dispatcher = getattr(listeners, "dispatcher", None)
+        if dispatcher is None:
+            await interaction.response.send_message(
+                embed=Embed(title="Handler Stats", description="The Listeners extension is not loaded."), ephemeral=True
+            )
+            return
+
+        lines = dispatcher.latency_report()
+        description = "```\n" + "\n".join(lines)[:3900] + "\n```" if lines else "No handlers registered."
+        await interaction.response.send_message(embed=Embed(title="Handler Stats", description=description), ephemeral=True)
+
+    @app_commands.command(name="stats", description="Show command, event, REST and LLM metrics (lxgrf only).")
+    async def stats(self, interaction: discord.Interaction) -> None:
+        """Summarise the metrics registry that also backs the local /metrics endpoint."""
+        if interaction.user.id != LXGRF_USER_ID:
+            await interaction.response.send_message(
+                embed=Embed(title="Not Authorised", description="This command is restricted."), ephemeral=True
+            )
+            return
+
+        # Auto-responder handlers have their own breakdown in /handlerstats
+        dispatcher = getattr(self.bot.get_cog("Listeners"), "dispatcher", None)
+        responders = list(dispatcher.latency) if dispatcher is not None else []
+        lines = stats_report(metrics_for(self.bot), skip_handlers=responders)
+        description = "```\n" + "\n".join(lines)[:3800] + "\n```" if lines else "Nothing recorded yet."
+        if responders:
+            description += "\nPer-responder latency, errors and timeouts: `/handlerstats`"
+        server = getattr(getattr(self.bot, "services", None), "metrics_server", None)
+        if server is not None and server.running:
+            description += f"\nScrape endpoint: `http://{server.host}:{server.port}/metrics`"
+        await interaction.response.send_message(embed=Embed(title="Stats", description=description), ephemeral=True)
+
+    @app_commands.command(name="reload", description="Reload settings or a single extension without a restart (lxgrf only).")
+    @app_commands.describe(target="'config' to re-read /data/settings.json, or an extension such as 'listeners'")
+    async def reload(self, interaction: discord.Interaction, target: str) -> None:
+        """Re-read the settings file or reload one extension in place, keeping the gateway session."""
+        if interaction.user.id != LXGRF_USER_ID:
+            await interaction.response.send_message(
+                embed=Embed(title="Not Authorised", description="This command is restricted."), ephemeral=True
+            )
+            return
+
+        if target == "config":
+            store = config_store_for(self.bot)
+            if store.reload():
+                description = f"Settings reloaded from `{store.path}`."
+            else:
+                description = f"Settings were not changed: {store.last_error}"
+            await interaction.response.send_message(embed=Embed(title="Reload", description=description), ephemeral=True)
+            return
+
+        extension = target if target.startswith("bot.extensions.") else f"bot.extensions.{target}"
+        if extension not in self.bot.extensions:
+            await interaction.response.send_message(
+                embed=Embed(title="Reload", description=f"`{extension}` is not a loaded extension."), ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            await self.bot.reload_extension(extension)
+        except Exception as exc:
+            logger.exception("Failed to reload extension %s", extension)
+            description = f"Reloading `{extension}` failed; the previous version is still loaded.\n`{exc}`"
+        else:
+            logger.info("Reloaded extension %s", extension)
+            description = f"Reloaded `{extension}`."
+        await interaction.followup.send(embed=Embed(title="Reload", description=description), ephemeral=True)
+
+    @reload.autocomplete("target")
+    async def _reload_target_autocomplete(self, interaction: discord.Interaction, current: str):
+        names = ["config"] + sorted(name.rsplit(".", 1)[-1] for name in self.bot.extensions)
+        return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name][:25]
+
     @app_commands.command(name="senddm", description="Send a custom DM to a server member (lxgrf only).")
     @app_commands.describe(
         user="Server member to DM",
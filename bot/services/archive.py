@@ -0,0 +1,152 @@
+"""Incremental channel archiver writing compressed JSONL segments to the data volume."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from bot.core.storage import WriteBehindJsonStore, data_path
+from bot.extensions._helpers.transcripts import TranscriptRecord, message_to_record
+
+logger = logging.getLogger(__name__)
+
+
+class _Snowflake(NamedTuple):
+    """Minimal ``discord.abc.Snowflake`` used as the ``after`` bound for history paging."""
+
+    id: int
+
+
+@dataclass
+class ArchiveResult:
+    """Outcome of archiving a single channel."""
+
+    channel_id: int
+    messages: int = 0
+    segments: int = 0
+    last_message_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ArchiveCursorStore(WriteBehindJsonStore):
+    """Persists the newest archived message ID per channel.
+
+    Processes archiving different shards share the file, so a flush keeps the other
+    processes' cursors and never moves a channel's cursor backwards.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 5.0) -> None:
+        super().__init__(path, flush_interval=flush_interval)
+        self._cursors: Dict[int, int] = {int(key): int(value) for key, value in (self.load() or {}).items()}
+
+    def get(self, channel_id: int) -> Optional[int]:
+        return self._cursors.get(int(channel_id))
+
+    def set(self, channel_id: int, message_id: int) -> None:
+        self._cursors[int(channel_id)] = int(message_id)
+        self.mark_dirty()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {str(key): value for key, value in self._cursors.items()}
+
+    def merge(self, on_disk: Any, snapshot: Dict[str, int]) -> Dict[str, int]:
+        merged = {str(key): int(value) for key, value in (on_disk or {}).items()}
+        for key, message_id in snapshot.items():
+            merged[key] = max(message_id, merged.get(key, 0))
+        return merged
+
+
+class ChannelArchiver:
+    """Pages through channel history and writes new messages as gzip JSONL segments.
+
+    Each channel's segments live in ``<root>/<guild_id>/<channel_id>/<first>-<last>.jsonl.gz``.
+    The cursor is only advanced after a segment has been written, so an interrupted run
+    resumes from the last complete segment and later runs fetch only newer messages.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        concurrency: int = 3,
+        segment_size: int = 5000,
+    ) -> None:
+        self.root = root or data_path("archive")
+        self.concurrency = max(1, concurrency)
+        self.segment_size = max(1, segment_size)
+        self.cursors = ArchiveCursorStore(os.path.join(self.root, "cursors.json"))
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _segment_path(self, guild_id: int, channel_id: int, records: List[TranscriptRecord]) -> str:
+        first_id, last_id = records[0]["id"], records[-1]["id"]
+        return os.path.join(self.root, str(guild_id), str(channel_id), f"{first_id}-{last_id}.jsonl.gz")
+
+    def write_segment(self, guild_id: int, channel_id: int, records: List[TranscriptRecord]) -> str:
+        """Write ``records`` (oldest first) as one compressed segment and return its path."""
+
+        path = self._segment_path(guild_id, channel_id, records)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".part"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record, ensure_ascii=False))
+                handle.write("\n")
+        os.replace(tmp_path, path)
+        return path
+
+    async def _flush(self, guild_id: int, channel_id: int, records: List[TranscriptRecord], result: ArchiveResult) -> None:
+        await asyncio.to_thread(self.write_segment, guild_id, channel_id, records)
+        last_id = records[-1]["id"]
+        self.cursors.set(channel_id, last_id)
+        result.segments += 1
+        result.messages += len(records)
+        result.last_message_id = last_id
+
+    async def archive_channel(self, channel, guild_id: int) -> ArchiveResult:
+        """Archive every message in ``channel`` newer than its stored cursor."""
+
+        result = ArchiveResult(channel_id=channel.id)
+        cursor = self.cursors.get(channel.id)
+        after = _Snowflake(cursor) if cursor else None
+        buffer: List[TranscriptRecord] = []
+        try:
+            async for message in channel.history(limit=None, after=after, oldest_first=True):
+                buffer.append(message_to_record(message))
+                if len(buffer) >= self.segment_size:
+                    await self._flush(guild_id, channel.id, buffer, result)
+                    buffer = []
+            if buffer:
+                await self._flush(guild_id, channel.id, buffer, result)
+        except Exception as exc:
+            logger.exception("Archiving channel %s failed", channel.id)
+            result.error = str(exc) or exc.__class__.__name__
+        return result
+
+    async def archive_channels(self, guild_id: int, channels: Iterable) -> List[ArchiveResult]:
+        """Archive ``channels`` with at most ``concurrency`` history scans in flight."""
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _run(channel) -> ArchiveResult:
+            async with semaphore:
+                return await self.archive_channel(channel, guild_id)
+
+        async with self._lock:
+            results = await asyncio.gather(*(_run(channel) for channel in channels))
+            # Persist the run's cursors now rather than after the flush interval
+            await self.cursors.flush_async()
+        logger.info(
+            "Archived %d message(s) from %d channel(s) in guild %s",
+            sum(result.messages for result in results),
+            len(results),
+            guild_id,
+        )
+        return list(results)
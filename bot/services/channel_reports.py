@@ -0,0 +1,229 @@
+"""Precomputed ``/channelactivity`` reports for RP guilds.
+
+Building the report reads the recent history of every monitored channel, which
+takes a while on a guild with many RP channels. A
+weekly scheduled job (see the Activity cog) builds it off-peak and keeps it in
+``/data/channel_reports.json``, so ``/channelactivity`` can answer immediately.
+
+:class:`ChannelReport` is a snapshot: its colours, "days ago" and stale list are
+all as of :attr:`ChannelReport.generated`, so the activity and ping embeds always
+agree. ``/channelactivity`` labels a cached report with that time and offers a
+live refresh.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.core.config_store import GuildConfig
+from bot.core.storage import WriteBehindJsonStore, data_path
+
+logger = logging.getLogger(__name__)
+
+AVRAE_NAME = "Avrae"
+# Messages read back from the end of a stale channel to find who is in the scene
+PARTICIPANT_SCAN_LIMIT = 25
+
+PING_HEADER = (
+    "## Weekly pings!\nAs usual, this is a friendly check in on those scenes which seem to be slowing down."
+    " How's it going? How's life? Are you both communicating and happy with the pace of things?"
+    " Do you need any help or hand from anyone?\n"
+)
+NO_STALE_DESCRIPTION = "Good news! No stale channels were found. Everyone is playing nicely!"
+
+
+@dataclass(frozen=True)
+class ChannelEntry:
+    """The newest message in one monitored channel."""
+
+    channel_id: int
+    last_message_at: float
+    # The last post was Avrae's, i.e. the scene was closed out
+    avrae_last: bool
+
+
+@dataclass
+class ChannelReport:
+    """Channel activity and weekly ping participants for one guild."""
+
+    guild_id: int
+    generated_at: float
+    yellow_days: int
+    red_days: int
+    channels: List[ChannelEntry] = field(default_factory=list)
+    # (channel ID, participant user IDs newest first) for channels past the red threshold
+    stale: List[Tuple[int, List[int]]] = field(default_factory=list)
+
+    @property
+    def generated(self) -> datetime:
+        return datetime.fromtimestamp(self.generated_at, timezone.utc)
+
+    def age(self, now: datetime) -> timedelta:
+        return now - self.generated
+
+    def _status(self, elapsed: timedelta) -> str:
+        if elapsed > timedelta(days=self.red_days):
+            return ":red_circle:"
+        if elapsed > timedelta(days=self.yellow_days):
+            return ":yellow_circle:"
+        return ":green_circle:"
+
+    def active_description(self) -> Optional[str]:
+        """The "Active channels" embed text as of generation, or ``None`` if every scene ended with Avrae."""
+
+        now = self.generated
+        lines = []
+        for entry in self.channels:
+            if entry.avrae_last:
+                continue
+            message_time = datetime.fromtimestamp(entry.last_message_at, timezone.utc)
+            elapsed = now - message_time
+            elapsed_text = "Today" if elapsed.days == 0 else f"{elapsed.days} days ago"
+            lines.append(
+                f"{self._status(elapsed)} <#{entry.channel_id}>: {message_time.strftime('%d/%m/%Y')} ({elapsed_text})\n"
+            )
+        if not lines:
+            return None
+        return "# Active channels:\n(Channels with an ongoing RP scene)\n\n" + "".join(lines)
+
+    def ping_text(self) -> Optional[str]:
+        """The copy-paste weekly ping post, or ``None`` when no channel is stale."""
+
+        if not self.stale:
+            return None
+        text = PING_HEADER
+        for channel_id, users in self.stale:
+            text += f"<#{channel_id}>: ({', '.join(f'<@{user}>' for user in users)})\n"
+        return text
+
+    def ping_description(self) -> str:
+        """The "Ping Post" embed text ``/channelactivity`` shows."""
+
+        text = self.ping_text()
+        if text is None:
+            return NO_STALE_DESCRIPTION
+        return f"Copy and paste the below for your weekly pinging needs\n\n```\n{text}```"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "guild_id": self.guild_id,
+            "generated_at": self.generated_at,
+            "yellow_days": self.yellow_days,
+            "red_days": self.red_days,
+            "channels": [[entry.channel_id, entry.last_message_at, entry.avrae_last] for entry in self.channels],
+            "stale": [[channel_id, list(users)] for channel_id, users in self.stale],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChannelReport":
+        return cls(
+            guild_id=int(data["guild_id"]),
+            generated_at=float(data["generated_at"]),
+            yellow_days=int(data["yellow_days"]),
+            red_days=int(data["red_days"]),
+            channels=[ChannelEntry(int(cid), float(at), bool(avrae)) for cid, at, avrae in data.get("channels", [])],
+            stale=[(int(cid), [int(user) for user in users]) for cid, users in data.get("stale", [])],
+        )
+
+
+def _is_avrae(message: Any) -> bool:
+    return getattr(message.author, "name", None) == AVRAE_NAME
+
+
+async def build_channel_report(client: Any, gcfg: GuildConfig, now: datetime) -> ChannelReport:
+    """Read the recent history of ``gcfg``'s monitored channels into a :class:`ChannelReport`.
+
+    A channel is stale when its newest message is older than the red threshold and
+    was not posted by Avrae. Its participants are the authors of the messages after
+    the last Avrae post among the newest 25, newest first. One history page per
+    channel covers both.
+    """
+
+    thresholds = gcfg.channel_times
+    if thresholds is None:
+        raise ValueError(f"Guild {gcfg.guild_id} has no channeltimes thresholds")
+    report = ChannelReport(
+        guild_id=gcfg.guild_id,
+        generated_at=now.timestamp(),
+        yellow_days=int(thresholds["yellow"]),
+        red_days=int(thresholds["red"]),
+    )
+    red = timedelta(days=report.red_days)
+    for channel_id in gcfg.monitored_order:
+        channel = client.get_channel(int(channel_id))
+        if channel is None:
+            logger.debug("Skipping unknown channel %s in channel report", channel_id)
+            continue
+        recent = [message async for message in channel.history(limit=PARTICIPANT_SCAN_LIMIT)]
+        if not recent:
+            continue
+        newest = recent[0]
+        avrae_last = _is_avrae(newest)
+        report.channels.append(ChannelEntry(int(channel_id), newest.created_at.timestamp(), avrae_last))
+        if avrae_last or now - newest.created_at <= red:
+            continue
+        users: List[int] = []
+        for message in recent:
+            if _is_avrae(message):
+                break
+            if message.author.id not in users:
+                users.append(message.author.id)
+        report.stale.append((int(channel_id), users))
+    return report
+
+
+class ChannelReportCache(WriteBehindJsonStore):
+    """The latest :class:`ChannelReport` per guild, persisted on the data volume.
+
+    Each process builds reports for its own guilds, so a flush keeps the entries
+    other processes wrote unless this one has a newer report for the guild.
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 5.0) -> None:
+        super().__init__(path or data_path("channel_reports.json"), flush_interval=flush_interval)
+        self._reports: Dict[int, ChannelReport] = {}
+        for key, raw in (self.load() or {}).items():
+            try:
+                self._reports[int(key)] = ChannelReport.from_dict(raw)
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Ignoring unreadable cached channel report for guild %s", key)
+
+    def get(self, guild_id: int, max_age: Optional[timedelta] = None, now: Optional[datetime] = None) -> Optional[ChannelReport]:
+        """The cached report for ``guild_id``, or ``None`` if there is none or it is older than ``max_age``."""
+
+        report = self._reports.get(int(guild_id))
+        if report is None or max_age is None:
+            return report
+        if report.age(now or datetime.now(timezone.utc)) > max_age:
+            return None
+        return report
+
+    def put(self, report: ChannelReport) -> None:
+        self._reports[report.guild_id] = report
+        self.mark_dirty()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {str(guild_id): report.to_dict() for guild_id, report in self._reports.items()}
+
+    def merge(self, on_disk: Any, snapshot: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        merged = dict(on_disk or {})
+        for key, raw in snapshot.items():
+            existing = merged.get(key)
+            if not isinstance(existing, dict) or float(existing.get("generated_at", 0)) <= raw["generated_at"]:
+                merged[key] = raw
+        return merged
+
+
+def channel_reports_for(client: Any) -> ChannelReportCache:
+    """Return the report cache attached to ``client.services``, creating one if needed."""
+
+    services = getattr(client, "services", None)
+    cache = getattr(services, "channel_reports", None)
+    if cache is None:
+        cache = ChannelReportCache()
+        if services is not None:
+            services.channel_reports = cache
+    return cache
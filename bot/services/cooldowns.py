@@ -0,0 +1,105 @@
+"""Per-key cooldowns that expire by time and survive restarts."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set
+
+from bot.core.storage import WriteBehindJsonStore, data_path
+
+
+class CooldownStore(WriteBehindJsonStore):
+    """Bounded map of ``key -> expiry`` persisted to the data volume.
+
+    Keys are free-form strings; features namespace them (auto-responders use
+    ``"autoresponder:<rule>:<scope>"``) so several can share one store. Expiries are wall-clock timestamps so they
+    stay meaningful across restarts. Expired keys are dropped lazily and when
+    persisting; once ``maxsize`` live keys exist the least recently set one is evicted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        default_ttl: float = 24 * 60 * 60,
+        maxsize: int = 10000,
+        flush_interval: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(path or data_path("cooldowns.json"), flush_interval=flush_interval)
+        self.default_ttl = default_ttl
+        self.maxsize = max(1, maxsize)
+        self._clock = clock
+        self._expiries: "OrderedDict[str, float]" = OrderedDict()
+        # Keys reset since the last flush, so merging does not bring them back from disk
+        self._released: Set[str] = set()
+        now = self._clock()
+        stored = self.load() or {}
+        for key, expires_at in sorted(stored.items(), key=lambda item: item[1]):
+            if float(expires_at) > now:
+                self._expiries[str(key)] = float(expires_at)
+        self._trim()
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+    def _trim(self) -> None:
+        while len(self._expiries) > self.maxsize:
+            self._expiries.popitem(last=False)
+
+    def remaining(self, key: str) -> float:
+        """Seconds until ``key`` is off cooldown (``0.0`` if it is ready)."""
+
+        expires_at = self._expiries.get(key)
+        if expires_at is None:
+            return 0.0
+        left = expires_at - self._clock()
+        if left <= 0:
+            del self._expiries[key]
+            return 0.0
+        return left
+
+    def ready(self, key: str) -> bool:
+        return self.remaining(key) == 0.0
+
+    def start(self, key: str, ttl: Optional[float] = None) -> None:
+        """Put ``key`` on cooldown for ``ttl`` seconds (``default_ttl`` if omitted)."""
+
+        self._expiries.pop(key, None)
+        self._released.discard(key)
+        self._expiries[key] = self._clock() + (self.default_ttl if ttl is None else ttl)
+        self._trim()
+        self.mark_dirty()
+
+    def acquire(self, key: str, ttl: Optional[float] = None) -> bool:
+        """Start the cooldown and return ``True`` if ``key`` was ready, else return ``False``."""
+
+        if not self.ready(key):
+            return False
+        self.start(key, ttl)
+        return True
+
+    def reset(self, key: str) -> None:
+        if self._expiries.pop(key, None) is not None:
+            self._released.add(key)
+            self.mark_dirty()
+
+    def snapshot(self) -> Dict[str, float]:
+        now = self._clock()
+        return {key: expires_at for key, expires_at in self._expiries.items() if expires_at > now}
+
+    def merge(self, on_disk: Any, snapshot: Dict[str, float]) -> Dict[str, float]:
+        """Live cooldowns other processes wrote, overlaid with ours, minus keys we reset."""
+
+        now = self._clock()
+        merged = {
+            str(key): float(expires_at)
+            for key, expires_at in (on_disk or {}).items()
+            if float(expires_at) > now and key not in self._released
+        }
+        merged.update(snapshot)
+        return dict(sorted(merged.items(), key=lambda item: item[1])[-self.maxsize:])
+
+    def flushed(self, snapshot: Dict[str, float]) -> None:
+        # Keys reset after the snapshot was taken were written as live, so keep masking them
+        self._released = {key for key in self._released if key in snapshot}
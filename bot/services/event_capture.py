@@ -0,0 +1,218 @@
+"""Record anonymised gateway message and reaction events for offline replay.
+
+With ``BARRY_CAPTURE_EVENTS`` set to a file name (relative names go in the data
+volume), the bot is started with discord.py's debug events and the Listeners cog
+appends every ``MESSAGE_CREATE`` and ``MESSAGE_REACTION_ADD`` payload to that JSONL
+file. Each line stores the seconds since the capture started, the event type and the
+anonymised payload. ``python -m benchmarks.replay`` feeds the file back into the cog.
+
+Anonymisation:
+
+- Human user IDs are replaced by keyed hashes, so one person maps to the same ID
+  throughout a capture but not across captures. Human usernames are replaced too.
+- In human messages, every word outside the trigger vocabulary is masked.
+- Bot accounts (Avrae, Barry itself) are kept as they are, because the
+  auto-responders match on their output.
+- Timestamps, attachments, member roles and link previews are dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from bot.core.storage import data_path
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_ENV = "BARRY_CAPTURE_EVENTS"
+CAPTURED_EVENTS = ("MESSAGE_CREATE", "MESSAGE_REACTION_ADD")
+CAPTURE_VERSION = 1
+# Stop recording after this many events so a forgotten capture cannot fill the volume
+DEFAULT_MAX_EVENTS = 200_000
+
+_TOKEN = re.compile(r"<@!?(\d+)>|<@&\d+>|<#\d+>|\w+")
+
+
+def capture_path() -> Optional[str]:
+    """Path named by ``BARRY_CAPTURE_EVENTS``, or ``None`` when capture is off."""
+
+    name = os.getenv(CAPTURE_ENV, "").strip()
+    if not name:
+        return None
+    return name if os.path.isabs(name) else data_path(name)
+
+
+class Anonymiser:
+    """Pseudonymise user identities and mask human-written text in gateway payloads."""
+
+    def __init__(
+        self,
+        salt: Optional[bytes] = None,
+        keep_words: Iterable[str] = (),
+        keep_patterns: Iterable[Pattern[str]] = (),
+    ) -> None:
+        self._salt = salt if salt is not None else secrets.token_bytes(16)
+        self.keep_words = frozenset(word.lower() for word in keep_words)
+        self.keep_patterns: Tuple[Pattern[str], ...] = tuple(keep_patterns)
+
+    def user_id(self, value: Any) -> str:
+        """A stable 60-bit stand-in snowflake for ``value``."""
+
+        digest = hmac.new(self._salt, str(value).encode(), hashlib.sha256).hexdigest()
+        return str(int(digest[:15], 16))
+
+    def user(self, data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not data:
+            return None
+        if data.get("bot"):
+            return {"id": data.get("id"), "username": data.get("username"), "bot": True}
+        pseudo = self.user_id(data.get("id"))
+        return {"id": pseudo, "username": f"user{pseudo[-6:]}", "bot": False}
+
+    def text(self, text: str) -> str:
+        """Mask every word not in the keep list; user mentions keep their (pseudonymised) shape."""
+
+        def replace(match: "re.Match[str]") -> str:
+            token = match.group(0)
+            if match.group(1):
+                return f"<@{self.user_id(match.group(1))}>"
+            if token.startswith("<") or token.lower() in self.keep_words:
+                return token
+            if any(pattern.search(token) for pattern in self.keep_patterns):
+                return token
+            return "x" * len(token)
+
+        return _TOKEN.sub(replace, text or "")
+
+    def message(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        author = self.user(data.get("author")) or {}
+        is_bot = author.get("bot", False)
+        out: Dict[str, Any] = {
+            "id": data.get("id"),
+            "channel_id": data.get("channel_id"),
+            "guild_id": data.get("guild_id"),
+            "author": author,
+            "content": data.get("content", "") if is_bot else self.text(data.get("content", "")),
+            # Human embeds are link previews; bot embeds carry the text the responders match
+            "embeds": data.get("embeds", []) if is_bot else [],
+        }
+        reference = data.get("message_reference")
+        if reference:
+            out["message_reference"] = {
+                "message_id": reference.get("message_id"),
+                "channel_id": reference.get("channel_id"),
+            }
+        metadata = data.get("interaction_metadata")
+        if metadata and metadata.get("user"):
+            out["interaction_metadata"] = {"user": self.user(metadata["user"])}
+        return out
+
+    def reaction(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        member = data.get("member") or {}
+        emoji = data.get("emoji") or {}
+        out: Dict[str, Any] = {
+            "user_id": self.user_id(data.get("user_id")),
+            "channel_id": data.get("channel_id"),
+            "message_id": data.get("message_id"),
+            "guild_id": data.get("guild_id"),
+            "emoji": {"id": emoji.get("id"), "name": emoji.get("name")},
+        }
+        if member.get("user"):
+            out["member"] = {"user": self.user(member["user"])}
+        return out
+
+
+class EventRecorder:
+    """Append anonymised ``MESSAGE_CREATE``/``MESSAGE_REACTION_ADD`` events to a JSONL file."""
+
+    def __init__(
+        self,
+        path: str,
+        anonymiser: Anonymiser,
+        bot_user_id: Optional[int] = None,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = path
+        self.anonymiser = anonymiser
+        self.max_events = max_events
+        self.recorded = 0
+        self._clock = clock
+        self._started = clock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._handle = open(path, "a", encoding="utf-8", buffering=1)
+        header = {
+            "capture": {
+                "version": CAPTURE_VERSION,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "bot_user_id": str(bot_user_id) if bot_user_id is not None else None,
+            }
+        }
+        self._handle.write(json.dumps(header) + "\n")
+        logger.info("Capturing gateway message events to %s", path)
+
+    @property
+    def closed(self) -> bool:
+        return self._handle.closed
+
+    def feed(self, raw: Any) -> bool:
+        """Record ``raw`` (a gateway frame as given to ``on_socket_raw_receive``) if it is captured."""
+
+        if self.closed or not isinstance(raw, str):
+            return False
+        # Cheap prefilter: most frames are presence, typing and heartbeat traffic
+        if not any(event in raw for event in CAPTURED_EVENTS):
+            return False
+        try:
+            frame = json.loads(raw)
+        except ValueError:
+            return False
+        return self.record(frame.get("t"), frame.get("d") or {})
+
+    def record(self, event: Optional[str], data: Dict[str, Any]) -> bool:
+        if self.closed or event not in CAPTURED_EVENTS:
+            return False
+        payload = self.anonymiser.message(data) if event == "MESSAGE_CREATE" else self.anonymiser.reaction(data)
+        line = {"at": round(self._clock() - self._started, 3), "t": event, "d": payload}
+        self._handle.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self.recorded += 1
+        if self.recorded >= self.max_events:
+            logger.warning("Event capture reached %d events; stopping", self.max_events)
+            self.close()
+        return True
+
+    def close(self) -> None:
+        if not self.closed:
+            self._handle.close()
+
+
+def read_events(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return the capture header and the events of a capture file, in time order.
+
+    Files appended to by several runs keep only the last run's header; each run's
+    offsets restart at zero, so later runs are shifted to follow the earlier ones.
+    """
+
+    header: Dict[str, Any] = {}
+    events: List[Dict[str, Any]] = []
+    offset = 0.0
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "capture" in record:
+                header = record["capture"]
+                offset = events[-1]["at"] if events else 0.0
+                continue
+            record["at"] = float(record.get("at", 0.0)) + offset
+            events.append(record)
+    return header, events
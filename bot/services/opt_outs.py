@@ -0,0 +1,138 @@
+"""Durable registry of users who opted out of automated replies."""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from typing import Callable, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from bot.core.storage import data_path
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS opt_outs (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    source TEXT,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class OptOutRegistry:
+    """SQLite-backed opt-out store mirrored into in-memory sets for O(1) checks.
+
+    ``static_entries`` seeds entries that cannot be removed at runtime (the legacy
+    ``config.IGNORE_LIST``): integers are user IDs, strings are lowercase usernames.
+
+    Several bot processes may share the database file. Checks notice writes made by
+    other connections at most every ``refresh_interval`` seconds and reload the sets.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        static_entries: Iterable[Union[int, str]] = (),
+        refresh_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = path or data_path("opt_outs.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._checked_at = clock()
+        self._data_version = self._read_data_version()
+        self._static_ids: FrozenSet[int] = frozenset()
+        self._static_names: FrozenSet[str] = frozenset()
+        self._ids: Set[int] = set()
+        self._names: Set[str] = set()
+        self.set_static_entries(static_entries)
+
+    def set_static_entries(self, static_entries: Iterable[Union[int, str]]) -> None:
+        """Replace the static entries (e.g. after the ignore list in settings changed)."""
+
+        entries = list(static_entries)
+        self._static_ids = frozenset(entry for entry in entries if isinstance(entry, int))
+        self._static_names = frozenset(entry.lower() for entry in entries if isinstance(entry, str))
+        self.reload()
+
+    def reload(self) -> None:
+        """Rebuild the in-memory sets from the database."""
+
+        rows = self._conn.execute("SELECT user_id, username FROM opt_outs").fetchall()
+        self._ids = set(self._static_ids) | {int(user_id) for user_id, _ in rows}
+        self._names = set(self._static_names) | {username for _, username in rows if username}
+
+    def _read_data_version(self) -> int:
+        return int(self._conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        now = self._clock()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        # data_version only changes when another connection commits to the file
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self.reload()
+
+    def is_opted_out(self, user_id: Optional[int] = None, username: Optional[str] = None) -> bool:
+        self._maybe_reload()
+        if user_id is not None and user_id in self._ids:
+            return True
+        return username is not None and username.lower() in self._names
+
+    def add(self, user_id: int, username: Optional[str] = None, source: str = "") -> bool:
+        """Record an opt-out. Returns ``False`` if the user had already opted out.
+
+        A user counts as opted out already if their ID or name is on the static list
+        or was recorded by any process sharing the database.
+        """
+
+        # Pick up opt-outs other processes recorded since the last check
+        self._maybe_reload(force=True)
+        if self.is_opted_out(user_id=user_id, username=username):
+            return False
+        name = username.lower() if username else None
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO opt_outs (user_id, username, source, created_at) VALUES (?, ?, ?, ?)",
+            (int(user_id), name, source, time.time()),
+        )
+        self._conn.commit()
+        self._ids.add(int(user_id))
+        if name:
+            self._names.add(name)
+        if cursor.rowcount == 0:
+            # Another process recorded it between the reload and the insert
+            return False
+        logger.info("Recorded opt-out for user %s (%s)", user_id, source or "unknown source")
+        return True
+
+    def remove(self, user_id: int) -> bool:
+        """Remove a runtime opt-out. Static entries from config cannot be removed."""
+
+        cursor = self._conn.execute("DELETE FROM opt_outs WHERE user_id = ?", (int(user_id),))
+        self._conn.commit()
+        self.reload()
+        return cursor.rowcount > 0
+
+    def is_static(self, user_id: Optional[int] = None, username: Optional[str] = None) -> bool:
+        return (user_id is not None and user_id in self._static_ids) or (
+            username is not None and username.lower() in self._static_names
+        )
+
+    def entries(self) -> List[Tuple[int, Optional[str], str, float]]:
+        return list(self._conn.execute("SELECT user_id, username, source, created_at FROM opt_outs ORDER BY created_at"))
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,258 @@
+"""Rate-limit-aware queue for outbound Discord messages.
+
+Messages are queued per route (one DM recipient or one channel), throttled by a
+token bucket per route plus a global bucket so the bot stays under Discord's limits
+instead of running into 429s. Each route drains in priority order, so a long report
+never delays an alert, and routes drain independently of one another. Plain-text
+messages marked ``coalesce=True`` that queue up for the same route are merged into
+as few messages as fit under Discord's 2000 character limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from bot.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+MAX_MESSAGE_LENGTH = 2000
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per ``period`` seconds, waiting when exhausted."""
+
+    def __init__(
+        self,
+        rate: int,
+        period: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.capacity = max(1, rate)
+        self.period = period
+        self._tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.capacity / self.period)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (``0.0`` if one is available now)."""
+
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) * self.period / self.capacity
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.delay()
+            if wait <= 0:
+                self._tokens -= 1
+                return
+            await self._sleep(wait)
+
+
+@dataclass(order=True)
+class _Outgoing:
+    priority: int
+    seq: int
+    factory: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: "asyncio.Future[Any]" = field(compare=False)
+    destination: Any = field(default=None, compare=False)
+    content: Optional[str] = field(default=None, compare=False)
+    coalesce: bool = field(default=False, compare=False)
+
+
+class _Route:
+    __slots__ = ("queue", "bucket", "task")
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.queue: List[_Outgoing] = []
+        self.bucket = bucket
+        self.task: Optional["asyncio.Task[None]"] = None
+
+
+def route_for(destination: Any) -> Tuple[str, Any]:
+    """Return the rate-limit route for a user, member, channel or thread."""
+
+    if hasattr(destination, "dm_channel") or hasattr(destination, "discriminator"):
+        return ("dm", getattr(destination, "id", id(destination)))
+    return ("channel", getattr(destination, "id", id(destination)))
+
+
+class OutboundScheduler:
+    """Per-route, priority-ordered, throttled send queue."""
+
+    def __init__(
+        self,
+        route_rate: int = 5,
+        route_period: float = 5.0,
+        global_rate: int = 40,
+        global_period: float = 1.0,
+        max_length: int = MAX_MESSAGE_LENGTH,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.route_rate = route_rate
+        self.route_period = route_period
+        self.max_length = max_length
+        self._clock = clock
+        self._sleep = sleep
+        self._global = TokenBucket(global_rate, global_period, clock=clock, sleep=sleep)
+        self._routes: Dict[Hashable, _Route] = {}
+        # Buckets outlive their (idle) routes for one period so a route cannot burst twice back to back.
+        self._buckets: TTLCache = TTLCache(maxsize=4096, ttl=route_period, clock=clock)
+        self._seq = itertools.count()
+        self.sent = 0
+        self.coalesced = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(route.queue) for route in self._routes.values())
+
+    def submit(
+        self,
+        route: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_NORMAL,
+        *,
+        destination: Any = None,
+        content: Optional[str] = None,
+        coalesce: bool = False,
+    ) -> "asyncio.Future[Any]":
+        """Queue ``factory()`` on ``route``; the returned future resolves to its result."""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(functools.partial(_log_failure, route))
+        item = _Outgoing(priority, next(self._seq), factory, future, destination, content, coalesce)
+        state = self._routes.get(route)
+        if state is None:
+            bucket = self._buckets.get(route) or TokenBucket(
+                self.route_rate, self.route_period, clock=self._clock, sleep=self._sleep
+            )
+            state = self._routes[route] = _Route(bucket)
+        heapq.heappush(state.queue, item)
+        if state.task is None:
+            state.task = loop.create_task(self._drain(route, state))
+        return future
+
+    def send(
+        self,
+        destination: Any,
+        content: Optional[str] = None,
+        *,
+        priority: int = PRIORITY_NORMAL,
+        coalesce: bool = False,
+        **kwargs: Any,
+    ) -> "asyncio.Future[Any]":
+        """Queue ``destination.send(content, **kwargs)``.
+
+        ``coalesce`` only applies to plain-text sends; messages merged together all
+        resolve to the single message that was actually sent.
+        """
+
+        coalesce = coalesce and not kwargs and content is not None
+
+        def factory() -> Awaitable[Any]:
+            return destination.send(content, **kwargs)
+
+        return self.submit(
+            route_for(destination),
+            factory,
+            priority,
+            destination=destination,
+            content=content,
+            coalesce=coalesce,
+        )
+
+    def _take_batch(self, queue: List[_Outgoing]) -> List[_Outgoing]:
+        first = heapq.heappop(queue)
+        batch = [first]
+        if not first.coalesce:
+            return batch
+        length = len(first.content or "")
+        while queue:
+            candidate = queue[0]
+            if not candidate.coalesce or candidate.priority != first.priority:
+                break
+            extra = len(candidate.content or "") + 1
+            if length + extra > self.max_length:
+                break
+            batch.append(heapq.heappop(queue))
+            length += extra
+        return batch
+
+    async def _drain(self, route: Hashable, state: _Route) -> None:
+        try:
+            while state.queue:
+                batch = self._take_batch(state.queue)
+                await state.bucket.acquire()
+                await self._global.acquire()
+                try:
+                    if len(batch) > 1:
+                        self.coalesced += len(batch) - 1
+                        merged = "\n".join(item.content or "" for item in batch)
+                        result = await batch[0].destination.send(merged)
+                    else:
+                        result = await batch[0].factory()
+                    self.sent += 1
+                except Exception as exc:
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_exception(exc)
+                else:
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_result(result)
+        finally:
+            state.task = None
+            if not state.queue:
+                self._routes.pop(route, None)
+                self._buckets.set(route, state.bucket)
+
+    async def drain(self) -> None:
+        """Wait until every queued message has been sent."""
+
+        while self._routes:
+            tasks = [state.task for state in list(self._routes.values()) if state.task is not None]
+            if not tasks:
+                return
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _log_failure(route: Hashable, future: "asyncio.Future[Any]") -> None:
+    # Fire-and-forget callers never await the future, so this is the only record of their failures.
+    # Cancelled futures have no exception, and calling exception() on them would raise.
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        logger.warning("Outbound send on route %r failed: %r", route, exc)
+
+
+def scheduler_for(client: Any) -> OutboundScheduler:
+    """Return the scheduler attached to ``client.services``, creating one if needed."""
+
+    services = getattr(client, "services", None)
+    scheduler = getattr(services, "outbound", None)
+    if scheduler is None:
+        scheduler = OutboundScheduler()
+        if services is not None:
+            services.outbound = scheduler
+    return scheduler
@@ -0,0 +1,79 @@
+"""Shared lookup of users and channels that avoids redundant REST fetches."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional
+
+from bot.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class DiscordResolver:
+    """Resolve users and channels from the gateway cache, then a TTL cache, then REST.
+
+    ``client`` is the running ``discord.Client``/``commands.Bot``. Objects fetched over
+    REST are kept for ``ttl`` seconds so repeated alerts and reactions cost no extra
+    HTTP calls.
+    """
+
+    def __init__(self, client: Any, ttl: float = 3600.0, maxsize: int = 1024) -> None:
+        self.client = client
+        self.users: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.channels: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.rest_fetches = 0
+
+    async def user(self, user_id: int):
+        """Return the user for ``user_id``, fetching over REST only on a cache miss."""
+
+        user = self.client.get_user(user_id)
+        if user is not None:
+            return user
+        user = self.users.get(user_id)
+        if user is not None:
+            return user
+        self.rest_fetches += 1
+        user = await self.client.fetch_user(user_id)
+        self.users.set(user_id, user)
+        return user
+
+    async def channel(self, channel_id: int):
+        """Return the channel (or thread) for ``channel_id``, fetching over REST only on a cache miss."""
+
+        channel = self.client.get_channel(channel_id)
+        if channel is not None:
+            return channel
+        channel = self.channels.get(channel_id)
+        if channel is not None:
+            return channel
+        self.rest_fetches += 1
+        channel = await self.client.fetch_channel(channel_id)
+        self.channels.set(channel_id, channel)
+        return channel
+
+    def messageable(self, channel_id: int, guild_id: Optional[int] = None):
+        """Return something that can send/fetch messages in ``channel_id`` without any HTTP call."""
+
+        channel = self.client.get_channel(channel_id) or self.channels.get(channel_id)
+        if channel is not None:
+            return channel
+        return self.client.get_partial_messageable(channel_id, guild_id=guild_id)
+
+    def invalidate(self, user_id: Optional[int] = None, channel_id: Optional[int] = None) -> None:
+        if user_id is not None:
+            self.users.pop(user_id)
+        if channel_id is not None:
+            self.channels.pop(channel_id)
+
+
+def resolver_for(client: Any) -> DiscordResolver:
+    """Return the resolver attached to ``client.services``, creating one if needed."""
+
+    services = getattr(client, "services", None)
+    resolver = getattr(services, "resolver", None)
+    if resolver is None:
+        resolver = DiscordResolver(client)
+        if services is not None:
+            services.resolver = resolver
+    return resolver
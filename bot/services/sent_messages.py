@@ -0,0 +1,52 @@
+"""Bounded, persisted record of message IDs the bot has sent."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from bot.core.storage import WriteBehindJsonStore, data_path
+
+
+class SentMessageRegistry(WriteBehindJsonStore):
+    """Remembers the most recent ``maxsize`` bot-authored message IDs.
+
+    Reaction listeners check membership here before fetching anything, so reactions
+    on other people's messages cost no API calls.
+    """
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = 50000, flush_interval: float = 30.0) -> None:
+        super().__init__(path or data_path("sent_messages.json"), flush_interval=flush_interval)
+        self.maxsize = max(1, maxsize)
+        self._ids: "OrderedDict[int, None]" = OrderedDict()
+        for message_id in self.load() or []:
+            self._ids[int(message_id)] = None
+        self._trim()
+
+    def __contains__(self, message_id: object) -> bool:
+        return message_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _trim(self) -> None:
+        while len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+    def add(self, message_id: int) -> None:
+        if message_id in self._ids:
+            return
+        self._ids[int(message_id)] = None
+        self._trim()
+        self.mark_dirty()
+
+    def snapshot(self) -> List[int]:
+        return list(self._ids)
+
+    def merge(self, on_disk: Any, snapshot: List[int]) -> List[int]:
+        """The IDs on disk followed by ours that are not there yet, keeping the newest ``maxsize``."""
+
+        merged: "OrderedDict[int, None]" = OrderedDict((int(message_id), None) for message_id in on_disk or [])
+        for message_id in snapshot:
+            merged.setdefault(message_id, None)
+        return list(merged)[-self.maxsize:]
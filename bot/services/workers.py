@@ -0,0 +1,121 @@
+"""Process pool for CPU-heavy parsing of plain message records.
+
+Commands fetch history on the event loop, convert each message into a compact
+record (``history.Compactor``) and hand the records to this pool.
+Regex scans and transcript rendering then run on other cores, so a long scan does
+not hold up gateway heartbeats or other interactions.
+
+Jobs must be module-level functions of discord-free modules so worker processes,
+which are spawned rather than forked, can import them. ``BARRY_PARSE_WORKERS``
+sets the number of processes (default: one per spare core, at least one); ``0``
+runs every job inline on the event loop, as before the pool existed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+WORKERS_ENV = "BARRY_PARSE_WORKERS"
+DEFAULT_BATCH_SIZE = 500
+# Smaller inputs are parsed inline; pickling them to a worker would cost more than it saves
+DEFAULT_INLINE_BELOW = 200
+
+R = TypeVar("R")
+
+
+def default_worker_count() -> int:
+    value = os.getenv(WORKERS_ENV, "").strip()
+    if value:
+        return max(0, int(value))
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _spawn_pool(max_workers: int) -> Executor:
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class ParseWorkerPool:
+    """Runs pure parsing jobs over batches of records in worker processes.
+
+    The processes are started on first use. If the pool breaks (a worker was killed),
+    the job is retried inline and a fresh pool is started for the next one.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        inline_below: int = DEFAULT_INLINE_BELOW,
+        executor_factory: Callable[[int], Executor] = _spawn_pool,
+    ) -> None:
+        self.max_workers = default_worker_count() if max_workers is None else max(0, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.inline_below = inline_below
+        self._executor_factory = executor_factory
+        self._executor: Optional[Executor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._executor_factory(self.max_workers)
+            logger.info("Started %d parse worker process(es)", self.max_workers)
+        return self._executor
+
+    async def run(self, func: Callable[..., R], *args: Any, size: Optional[int] = None) -> R:
+        """Run ``func(*args)`` in a worker process and return its result.
+
+        ``size`` is the number of records the job covers; below ``inline_below`` the
+        job runs inline, as :meth:`map_batches` does for small inputs.
+        """
+
+        if not self.enabled or (size is not None and size < self.inline_below):
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool(), functools.partial(func, *args))
+        except BrokenProcessPool:
+            logger.warning("Parse worker pool broke; running %s inline", getattr(func, "__name__", func))
+            self.close()
+            return func(*args)
+
+    async def map_batches(self, func: Callable[[Sequence[Any]], List[R]], records: Sequence[Any]) -> List[R]:
+        """Apply ``func`` to ``records`` in batches across the pool, keeping input order.
+
+        ``func`` takes a sequence of records and returns a list of results; the
+        per-batch lists are concatenated.
+        """
+
+        if not self.enabled or len(records) < self.inline_below:
+            return func(records)
+        batches = [records[start : start + self.batch_size] for start in range(0, len(records), self.batch_size)]
+        results = await asyncio.gather(*(self.run(func, batch) for batch in batches))
+        return [item for batch in results for item in batch]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def workers_for(client: Any) -> ParseWorkerPool:
+    """Return the worker pool attached to ``client.services``, creating one if needed."""
+
+    services = getattr(client, "services", None)
+    workers = getattr(services, "workers", None)
+    if workers is None:
+        workers = ParseWorkerPool()
+        if services is not None:
+            services.workers = workers
+    return workers
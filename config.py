@@ -99,6 +99,10 @@ channeltimes = {
     1197643287423627264: {"yellow":7,"red":14}, # Bellegorn
 }
 
+# Staff channel the weekly ping report is posted to; guilds without one only get the cached /channelactivity report
+ping_report_channels = {
+}
+
 nyoom_immunity = [929193107487092798,929193266052759582,940415123527446608,929193302287343727]
 
 nyoom_user_immunity = ["aethelar"]
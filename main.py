@@ -3,12 +3,21 @@ from __future__ import annotations
 import asyncio
 import logging
 
-from discord import Intents
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from bot.core.config_store import config_store_for
+from bot.core.gateway import build_gateway_profile, cache_report
+from bot.core.instrumentation import InstrumentedCommandTree, instrument_http
+from bot.core.metrics import MetricsServer, cache_collector
+from bot.core.scheduler import jobs_for
 from bot.core.services import ServiceContainer
 from bot.core.settings import build_service_container, load_settings
+from bot.core.sharding import ShardPlan, is_primary
+from bot.core.startup import StartupPhases, sync_commands_if_changed
+from bot.core.tracing import build_http_trace_config
+from bot.services.event_capture import capture_path
+from bot.services.resolver import DiscordResolver
 
 
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +26,7 @@ logger = logging.getLogger(__name__)
 
 EXTENSIONS = [
     "bot.extensions.activity",
+    "bot.extensions.archive",
     "bot.extensions.contributions",
     "bot.extensions.github_issues",
     "bot.extensions.listeners",
@@ -27,23 +37,61 @@ EXTENSIONS = [
 
 
 def create_bot(services: ServiceContainer) -> commands.Bot:
-    intents = Intents.all()
-    bot = commands.Bot(command_prefix="\u200b", intents=intents)
+    profile = build_gateway_profile(EXTENSIONS)
+    shards = ShardPlan.from_env()
+    logger.info("Running %s", shards.describe())
+    bot = commands.AutoShardedBot(
+        command_prefix="\u200b",
+        tree_cls=InstrumentedCommandTree,
+        http_trace=build_http_trace_config(),
+        # Raw gateway frames are only dispatched while capturing events for replay
+        enable_debug_events=capture_path() is not None,
+        **profile.bot_kwargs(),
+        **shards.bot_kwargs(),
+    )
     bot.services = services  # type: ignore[attr-defined]
+    services.resolver = DiscordResolver(bot)
+    instrument_http(bot, services.metrics, services.tracer)
+    services.metrics.add_collector(
+        cache_collector({"resolver_users": services.resolver.users, "resolver_channels": services.resolver.channels})
+    )
+    services.metrics_server = MetricsServer(services.metrics)
     return bot
 
 
-async def on_ready_event(bot: commands.Bot) -> None:
+async def on_ready_event(bot: commands.Bot, phases: StartupPhases | None = None) -> None:
     logger.info("Logged in as %s (ID: %s)", bot.user, getattr(bot.user, "id", "unknown"))
+    if getattr(bot, "_startup_complete", False):
+        # on_ready also fires after gateway reconnects; the one-off startup work is already done
+        logger.info("Reconnected to the gateway")
+        return
+    bot._startup_complete = True  # type: ignore[attr-defined]
+
+    if phases is not None:
+        phases.mark_ready()
+        logger.info(phases.report())
+    for line in cache_report(bot):
+        logger.info("Cache %s", line)
+    config_store_for(bot).start_watching()
+    metrics_server = getattr(getattr(bot, "services", None), "metrics_server", None)
+    if metrics_server is not None:
+        await metrics_server.start()
+    jobs_for(bot).start()
+
+    if not is_primary(bot):
+        # Commands are global and the startup DM is per deployment; the shard 0 process handles both
+        return
+
     try:
-        synced = await bot.tree.sync()
-        logger.info("Synced %d command(s)", len(synced))
+        synced = await sync_commands_if_changed(bot)
+        if synced is not None:
+            logger.info("Synced %d command(s)", synced)
     except Exception as exc:  # pragma: no cover - defensive
         logger.error("Failed to sync commands: %s", exc)
 
     if not getattr(bot, "_startup_dm_sent", False):
         try:
-            target_user = await bot.fetch_user(661212031231459329)
+            target_user = await bot.services.resolver.user(661212031231459329)  # type: ignore[attr-defined]
             await target_user.send("Barry is online and ready.")
             logger.info("Sent startup DM to lxgrf (661212031231459329)")
         except Exception as exc:  # pragma: no cover - defensive
@@ -66,17 +114,21 @@ async def load_extensions(bot: commands.Bot) -> None:
 
 
 async def main() -> None:
-    load_dotenv()
-    settings = load_settings()
-    services = build_service_container()
-    bot = create_bot(services)
+    phases = StartupPhases()
+    with phases.phase("settings"):
+        load_dotenv()
+        settings = load_settings()
+    with phases.phase("services"):
+        services = build_service_container()
+        bot = create_bot(services)
 
     @bot.event  # type: ignore[no-redef]
     async def on_ready() -> None:
-        await on_ready_event(bot)
+        await on_ready_event(bot, phases)
 
     async with bot:
-        await load_extensions(bot)
+        with phases.phase("extensions"):
+            await load_extensions(bot)
         await bot.start(settings.discord_token)
 
 
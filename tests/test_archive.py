@@ -0,0 +1,186 @@
+"""Unit tests for the incremental channel archiver."""
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from bot.core.config_store import BotConfig
+from bot.extensions.archive import Archive, failed_channels_text
+from bot.services.archive import ArchiveCursorStore, ArchiveResult, ChannelArchiver
+
+
+class FakeChannel:
+    """Channel stub serving a fixed history, honouring ``after`` like discord.py."""
+
+    def __init__(self, channel_id, message_ids, fail_after=None):
+        self.id = channel_id
+        self.message_ids = sorted(message_ids)
+        self.fail_after = fail_after
+        self.requested_after = []
+
+    def history(self, limit=None, after=None, oldest_first=False):
+        self.requested_after.append(after.id if after else None)
+
+        async def _iter():
+            for yielded, message_id in enumerate(m for m in self.message_ids if not after or m > after.id):
+                if self.fail_after is not None and yielded >= self.fail_after:
+                    raise RuntimeError("connection lost")
+                yield SimpleNamespace(
+                    id=message_id,
+                    channel=self,
+                    author=SimpleNamespace(id=1, name="alice", display_name="Alice", bot=False),
+                    created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                    edited_at=None,
+                    content=f"message {message_id}",
+                    embeds=[],
+                    attachments=[],
+                    jump_url="",
+                )
+
+        return _iter()
+
+
+def read_segments(root, guild_id, channel_id):
+    directory = os.path.join(root, str(guild_id), str(channel_id))
+    ids = []
+    for name in sorted(os.listdir(directory)):
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as handle:
+            ids.extend(json.loads(line)["id"] for line in handle)
+    return ids
+
+
+class TestArchiveCursorStore:
+    """Tests for cursor persistence."""
+
+    def test_cursor_round_trip(self, tmp_path):
+        """Cursors should survive a reload from disk."""
+        path = str(tmp_path / "cursors.json")
+        store = ArchiveCursorStore(path)
+        store.set(10, 99)
+        store.flush()
+        assert ArchiveCursorStore(path).get(10) == 99
+        assert ArchiveCursorStore(path).get(11) is None
+
+    def test_flush_keeps_other_processes_and_newer_cursors(self, tmp_path):
+        """Two processes flushing one file should keep each other's channels and the larger message ID."""
+        path = str(tmp_path / "cursors.json")
+        first, second = ArchiveCursorStore(path), ArchiveCursorStore(path)
+        first.set(10, 50)
+        first.set(12, 7)
+        first.flush()
+        second.set(11, 20)
+        second.set(12, 3)
+        second.flush()
+        assert json.loads((tmp_path / "cursors.json").read_text()) == {"10": 50, "11": 20, "12": 7}
+
+
+class TestChannelArchiver:
+    """Tests for segment writing and incremental runs."""
+
+    @pytest.mark.asyncio
+    async def test_archives_in_segments_and_advances_cursor(self, tmp_path):
+        """History should be split into segments and the cursor set to the newest ID."""
+        archiver = ChannelArchiver(root=str(tmp_path), segment_size=2)
+        channel = FakeChannel(5, [1, 2, 3, 4, 5])
+
+        results = await archiver.archive_channels(100, [channel])
+
+        assert results[0].messages == 5
+        assert results[0].segments == 3
+        assert archiver.cursors.get(5) == 5
+        assert read_segments(str(tmp_path), 100, 5) == [1, 2, 3, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_later_runs_fetch_only_newer_messages(self, tmp_path):
+        """A second run should page from the stored cursor."""
+        archiver = ChannelArchiver(root=str(tmp_path))
+        channel = FakeChannel(5, [1, 2, 3])
+        await archiver.archive_channels(100, [channel])
+
+        channel.message_ids.extend([4, 5])
+        results = await ChannelArchiver(root=str(tmp_path)).archive_channels(100, [channel])
+
+        assert channel.requested_after == [None, 3]
+        assert results[0].messages == 2
+        assert read_segments(str(tmp_path), 100, 5) == [1, 2, 3, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_interrupted_run_resumes_from_last_segment(self, tmp_path):
+        """Errors should keep completed segments and report the failure."""
+        archiver = ChannelArchiver(root=str(tmp_path), segment_size=2)
+        channel = FakeChannel(5, [1, 2, 3, 4, 5], fail_after=3)
+
+        results = await archiver.archive_channels(100, [channel])
+
+        assert results[0].error == "connection lost"
+        assert archiver.cursors.get(5) == 2
+
+
+class FakeUser:
+    def __init__(self, role_names):
+        self.id = 7
+        self.mention = "<@7>"
+        self.roles = [SimpleNamespace(name=name) for name in role_names]
+        self.dms = []
+
+    async def send(self, **kwargs):
+        self.dms.append(kwargs)
+
+
+class FakeInteraction:
+    def __init__(self, guild_id, user):
+        self.guild = SimpleNamespace(id=guild_id)
+        self.user = user
+        self.channel = SimpleNamespace(id=1)
+        self.followups = []
+        self.response = SimpleNamespace(defer=self._defer)
+        self.followup = SimpleNamespace(send=self._followup)
+
+    async def _defer(self, **kwargs):
+        return None
+
+    async def _followup(self, **kwargs):
+        self.followups.append(kwargs)
+
+
+class TestArchiveCommand:
+    """Tests for the /archive command running in the background."""
+
+    @pytest.mark.asyncio
+    async def test_replies_at_once_and_dms_results(self, tmp_path):
+        """The command should answer before the run finishes, refuse a second run and DM the totals."""
+        cfg = BotConfig.from_module(config)
+        guild_id = next(gid for gid, gcfg in cfg.guild_index.items() if gcfg.archive_order)
+        channel_ids = cfg.guild(guild_id).archive_order
+        channels = {channel_ids[0]: FakeChannel(channel_ids[0], [1, 2, 3])}
+        bot = SimpleNamespace(
+            services=SimpleNamespace(config=SimpleNamespace(current=cfg), archiver=ChannelArchiver(root=str(tmp_path))),
+            get_channel=channels.get,
+        )
+        cog = Archive(bot)
+        user = FakeUser(["Staff"])
+
+        first = FakeInteraction(guild_id, user)
+        await cog.archive.callback(cog, first)
+        assert "Archive started" in first.followups[0]["embed"].description
+        assert user.dms == []
+
+        second = FakeInteraction(guild_id, user)
+        await cog.archive.callback(cog, second)
+        assert "already in progress" in second.followups[0]["embed"].description
+
+        await cog._manual_run
+        assert user.dms[0]["embed"].description == "Archived 3 new message(s) from 1 channel(s)."
+
+    def test_failed_channel_list_is_capped(self):
+        """A long failure list should stay under the limit and count the channels left out."""
+        failed = [ArchiveResult(channel_id=1000 + i, error="403 Forbidden (error code: 50001): Missing Access") for i in range(150)]
+        text = failed_channels_text(failed)
+        assert len(text) <= 3500
+        shown = text.count("\n")
+        assert text.endswith(f"…and {150 - shown} more")
+        assert failed_channels_text(failed[:2]) == "\n".join(f"<#{r.channel_id}>: {r.error}" for r in failed[:2])
@@ -0,0 +1,162 @@
+"""Unit tests for the data-driven auto-responder rules engine."""
+import json
+import os
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from bot.extensions._helpers import autoresponders
+from bot.extensions._helpers.autoresponders import (
+    AutoResponderEngine,
+    AutoResponderRule,
+    AutoResponderRuleSet,
+    LiteralMatcher,
+    load_rules,
+)
+from bot.extensions._helpers.dispatch import MessageContext
+
+
+def make_ctx(content="", name="alice", bot=False, channel_id=20, embeds=None):
+    message = SimpleNamespace(
+        id=99,
+        content=content,
+        author=SimpleNamespace(id=1, name=name, bot=bot),
+        guild=SimpleNamespace(id=10),
+        channel=SimpleNamespace(id=channel_id, category_id=None),
+        embeds=embeds or [],
+    )
+    return MessageContext(message, resolve_user=lambda m: {"user_id": 1, "username": "alice"})
+
+
+def rule(**overrides):
+    data = {"name": "r", "triggers": ["hello"], "response": "hi!"}
+    data.update(overrides)
+    return AutoResponderRule.from_dict(data)
+
+
+@pytest.fixture(params=["c", "python"])
+def automaton(request, monkeypatch):
+    """Run a test against pyahocorasick and against the pure-Python fallback."""
+    if request.param == "c" and autoresponders.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    if request.param == "python":
+        monkeypatch.setattr(autoresponders, "ahocorasick", None)
+    return request.param
+
+
+class TestLiteralMatcher:
+    """Tests for the single-pass multi-literal matcher."""
+
+    def test_finds_overlapping_and_nested_literals(self, automaton):
+        """Every literal present should be reported, even inside a longer match."""
+        matcher = LiteralMatcher(["go to", "go to marketplace", "market", "absent"])
+        assert matcher.find("please go to marketplace now") == {"go to", "go to marketplace", "market"}
+
+    def test_suffix_literals_found_through_failure_links(self, automaton):
+        """Literals that start inside a partial match of a longer one should still be found."""
+        matcher = LiteralMatcher(["abcd", "bcx", "c", "she", "he", "hers"])
+        assert matcher.find("abcx ushers") == {"bcx", "c", "she", "he", "hers"}
+        assert matcher.find("abcd") == {"abcd", "c"}
+
+    def test_agrees_with_substring_checks(self, automaton):
+        """On random text the matcher should report exactly the literals ``in`` finds."""
+        rng = random.Random(5)
+        literals = ["".join(rng.choice("abc ") for _ in range(rng.randint(1, 6))) for _ in range(200)]
+        matcher = LiteralMatcher(literals)
+        for _ in range(50):
+            text = "".join(rng.choice("abcd ") for _ in range(rng.randint(0, 80)))
+            assert matcher.find(text) == {literal for literal in matcher.literals if literal in text}
+
+    def test_empty_matcher(self, automaton):
+        """A matcher without literals should never match."""
+        assert LiteralMatcher([]).find("anything") == set()
+
+
+class TestAutoResponderRule:
+    """Tests for rule parsing and validation."""
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"name": "r", "response": "x"},
+            {"name": "r", "triggers": [], "response": "x"},
+            {"name": "r", "triggers": ["a"], "response": "x", "authors": ["robots"]},
+            {"name": "r", "triggers": ["a"], "response": "x", "cooldown_scope": "key"},
+            {"name": "r", "triggers": ["a"], "response": "x", "cooldown_scope": "galaxy"},
+            {"name": "r", "triggers": "hello", "response": "x"},
+            {"name": "r", "triggers": ["a"], "response": "x", "unless": "bye"},
+            {"name": "r", "triggers": ["a"], "response": "x", "channel_ids": "123"},
+        ],
+    )
+    def test_invalid_rules_raise(self, data):
+        """Malformed rules should raise ValueError."""
+        with pytest.raises(ValueError):
+            AutoResponderRule.from_dict(data)
+
+    def test_key_pattern_builds_cooldown_key(self):
+        """A key_pattern should scope the cooldown to its first group."""
+        spellbook = rule(triggers=["homebrew"], key_pattern=r"^(.+?) knows \d+ spells?", cooldown_scope="key")
+        ctx = make_ctx("Aria knows 3 spells\nhomebrew")
+        assert spellbook.cooldown_key(ctx) == "autoresponder:r:Aria"
+        assert spellbook.cooldown_key(make_ctx("homebrew")) is None
+
+
+class TestAutoResponderEngine:
+    """Tests for evaluating many rules against one message."""
+
+    def test_unless_literals_suppress_rule(self):
+        """A rule should not fire when one of its exclusion literals is present."""
+        engine = AutoResponderEngine([rule(unless=["goodbye"])])
+        assert [r.name for r, _ in engine.match(make_ctx("Hello there"))] == ["r"]
+        assert engine.match(make_ctx("hello and goodbye")) == []
+
+    def test_author_and_channel_scopes(self):
+        """Rules should only fire for their author kinds and channels."""
+        engine = AutoResponderEngine(
+            [
+                rule(name="avrae_only", authors=["avrae"]),
+                rule(name="channel_only", channel_ids=[21]),
+                rule(name="not_here", exclude_channel_ids=[20]),
+            ]
+        )
+        assert engine.match(make_ctx("hello")) == []
+        names = {r.name for r, _ in engine.match(make_ctx("hello", name="Avrae", bot=True, channel_id=21))}
+        assert names == {"avrae_only"}
+        names = {r.name for r, _ in engine.match(make_ctx("hello", channel_id=21))}
+        assert names == {"channel_only", "not_here"}
+
+    def test_match_is_memoised_on_context(self):
+        """A predicate and its handler should share one scan of the message."""
+        engine = AutoResponderEngine([rule()])
+        ctx = make_ctx("hello")
+        assert engine.match(ctx) is engine.match(ctx)
+
+
+class TestAutoResponderRuleSet:
+    """Tests for loading rules from disk and reloading on change."""
+
+    def test_defaults_used_without_file(self, tmp_path):
+        """Missing rule files should fall back to the defaults."""
+        defaults = [{"name": "d", "triggers": ["x"], "response": "y"}]
+        assert [r.name for r in load_rules(str(tmp_path / "missing.json"), defaults)] == ["d"]
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        """Editing the rules file should take effect without a restart."""
+        path = tmp_path / "autoresponders.json"
+        path.write_text(json.dumps([{"name": "one", "triggers": ["x"], "response": "y"}]))
+        rules = AutoResponderRuleSet(str(path), check_interval=0)
+        assert [r.name for r in rules.engine.rules] == ["one"]
+
+        path.write_text(json.dumps({"rules": [{"name": "two", "triggers": ["x"], "response": "y"}]}))
+        os.utime(path, (1, 1))
+        assert [r.name for r in rules.engine.rules] == ["two"]
+
+    def test_invalid_file_keeps_previous_rules(self, tmp_path):
+        """A broken edit should be ignored rather than disabling every responder."""
+        path = tmp_path / "autoresponders.json"
+        path.write_text(json.dumps([{"name": "one", "triggers": ["x"], "response": "y"}]))
+        rules = AutoResponderRuleSet(str(path), check_interval=0)
+        path.write_text(json.dumps([{"name": "broken"}]))
+        os.utime(path, (1, 1))
+        assert [r.name for r in rules.engine.rules] == ["one"]
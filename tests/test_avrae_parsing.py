@@ -0,0 +1,94 @@
+"""Unit tests for the Avrae embed parsers (bot/extensions/_helpers/avrae.py)."""
+import pytest
+
+from bot.extensions._helpers.avrae import (
+    contribution_key,
+    level_ups_records,
+    parse_contribution_points,
+    parse_level_ups,
+    scan_contributions,
+)
+
+
+def record(content="", embeds=()):
+    return {"content": content, "embeds": [{"fields": [], **embed} for embed in embeds]}
+
+
+class TestContributionPoints:
+    """Tests for the "That's N contribution points" parser."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("That's 25 contribution points", 25),
+            ("That’s 8 contribution points", 8),
+            ("That's **25** contribution points", 25),
+            ("That's only _3_ contribution points", 3),
+            ("That's 1,234 contribution points", 1234),
+            ("THAT'S 12 CONTRIBUTION POINTS", 12),
+            ("That's\u200b 7 contribution points", 7),
+        ],
+    )
+    def test_variants_from_the_guide(self, text, expected):
+        """Every variant listed in docs/avrae_message_guide.md should parse."""
+        assert parse_contribution_points(text) == expected
+
+    @pytest.mark.parametrize("text", ["", "That's 25 experience points", "Contribution points so far: 40"])
+    def test_non_matches(self, text):
+        """Text without the contribution phrase should return None."""
+        assert parse_contribution_points(text) is None
+
+
+class TestLevelUps:
+    """Tests for the level-up line parser."""
+
+    def test_each_phrasing(self):
+        """All three Avrae phrasings should yield the character and level."""
+        text = "\n".join(
+            [
+                "Aria gains 6,500 Experience and levels up to **5th** level!",
+                "Brom leveled up to 11th level",
+                "Cerys reaches level 3",
+            ]
+        )
+        assert sorted(parse_level_ups(text)) == [("Aria", 5), ("Brom", 11), ("Cerys", 3)]
+
+    def test_spell_levels_are_ignored(self):
+        """Spell-slot lines mention levels but are not level-ups."""
+        assert parse_level_ups("Aria casts Fireball at 3rd level!") == []
+
+
+class TestRecordScans:
+    """Tests for the batch parsers the worker pool runs over transcript records."""
+
+    def test_points_are_keyed_by_embed_title(self):
+        """Each embed with points should count under the first word of its title."""
+        scan = scan_contributions(record(embeds=[
+            {"title": "**Tamsin** works the forge", "description": "That's 25 contribution points"},
+            {"title": "Rowan studies", "description": "That's only 3 contribution points"},
+        ]))
+        assert [(key, points) for key, points, _ in scan.matches] == [("Tamsin", 25), ("Rowan", 3)]
+        assert not scan.missed
+
+    def test_whole_message_fallback(self):
+        """Points outside embed descriptions should be found in the whole message."""
+        scan = scan_contributions(record("- Bryn: That's 4 contribution points"))
+        assert [(key, points) for key, points, _ in scan.matches] == [("Bryn", 4)]
+
+    def test_unmatched_and_empty_records(self):
+        """Records without points are flagged as missed; empty records are not counted."""
+        assert scan_contributions(record("just chatting")).missed
+        empty = scan_contributions(record())
+        assert empty.text == "" and not empty.missed and not empty.matches
+
+    def test_key_falls_back_past_bullets(self):
+        """Lines that are only markdown bullets should not end key extraction."""
+        assert contribution_key(record("---\n* Lyra")) == "Lyra"
+
+    def test_level_ups_include_embed_authors(self):
+        """Level-ups should be read from content, embed text and embed author names."""
+        records = [
+            record("Ansa levels up to 5th level!"),
+            record(embeds=[{"author": "Orrin reaches level 7", "description": "Congratulations"}]),
+        ]
+        assert level_ups_records(records) == [("Ansa", 5), ("Orrin", 7)]
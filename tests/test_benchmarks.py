@@ -0,0 +1,186 @@
+"""Tests for the simulated-guild benchmark harness (benchmarks/)."""
+import asyncio
+import sys
+
+import pytest
+
+pytest.importorskip("discord")
+
+from benchmarks.avrae_corpus import KINDS, generate_corpus  # noqa: E402
+from benchmarks.parsers import PARSERS, benchmark_literal_scaling, benchmark_parser  # noqa: E402
+from benchmarks.replay import percentile, replay  # noqa: E402
+from benchmarks.run import SCENARIOS, compare, run_benchmark  # noqa: E402
+from benchmarks.simulated_guild import SILVERYMOON_GUILD_ID, GuildSpec, SimulatedWorld  # noqa: E402
+from bot.extensions.listeners import Listeners  # noqa: E402
+from bot.services.event_capture import Anonymiser, EventRecorder  # noqa: E402
+
+# test_utils.py imports utils against a mocked discord; don't hand it the real-discord copy loaded above
+sys.modules.pop("utils", None)
+
+SMALL = GuildSpec(
+    channels=3, messages_per_channel=150, members=12, downtime_messages=250, level_up_messages=20, latency=0.0, global_rate=0
+)
+
+
+async def collect(iterator):
+    return [message async for message in iterator]
+
+
+class TestSimulatedChannel:
+    """Tests for the fake channel's history paging."""
+
+    @pytest.mark.asyncio
+    async def test_history_pages_newest_first(self):
+        """History should default to newest first and cost one request per 100 messages."""
+        world = SimulatedWorld(SMALL)
+        channel = world.rp_channels[0]
+        messages = await collect(channel.history(limit=150))
+        assert [m.id for m in messages] == [m.id for m in reversed(channel.messages)]
+        assert world.rest.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_after_defaults_to_oldest_first(self):
+        """Passing ``after`` should switch to oldest first, like discord.py."""
+        world = SimulatedWorld(SMALL)
+        channel = world.rp_channels[0]
+        cutoff = channel.messages[100].created_at
+        messages = await collect(channel.history(limit=10, after=cutoff))
+        assert messages[0].id == channel.messages[101].id
+        assert all(m.created_at > cutoff for m in messages)
+
+    @pytest.mark.asyncio
+    async def test_rate_limits_are_recorded(self):
+        """Requests beyond the global rate should wait and record that wait on the trace."""
+        world = SimulatedWorld(GuildSpec(**{**SMALL.__dict__, "global_rate": 2}))
+        with world.tracer.trace("command", "burst") as trace:
+            for _ in range(3):
+                await world.rest.request("GET", "/users/{user_id}")
+        assert trace.summary()["rest"]["ratelimit_wait_ms"] > 0
+
+    def test_worlds_are_reproducible(self):
+        """The same seed should produce the same history."""
+        first, second = SimulatedWorld(SMALL), SimulatedWorld(SMALL)
+        assert [m.content for m in first.downtimes.messages] == [m.content for m in second.downtimes.messages]
+
+
+class TestScenarios:
+    """Each benchmarked command should run to completion against the simulated guild."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("name", sorted(SCENARIOS))
+    async def test_command_runs(self, name):
+        """The command should page history and send at least one response."""
+        result = await run_benchmark(name, SMALL, repeat=1, measure_memory=False)
+        assert result.rest_calls > 0
+        assert result.responses > 0
+        assert any(route["route"] == "GET /channels/{channel_id}/messages" for route in result.routes)
+
+    @pytest.mark.asyncio
+    async def test_contributions_totals_match_history(self):
+        """/contributions should DM a grand total equal to the points in the simulated channel."""
+        world = SimulatedWorld(SMALL)
+        await SCENARIOS["contributions"](world)
+        expected = sum(
+            int(m.embeds[0].description.split("**")[1]) for m in world.downtimes.messages if m.embeds
+        )
+        dm = world.staff.dm_channel.sent[0]["embed"]
+        assert f"Grand total: {expected} points" in dm.description
+
+    def test_compare_reports_relative_change(self):
+        """Comparisons should show the percentage change against the baseline."""
+        result = asyncio.run(run_benchmark("log", SMALL, repeat=1, measure_memory=False))
+        baseline = {"log": {"wall_seconds": result.wall_seconds * 2, "rest_calls": result.rest_calls, "peak_memory_bytes": 0}}
+        assert compare([result], baseline)[0].startswith("log              wall -50.0%, calls +0.0%")
+
+
+class TestAvraeCorpus:
+    """Tests for the labelled Avrae corpus and the parser benchmark."""
+
+    def test_corpus_is_reproducible_and_covers_every_kind(self):
+        """The same seed should give the same corpus, with every kind represented."""
+        first, second = generate_corpus(2000, seed=3), generate_corpus(2000, seed=3)
+        assert [m.embeds for m in first] == [m.embeds for m in second]
+        assert {m.kind for m in first} == set(KINDS)
+
+    @pytest.mark.parametrize("name", list(PARSERS))
+    def test_plain_messages_parse_exactly(self, name):
+        """Unvaried Avrae messages, near misses aside, should be parsed with full precision and recall."""
+        corpus = [
+            m for m in generate_corpus(1500)
+            if m.variant == "plain" and m.author.name == "Avrae" and not m.kind.endswith("near_miss")
+        ]
+        result = benchmark_parser(name, corpus, repeat=1)
+        assert result.messages_per_second > 0
+        assert (result.precision, result.recall) == (1.0, 1.0), (result.misses, result.false_alarms)
+
+    def test_misses_are_reported_by_variant(self):
+        """Known gaps, such as zero-width spaces inside trigger phrases, should show up as labelled misses."""
+        corpus = generate_corpus(500, kinds=["spellbook"])
+        result = benchmark_parser("triggers", corpus, repeat=1)
+        assert set(result.misses) == {"spellbook/zero_width"}
+        assert result.recall < 1.0
+
+    def test_literal_scan_cost_does_not_grow_with_rule_count(self):
+        """A hundredfold increase in literals should cost well under a hundredfold per message."""
+        corpus = generate_corpus(1000)
+        small, large = benchmark_literal_scaling(corpus, [10, 1000], repeat=3)
+        assert (small.literals, large.literals) == (10, 1000)
+        assert large.microseconds_per_message < 5 * small.microseconds_per_message
+
+
+def write_capture(path):
+    """A short capture: a nyoom, an Avrae marketplace error, and an opt-out reaction to Barry's own message."""
+    times = iter([0.0, 0.0, 0.1, 0.2, 0.3, 0.4])
+    anonymiser = Anonymiser(salt=b"s", keep_patterns=(Listeners.NYOOM_PATTERN,))
+    recorder = EventRecorder(str(path), anonymiser, bot_user_id=1, clock=lambda: next(times))
+    guild, channel = str(SILVERYMOON_GUILD_ID), "555"
+    human = {"id": "4242", "username": "someone", "bot": False}
+    recorder.record("MESSAGE_CREATE", {"id": "10", "channel_id": channel, "guild_id": guild, "author": human, "content": "nyooom"})
+    recorder.record(
+        "MESSAGE_CREATE",
+        {
+            "id": "11", "channel_id": channel, "guild_id": guild,
+            "author": {"id": "261302296103747584", "username": "Avrae", "bot": True},
+            "embeds": [{"title": "Error", "description": "You do not have access to Fireball. go to Marketplace to unlock it."}],
+        },
+    )
+    recorder.record(
+        "MESSAGE_CREATE",
+        {"id": "12", "channel_id": channel, "guild_id": guild, "author": {"id": "1", "username": "barry", "bot": True}, "content": "Hi"},
+    )
+    recorder.record(
+        "MESSAGE_REACTION_ADD",
+        {"user_id": "4242", "channel_id": channel, "message_id": "12", "guild_id": guild, "emoji": {"name": "❌"}},
+    )
+    recorder.record("MESSAGE_CREATE", {"id": "13", "channel_id": "9", "guild_id": "1", "author": human, "content": "nyooom"})
+    recorder.close()
+
+
+class TestReplay:
+    """Tests for replaying captured events into the Listeners cog."""
+
+    def test_percentile_uses_nearest_rank(self):
+        """Percentiles should pick an observed value."""
+        assert percentile([0.3, 0.1, 0.2, 0.4], 0.5) == 0.2
+        assert percentile([], 0.9) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_replay_reports_responses_and_rest_calls(self, tmp_path, monkeypatch):
+        """Replayed events should produce the replies, opt-out and digest the live cog would send."""
+        monkeypatch.setenv("BARRY_DATA_DIR", str(tmp_path))
+        path = tmp_path / "events.jsonl"
+        write_capture(path)
+        spec = GuildSpec(channels=0, members=0, downtime_messages=0, level_up_messages=0, latency=0.0, global_rate=0)
+        report = await replay(str(path), speed=100, spec=spec)
+
+        assert report.events == {"MESSAGE_CREATE": 4, "MESSAGE_REACTION_ADD": 1}
+        assert report.errors == 0
+        assert len(report.latencies["MESSAGE_CREATE"]) == 4
+        texts = [response.get("content") or response.get("reaction") for response in report.responses]
+        assert "## 🏎️ nyooooom 🏎️" in texts and "🏎️" in texts
+        assert any("D&D Beyond doesn't want you" in text for text in texts)
+        assert any(text.startswith("Thank you") for text in texts)
+        assert any("notification(s) from opt-outs" in text for text in texts)
+        sent = [response for response in report.responses if "content" in response]
+        assert report.routes["POST /channels/{channel_id}/messages"] == len(sent)
+        assert report.rest_calls == sum(report.routes.values())
@@ -0,0 +1,132 @@
+"""Unit tests for precomputed channel activity reports."""
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from bot.core.config_store import BotConfig
+from bot.services.channel_reports import (
+    NO_STALE_DESCRIPTION,
+    ChannelEntry,
+    ChannelReport,
+    ChannelReportCache,
+    build_channel_report,
+)
+
+GUILD_ID = 1114617197931790376  # Test Server: yellow 14 days, red 31
+NOW = datetime(2024, 3, 4, 5, 0, tzinfo=timezone.utc)
+
+
+def author(user_id, name):
+    return SimpleNamespace(id=user_id, name=name)
+
+
+class FakeChannel:
+    """Channel stub serving messages newest first, as ``history`` does."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.limits = []
+
+    def history(self, limit=None):
+        self.limits.append(limit)
+
+        async def _iter():
+            for message in self.messages[:limit]:
+                yield message
+
+        return _iter()
+
+
+def message(user, days_ago):
+    return SimpleNamespace(author=user, created_at=NOW - timedelta(days=days_ago))
+
+
+def guild_config(channel_ids):
+    data = BotConfig.from_module(config).to_mapping()
+    data["monitored_channels"] = {GUILD_ID: channel_ids}
+    return BotConfig.from_mapping(data).guild(GUILD_ID)
+
+
+class TestBuildChannelReport:
+    """Tests for reading channel history into a report."""
+
+    @pytest.mark.asyncio
+    async def test_classifies_channels_and_collects_participants(self):
+        """Stale channels should list the authors since the last Avrae post; closed and fresh ones should not."""
+        avrae = author(9, "Avrae")
+        alice, bob = author(1, "alice"), author(2, "bob")
+        channels = {
+            10: FakeChannel([message(alice, 40), message(bob, 41), message(alice, 42), message(avrae, 43), message(bob, 44)]),
+            11: FakeChannel([message(avrae, 60), message(alice, 61)]),
+            12: FakeChannel([message(bob, 20)]),
+            13: FakeChannel([]),
+        }
+        client = SimpleNamespace(get_channel=channels.get)
+
+        report = await build_channel_report(client, guild_config([10, 11, 12, 13, 14]), NOW)
+
+        assert [entry.channel_id for entry in report.channels] == [10, 11, 12]
+        assert report.stale == [(10, [1, 2])]
+        assert all(channel.limits == [25] for channel in channels.values())
+
+        active = report.active_description()
+        assert ":red_circle: <#10>: 24/01/2024 (40 days ago)" in active
+        assert ":yellow_circle: <#12>: 13/02/2024 (20 days ago)" in active
+        assert "<#11>" not in active
+        assert report.ping_text().endswith("<#10>: (<@1>, <@2>)\n")
+        assert report.ping_description().startswith("Copy and paste the below")
+
+    def test_cached_report_renders_as_of_generation(self):
+        """Reloaded days later, a report should show the colours and ages it had when built."""
+        report = ChannelReport(
+            guild_id=GUILD_ID,
+            generated_at=NOW.timestamp(),
+            yellow_days=14,
+            red_days=31,
+            channels=[ChannelEntry(12, (NOW - timedelta(days=10)).timestamp(), False)],
+        )
+        reloaded = ChannelReport.from_dict(json.loads(json.dumps(report.to_dict())))
+        assert ":green_circle: <#12>: 23/02/2024 (10 days ago)" in reloaded.active_description()
+        assert reloaded.ping_description() == NO_STALE_DESCRIPTION
+
+    def test_empty_report_has_good_news(self):
+        """A report without stale channels should show the all-clear message."""
+        report = ChannelReport(guild_id=GUILD_ID, generated_at=NOW.timestamp(), yellow_days=7, red_days=14)
+        assert report.ping_text() is None
+        assert report.ping_description() == NO_STALE_DESCRIPTION
+        assert report.active_description() is None
+
+
+class TestChannelReportCache:
+    """Tests for caching reports on the data volume."""
+
+    def report(self, guild_id, generated_at):
+        return ChannelReport(guild_id=guild_id, generated_at=generated_at, yellow_days=7, red_days=14, stale=[(10, [1])])
+
+    def test_round_trip_and_max_age(self, tmp_path):
+        """A flushed report should reload intact and be ignored once older than ``max_age``."""
+        path = str(tmp_path / "reports.json")
+        cache = ChannelReportCache(path)
+        cache.put(self.report(GUILD_ID, NOW.timestamp()))
+        cache.flush()
+
+        reloaded = ChannelReportCache(path)
+        assert reloaded.get(GUILD_ID) == self.report(GUILD_ID, NOW.timestamp())
+        assert reloaded.get(GUILD_ID, max_age=timedelta(days=8), now=NOW + timedelta(days=7)) is not None
+        assert reloaded.get(GUILD_ID, max_age=timedelta(days=8), now=NOW + timedelta(days=9)) is None
+
+    def test_merge_keeps_newer_reports(self, tmp_path):
+        """A flush should keep other processes' guilds and never replace a newer report with an older one."""
+        path = tmp_path / "reports.json"
+        newer = self.report(2, NOW.timestamp() + 60).to_dict()
+        path.write_text(json.dumps({"2": newer, "3": self.report(3, 1.0).to_dict()}))
+        cache = ChannelReportCache(str(path))
+        cache.put(self.report(2, NOW.timestamp()))
+        cache.put(self.report(1, NOW.timestamp()))
+        cache.flush()
+        saved = json.loads(path.read_text())
+        assert set(saved) == {"1", "2", "3"}
+        assert saved["2"] == newer
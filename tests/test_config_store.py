@@ -0,0 +1,146 @@
+"""Unit tests for the file-backed, hot-reloadable configuration store."""
+import json
+import os
+from types import ModuleType
+
+import pytest
+
+import config
+from bot.core.config_store import BotConfig, ConfigError, ConfigStore
+
+
+def defaults_module():
+    """A throwaway copy of config.py so tests never mutate the real module."""
+    module = ModuleType("config_copy")
+    for key, value in vars(config).items():
+        if not key.startswith("__"):
+            setattr(module, key, value)
+    return module
+
+
+def write_settings(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, (mtime, mtime))
+
+
+class TestBotConfig:
+    """Tests for validating and coercing settings."""
+
+    def test_defaults_from_config_module(self):
+        """config.py should load as a valid snapshot with the same values."""
+        cfg = BotConfig.from_module(config)
+        assert cfg.monitored_channels == config.monitored_channels
+        assert cfg.ignore_list == config.IGNORE_LIST
+        assert cfg.github_issue_repo == config.GITHUB_ISSUE_REPO
+
+    def test_json_keys_are_coerced_to_ints(self):
+        """Guild-keyed settings from JSON (string keys) should become int-keyed."""
+        data = BotConfig.from_module(config).to_mapping()
+        data["monitored_channels"] = {"1": ["2", 3]}
+        cfg = BotConfig.from_mapping(data)
+        assert cfg.monitored_channels == {1: [2, 3]}
+
+    @pytest.mark.parametrize(
+        "override",
+        [
+            {"warning_threshold": 60},
+            {"monitored_channels": ["not", "a", "dict"]},
+            {"channeltimes": {"1": {"yellow": 7}}},
+            {"not_a_setting": True},
+        ],
+    )
+    def test_invalid_settings_raise(self, override):
+        """Malformed settings should raise ConfigError."""
+        data = {**BotConfig.from_module(config).to_mapping(), **override}
+        with pytest.raises(ConfigError):
+            BotConfig.from_mapping(data)
+
+
+class TestGuildIndex:
+    """Tests for the precomputed per-guild view of a snapshot."""
+
+    def build(self, **overrides):
+        data = BotConfig.from_module(config).to_mapping()
+        data.update(overrides)
+        return BotConfig.from_mapping(data)
+
+    def test_monitored_channels_are_deduplicated_in_order(self):
+        """Duplicate channel IDs should collapse without reordering the rest."""
+        cfg = self.build(monitored_channels={"1": [30, 10, 30, 20]})
+        gcfg = cfg.guild(1)
+        assert gcfg.monitored_order == (30, 10, 20)
+        assert gcfg.monitored == frozenset({10, 20, 30})
+
+    def test_tldr_eligibility_applies_exclusions(self):
+        """TL;DR should cover monitored plus additional channels, minus exclusions."""
+        cfg = self.build(
+            monitored_channels={"1": [10, 11]},
+            tldr_additional_channels={"1": [12]},
+            tldr_excluded_channels={"1": [11]},
+        )
+        gcfg = cfg.guild("1")
+        assert gcfg.tldr_sources == frozenset({10, 11, 12})
+        assert gcfg.tldr_eligible == frozenset({10, 12})
+        assert gcfg.archive_order == (10, 11, 12)
+
+    def test_unknown_guild_returns_none(self):
+        """Guilds missing from every setting should not be indexed."""
+        assert BotConfig.from_module(config).guild(1) is None
+        assert BotConfig.from_module(config).guild(None) is None
+
+    def test_ai_and_authorisation_flags(self):
+        """String guild IDs from the guilds and AI lists should resolve to int-keyed flags."""
+        cfg = self.build(guilds={"5": "Waterdeep"}, ai_enabled_servers=["5"], monitored_channels={})
+        gcfg = cfg.guild(5)
+        assert gcfg.is_known and gcfg.ai_enabled
+        assert gcfg.description == "Waterdeep"
+        assert not gcfg.is_monitored
+        assert cfg.ai_enabled_guild_ids == frozenset({5})
+
+    def test_derived_fields_stay_out_of_mapping(self):
+        """Round-tripping a snapshot should not leak the derived index into settings."""
+        cfg = BotConfig.from_module(config)
+        mapping = cfg.to_mapping()
+        assert "guild_index" not in mapping
+        assert BotConfig.from_mapping(mapping) == cfg
+
+
+class TestConfigStore:
+    """Tests for overrides, reloads and listeners."""
+
+    def test_overrides_apply_and_reload(self, tmp_path):
+        """Edits to the settings file should swap in a new snapshot and notify listeners."""
+        path = tmp_path / "settings.json"
+        module = defaults_module()
+        store = ConfigStore(module, str(path))
+        assert store.current.inactivity_threshold == config.inactivity_threshold
+
+        seen = []
+        store.subscribe(lambda cfg: seen.append(cfg.ignore_list))
+        before = store.current
+        write_settings(path, {"inactivity_threshold": 60, "ignore_list": ["SomeOne"]}, 1)
+        assert store.check_for_changes() is True
+        assert store.current.inactivity_threshold == 60
+        assert before.inactivity_threshold == config.inactivity_threshold
+        assert seen == [["someone"]]
+        assert module.IGNORE_LIST == ["someone"]
+        assert store.check_for_changes() is False
+
+    def test_invalid_file_keeps_previous_snapshot(self, tmp_path):
+        """A broken edit should be reported and ignored."""
+        path = tmp_path / "settings.json"
+        store = ConfigStore(defaults_module(), str(path))
+        write_settings(path, {"warning_threshold": "soon"}, 1)
+        assert store.check_for_changes() is False
+        assert store.current.warning_threshold == config.warning_threshold
+        assert "Thresholds" in store.last_error
+
+    def test_removing_file_restores_defaults(self, tmp_path):
+        """Deleting the settings file should fall back to config.py."""
+        path = tmp_path / "settings.json"
+        write_settings(path, {"inactivity_threshold": 60}, 1)
+        store = ConfigStore(defaults_module(), str(path))
+        assert store.current.inactivity_threshold == 60
+        path.unlink()
+        assert store.check_for_changes() is True
+        assert store.current.inactivity_threshold == config.inactivity_threshold
@@ -0,0 +1,90 @@
+"""Unit tests for the persisted cooldown store."""
+import asyncio
+import json
+
+import pytest
+
+from bot.services.cooldowns import CooldownStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCooldownStore:
+    """Tests for expiry, bounding and persistence."""
+
+    def test_acquire_blocks_until_expiry(self, tmp_path):
+        """A key should be unavailable for its TTL and ready again afterwards."""
+        clock = FakeClock()
+        store = CooldownStore(str(tmp_path / "cd.json"), default_ttl=60, clock=clock)
+        assert store.acquire("sbb:Tav") is True
+        assert store.acquire("sbb:Tav") is False
+        assert store.remaining("sbb:Tav") == 60
+        clock.now += 61
+        assert store.ready("sbb:Tav")
+        assert len(store) == 0
+
+    def test_reset_releases_key(self, tmp_path):
+        """Resetting a key should make it ready immediately."""
+        store = CooldownStore(str(tmp_path / "cd.json"), clock=FakeClock())
+        store.start("k", ttl=100)
+        store.reset("k")
+        assert store.ready("k")
+
+    def test_store_is_bounded(self, tmp_path):
+        """The least recently started key should be evicted past maxsize."""
+        store = CooldownStore(str(tmp_path / "cd.json"), maxsize=2, clock=FakeClock())
+        for key in ("a", "b", "c"):
+            store.start(key)
+        assert store.ready("a")
+        assert not store.ready("b") and not store.ready("c")
+
+    def test_flush_persists_only_live_keys(self, tmp_path):
+        """Expired keys should not be written, and live keys should reload after a restart."""
+        path = tmp_path / "cd.json"
+        clock = FakeClock()
+        store = CooldownStore(str(path), clock=clock)
+        store.start("short", ttl=5)
+        store.start("long", ttl=500)
+        clock.now += 10
+        store.flush()
+        assert json.loads(path.read_text()) == {"long": 1500.0}
+
+        reloaded = CooldownStore(str(path), clock=clock)
+        assert not reloaded.ready("long")
+        assert reloaded.ready("short")
+
+    def test_flush_merges_cooldowns_from_other_processes(self, tmp_path):
+        """Live keys written by another store should survive a flush; locally reset keys should not."""
+        path = tmp_path / "cd.json"
+        clock = FakeClock()
+        first, second = CooldownStore(str(path), clock=clock), CooldownStore(str(path), clock=clock)
+        first.start("a", ttl=100)
+        first.start("shared", ttl=100)
+        first.flush()
+        second.start("b", ttl=200)
+        second.flush()
+        assert json.loads(path.read_text()) == {"a": 1100.0, "shared": 1100.0, "b": 1200.0}
+
+        first.reset("shared")
+        first.flush()
+        assert json.loads(path.read_text()) == {"a": 1100.0, "b": 1200.0}
+
+    @pytest.mark.asyncio
+    async def test_reset_during_background_write_is_kept(self, tmp_path):
+        """A key reset while a background flush is writing should stay reset on the next flush."""
+        path = tmp_path / "cd.json"
+        store = CooldownStore(str(path), clock=FakeClock(), flush_interval=60)
+        store.start("a", ttl=100)
+        flushing = asyncio.get_running_loop().create_task(store.flush_async())
+        await asyncio.sleep(0)
+        store.reset("a")
+        await flushing
+        assert json.loads(path.read_text()) == {"a": 1100.0}
+        store.flush()
+        assert json.loads(path.read_text()) == {}
@@ -0,0 +1,151 @@
+"""Unit tests for notification digest batching."""
+import asyncio
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+import config
+from bot.core.config_store import BotConfig
+from bot.extensions._helpers.digest import Notification, NotificationDigest, render_digest
+from bot.extensions._helpers.dispatch import MessageContext
+from bot.extensions.listeners import Listeners
+
+
+class Recorder:
+    def __init__(self):
+        self.flushes = []
+
+    async def __call__(self, group, items):
+        self.flushes.append((group, [item.title for item in items]))
+
+
+class TestNotificationDigest:
+    """Tests for windowed, size-capped and urgent delivery."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_window(self):
+        """Buffered notifications should be delivered together once the window ends."""
+        recorder = Recorder()
+        digest = NotificationDigest(recorder, window=0.01)
+        await digest.add(Notification("a", "x", group="#tavern"))
+        await digest.add(Notification("b", "y", group="#tavern"))
+        assert recorder.flushes == []
+        await asyncio.sleep(0.05)
+        assert recorder.flushes == [("#tavern", ["a", "b"])]
+        assert digest.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_size_cap_and_groups(self):
+        """A group should flush as soon as it reaches max_items, independently of other groups."""
+        recorder = Recorder()
+        digest = NotificationDigest(recorder, window=60, max_items=2)
+        await digest.add(Notification("a", "x", group=1))
+        await digest.add(Notification("b", "x", group=2))
+        await digest.add(Notification("c", "x", group=1))
+        assert recorder.flushes == [(1, ["a", "c"])]
+        await digest.flush_all()
+        assert recorder.flushes[-1] == (2, ["b"])
+
+    @pytest.mark.asyncio
+    async def test_urgent_bypasses_buffer(self):
+        """Urgent notifications should be delivered immediately and alone."""
+        recorder = Recorder()
+        digest = NotificationDigest(recorder, window=60)
+        await digest.add(Notification("normal", "x", group=1))
+        await digest.add(Notification("urgent", "x", group=1, urgent=True))
+        assert recorder.flushes == [(1, ["urgent"])]
+        assert digest.pending == 1
+        await digest.flush_all()
+
+
+class TestRenderDigest:
+    """Tests for packing digest lines into messages."""
+
+    def test_packs_lines_under_limit(self):
+        """Lines should be split across messages without exceeding the limit."""
+        items = [Notification(f"t{i}", "b" * 20) for i in range(5)]
+        messages = render_digest(items, limit=70)
+        assert all(len(message) <= 70 for message in messages)
+        assert sum(message.count("•") for message in messages) == 5
+        assert len(messages) > 1
+
+
+class FakeDestination:
+    def __init__(self, name, gone=False, channel_id=None):
+        self.id = channel_id
+        self.name = name
+        self.gone = gone
+        self.sent = []
+
+    async def send(self, content):
+        if self.gone:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Channel")
+        self.sent.append(content)
+        return self
+
+
+class FakeOutbound:
+    async def send(self, destination, content):
+        return await destination.send(content)
+
+
+@pytest.fixture
+def listeners(tmp_path, monkeypatch):
+    """A Listeners cog posting digests to a plain text channel, with two same-named source channels."""
+    monkeypatch.setenv("BARRY_DATA_DIR", str(tmp_path))
+    channels = {1: FakeDestination("tavern", channel_id=1), 2: FakeDestination("tavern", channel_id=2)}
+    bot = SimpleNamespace(
+        user=None,
+        get_channel=channels.get,
+        services=SimpleNamespace(config=SimpleNamespace(current=BotConfig.from_module(config))),
+    )
+    cog = Listeners(bot)
+    cog.dest = FakeDestination("dragonspeakers")
+    cog.outbound = FakeOutbound()
+    cog.resolver = SimpleNamespace(channel=lambda channel_id: _returning(cog.dest))
+    return cog
+
+
+async def _returning(value):
+    return value
+
+
+class TestDragonspeakerDigestDelivery:
+    """Tests for how the Listeners cog posts Dragonspeaker digests."""
+
+    @pytest.mark.asyncio
+    async def test_only_opt_out_digests_ping_the_role(self, listeners):
+        """Opt-out digests should ping the Dragonspeaker role; mention digests should not."""
+        role = f"<@&{Listeners.DRAGONSPEAKER_ROLE_ID}>"
+        await listeners._flush_dragonspeaker_digest(1, [Notification("Mention", "hi")])
+        await listeners._flush_dragonspeaker_digest(Listeners.OPT_OUT_DIGEST_GROUP, [Notification("Opt-out", "x")])
+        mention, opt_out = listeners.dest.sent
+        assert role not in mention and mention.startswith("1 notification(s) from #tavern:")
+        assert opt_out.startswith(f"{role} 1 notification(s) from opt-outs:")
+
+    @pytest.mark.asyncio
+    async def test_mention_digests_are_keyed_by_channel_id(self, listeners):
+        """Mentions in two channels that share a name should go into separate digests."""
+        for channel_id in (1, 2):
+            message = SimpleNamespace(
+                id=channel_id,
+                content=f"<@&{Listeners.DRAGONSPEAKER_ROLE_ID}> help",
+                author=SimpleNamespace(id=5, name="bob", bot=False),
+                guild=SimpleNamespace(id=Listeners.SILVERYMOON_GUILD_ID),
+                channel=listeners.bot.get_channel(channel_id),
+                embeds=[],
+                jump_url="",
+            )
+            await listeners._handle_forward_dragonspeaker(message, MessageContext(message))
+        await listeners.dragonspeaker_digest.flush_all()
+        assert [post.split(":")[0] for post in listeners.dest.sent] == ["1 notification(s) from #tavern"] * 2
+        assert 1 in listeners._digest_threads and 2 in listeners._digest_threads
+
+    @pytest.mark.asyncio
+    async def test_deleted_thread_is_replaced(self, listeners):
+        """A cached thread that no longer exists should be evicted and the digest posted afresh."""
+        listeners._digest_threads.set(1, FakeDestination("old thread", gone=True))
+        await listeners._flush_dragonspeaker_digest(1, [Notification("Mention", "hi")])
+        assert len(listeners.dest.sent) == 1
+        assert listeners._digest_threads.get(1) is listeners.dest
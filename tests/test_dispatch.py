@@ -0,0 +1,210 @@
+"""Unit tests for the on_message dispatch pipeline."""
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from bot.core.config_store import BotConfig
+
+from bot.extensions._helpers.dispatch import (
+    AUTHOR_AVRAE,
+    AUTHOR_BOT,
+    AUTHOR_HUMAN,
+    AUTHOR_SELF,
+    MessageContext,
+    MessageDispatcher,
+)
+from bot.extensions.listeners import Listeners
+
+
+def make_message(content="", name="alice", bot=False, author_id=1, guild_id=10, channel_id=20, category_id=30, embeds=None):
+    return SimpleNamespace(
+        id=99,
+        content=content,
+        author=SimpleNamespace(id=author_id, name=name, bot=bot),
+        guild=SimpleNamespace(id=guild_id),
+        channel=SimpleNamespace(id=channel_id, category_id=category_id),
+        embeds=embeds or [],
+    )
+
+
+class TestMessageContext:
+    """Tests for the shared per-message context."""
+
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            ({}, AUTHOR_HUMAN),
+            ({"bot": True, "name": "Avrae"}, AUTHOR_AVRAE),
+            ({"bot": True, "name": "Dyno"}, AUTHOR_BOT),
+            ({"bot": True, "author_id": 5}, AUTHOR_SELF),
+        ],
+    )
+    def test_author_kind(self, kwargs, expected):
+        """Authors should be classified once per message."""
+        assert MessageContext(make_message(**kwargs), bot_user_id=5).author_kind == expected
+
+    def test_text_includes_embeds(self):
+        """Lowered text should cover embed titles, fields and footers."""
+        embed = SimpleNamespace(
+            title="Spellbook",
+            description="Aria knows 3 spells",
+            footer=SimpleNamespace(text="Homebrew"),
+            fields=[SimpleNamespace(name="Cantrips", value="Light")],
+        )
+        ctx = MessageContext(make_message("Hi", embeds=[embed]))
+        assert ctx.text_lower == "hi\nspellbook\naria knows 3 spells\nhomebrew\ncantrips\nlight"
+
+    def test_user_resolution_is_cached(self):
+        """The triggering user should be resolved only once per message."""
+        calls = []
+
+        def resolve(message):
+            calls.append(message)
+            return {"user_id": 1, "username": "alice"}
+
+        ctx = MessageContext(make_message(), resolve_user=resolve, is_ignored=lambda user_id, username: username == "alice")
+        assert ctx.is_ignored and ctx.is_ignored
+        assert ctx.triggering_user == {"user_id": 1, "username": "alice"}
+        assert len(calls) == 1
+
+
+class TestMessageDispatcher:
+    """Tests for predicate matching and dispatch."""
+
+    @pytest.fixture
+    def dispatcher(self):
+        dispatcher = MessageDispatcher()
+        dispatcher.calls = []
+
+        def record(name):
+            async def _callback(message, ctx):
+                dispatcher.calls.append(name)
+            return _callback
+
+        dispatcher.register("greeting", record("greeting"), substrings=("Hello",), guild_ids=(10,))
+        dispatcher.register("avrae", record("avrae"), authors=(AUTHOR_AVRAE,), requires_embeds=True)
+        dispatcher.register("quiet", record("quiet"), exclude_channel_ids=(21,), exclude_category_ids=(31,))
+        return dispatcher
+
+    @pytest.mark.asyncio
+    async def test_only_matching_handlers_run(self, dispatcher):
+        """Handlers whose predicates fail should not be called."""
+        ran = await dispatcher.dispatch(MessageContext(make_message("hello there")))
+        assert ran == ["greeting", "quiet"]
+        assert dispatcher.calls == ["greeting", "quiet"]
+
+    @pytest.mark.asyncio
+    async def test_channel_and_category_exclusions(self, dispatcher):
+        """Excluded channels and categories should skip a handler."""
+        assert await dispatcher.dispatch(MessageContext(make_message("x", channel_id=21))) == []
+        assert await dispatcher.dispatch(MessageContext(make_message("x", category_id=31))) == []
+
+    @pytest.mark.asyncio
+    async def test_guild_and_author_predicates(self, dispatcher):
+        """Guild and author predicates should be respected."""
+        ran = await dispatcher.dispatch(
+            MessageContext(make_message("hello", name="Avrae", bot=True, guild_id=11, embeds=[SimpleNamespace()]))
+        )
+        assert ran == ["avrae"]
+
+    @pytest.mark.asyncio
+    async def test_handler_errors_are_isolated(self):
+        """A failing handler should not stop later handlers."""
+        dispatcher = MessageDispatcher()
+        seen = []
+
+        async def broken(message, ctx):
+            raise RuntimeError("boom")
+
+        async def working(message, ctx):
+            seen.append(ctx.content)
+
+        dispatcher.register("broken", broken)
+        dispatcher.register("working", working)
+        await dispatcher.dispatch(MessageContext(make_message("hi")))
+        assert seen == ["hi"]
+
+    @pytest.mark.asyncio
+    async def test_slow_handler_does_not_block_others(self):
+        """Handlers should run concurrently, with per-handler timeouts."""
+        import asyncio
+
+        dispatcher = MessageDispatcher(default_timeout=0.05)
+        finished = []
+
+        async def slow(message, ctx):
+            await asyncio.sleep(1)
+            finished.append("slow")
+
+        async def fast(message, ctx):
+            finished.append("fast")
+
+        dispatcher.register("slow", slow)
+        dispatcher.register("fast", fast)
+        await dispatcher.dispatch(MessageContext(make_message("hi")))
+
+        assert finished == ["fast"]
+        assert dispatcher.timeouts["slow"] == 1
+        assert dispatcher.latency["fast"].count == 1
+        assert dispatcher.latency_report()[0].startswith("slow:")
+
+    @pytest.mark.asyncio
+    async def test_latency_is_exported_to_registry(self):
+        """With a registry attached, handler latency should be labelled by outcome."""
+        from bot.core.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        dispatcher = MessageDispatcher(metrics=registry)
+
+        async def broken(message, ctx):
+            raise RuntimeError("boom")
+
+        dispatcher.register("broken", broken)
+        await dispatcher.dispatch(MessageContext(make_message("hi")))
+        assert registry.histogram("barry_handler_seconds", handler="broken", outcome="error").count == 1
+
+
+class FakeOutbound:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, destination, content, **kwargs):
+        self.sent.append((destination, content))
+
+
+class TestNameAlerts:
+    """Tests for the name alert DMs sent by the Listeners cog."""
+
+    @pytest.fixture
+    def listeners(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("BARRY_DATA_DIR", str(tmp_path))
+        bot = SimpleNamespace(user=None, services=SimpleNamespace(config=SimpleNamespace(current=BotConfig.from_module(config))))
+        cog = Listeners(bot)
+        cog.outbound = FakeOutbound()
+
+        async def user(user_id):
+            return user_id
+
+        cog.resolver = SimpleNamespace(user=user)
+        return cog
+
+    async def alert(self, listeners, content, author_id=5):
+        message = make_message(content, author_id=author_id)
+        message.jump_url = ""
+        await listeners._handle_name_alert(message, MessageContext(message))
+        return [recipient for recipient, _ in listeners.outbound.sent]
+
+    @pytest.mark.asyncio
+    async def test_suppressor_skips_only_its_own_recipient(self, listeners):
+        """A suppressing literal should silence that recipient's matches and leave other recipients alerted."""
+        lxgrf, aethelar = (recipient for recipient, _, _ in Listeners.NAME_ALERTS)
+        assert await self.alert(listeners, 'Mimi rolled {"Revivify (Sarran)": 1}') == [aethelar]
+        listeners.outbound.sent.clear()
+        assert await self.alert(listeners, "Sarran and Mimi") == [lxgrf, aethelar]
+
+    @pytest.mark.asyncio
+    async def test_author_is_not_alerted_about_themselves(self, listeners):
+        """A recipient mentioning their own phrases should not be DMed."""
+        lxgrf, _ = (recipient for recipient, _, _ in Listeners.NAME_ALERTS)
+        assert await self.alert(listeners, "Sarran waves", author_id=lxgrf) == []
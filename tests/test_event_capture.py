@@ -0,0 +1,74 @@
+"""Unit tests for anonymised gateway event capture (bot/services/event_capture.py)."""
+import json
+import re
+
+from bot.services.event_capture import Anonymiser, EventRecorder, capture_path, read_events
+
+HUMAN = {"id": "4242", "username": "realname", "bot": False}
+AVRAE = {"id": "261302296103747584", "username": "Avrae", "bot": True}
+
+
+def frame(event, data):
+    return json.dumps({"op": 0, "t": event, "s": 1, "d": data})
+
+
+class TestAnonymiser:
+    """Tests for pseudonymising users and masking human text."""
+
+    def test_user_ids_are_stable_within_a_capture_only(self):
+        """The same ID maps to the same pseudonym under one salt and to a different one under another."""
+        first, second = Anonymiser(salt=b"a"), Anonymiser(salt=b"b")
+        assert first.user_id(4242) == first.user_id("4242") != "4242"
+        assert first.user_id(4242) != second.user_id(4242)
+
+    def test_human_text_is_masked_except_trigger_words(self):
+        """Words outside the vocabulary are masked; mentions keep their shape with pseudonymised users."""
+        anonymiser = Anonymiser(salt=b"s", keep_words={"urgent"}, keep_patterns=(re.compile(r"ny+o{2,}m"),))
+        masked = anonymiser.text("URGENT hello <@4242> <@&881993444380258377> nyooom")
+        assert masked == f"URGENT xxxxx <@{anonymiser.user_id('4242')}> <@&881993444380258377> nyooom"
+
+    def test_bot_messages_are_kept(self):
+        """Bot output is kept verbatim because auto-responders match on it; human embeds are dropped."""
+        anonymiser = Anonymiser(salt=b"s")
+        embed = {"title": "Error", "description": "go to Marketplace"}
+        avrae = anonymiser.message({"id": "1", "channel_id": "2", "guild_id": "3", "author": AVRAE, "embeds": [embed]})
+        human = anonymiser.message(
+            {"id": "1", "channel_id": "2", "guild_id": "3", "author": HUMAN, "content": "hi", "embeds": [embed]}
+        )
+        assert avrae["author"] == AVRAE and avrae["embeds"] == [embed]
+        assert human["author"]["username"] != "realname" and human["embeds"] == []
+
+
+class TestEventRecorder:
+    """Tests for writing and reading capture files."""
+
+    def test_only_message_and_reaction_events_are_recorded(self, tmp_path):
+        """Other gateway frames should be skipped and captured ones read back in order."""
+        path = tmp_path / "events.jsonl"
+        times = iter([100.0, 100.5, 101.25])
+        recorder = EventRecorder(str(path), Anonymiser(salt=b"s"), bot_user_id=1, clock=lambda: next(times))
+        assert not recorder.feed(frame("TYPING_START", {"user_id": "4242"}))
+        assert recorder.feed(frame("MESSAGE_CREATE", {"id": "10", "channel_id": "2", "author": HUMAN, "content": "hi"}))
+        assert recorder.feed(
+            frame("MESSAGE_REACTION_ADD", {"user_id": "4242", "channel_id": "2", "message_id": "10", "emoji": {"name": "❌"}})
+        )
+        recorder.close()
+        header, events = read_events(str(path))
+        assert header["bot_user_id"] == "1"
+        assert [(event["t"], event["at"]) for event in events] == [("MESSAGE_CREATE", 0.5), ("MESSAGE_REACTION_ADD", 1.25)]
+        assert "4242" not in path.read_text()
+
+    def test_recording_stops_at_the_cap(self, tmp_path):
+        """The recorder should close itself after max_events."""
+        recorder = EventRecorder(str(tmp_path / "events.jsonl"), Anonymiser(salt=b"s"), max_events=1)
+        data = {"id": "10", "channel_id": "2", "author": HUMAN}
+        assert recorder.record("MESSAGE_CREATE", data)
+        assert recorder.closed and not recorder.record("MESSAGE_CREATE", data)
+
+    def test_capture_path_resolves_into_the_data_volume(self, monkeypatch, tmp_path):
+        """Relative names go in BARRY_DATA_DIR; unset means capture is off."""
+        monkeypatch.setenv("BARRY_DATA_DIR", str(tmp_path))
+        monkeypatch.setenv("BARRY_CAPTURE_EVENTS", "events.jsonl")
+        assert capture_path() == str(tmp_path / "events.jsonl")
+        monkeypatch.delenv("BARRY_CAPTURE_EVENTS")
+        assert capture_path() is None
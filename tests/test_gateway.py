@@ -0,0 +1,73 @@
+"""Unit tests for the gateway intent/cache profile helpers."""
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from bot.core.gateway import cache_report, ensure_chunked, required_intent_names
+
+
+def module(name, intents=None):
+    mod = ModuleType(name)
+    if intents is not None:
+        mod.REQUIRED_INTENTS = intents
+    return mod
+
+
+class TestRequiredIntentNames:
+    """Tests for combining per-extension intent declarations."""
+
+    def test_union_of_declarations(self):
+        """Declared intents should be unioned with the base guilds intent."""
+        names = required_intent_names(
+            [module("a", ("message_content",)), module("b", ("members", "message_content")), module("c")]
+        )
+        assert names == {"guilds", "message_content", "members"}
+
+    def test_extension_intents_are_valid_flags(self):
+        """Every extension should only declare real discord.Intents flags."""
+        import importlib
+
+        discord = pytest.importorskip("discord")
+        if not isinstance(getattr(discord, "Intents", None), type):
+            pytest.skip("discord is mocked in this session")
+        from main import EXTENSIONS
+
+        valid = set(discord.Intents.VALID_FLAGS)
+        for extension in EXTENSIONS:
+            declared = set(getattr(importlib.import_module(extension), "REQUIRED_INTENTS", ()))
+            assert declared <= valid, extension
+
+
+class TestCacheReport:
+    """Tests for the startup cache report."""
+
+    def test_counts_entries_per_cache(self):
+        """Members, channels and roles should be counted across guilds."""
+        guild = SimpleNamespace(members=[object(), object()], channels=[object()], roles=[])
+        client = SimpleNamespace(guilds=[guild, guild], users=[object()], cached_messages=[])
+        lines = cache_report(client)
+        assert lines[0].startswith("guilds: 2 entries")
+        assert lines[2].startswith("members: 4 entries")
+        assert lines[5].startswith("messages: 0 entries, ~0 KiB")
+
+
+class TestEnsureChunked:
+    """Tests for lazy member chunking."""
+
+    @pytest.mark.asyncio
+    async def test_chunks_only_unchunked_guilds(self):
+        """Guilds should be chunked once, on first use."""
+        calls = []
+
+        class Guild:
+            chunked = False
+
+            async def chunk(self, cache=True):
+                calls.append(cache)
+                self.chunked = True
+
+        guild = Guild()
+        await ensure_chunked(guild)
+        await ensure_chunked(guild)
+        await ensure_chunked(None)
+        assert calls == [True]
@@ -0,0 +1,90 @@
+"""Unit tests for compact history records (bot/extensions/_helpers/history.py)."""
+import pickle
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from bot.extensions._helpers.avrae import level_ups_records, scan_contributions_records
+from bot.extensions._helpers.history import CompactMessage, Compactor
+from bot.extensions._helpers.transcripts import message_to_record, render_transcript
+
+
+def make_message(message_id=1, author_id=7, name="alice", content="Hello there", edited=False, embeds=(), attachments=()):
+    """Build a minimal message-like object."""
+    return SimpleNamespace(
+        id=message_id,
+        channel=SimpleNamespace(id=42),
+        guild=SimpleNamespace(id=1),
+        author=SimpleNamespace(id=author_id, name=name, display_name=name.title(), bot=name == "avrae"),
+        created_at=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        edited_at=datetime(2024, 5, 1, 13, 0, tzinfo=timezone.utc) if edited else None,
+        content=content,
+        embeds=list(embeds),
+        attachments=list(attachments),
+        jump_url=f"https://discord.com/channels/1/42/{message_id}",
+    )
+
+
+EMBED = SimpleNamespace(
+    title="Aria's Downtime",
+    description="That's 24 contribution points",
+    fields=[SimpleNamespace(name="Roll", value="1d20 (15)")],
+    footer=SimpleNamespace(text="Avrae"),
+    author=None,
+)
+ATTACHMENT = SimpleNamespace(filename="map.png", url="https://cdn/map.png", size=10, content_type="image/png")
+
+
+class TestCompactMessage:
+    """Tests for converting messages into compact records and back."""
+
+    def test_transcript_matches_full_message(self):
+        """A compact record should expand to the same transcript record as the message."""
+        compact = Compactor()
+        for message in (
+            make_message(1, edited=True),
+            make_message(2, author_id=9, name="avrae", content="", embeds=[EMBED], attachments=[ATTACHMENT]),
+        ):
+            assert compact(message).to_transcript() == message_to_record(message)
+
+    def test_plain_messages_carry_no_extras(self):
+        """Messages without embeds or attachments should not allocate containers for them."""
+        record = Compactor()(make_message())
+        assert record.extras is None
+        assert not record.bot and not record.edited
+        assert record.created == datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+    def test_authors_are_interned_per_scan(self):
+        """Records by the same author should share one name string."""
+        compact = Compactor()
+        first, second = compact(make_message(1, name="bryn")), compact(make_message(2, name="bryn"))
+        assert first.display_name is second.display_name
+        assert not hasattr(first, "__dict__")
+
+    def test_text_can_be_dropped(self):
+        """keep_text=False should keep authors and times but no text."""
+        record = Compactor(keep_text=False)(make_message(embeds=[EMBED]))
+        assert record.content == "" and record.extras is None
+        assert record.author_id == 7 and record.display_name == "Alice"
+
+    def test_records_pickle_for_worker_processes(self):
+        """Records should survive a pickle round trip unchanged."""
+        record = Compactor()(make_message(3, embeds=[EMBED], edited=True))
+        restored = pickle.loads(pickle.dumps(record))
+        assert isinstance(restored, CompactMessage)
+        assert restored.to_transcript() == record.to_transcript()
+
+    def test_transcripts_render_from_compact_records(self):
+        """render_transcript should give the same output for compact records and dictionaries."""
+        messages = [make_message(1), make_message(2, author_id=9, name="avrae", content="", embeds=[EMBED])]
+        compact = Compactor()
+        for fmt in ("txt", "md", "jsonl", "html"):
+            assert render_transcript([compact(m) for m in messages], fmt, "scene") == render_transcript(
+                [message_to_record(m) for m in messages], fmt, "scene"
+            )
+
+    def test_avrae_batch_parsers_accept_compact_records(self):
+        """The worker-pool parsers should read compact records like transcript dictionaries."""
+        compact = Compactor()
+        records = [compact(make_message(1, content="Ansa levels up to 5th level!")), compact(make_message(2, embeds=[EMBED]))]
+        assert level_ups_records(records) == [("Ansa", 5)]
+        assert [scan.matches[0][:2] for scan in scan_contributions_records(records)[1:]] == [("Aria's", 24)]
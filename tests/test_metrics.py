@@ -0,0 +1,161 @@
+"""Unit tests for the in-process metrics primitives."""
+import asyncio
+import math
+import socket
+
+import pytest
+
+from bot.core.metrics import Histogram, MetricsRegistry, MetricsServer, cache_collector, instrumented, stats_report
+from bot.core.cache import TTLCache
+
+
+class TestHistogram:
+    """Tests for the fixed-bucket histogram."""
+
+    def test_observations_are_bucketed(self):
+        """Values should land in the first bucket whose bound is >= the value."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.cumulative() == {0.1: 2, 1.0: 3, math.inf: 4}
+        assert histogram.count == 4
+        assert histogram.max == 5.0
+
+    def test_quantiles_use_bucket_bounds(self):
+        """Quantiles should report the bucket upper bound, capped at the max."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for _ in range(9):
+            histogram.observe(0.05)
+        histogram.observe(0.7)
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(0.99) == 0.7
+
+    def test_empty_histogram(self):
+        """An empty histogram should report zeros."""
+        histogram = Histogram()
+        assert histogram.quantile(0.5) == 0.0
+        assert histogram.mean == 0.0
+
+
+class TestMetricsRegistry:
+    """Tests for labelled series and the Prometheus text rendering."""
+
+    def test_render_counters_gauges_and_histograms(self):
+        """Each series type should render with its TYPE header and labels."""
+        registry = MetricsRegistry(buckets=(0.1,))
+        registry.describe("requests_total", "Requests.")
+        registry.inc("requests_total", route="/a")
+        registry.inc("requests_total", 2, route="/a")
+        registry.observe("latency_seconds", 0.05, command="tldr")
+        registry.add_collector(lambda: [("ratio", {"cache": "users"}, 0.5)])
+        text = registry.render()
+        assert "# HELP requests_total Requests.\n# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 3' in text
+        assert 'ratio{cache="users"} 0.5' in text
+        assert 'latency_seconds_bucket{command="tldr",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{command="tldr",le="+Inf"} 1' in text
+        assert 'latency_seconds_count{command="tldr"} 1' in text
+
+    def test_label_values_are_escaped(self):
+        """Quotes and newlines in label values should be escaped."""
+        registry = MetricsRegistry()
+        registry.inc("x_total", name='say "hi"\n')
+        assert 'x_total{name="say \\"hi\\"\\n"} 1' in registry.render()
+
+    def test_time_records_outcome(self):
+        """The timing context manager should label failures as errors and re-raise."""
+        registry = MetricsRegistry()
+        with registry.time("op_seconds", op="a"):
+            pass
+        with pytest.raises(ValueError):
+            with registry.time("op_seconds", op="a"):
+                raise ValueError
+        assert registry.histogram("op_seconds", op="a", outcome="ok").count == 1
+        assert registry.histogram("op_seconds", op="a", outcome="error").count == 1
+
+    def test_failing_collector_is_skipped(self):
+        """A broken collector should not break the scrape."""
+        registry = MetricsRegistry()
+
+        def broken():
+            raise RuntimeError("boom")
+
+        registry.add_collector(broken)
+        registry.inc("x_total")
+        assert "x_total 1" in registry.render()
+
+    def test_cache_collector_reports_hit_rate(self):
+        """Cache hit rates and sizes should be exposed as gauges."""
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        registry = MetricsRegistry()
+        registry.add_collector(cache_collector({"users": cache}))
+        gauges = registry.collect()
+        assert gauges["barry_cache_hit_ratio"][(("cache", "users"),)] == 0.5
+        assert gauges["barry_cache_entries"][(("cache", "users"),)] == 1
+
+    @pytest.mark.asyncio
+    async def test_instrumented_decorator(self):
+        """Decorated coroutines should be timed and keep their metadata."""
+        registry = MetricsRegistry()
+
+        @instrumented("on_message", registry=registry)
+        async def on_message(value):
+            return value * 2
+
+        assert await on_message(2) == 4
+        assert on_message.__name__ == "on_message"
+        assert asyncio.iscoroutinefunction(on_message)
+        assert registry.histogram("barry_handler_seconds", handler="on_message", outcome="ok").count == 1
+
+    def test_stats_report_summarises_series(self):
+        """The /stats summary should cover commands, events, REST calls and tokens, minus skipped handlers."""
+        registry = MetricsRegistry()
+        registry.observe("barry_command_seconds", 0.2, command="tldr", outcome="ok")
+        registry.observe("barry_command_seconds", 0.3, command="tldr", outcome="error")
+        registry.inc("barry_discord_requests_total", 5, method="GET", route="/channels/{channel_id}/messages", status="ok")
+        registry.inc("barry_llm_tokens_total", 120, model="claude", direction="input")
+        registry.observe("barry_handler_seconds", 0.1, handler="on_message", outcome="ok")
+        registry.observe("barry_handler_seconds", 0.1, handler="nyoom", outcome="ok")
+        lines = stats_report(registry, skip_handlers=["nyoom"])
+        assert lines[0] == "Commands:"
+        assert lines[1].startswith("  tldr: n=2 err=1")
+        assert lines[2] == "Events:"
+        assert lines[3].startswith("  on_message: n=1")
+        assert not any("nyoom" in line for line in lines)
+        assert "  GET /channels/{channel_id}/messages: 5" in lines
+        assert "  claude input: 120" in lines
+
+
+class TestMetricsServer:
+    """Tests for the local /metrics endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_serves_registry(self):
+        """GET /metrics should return the rendered registry."""
+        import aiohttp
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        registry = MetricsRegistry()
+        registry.inc("x_total")
+        server = MetricsServer(registry, host="127.0.0.1", port=port)
+        assert await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                    assert response.status == 200
+                    assert "x_total 1" in await response.text()
+        finally:
+            await server.stop()
+        assert not server.running
+
+    @pytest.mark.asyncio
+    async def test_port_zero_disables(self):
+        """A zero port should leave the endpoint off."""
+        server = MetricsServer(MetricsRegistry(), port=0)
+        assert not await server.start()
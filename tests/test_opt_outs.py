@@ -0,0 +1,81 @@
+"""Unit tests for the persisted opt-out registry."""
+import sqlite3
+
+from bot.services.opt_outs import OptOutRegistry
+
+
+class TestOptOutRegistry:
+    """Tests for recording, persisting and removing opt-outs."""
+
+    def test_static_entries_are_checked_by_username(self):
+        """Usernames from the static ignore list should be opted out case-insensitively."""
+        registry = OptOutRegistry(":memory:", static_entries=["rosiemittens"])
+        assert registry.is_opted_out(username="RosieMittens")
+        assert not registry.is_opted_out(user_id=1, username="someone")
+
+    def test_add_records_id_and_username(self, tmp_path):
+        """An added opt-out should apply immediately and survive a reload from disk."""
+        path = str(tmp_path / "opt_outs.sqlite3")
+        registry = OptOutRegistry(path)
+        assert registry.add(42, "Tav", source="reaction:1/2") is True
+        assert registry.add(42, "Tav") is False
+        assert registry.is_opted_out(user_id=42)
+        assert registry.is_opted_out(username="tav")
+
+        reopened = OptOutRegistry(path)
+        assert reopened.is_opted_out(user_id=42)
+        assert [row[:3] for row in reopened.entries()] == [(42, "tav", "reaction:1/2")]
+
+    def test_remove_clears_runtime_opt_out(self, tmp_path):
+        """Removing an opt-out should drop both its ID and username."""
+        registry = OptOutRegistry(str(tmp_path / "opt_outs.sqlite3"))
+        registry.add(42, "tav")
+        assert registry.remove(42) is True
+        assert not registry.is_opted_out(user_id=42, username="tav")
+        assert registry.remove(42) is False
+
+    def test_static_entries_cannot_be_removed(self):
+        """Static entries should stay in force even after a removal attempt."""
+        registry = OptOutRegistry(":memory:", static_entries=["aethelar"])
+        registry.add(7, "aethelar")
+        registry.remove(7)
+        assert registry.is_static(username="aethelar")
+        assert registry.is_opted_out(username="aethelar")
+
+    def test_reload_picks_up_external_changes(self, tmp_path):
+        """Rows written by another process should apply after reload without a restart."""
+        path = str(tmp_path / "opt_outs.sqlite3")
+        registry = OptOutRegistry(path)
+        with sqlite3.connect(path) as conn:
+            conn.execute("INSERT INTO opt_outs (user_id, username, source, created_at) VALUES (5, 'x', 'manual', 0)")
+        assert not registry.is_opted_out(user_id=5)
+        registry.reload()
+        assert registry.is_opted_out(user_id=5)
+
+    def test_checks_notice_writes_from_other_connections(self, tmp_path):
+        """Opt-outs recorded by another process should apply once the refresh interval passes."""
+        path = str(tmp_path / "opt_outs.sqlite3")
+        now = [0.0]
+        registry = OptOutRegistry(path, refresh_interval=5, clock=lambda: now[0])
+        other = OptOutRegistry(path)
+        other.add(9, "elsewhere", source="dm")
+        assert not registry.is_opted_out(user_id=9)
+        now[0] = 6
+        assert registry.is_opted_out(user_id=9)
+        assert registry.is_opted_out(username="Elsewhere")
+        other.close()
+        registry.close()
+
+    def test_add_reports_existing_opt_outs(self, tmp_path):
+        """Adding a user already opted out statically or by another process should not count as new."""
+        path = str(tmp_path / "opt_outs.sqlite3")
+        now = [0.0]
+        registry = OptOutRegistry(path, static_entries=["aethelar"], refresh_interval=5, clock=lambda: now[0])
+        other = OptOutRegistry(path)
+        assert other.add(9, "elsewhere", source="dm")
+
+        assert not registry.add(9, "elsewhere", source="reaction")
+        assert not registry.add(7, "Aethelar", source="reaction")
+        assert [row[0] for row in registry.entries()] == [9]
+        other.close()
+        registry.close()
@@ -0,0 +1,115 @@
+"""Unit tests for the outbound message scheduler."""
+import asyncio
+
+import pytest
+
+from bot.services.outbound import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    OutboundScheduler,
+    TokenBucket,
+    route_for,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class FakeChannel:
+    def __init__(self, channel_id=1, fail=False):
+        self.id = channel_id
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        if self.fail:
+            raise RuntimeError("boom")
+        self.sent.append(content if content is not None else kwargs)
+        return len(self.sent)
+
+
+class TestTokenBucket:
+    """Tests for the throttling primitive."""
+
+    @pytest.mark.asyncio
+    async def test_waits_once_exhausted(self):
+        """Acquisitions beyond the rate should wait for the bucket to refill."""
+        clock = FakeClock()
+        bucket = TokenBucket(2, 1.0, clock=clock, sleep=clock.sleep)
+        for _ in range(3):
+            await bucket.acquire()
+        assert clock.now == pytest.approx(0.5)
+
+
+class TestOutboundScheduler:
+    """Tests for priority ordering, coalescing and throttling."""
+
+    @pytest.mark.asyncio
+    async def test_high_priority_jumps_the_queue(self):
+        """Alerts queued behind a report on the same route should be sent first."""
+        channel = FakeChannel()
+        scheduler = OutboundScheduler()
+        futures = [scheduler.send(channel, f"report {i}", priority=PRIORITY_LOW) for i in range(3)]
+        futures.append(scheduler.send(channel, "alert", priority=PRIORITY_HIGH))
+        await asyncio.gather(*futures)
+        assert channel.sent == ["alert", "report 0", "report 1", "report 2"]
+
+    @pytest.mark.asyncio
+    async def test_coalesces_bursts(self):
+        """Plain-text messages marked coalesce should be merged while they fit."""
+        channel = FakeChannel()
+        scheduler = OutboundScheduler(max_length=12)
+        futures = [scheduler.send(channel, text, coalesce=True) for text in ("first", "a", "b", "ccccccccccc")]
+        results = await asyncio.gather(*futures)
+        assert channel.sent == ["first\na\nb", "ccccccccccc"]
+        assert results == [1, 1, 1, 2]
+        assert scheduler.coalesced == 2
+
+    @pytest.mark.asyncio
+    async def test_routes_are_throttled_independently(self):
+        """A busy route should wait while other routes keep sending."""
+        clock = FakeClock()
+        scheduler = OutboundScheduler(route_rate=1, route_period=10.0, clock=clock, sleep=clock.sleep)
+        busy, quiet = FakeChannel(1), FakeChannel(2)
+        first = [scheduler.send(busy, "one"), scheduler.send(busy, "two")]
+        await scheduler.send(quiet, "hello")
+        assert quiet.sent == ["hello"]
+        await asyncio.gather(*first)
+        assert busy.sent == ["one", "two"]
+        assert clock.now >= 10.0
+        assert scheduler.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_failures_propagate_to_caller(self):
+        """Errors from the send should surface on the returned future."""
+        scheduler = OutboundScheduler()
+        with pytest.raises(RuntimeError):
+            await scheduler.send(FakeChannel(fail=True), "x")
+
+    @pytest.mark.asyncio
+    async def test_unawaited_failures_are_logged_as_warnings(self, caplog):
+        """Fire-and-forget failures should reach the logs at WARNING; cancelled sends should not."""
+        scheduler = OutboundScheduler()
+        failed = scheduler.send(FakeChannel(fail=True), "x")
+        cancelled = scheduler.send(FakeChannel(2), "y")
+        cancelled.cancel()
+        with caplog.at_level("WARNING", logger="bot.services.outbound"):
+            await asyncio.wait([failed])
+            await asyncio.sleep(0)
+        assert [record.levelname for record in caplog.records] == ["WARNING"]
+        assert "boom" in caplog.records[0].getMessage()
+
+    def test_route_for_distinguishes_dms(self):
+        """Users and channels with the same ID should not share a route."""
+        user = type("User", (), {"id": 5, "dm_channel": None})()
+        assert route_for(user) == ("dm", 5)
+        assert route_for(FakeChannel(5)) == ("channel", 5)
@@ -0,0 +1,91 @@
+"""Unit tests for the TTL cache and the Discord object resolver."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from bot.core.cache import TTLCache
+from bot.services.resolver import DiscordResolver, resolver_for
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Tests for expiry and bounding."""
+
+    def test_entries_expire(self):
+        """Entries should disappear after their TTL."""
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """The cache should never exceed maxsize."""
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+
+def make_client(gateway_user=None):
+    client = SimpleNamespace(
+        get_user=Mock(return_value=gateway_user),
+        fetch_user=AsyncMock(side_effect=lambda user_id: SimpleNamespace(id=user_id)),
+        get_channel=Mock(return_value=None),
+        fetch_channel=AsyncMock(side_effect=lambda channel_id: SimpleNamespace(id=channel_id)),
+        get_partial_messageable=Mock(side_effect=lambda channel_id, guild_id=None: ("partial", channel_id)),
+    )
+    return client
+
+
+class TestDiscordResolver:
+    """Tests for cache-first resolution."""
+
+    @pytest.mark.asyncio
+    async def test_gateway_cache_avoids_rest(self):
+        """Users already in the gateway cache should not be fetched."""
+        user = SimpleNamespace(id=1)
+        client = make_client(gateway_user=user)
+        assert await DiscordResolver(client).user(1) is user
+        client.fetch_user.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_rest_results_are_cached(self):
+        """Repeated lookups should cost a single REST call."""
+        client = make_client()
+        resolver = DiscordResolver(client)
+        first = await resolver.user(5)
+        assert await resolver.user(5) is first
+        await resolver.channel(7)
+        await resolver.channel(7)
+        assert client.fetch_user.await_count == 1
+        assert client.fetch_channel.await_count == 1
+        assert resolver.rest_fetches == 2
+
+    def test_messageable_uses_partial_without_http(self):
+        """Unknown channels should resolve to a partial messageable."""
+        client = make_client()
+        assert DiscordResolver(client).messageable(9, guild_id=3) == ("partial", 9)
+
+    def test_resolver_for_attaches_to_services(self):
+        """resolver_for should reuse the resolver stored on the services container."""
+        client = make_client()
+        client.services = SimpleNamespace(resolver=None)
+        resolver = resolver_for(client)
+        assert client.services.resolver is resolver
+        assert resolver_for(client) is resolver
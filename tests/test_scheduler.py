@@ -0,0 +1,184 @@
+"""Unit tests for cron specs and the persisted job scheduler."""
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from bot.core.scheduler import CronSpec, JobScheduler
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCronSpec:
+    """Tests for parsing cron expressions and finding the next matching minute."""
+
+    def test_parses_lists_ranges_and_steps(self):
+        """Each field should accept lists, ranges and steps."""
+        spec = CronSpec.parse("*/15 9-17/4 1,15 * *")
+        assert spec.minutes == {0, 15, 30, 45}
+        assert spec.hours == {9, 13, 17}
+        assert spec.days == {1, 15}
+        assert spec.months == set(range(1, 13))
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* * 0 * *", "5-1 * * * *", "*/0 * * * *", "a * * * *"])
+    def test_rejects_invalid_expressions(self, expression):
+        """Wrong field counts, out-of-range values and malformed fields should raise ValueError."""
+        with pytest.raises(ValueError):
+            CronSpec.parse(expression)
+
+    def test_weekly_spec_finds_next_monday(self):
+        """A Monday 05:00 spec should skip to the following Monday once this week's slot has passed."""
+        spec = CronSpec.parse("0 5 * * 1")
+        assert spec.next_after(utc(2024, 3, 4, 4, 59)) == utc(2024, 3, 4, 5, 0)
+        assert spec.next_after(utc(2024, 3, 4, 5, 0)) == utc(2024, 3, 11, 5, 0)
+
+    def test_sunday_is_zero_or_seven(self):
+        """Weekday 7 should mean Sunday, like 0 and the @weekly alias."""
+        after = utc(2024, 3, 5, 12, 0)
+        sunday = utc(2024, 3, 10, 0, 0)
+        assert CronSpec.parse("0 0 * * 7").next_after(after) == sunday
+        assert CronSpec.parse("0 0 * * 0").next_after(after) == sunday
+        assert CronSpec.parse("@weekly").next_after(after) == sunday
+
+    def test_day_and_weekday_match_either(self):
+        """When both day and weekday are restricted, a date matching either should run."""
+        spec = CronSpec.parse("0 0 20 * 1")
+        # Friday 15 March 2024: the next Monday (18th) comes before the 20th
+        assert spec.next_after(utc(2024, 3, 15)) == utc(2024, 3, 18)
+        assert spec.next_after(utc(2024, 3, 18)) == utc(2024, 3, 20)
+
+    def test_skips_months_and_leap_days(self):
+        """A 29 February spec should run in the next leap year."""
+        assert CronSpec.parse("30 6 29 2 *").next_after(utc(2024, 3, 1)) == utc(2028, 2, 29, 6, 30)
+
+    def test_impossible_spec_raises(self):
+        """A spec that never matches should raise instead of looping forever."""
+        with pytest.raises(ValueError):
+            CronSpec.parse("0 0 31 2 *").next_after(utc(2024, 1, 1))
+
+
+class TestJobScheduler:
+    """Tests for registering, running and persisting jobs."""
+
+    @pytest.mark.asyncio
+    async def test_runs_due_job_and_persists_last_run(self, tmp_path):
+        """A due job should run once, move to its next slot and record its last run on flush."""
+        path = tmp_path / "schedule.json"
+        clock = FakeClock(utc(2024, 3, 4, 4, 0))
+        scheduler = JobScheduler(str(path), clock=clock)
+        calls = []
+
+        async def job():
+            calls.append(clock.now)
+
+        scheduler.add("weekly", "0 5 * * 1", job)
+        assert scheduler.run_due() == []
+
+        clock.now = utc(2024, 3, 4, 5, 0)
+        await asyncio.gather(*scheduler.run_due())
+        assert calls == [utc(2024, 3, 4, 5, 0)]
+        assert scheduler.jobs["weekly"].next_run == utc(2024, 3, 11, 5, 0)
+
+        scheduler.store.flush()
+        saved = json.loads(path.read_text())
+        assert saved == {"weekly": {"last_run": utc(2024, 3, 4, 5, 0).timestamp()}}
+
+    @pytest.mark.asyncio
+    async def test_missed_run_catches_up_after_restart(self, tmp_path):
+        """A slot that passed while the bot was down should run as soon as the job is registered again."""
+        path = str(tmp_path / "schedule.json")
+        clock = FakeClock(utc(2024, 3, 4, 4, 0))
+        first = JobScheduler(path, clock=clock)
+
+        async def noop():
+            return None
+
+        first.add("weekly", "0 5 * * 1", noop)
+        clock.now = utc(2024, 3, 4, 5, 0)
+        await asyncio.gather(*first.run_due())
+        first.store.flush()
+
+        restarted = JobScheduler(path, clock=FakeClock(utc(2024, 3, 12, 9, 0)))
+        job = restarted.add("weekly", "0 5 * * 1", noop)
+        assert job.next_run == utc(2024, 3, 11, 5, 0)
+        assert restarted.due() == [job]
+
+    def test_saved_override_replaces_default(self, tmp_path):
+        """An override in schedule.json should win over the code default and survive a flush; an invalid one should not."""
+        path = tmp_path / "schedule.json"
+        path.write_text(json.dumps({"a": {"override": "30 2 * * *", "last_run": None}, "b": {"override": "nonsense"}}))
+        scheduler = JobScheduler(str(path), clock=FakeClock(utc(2024, 3, 4, 0, 0)))
+
+        async def noop():
+            return None
+
+        assert scheduler.add("a", "0 5 * * 1", noop).next_run == utc(2024, 3, 4, 2, 30)
+        assert scheduler.add("b", "0 5 * * 1", noop).spec.expression == "0 5 * * 1"
+        scheduler.store.flush()
+        assert json.loads(path.read_text())["a"] == {"last_run": None, "override": "30 2 * * *"}
+
+    def test_changed_default_applies_without_override(self, tmp_path):
+        """A default changed by a release should replace the one a previous release saved."""
+        path = tmp_path / "schedule.json"
+        path.write_text(json.dumps({"weekly": {"spec": "0 5 * * 1", "last_run": None}}))
+        scheduler = JobScheduler(str(path), clock=FakeClock(utc(2024, 3, 4, 0, 0)))
+
+        async def noop():
+            return None
+
+        assert scheduler.add("weekly", "0 6 * * 2", noop).next_run == utc(2024, 3, 5, 6, 0)
+        scheduler.store.flush()
+        assert json.loads(path.read_text()) == {"weekly": {"last_run": None}}
+
+    @pytest.mark.asyncio
+    async def test_failing_or_running_job_is_not_rerun(self, tmp_path):
+        """A failed job should be logged and rescheduled; one still running should not start twice."""
+        clock = FakeClock(utc(2024, 3, 4, 5, 0))
+        scheduler = JobScheduler(str(tmp_path / "schedule.json"), clock=clock)
+        release = asyncio.Event()
+        started = []
+
+        async def slow():
+            started.append(clock.now)
+            await release.wait()
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        scheduler.add("slow", "* * * * *", slow)
+        scheduler.add("broken", "* * * * *", broken)
+        clock.now = utc(2024, 3, 4, 5, 1)
+        first = scheduler.run_due()
+        await asyncio.sleep(0)
+        clock.now = utc(2024, 3, 4, 5, 2)
+        second = scheduler.run_due()
+        assert [task.get_name() for task in second] == ["job:broken"]
+        release.set()
+        await asyncio.gather(*first, *second)
+        assert len(started) == 1
+        assert not scheduler.jobs["slow"].running
+
+    def test_flush_keeps_other_processes_jobs(self, tmp_path):
+        """Jobs registered by another process should survive this process's flush."""
+        path = tmp_path / "schedule.json"
+        path.write_text(json.dumps({"weekly_pings:2": {"spec": "0 5 * * 1", "last_run": 1.0}}))
+        scheduler = JobScheduler(str(path), clock=FakeClock(utc(2024, 3, 4)))
+        scheduler.store.entries.pop("weekly_pings:2")
+
+        async def noop():
+            return None
+
+        scheduler.add("weekly_pings:1", "0 5 * * 1", noop)
+        scheduler.store.flush()
+        assert set(json.loads(path.read_text())) == {"weekly_pings:1", "weekly_pings:2"}
@@ -0,0 +1,81 @@
+"""Unit tests for the persisted sent-message registry."""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from bot.core import storage
+from bot.core.storage import file_lock
+from bot.services.sent_messages import SentMessageRegistry
+
+
+class TestSentMessageRegistry:
+    """Tests for bounding and write-behind persistence."""
+
+    def test_registry_is_bounded(self, tmp_path):
+        """The oldest IDs should be evicted once maxsize is reached."""
+        registry = SentMessageRegistry(str(tmp_path / "sent.json"), maxsize=2)
+        for message_id in (1, 2, 3):
+            registry.add(message_id)
+        assert 1 not in registry
+        assert 2 in registry and 3 in registry
+        assert len(registry) == 2
+
+    def test_flush_persists_ids(self, tmp_path):
+        """Flushed IDs should be reloaded by a new registry."""
+        path = tmp_path / "sent.json"
+        registry = SentMessageRegistry(str(path))
+        registry.add(10)
+        registry.flush()
+        assert json.loads(path.read_text()) == [10]
+        assert 10 in SentMessageRegistry(str(path))
+
+    @pytest.mark.asyncio
+    async def test_writes_happen_behind_the_event_loop(self, tmp_path):
+        """Adds inside a running loop should be written after the flush interval."""
+        path = tmp_path / "sent.json"
+        registry = SentMessageRegistry(str(path), flush_interval=0.01)
+        registry.add(1)
+        registry.add(2)
+        assert not path.exists()
+        await asyncio.sleep(0.05)
+        assert json.loads(path.read_text()) == [1, 2]
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(storage.fcntl is None, reason="file locks need fcntl")
+    async def test_contended_lock_does_not_block_the_loop(self, tmp_path):
+        """A background flush should wait for another process's lock in a worker thread."""
+        path = tmp_path / "sent.json"
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with file_lock(str(path)):
+                locked.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait(5)
+        registry = SentMessageRegistry(str(path), flush_interval=0)
+        registry.add(1)
+        await asyncio.sleep(0.05)
+        assert not path.exists()
+        release.set()
+        await registry._flush_task
+        holder.join()
+        assert json.loads(path.read_text()) == [1]
+
+    def test_flush_merges_ids_from_other_processes(self, tmp_path):
+        """Two registries sharing a file should keep each other's IDs when flushing."""
+        path = str(tmp_path / "sent.json")
+        first, second = SentMessageRegistry(path, maxsize=3), SentMessageRegistry(path, maxsize=3)
+        first.add(1)
+        first.flush()
+        second.add(2)
+        second.add(3)
+        second.flush()
+        assert json.loads((tmp_path / "sent.json").read_text()) == [1, 2, 3]
+        first.add(4)
+        first.flush()
+        assert json.loads((tmp_path / "sent.json").read_text()) == [2, 3, 4]
@@ -0,0 +1,69 @@
+"""Unit tests for shard planning and shard-aware job helpers."""
+from types import SimpleNamespace
+
+import pytest
+
+from bot.core.sharding import ShardPlan, is_primary, owns_guild, parse_shard_ids, shard_for_guild
+
+
+class TestShardPlan:
+    """Tests for reading the shard layout from the environment."""
+
+    def test_parse_shard_ids_accepts_ranges_and_lists(self):
+        """Ranges and single IDs should combine into sorted, de-duplicated IDs."""
+        assert parse_shard_ids("4, 0-2,2") == (0, 1, 2, 4)
+
+    @pytest.mark.parametrize("spec", ["", "a", "3-1", "1-x"])
+    def test_parse_shard_ids_rejects_bad_specs(self, spec):
+        """Empty, non-numeric and reversed specs should raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_shard_ids(spec)
+
+    def test_unset_environment_leaves_sharding_to_discord(self, monkeypatch):
+        """Without the variables the bot should pass no shard arguments."""
+        monkeypatch.delenv("BARRY_SHARD_COUNT", raising=False)
+        monkeypatch.delenv("BARRY_SHARD_IDS", raising=False)
+        assert ShardPlan.from_env().bot_kwargs() == {}
+
+    def test_environment_selects_this_process_shards(self, monkeypatch):
+        """BARRY_SHARD_COUNT and BARRY_SHARD_IDS should become AutoShardedBot arguments."""
+        monkeypatch.setenv("BARRY_SHARD_COUNT", "4")
+        monkeypatch.setenv("BARRY_SHARD_IDS", "2-3")
+        plan = ShardPlan.from_env()
+        assert plan.bot_kwargs() == {"shard_count": 4, "shard_ids": [2, 3]}
+        assert plan.describe() == "shard(s) 2, 3 of 4"
+
+    @pytest.mark.parametrize(
+        "count, ids",
+        [(0, None), (None, (0,)), (2, (0, 2))],
+    )
+    def test_invalid_plans_are_rejected(self, count, ids):
+        """Counts below one, IDs without a count and IDs outside the count should raise."""
+        with pytest.raises(ValueError):
+            ShardPlan(shard_count=count, shard_ids=ids)
+
+
+class TestShardOwnership:
+    """Tests for deciding which process handles a guild."""
+
+    def test_guild_shard_follows_discord_formula(self):
+        """A guild should map to (guild_id >> 22) % shard_count."""
+        guild_id = (7 << 22) | 12345
+        assert shard_for_guild(guild_id, 4) == 3
+
+    def test_process_owns_only_guilds_on_its_shards(self):
+        """A process should own guilds on its shards and no others."""
+        client = SimpleNamespace(shard_count=4, shard_ids=[0, 1])
+        assert owns_guild(client, 1 << 22)
+        assert not owns_guild(client, 2 << 22)
+
+    def test_unsharded_clients_own_every_guild(self):
+        """Plain clients and processes running every shard should own all guilds."""
+        assert owns_guild(SimpleNamespace(), 2 << 22)
+        assert owns_guild(SimpleNamespace(shard_count=4, shard_ids=None), 2 << 22)
+
+    def test_primary_is_the_process_with_shard_zero(self):
+        """Only the process holding shard 0 should do once-per-deployment work."""
+        assert is_primary(SimpleNamespace(shard_ids=None))
+        assert is_primary(SimpleNamespace(shard_ids=[0, 1]))
+        assert not is_primary(SimpleNamespace(shard_ids=[2, 3]))
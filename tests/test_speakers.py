@@ -0,0 +1,82 @@
+"""Unit tests for the recent-speaker tracker used to attribute bot replies."""
+from types import SimpleNamespace
+
+from bot.extensions._helpers.speakers import RecentSpeakerTracker
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def bot_message(channel_id=1, reference=None, interaction_metadata=None):
+    return SimpleNamespace(
+        channel=SimpleNamespace(id=channel_id),
+        reference=reference,
+        interaction_metadata=interaction_metadata,
+    )
+
+
+class TestRecentSpeakerTracker:
+    """Tests for bounded memory and reply attribution."""
+
+    def test_ring_buffer_keeps_latest_slots(self):
+        """Older messages should be overwritten once the ring is full."""
+        tracker = RecentSpeakerTracker(slots=2, clock=FakeClock())
+        for message_id, user_id in ((10, 1), (11, 2), (12, 3)):
+            tracker.record(5, message_id, user_id, f"user{user_id}")
+        assert tracker.by_message(5, 10) is None
+        assert tracker.by_message(5, 11)["user_id"] == 2
+        assert tracker.latest(5)["user_id"] == 3
+
+    def test_channels_are_lru_bounded(self):
+        """The least recently active channel should be evicted past max_channels."""
+        tracker = RecentSpeakerTracker(max_channels=2, clock=FakeClock())
+        tracker.record(1, 10, 1, "a")
+        tracker.record(2, 11, 2, "b")
+        tracker.record(1, 12, 1, "a")
+        tracker.record(3, 13, 3, "c")
+        assert len(tracker) == 2
+        assert tracker.latest(2) is None
+        assert tracker.latest(1) is not None
+
+    def test_latest_respects_max_age(self):
+        """Speakers older than max_age should not be blamed."""
+        clock = FakeClock()
+        tracker = RecentSpeakerTracker(max_age=10, clock=clock)
+        tracker.record(1, 10, 1, "Tav")
+        clock.now += 11
+        assert tracker.latest(1) is None
+
+    def test_interaction_metadata_wins(self):
+        """Slash-command responses should be attributed to the invoking user."""
+        tracker = RecentSpeakerTracker(clock=FakeClock())
+        tracker.record(1, 10, 99, "bystander")
+        metadata = SimpleNamespace(user=SimpleNamespace(id=7, name="Invoker"))
+        assert tracker.attribute(bot_message(interaction_metadata=metadata)) == {
+            "user_id": 7,
+            "username": "invoker",
+        }
+
+    def test_reply_reference_matches_invoking_message(self):
+        """A reply should be attributed to the author of the referenced command, not the last speaker."""
+        tracker = RecentSpeakerTracker(clock=FakeClock())
+        tracker.record(1, 10, 7, "invoker")
+        tracker.record(1, 11, 99, "bystander")
+        reference = SimpleNamespace(resolved=None, message_id=10)
+        assert tracker.attribute(bot_message(reference=reference))["user_id"] == 7
+
+        resolved = SimpleNamespace(author=SimpleNamespace(id=8, name="Other", bot=False))
+        reference = SimpleNamespace(resolved=resolved, message_id=12)
+        assert tracker.attribute(bot_message(reference=reference))["user_id"] == 8
+
+    def test_falls_back_to_latest_speaker(self):
+        """Without any link the latest speaker in the channel should be used."""
+        tracker = RecentSpeakerTracker(clock=FakeClock())
+        tracker.record(1, 10, 7, "a")
+        tracker.record(1, 11, 8, "b")
+        assert tracker.attribute(bot_message())["user_id"] == 8
+        assert tracker.attribute(bot_message(channel_id=2)) is None
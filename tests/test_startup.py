@@ -0,0 +1,75 @@
+"""Unit tests for startup timing and change-gated command sync."""
+from types import SimpleNamespace
+
+import pytest
+
+from bot.core.startup import StartupPhases, command_tree_hash, sync_commands_if_changed
+
+
+class FakeCommand:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def to_dict(self, tree):
+        return self.payload
+
+
+class FakeTree:
+    def __init__(self, payloads):
+        self.commands = [FakeCommand(payload) for payload in payloads]
+        self.syncs = 0
+
+    def get_commands(self):
+        return self.commands
+
+    async def sync(self):
+        self.syncs += 1
+        return self.commands
+
+
+class TestCommandTreeHash:
+    """Tests for the command tree fingerprint."""
+
+    def test_hash_ignores_order(self):
+        """Reordering commands or keys should not change the hash."""
+        first = command_tree_hash([{"name": "a", "type": 1}, {"name": "b"}], 1)
+        second = command_tree_hash([{"name": "b"}, {"type": 1, "name": "a"}], 1)
+        assert first == second
+
+    def test_hash_changes_with_tree_or_application(self):
+        """Edits to a command or a different application should change the hash."""
+        base = command_tree_hash([{"name": "a"}], 1)
+        assert command_tree_hash([{"name": "a", "description": "x"}], 1) != base
+        assert command_tree_hash([{"name": "a"}], 2) != base
+
+
+class TestSyncCommandsIfChanged:
+    """Tests for skipping redundant syncs."""
+
+    @pytest.mark.asyncio
+    async def test_sync_only_when_tree_changes(self, tmp_path):
+        """A second start with the same tree should skip the sync."""
+        path = str(tmp_path / "tree.sha256")
+        bot = SimpleNamespace(tree=FakeTree([{"name": "a"}]), application_id=1)
+        assert await sync_commands_if_changed(bot, path) == 1
+        assert await sync_commands_if_changed(bot, path) is None
+        assert bot.tree.syncs == 1
+
+        bot.tree = FakeTree([{"name": "a"}, {"name": "b"}])
+        assert await sync_commands_if_changed(bot, path) == 2
+        assert await sync_commands_if_changed(bot, path, force=True) == 2
+
+
+class TestStartupPhases:
+    """Tests for phase timing."""
+
+    def test_phases_and_first_ready(self):
+        """Phases should be recorded and only the first ready should count."""
+        ticks = iter([0.0, 1.0, 3.0, 5.0, 9.0])
+        phases = StartupPhases(clock=lambda: next(ticks))
+        with phases.phase("extensions"):
+            pass
+        assert phases.phases == [("extensions", 2.0)]
+        assert phases.mark_ready() == 5.0
+        assert phases.mark_ready() == 5.0
+        assert phases.report() == "Time to first ready: 5.00s (extensions=2.00s)"
@@ -0,0 +1,168 @@
+"""Unit tests for per-invocation REST tracing."""
+import asyncio
+import json
+import logging
+
+import pytest
+
+from bot.core.tracing import (
+    RestSpan,
+    Trace,
+    Tracer,
+    build_http_trace_config,
+    current_trace,
+    record_attempt_end,
+    record_attempt_start,
+)
+
+
+def make_span(route, started, duration, wait=0.0, bucket=None):
+    return RestSpan(method="GET", route=route, started=started, duration=duration, ratelimit_wait=wait, bucket=bucket)
+
+
+class TestTrace:
+    """Tests for trace summaries and flamegraph output."""
+
+    def test_busy_time_merges_overlapping_spans(self):
+        """Concurrent requests should only count once towards REST busy time."""
+        trace = Trace(kind="command", name="useractivity", started=0.0, duration=10.0)
+        trace.spans = [make_span("/a", 1.0, 2.0), make_span("/a", 2.0, 2.0), make_span("/b", 6.0, 1.0)]
+        assert trace.rest_busy_time() == pytest.approx(4.0)
+
+    def test_summary_groups_routes(self):
+        """The summary should aggregate calls, time and rate-limit waits per route."""
+        trace = Trace(kind="command", name="log", attrs={"guild_id": 5}, started=0.0, duration=3.0)
+        trace.spans = [
+            make_span("/channels/{channel_id}/messages", 0.0, 1.0, wait=0.25, bucket="abc"),
+            make_span("/channels/{channel_id}/messages", 1.0, 1.0),
+            make_span("/users/{user_id}", 2.0, 0.1),
+        ]
+        summary = trace.summary()
+        assert summary["guild_id"] == 5
+        assert summary["rest"]["calls"] == 3
+        assert summary["rest"]["ratelimit_wait_ms"] == 250.0
+        assert summary["rest"]["routes"][0] == {
+            "route": "GET /channels/{channel_id}/messages",
+            "bucket": "abc",
+            "calls": 2,
+            "time_ms": 2000.0,
+            "wait_ms": 250.0,
+        }
+
+    def test_collapsed_stacks(self):
+        """Collapsed stacks should split network and rate-limit time and report self time."""
+        trace = Trace(kind="command", name="tldr", started=0.0, duration=5.0)
+        trace.spans = [make_span("/x", 0.0, 2.0, wait=0.5)]
+        assert trace.collapsed_stacks() == [
+            "command:tldr;(self) 3000",
+            "command:tldr;GET /x;network 1500",
+            "command:tldr;GET /x;ratelimit_wait 500",
+        ]
+
+
+class TestTracer:
+    """Tests for trace context propagation and logging."""
+
+    @pytest.mark.asyncio
+    async def test_spans_in_child_tasks_join_the_trace(self):
+        """Requests made from gathered tasks should be attributed to the invoking trace."""
+        tracer = Tracer(slow_threshold=60)
+
+        async def request(route):
+            with tracer.rest_span("GET", route):
+                await asyncio.sleep(0)
+
+        with tracer.trace("command", "useractivity") as trace:
+            await asyncio.gather(request("/a"), request("/b"))
+        assert sorted(span.route for span in trace.spans) == ["/a", "/b"]
+        assert current_trace() is None
+
+    def test_requests_outside_a_trace_are_ignored(self):
+        """Spans with no active trace should be dropped without error."""
+        tracer = Tracer(slow_threshold=60)
+        with tracer.rest_span("GET", "/a") as span:
+            pass
+        assert span.duration >= 0
+
+    def test_nested_traces_join_parent(self):
+        """An instrumented call inside a traced command should not start a second trace."""
+        tracer = Tracer(slow_threshold=60)
+        with tracer.trace("command", "outer") as outer:
+            with tracer.trace("event", "inner") as inner:
+                assert inner is outer
+
+    def test_summaries_are_logged_as_json(self, caplog):
+        """Command traces should log one JSON summary; slow ones also log collapsed stacks."""
+        tracer = Tracer(slow_threshold=0)
+        with caplog.at_level(logging.INFO, logger="barry.trace"):
+            with tracer.trace("command", "export", guild_id=1):
+                pass
+        info = [record for record in caplog.records if record.levelno == logging.INFO]
+        assert json.loads(info[0].getMessage())["name"] == "export"
+        assert any("command:export;(self)" in record.getMessage() for record in caplog.records)
+        assert len(tracer.recent_slow) == 1
+
+    def test_quiet_events_are_not_logged(self, caplog):
+        """Fast event traces without REST calls should not be logged."""
+        tracer = Tracer(slow_threshold=60)
+        with caplog.at_level(logging.INFO, logger="barry.trace"):
+            with tracer.trace("event", "on_message"):
+                pass
+        assert not caplog.records
+
+    def test_errors_are_recorded(self):
+        """A failing block should finish the trace with an error outcome."""
+        tracer = Tracer(slow_threshold=60)
+        finished = []
+        tracer.subscribe(finished.append)
+        with pytest.raises(RuntimeError):
+            with tracer.trace("command", "tldr"):
+                raise RuntimeError("boom")
+        assert finished[0].outcome == "error"
+
+
+class TestHttpAttempts:
+    """Tests for splitting request time into rate-limit waits and network time."""
+
+    def test_retry_gap_counts_as_wait(self):
+        """Time before each attempt should be charged to rate-limit waiting."""
+        tracer = Tracer(slow_threshold=60)
+        with tracer.rest_span("POST", "/channels/{channel_id}/messages") as span:
+            start = span.started
+            record_attempt_start(start + 0.1)
+            record_attempt_end(start + 0.2, 429, "bucket-1")
+            record_attempt_start(start + 1.2)
+            record_attempt_end(start + 1.3, 200, None)
+        assert span.attempts == 2
+        assert span.rate_limited == 1
+        assert span.bucket == "bucket-1"
+        assert span.status == 200
+        assert span.ratelimit_wait == pytest.approx(1.1)
+
+    @pytest.mark.asyncio
+    async def test_trace_config_marks_real_requests(self):
+        """The aiohttp trace config should mark attempts made by a real client session."""
+        import aiohttp
+        from aiohttp import web
+
+        async def handler(request):
+            return web.Response(text="ok", headers={"X-RateLimit-Bucket": "b"})
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        tracer = Tracer(slow_threshold=60)
+        try:
+            async with aiohttp.ClientSession(trace_configs=[build_http_trace_config()]) as session:
+                with tracer.rest_span("GET", "/") as span:
+                    async with session.get(f"http://127.0.0.1:{port}/") as response:
+                        await response.text()
+        finally:
+            await runner.cleanup()
+        assert span.attempts == 1
+        assert span.status == 200
+        assert span.bucket == "b"
@@ -0,0 +1,112 @@
+"""Unit tests for the scene transcript formatters."""
+import gzip
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from bot.extensions._helpers.transcripts import (
+    FORMATTERS,
+    format_text,
+    message_to_record,
+    render_transcript,
+)
+
+
+def make_message(message_id=1, name="alice", content="Hello there", embeds=None, attachments=None):
+    """Build a minimal message-like object."""
+    return SimpleNamespace(
+        id=message_id,
+        channel=SimpleNamespace(id=42),
+        author=SimpleNamespace(id=7, name=name, display_name=name.title(), bot=False),
+        created_at=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        edited_at=None,
+        content=content,
+        embeds=embeds or [],
+        attachments=attachments or [],
+        jump_url=f"https://discord.com/channels/1/42/{message_id}",
+    )
+
+
+@pytest.fixture
+def records():
+    embed = SimpleNamespace(
+        title="Aria's Downtime",
+        description="That's 24 contribution points",
+        fields=[SimpleNamespace(name="Roll", value="1d20 (15)")],
+        footer=SimpleNamespace(text="Avrae"),
+        author=None,
+    )
+    attachment = SimpleNamespace(filename="map.png", url="https://cdn/map.png", size=10, content_type="image/png")
+    return [
+        message_to_record(make_message(1, content="<b>hi</b>")),
+        message_to_record(make_message(2, name="avrae", content="", embeds=[embed], attachments=[attachment])),
+    ]
+
+
+class TestMessageToRecord:
+    """Tests for flattening messages into records."""
+
+    def test_record_is_json_serialisable(self, records):
+        """Records should round-trip through JSON."""
+        assert json.loads(json.dumps(records)) == records
+
+    def test_record_captures_embeds_and_attachments(self, records):
+        """Embeds and attachments should not be dropped."""
+        assert records[1]["embeds"][0]["fields"] == [{"name": "Roll", "value": "1d20 (15)"}]
+        assert records[1]["attachments"][0]["filename"] == "map.png"
+        assert records[0]["created_at"] == "2024-05-01T12:30:00+00:00"
+
+
+class TestFormatters:
+    """Tests for the individual output formats."""
+
+    def test_text_matches_legacy_layout(self):
+        """Plain messages should keep the original export layout."""
+        output = format_text([message_to_record(make_message())], "scene")
+        assert output == "alice\n-----\n Hello there\n===============\n"
+
+    def test_text_includes_embed_lines(self, records):
+        """Embed content should appear in plain text exports."""
+        assert " | That's 24 contribution points" in format_text(records, "scene")
+
+    def test_jsonl_has_one_line_per_message(self, records):
+        """JSONL output should contain one record per line."""
+        lines = FORMATTERS["jsonl"].render(records, "scene").splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+    def test_html_escapes_content(self, records):
+        """HTML output should escape message content."""
+        output = FORMATTERS["html"].render(records, "scene")
+        assert "&lt;b&gt;hi&lt;/b&gt;" in output
+        assert "<b>hi</b>" not in output
+
+    def test_markdown_quotes_embeds(self, records):
+        """Markdown output should render embeds as block quotes."""
+        assert "> Aria's Downtime" in FORMATTERS["md"].render(records, "scene")
+
+
+class TestRenderTranscript:
+    """Tests for rendering and compressing exports."""
+
+    def test_small_exports_are_not_compressed(self, records):
+        """Small exports should keep their plain extension."""
+        filename, payload = render_transcript(records, "md", "scene")
+        assert filename == "scene.md"
+        assert payload.startswith(b"# scene")
+
+    def test_large_exports_are_gzipped(self, records):
+        """Exports above the threshold should be gzip-compressed."""
+        filename, payload = render_transcript(records, "html", "scene", gzip_threshold=10)
+        assert filename == "scene.html.gz"
+        assert gzip.decompress(payload).startswith(b"<!DOCTYPE html>")
+
+    def test_unknown_format_raises(self, records):
+        """Unknown formats should raise ValueError."""
+        with pytest.raises(ValueError):
+            render_transcript(records, "pdf", "scene")
+
+    def test_formatter_can_be_passed_directly(self, records):
+        """A formatter object should render like its key, for worker processes without the registry."""
+        assert render_transcript(records, FORMATTERS["jsonl"], "scene") == render_transcript(records, "jsonl", "scene")
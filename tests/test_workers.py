@@ -0,0 +1,97 @@
+"""Unit tests for the parse worker pool (bot/services/workers.py)."""
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import pytest
+
+from bot.extensions._helpers.avrae import level_ups_records
+from bot.services.workers import ParseWorkerPool, workers_for
+
+
+def lengths(batch):
+    return [len(item) for item in batch]
+
+
+class BrokenExecutor(ThreadPoolExecutor):
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+
+class TestParseWorkerPool:
+    """Tests for batching, inline fallback and process execution."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_pool_runs_inline(self):
+        """With zero workers jobs should run inline and never start an executor."""
+        started = []
+        pool = ParseWorkerPool(max_workers=0, executor_factory=lambda n: started.append(n))
+        assert await pool.map_batches(lengths, ["a", "bb"] * 500) == [1, 2] * 500
+        assert await pool.run(sum, [1, 2, 3]) == 6
+        assert started == []
+
+    @pytest.mark.asyncio
+    async def test_batches_keep_input_order(self):
+        """Large inputs should be split into batches whose results are concatenated in order."""
+        batches = []
+
+        def record_batch(batch):
+            batches.append(len(batch))
+            return lengths(batch)
+
+        pool = ParseWorkerPool(max_workers=2, batch_size=3, inline_below=5, executor_factory=ThreadPoolExecutor)
+        items = ["x" * n for n in range(1, 9)]
+        assert await pool.map_batches(record_batch, items) == list(range(1, 9))
+        assert sorted(batches) == [2, 3, 3]
+        # Small inputs skip the pool
+        assert await pool.map_batches(record_batch, items[:4]) == [1, 2, 3, 4]
+        assert batches[-1] == 4
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_small_jobs_run_inline(self):
+        """run() should skip the pool when the job covers fewer than inline_below records."""
+        started = []
+
+        def factory(n):
+            started.append(n)
+            return ThreadPoolExecutor(n)
+
+        pool = ParseWorkerPool(max_workers=1, inline_below=5, executor_factory=factory)
+        assert await pool.run(sum, [1, 2, 3], size=3) == 6
+        assert started == []
+        assert await pool.run(sum, [1] * 5, size=5) == 5
+        assert started == [1]
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_falls_back_inline(self):
+        """A broken pool should not fail the job, and should be replaced for the next one."""
+        created = []
+
+        def factory(n):
+            created.append(n)
+            return BrokenExecutor(n)
+
+        pool = ParseWorkerPool(max_workers=1, executor_factory=factory)
+        assert await pool.run(sum, [1, 2]) == 3
+        assert await pool.run(sum, [3]) == 3
+        assert created == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_in_worker_processes(self):
+        """Record parsers should be importable and picklable by spawned workers."""
+        pool = ParseWorkerPool(max_workers=1, batch_size=2, inline_below=0)
+        records = [{"content": f"Hero{n} levels up to {n}th level!", "embeds": []} for n in (4, 5, 6)]
+        try:
+            assert await pool.map_batches(level_ups_records, records) == [("Hero4", 4), ("Hero5", 5), ("Hero6", 6)]
+        finally:
+            pool.close()
+
+    def test_workers_for_attaches_a_pool(self, monkeypatch):
+        """The accessor should create one pool per client and honour BARRY_PARSE_WORKERS."""
+        monkeypatch.setenv("BARRY_PARSE_WORKERS", "0")
+        client = SimpleNamespace(services=SimpleNamespace(workers=None))
+        pool = workers_for(client)
+        assert client.services.workers is pool and not pool.enabled
+        assert workers_for(client) is pool
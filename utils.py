@@ -1,11 +1,18 @@
 from discord import Embed
-import anthropic
+from functools import lru_cache
 import os
 import config
+from bot.core.metrics import REGISTRY
 
-anthro = anthropic.Anthropic(
-    api_key = os.getenv("anthropic")
-)
+
+@lru_cache(maxsize=None)
+def _anthropic_client():
+    """Build the Anthropic client on first use so importing utils stays cheap at startup."""
+    import anthropic
+
+    return anthropic.Anthropic(
+        api_key = os.getenv("anthropic")
+    )
 
 def _server_error(ctx_or_interaction):
     # Support both old ctx and new interaction patterns
@@ -32,11 +39,22 @@ def _ai_enabled_server(guild_id):
     """Check if a server has AI capabilities enabled."""
     return str(guild_id) in config.ai_enabled_servers
 
+CLAUDE_MODEL = "claude-3-5-sonnet-20240620"
+
 def claude_call(prompt, max_tokens=200, temperature=0.8):
-    message = anthro.messages.create(
+    with REGISTRY.time("barry_llm_seconds", model=CLAUDE_MODEL):
+        message = _claude_create(prompt, max_tokens, temperature)
+    usage = getattr(message, "usage", None)
+    if usage is not None:
+        REGISTRY.inc("barry_llm_tokens_total", usage.input_tokens, model=CLAUDE_MODEL, direction="input")
+        REGISTRY.inc("barry_llm_tokens_total", usage.output_tokens, model=CLAUDE_MODEL, direction="output")
+    return message.content[0].text
+
+def _claude_create(prompt, max_tokens, temperature):
+    return _anthropic_client().messages.create(
         # model="claude-3-opus-20240229",
         # model = "claude-3-sonnet-20240229",
-        model = "claude-3-5-sonnet-20240620",
+        model = CLAUDE_MODEL,
         max_tokens=max_tokens,
         temperature=temperature,
         messages=[
@@ -51,7 +69,6 @@ def claude_call(prompt, max_tokens=200, temperature=0.8):
             }
         ]
     )
-    return message.content[0].text
 
 def mistral_call(prompt, max_tokens=200, temperature=0.8):
     response = mistral.chat(